@@ -8,6 +8,7 @@ from app.core.database import get_db
 from app.models_sqlalchemy.user import User
 from app.models_sqlalchemy.product import Product, Category, Brand, Retailer
 from app.api.v1.endpoints.auth import get_current_user
+from app.services.counter_service import counter_aggregator
 
 router = APIRouter()
 
@@ -107,9 +108,12 @@ async def get_product_by_id(
             detail="Product not found"
         )
     
-    # Increment view count
-    product.view_count += 1
-    await db.commit()
+    # Increment view count (coalesced into a batched flush when enabled)
+    if counter_aggregator.running:
+        counter_aggregator.incr("products", product.id, "view_count")
+    else:
+        product.view_count += 1
+        await db.commit()
     
     return product.to_dict()
 
@@ -141,9 +145,12 @@ async def track_product_click(
             detail="Product not found"
         )
     
-    # Increment click count
-    product.click_count += 1
-    await db.commit()
+    # Increment click count (coalesced into a batched flush when enabled)
+    if counter_aggregator.running:
+        counter_aggregator.incr("products", product.id, "click_count")
+    else:
+        product.click_count += 1
+        await db.commit()
     
     # TODO: Create affiliate click tracking record
     # This would typically involve creating a record in an affiliate_clicks table
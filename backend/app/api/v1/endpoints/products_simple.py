@@ -3,6 +3,7 @@ from typing import List, Optional
 import uuid
 from datetime import datetime
 
+from app.core.caching import CacheInvalidator
 from app.database import supabase
 from app.models import Product, ProductCreate
 
@@ -135,6 +136,9 @@ async def update_product(product_id: str, product: ProductCreate):
             use_service_key=True
         )
         
+        # Drop cached copies (including affiliate click metadata)
+        await CacheInvalidator.invalidate_product_cache(product_id)
+        
         return updated_products[0]
         
     except HTTPException:
@@ -170,6 +174,8 @@ async def delete_product(product_id: str):
             use_service_key=True
         )
         
+        await CacheInvalidator.invalidate_product_cache(product_id)
+        
         return {"message": "Product deleted successfully"}
         
     except HTTPException:
@@ -102,16 +102,14 @@ async def analyze_user_preferences(user_id: str) -> Dict:
     - First attempts to get cached preferences from user_preferences table
     - Falls back to real-time calculation from swipe_interactions if needed
     - Uses efficient JSONB queries for flexible preference structure
+    - Stored preferences are updated incrementally per swipe, so this lookup
+      does not scale with swipe history; stale rows are reconciled in the
+      background
     """
     try:
-        # Get user preferences from database (calculated from real swipe data)
-        # Database Implementation: Using new database_service for real data access
-        preferences = await database_service.get_user_preferences(user_id)
-        
-        if not preferences:
-            # No cached preferences - calculate from swipe data
-            # Logic: This triggers ML preference calculation from actual user interactions
-            preferences = await database_service.calculate_user_preferences(user_id)
+        # Get user preferences from database (maintained incrementally per swipe)
+        # Falls back to a full calculation only for users never calculated before
+        preferences = await database_service.get_current_user_preferences(user_id)
         
         # Convert to expected format for recommendation algorithms
         return {
@@ -69,22 +69,26 @@ class SwipeRequest(BaseModel):
         product_id: Amazon ASIN or internal product identifier
         direction: Swipe direction ('like', 'dislike', 'super_like')
         session_id: Optional session identifier for analytics grouping
+        client_swipe_id: Optional client-generated UUID (idempotency key)
     
     Validation:
         - product_id must be valid ASIN format or internal ID
         - direction must be one of allowed values
         - session_id optional for anonymous or session-less swipes
+        - client_swipe_id must be a UUID when provided
     
     Example:
         {
             "product_id": "B08GYKNCCP",
             "direction": "like",
-            "session_id": "session_abc123"
+            "session_id": "session_abc123",
+            "client_swipe_id": "3f1c7d0e-8a4b-4c52-9d8e-2b6f0a9c1e77"
         }
     """
     product_id: str                        # Amazon ASIN or product identifier
     direction: str                         # 'like', 'dislike', or 'super_like'
     session_id: Optional[str] = None       # Optional session grouping
+    client_swipe_id: Optional[str] = None  # Client-generated UUID for idempotent retries
 
 class SwipeResponse(BaseModel):
     """
@@ -100,14 +104,16 @@ class SwipeResponse(BaseModel):
         direction: Direction of the swipe interaction
         timestamp: ISO timestamp when swipe was recorded
         session_id: Session identifier if part of session
+        queued: True when acknowledged before being persisted (write-behind)
     
     Example:
         {
-            "id": "swipe_1704067200123",
+            "id": "3f1c7d0e-8a4b-4c52-9d8e-2b6f0a9c1e77",
             "product_id": "B08GYKNCCP",
             "direction": "like",
             "timestamp": "2024-01-01T00:00:00.123Z",
-            "session_id": "session_abc123"
+            "session_id": "session_abc123",
+            "queued": true
         }
     """
     id: str                                # Unique swipe record identifier
@@ -115,6 +121,7 @@ class SwipeResponse(BaseModel):
     direction: str                         # Swipe direction
     timestamp: str                         # ISO timestamp of interaction
     session_id: Optional[str] = None       # Optional session identifier
+    queued: bool = False                   # Acknowledged ahead of persistence
 
 class SwipeSessionResponse(BaseModel):
     """
@@ -180,6 +187,7 @@ async def record_swipe(
     Data Processing:
         1. Validates user authentication and swipe data
         2. Records swipe interaction with timestamp and session context
+           (buffered and acknowledged immediately in write-behind mode)
         3. Updates user preference profile asynchronously
         4. Triggers recommendation engine updates
         5. Logs analytics event for dashboard metrics
@@ -271,8 +279,10 @@ async def record_swipe(
         preference_strength = preference_strength_mapping.get(db_direction, 0.5)
         
         # Record swipe interaction in database
+        # With SWIPE_WRITE_BEHIND_ENABLED the swipe is buffered and acknowledged
+        # immediately; otherwise it is written synchronously as before
         try:
-            interaction_id = await database_service.record_swipe_interaction(
+            interaction_id, queued = await database_service.enqueue_swipe_interaction(
                 user_id=user_id,
                 session_id=swipe_data.session_id,
                 product_id=swipe_data.product_id,
@@ -283,7 +293,8 @@ async def record_swipe(
                     "swipe_interface_version": "v1.0",
                     "frontend_direction": swipe_data.direction
                 },
-                preference_strength=preference_strength
+                preference_strength=preference_strength,
+                interaction_id=swipe_data.client_swipe_id
             )
             
             # Update swipe_id with actual database ID
@@ -296,7 +307,8 @@ async def record_swipe(
                 user_id=user_id,
                 product_id=swipe_data.product_id,
                 direction=swipe_data.direction,
-                preference_strength=preference_strength
+                preference_strength=preference_strength,
+                queued=queued
             )
             
         except ValidationError as e:
@@ -334,7 +346,8 @@ async def record_swipe(
             product_id=swipe_data.product_id,
             direction=swipe_data.direction,
             timestamp=timestamp.isoformat() + "Z",  # ISO format with UTC timezone
-            session_id=swipe_data.session_id
+            session_id=swipe_data.session_id,
+            queued=queued
         )
         
     except HTTPException:
@@ -6,6 +6,7 @@ from datetime import datetime
 from app.database import supabase
 from app.models import SwipeSession, SwipeSessionBase, SwipeSessionCreate, SwipeInteraction, SwipeInteractionBase, SwipeInteractionCreate
 from app.api.v1.endpoints.auth import get_current_user_from_token
+from app.services.database_service import database_service, ValidationError
 
 router = APIRouter()
 
@@ -172,9 +173,16 @@ async def complete_swipe_session(
 async def create_swipe_interaction(
     interaction_data: SwipeInteractionBase,  # Use base model without user_id requirement
     session_id: str = Query(..., description="Session ID for this interaction"),
+    client_interaction_id: Optional[str] = Query(None, description="Client-generated UUID for idempotent retries"),
     authorization: Optional[str] = Header(None)
 ):
-    """Record a swipe interaction."""
+    """
+    Record a swipe interaction.
+
+    With SWIPE_WRITE_BEHIND_ENABLED the interaction is buffered and
+    acknowledged immediately (``queued: true``); it is persisted with the
+    next batch flush, which also updates the session's total_swipes.
+    """
     try:
         # Get user from token
         if authorization:
@@ -183,9 +191,15 @@ async def create_swipe_interaction(
         else:
             raise HTTPException(status_code=401, detail="Authorization required")
         
+        if client_interaction_id:
+            try:
+                client_interaction_id = str(uuid.UUID(client_interaction_id))
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid client interaction ID format")
+
         interaction_dict = interaction_data.dict()
         interaction_dict.update({
-            "id": str(uuid.uuid4()),
+            "id": client_interaction_id or str(uuid.uuid4()),
             "session_id": session_id,  # Set from query parameter
             "user_id": user_id,        # Set from authenticated user
             "swipe_timestamp": datetime.now().isoformat()
@@ -203,6 +217,25 @@ async def create_swipe_interaction(
             if not sessions:
                 raise HTTPException(status_code=404, detail="Swipe session not found or unauthorized")
         
+        # Write-behind: acknowledge now, persist with the next batch
+        swipe_buffer = database_service._swipe_buffer
+        if swipe_buffer is not None and swipe_buffer.running:
+            try:
+                interaction_id, queued = await database_service.enqueue_swipe_interaction(
+                    user_id=user_id,
+                    session_id=session_id,
+                    product_id=interaction_dict.get("product_id"),
+                    category_id=interaction_dict.get("category_id"),
+                    direction=getattr(interaction_data.swipe_direction, "value", interaction_data.swipe_direction),
+                    time_spent_seconds=interaction_dict.get("time_spent_seconds"),
+                    interaction_context=interaction_dict.get("interaction_context"),
+                    preference_strength=interaction_dict.get("preference_strength", 0.5),
+                    interaction_id=interaction_dict["id"]
+                )
+            except ValidationError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return {**interaction_dict, "id": interaction_id, "queued": queued}
+        
         created_interactions = await supabase.insert(
             "swipe_interactions",
             interaction_dict,
@@ -0,0 +1,494 @@
+"""
+aclue Cache Admission - Byte-Bounded W-TinyLFU In-Process Cache
+
+Memory-bounded replacement for the entry-counted LRUCache used as
+CacheManager's memory tier.
+
+Problem Addressed:
+LRUCache bounds the number of entries, not their size, so a handful of large
+search results can grow worker RSS unchecked while thousands of small keys
+are evicted. Pure LRU also admits every new key, so a single pass over
+one-off keys (a crawler, an export) flushes the hot set.
+
+Design (W-TinyLFU, Einziger et al.):
+    window     ~1% of the byte budget, plain LRU; every new entry lands here
+    probation  main-space LRU segment for entries admitted from the window
+    protected  ~80% of the main space; entries hit again while in probation
+
+When the window overflows, its least recently used entry becomes a
+candidate for the main space. If the main space lacks room, the candidate
+is admitted only if its estimated access frequency beats that of every
+entry that would have to be evicted for it; otherwise it is dropped. Access
+frequencies come from a count-min sketch of 4-bit counters which is halved
+periodically, so popularity ages out.
+
+Entry sizes are estimated from sys.getsizeof over the value's containers,
+sampling long sequences, and entries larger than the whole budget are not
+cached at all.
+
+Usage:
+    from app.core.cache_admission import WTinyLFUCache
+
+    cache = WTinyLFUCache(max_bytes=64 * 1024 * 1024, ttl=60)
+    cache.set("search:audio", results)
+    cache.get("search:audio")
+"""
+
+import fnmatch
+import sys
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+# Sequences longer than this are sized from a sample of their items
+SIZE_SAMPLE_ITEMS = 32
+SIZE_MAX_DEPTH = 6
+
+
+def estimate_size(value: Any, depth: int = 0) -> int:
+    """
+    Estimate the memory held by a value in bytes
+
+    Containers are walked recursively up to SIZE_MAX_DEPTH levels; lists,
+    tuples and sets longer than SIZE_SAMPLE_ITEMS are extrapolated from
+    their first items. Shared objects are counted once per reference, so
+    the result is an upper bound for values that share strings.
+
+    Args:
+        value: Value to size
+        depth: Current recursion depth
+
+    Returns:
+        Estimated size in bytes
+    """
+    size = sys.getsizeof(value)
+    if depth >= SIZE_MAX_DEPTH or isinstance(value, (str, bytes, bytearray, int, float, bool)):
+        return size
+
+    if isinstance(value, dict):
+        items = list(value.items())
+        sample = items[:SIZE_SAMPLE_ITEMS]
+        sampled = sum(
+            estimate_size(k, depth + 1) + estimate_size(v, depth + 1) for k, v in sample
+        )
+        return size + (sampled * len(items) // len(sample) if sample else 0)
+
+    if isinstance(value, (list, tuple, set, frozenset, deque)):
+        sample = list(islice(value, SIZE_SAMPLE_ITEMS))
+        sampled = sum(estimate_size(item, depth + 1) for item in sample)
+        return size + (sampled * len(value) // len(sample) if sample else 0)
+
+    if hasattr(value, "__dict__"):
+        return size + estimate_size(vars(value), depth + 1)
+
+    return size
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of 4-bit access counters with periodic aging
+
+    Every ``sample_size`` increments all counters are halved, so the sketch
+    approximates recent popularity rather than all-time counts.
+    """
+
+    DEPTH = 4
+    MAX_COUNT = 15
+    SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5)
+
+    def __init__(self, expected_entries: int):
+        """
+        Initialize sketch
+
+        Args:
+            expected_entries: Roughly how many distinct entries the cache
+                holds; sizes the counter table
+        """
+        width = 16
+        while width < max(expected_entries, 1):
+            width <<= 1
+        self.mask = width - 1
+        self.table: List[bytearray] = [bytearray(width) for _ in range(self.DEPTH)]
+        self.sample_size = 10 * width
+        self.additions = 0
+        self.resets = 0
+
+    def _indexes(self, key: str) -> Iterable[Tuple[bytearray, int]]:
+        key_hash = hash(key)
+        for row, seed in zip(self.table, self.SEEDS):
+            mixed = ((key_hash ^ seed) * 0x100000001B3) & 0xFFFFFFFFFFFFFFFF
+            yield row, (mixed ^ (mixed >> 29)) & self.mask
+
+    def increment(self, key: str) -> None:
+        """Record one access to ``key``"""
+        added = False
+        for row, index in self._indexes(key):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+                added = True
+
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                self._reset()
+
+    def frequency(self, key: str) -> int:
+        """Estimated recent access count of ``key``"""
+        return min(row[index] for row, index in self._indexes(key))
+
+    def _reset(self) -> None:
+        """Halve every counter (aging)"""
+        for i, row in enumerate(self.table):
+            self.table[i] = bytearray(count >> 1 for count in row)
+        self.additions //= 2
+        self.resets += 1
+
+
+class WTinyLFUCache:
+    """
+    Byte-bounded in-process cache with W-TinyLFU admission
+
+    Drop-in replacement for LRUCache: same get/set/invalidate/clear API,
+    per-entry TTLs and on_evict hook, plus a byte budget.
+    """
+
+    WINDOW = "window"
+    PROBATION = "probation"
+    PROTECTED = "protected"
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: int = 60,
+        max_size: int = 100_000,
+        window_ratio: float = 0.01,
+        protected_ratio: float = 0.8,
+        on_evict: Optional[Callable[[str], None]] = None,
+        size_of: Callable[[Any], int] = estimate_size,
+        trace_size: int = 0,
+        on_capacity_evict: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Initialize cache
+
+        Args:
+            max_bytes: Byte budget across all segments
+            ttl: Time to live for cached items in seconds
+            max_size: Upper bound on the number of entries
+            window_ratio: Share of the budget for the admission window
+            protected_ratio: Share of the main space for the protected segment
+            on_evict: Called with the key whenever an item leaves the cache
+                (eviction, rejection, expiry, invalidation or clear)
+            size_of: Entry size estimator
+            trace_size: Keep the last ``trace_size`` operations as
+                (op, key, size) tuples for offline replay (0 disables)
+            on_capacity_evict: Called with the key of each entry evicted or
+                rejected to stay within the budget (before on_evict)
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_size = max_size
+        self.window_ratio = window_ratio
+        self.protected_ratio = protected_ratio
+        self.on_evict = on_evict
+        self.on_capacity_evict = on_capacity_evict
+        self.size_of = size_of
+
+        self.cache: Dict[str, Any] = {}
+        self.sizes: Dict[str, int] = {}
+        self.timestamps: Dict[str, float] = {}
+        self.ttls: Dict[str, float] = {}  # Per-entry TTL overrides
+        self.segment_of: Dict[str, str] = {}
+        self.segments: Dict[str, "OrderedDict[str, None]"] = {
+            self.WINDOW: OrderedDict(),
+            self.PROBATION: OrderedDict(),
+            self.PROTECTED: OrderedDict(),
+        }
+        self.segment_bytes: Dict[str, int] = {name: 0 for name in self.segments}
+        self.sketch = FrequencySketch(min(max_size, 1 << 20))
+        self.trace: Optional[Deque[Tuple[str, str, int]]] = deque(maxlen=trace_size) if trace_size else None
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.rejections: int = 0
+        self.oversized: int = 0
+
+    # Segment budgets follow max_bytes, so it can be changed at runtime
+    @property
+    def window_bytes(self) -> int:
+        return max(1, int(self.max_bytes * self.window_ratio))
+
+    @property
+    def protected_bytes(self) -> int:
+        return int((self.max_bytes - self.window_bytes) * self.protected_ratio)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.segment_bytes.values())
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get item from cache
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if not found/expired
+        """
+        self.sketch.increment(key)
+        if self.trace is not None:
+            self.trace.append(("get", key, self.sizes.get(key, 0)))
+
+        if key not in self.cache:
+            self.misses += 1
+            return None
+
+        # Check if expired
+        if time.time() - self.timestamps[key] > self.ttls.get(key, self.ttl):
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._touch(key)
+        self.hits += 1
+        return self.cache[key]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Set item in cache
+
+        New keys enter the admission window; replacing a key keeps its
+        segment. A main-space entry that grows past the budget makes room
+        by evicting other main-space entries (probation LRU first), without
+        running admission on unrelated window entries. Values larger than
+        the whole budget are not stored.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live for this item (defaults to the cache TTL)
+        """
+        size = self.size_of(value)
+        if self.trace is not None:
+            self.trace.append(("set", key, size))
+        if size > self.max_bytes:
+            self.oversized += 1
+            if key in self.cache:
+                self._remove(key)
+            return
+
+        if key in self.cache:
+            segment = self.segment_of[key]
+            self.segment_bytes[segment] += size - self.sizes[key]
+            self.segments[segment].move_to_end(key)
+        else:
+            segment = self.WINDOW
+            self.segment_of[key] = segment
+            self.segments[segment][key] = None
+            self.segment_bytes[segment] += size
+
+        self.cache[key] = value
+        self.sizes[key] = size
+        self.timestamps[key] = time.time()
+        if ttl is None:
+            self.ttls.pop(key, None)
+        else:
+            self.ttls[key] = ttl
+
+        if segment != self.WINDOW:
+            self._shrink_main(key)
+        self._rebalance()
+
+    def _touch(self, key: str) -> None:
+        """Record a hit: refresh recency and promote from probation."""
+        segment = self.segment_of[key]
+        if segment == self.PROBATION:
+            self._move(key, self.PROBATION, self.PROTECTED)
+            # Keep protected within its share by demoting its LRU entries
+            while self.segment_bytes[self.PROTECTED] > self.protected_bytes and len(self.segments[self.PROTECTED]) > 1:
+                demoted = next(iter(self.segments[self.PROTECTED]))
+                self._move(demoted, self.PROTECTED, self.PROBATION)
+        else:
+            self.segments[segment].move_to_end(key)
+
+    def _move(self, key: str, source: str, target: str) -> None:
+        """Move an entry to the MRU end of another segment."""
+        del self.segments[source][key]
+        self.segments[target][key] = None
+        self.segment_of[key] = target
+        self.segment_bytes[source] -= self.sizes[key]
+        self.segment_bytes[target] += self.sizes[key]
+
+    def _rebalance(self) -> None:
+        """Move window overflow into the main space, admitting by frequency."""
+        window = self.segments[self.WINDOW]
+        while window:
+            within_limits = len(self.cache) <= self.max_size and self.total_bytes <= self.max_bytes
+            if within_limits and (self.segment_bytes[self.WINDOW] <= self.window_bytes or len(window) == 1):
+                # A single entry larger than the window may use main-space headroom
+                break
+            self._admit(next(iter(window)))
+
+    def _admit(self, candidate: str) -> None:
+        """Admit a window victim to probation, or drop it if colder than its victims."""
+        size = self.sizes[candidate]
+        main_budget = self.max_bytes - self.window_bytes
+        main_bytes = self.segment_bytes[self.PROBATION] + self.segment_bytes[self.PROTECTED]
+        main_entries = len(self.segments[self.PROBATION]) + len(self.segments[self.PROTECTED])
+        main_max_entries = self.max_size - len(self.segments[self.WINDOW]) + 1
+
+        victims: List[str] = []
+        freed = 0
+        for victim in self._main_victims():
+            if main_bytes - freed + size <= main_budget and main_entries - len(victims) < main_max_entries:
+                break
+            victims.append(victim)
+            freed += self.sizes[victim]
+
+        if victims:
+            candidate_frequency = self.sketch.frequency(candidate)
+            if any(self.sketch.frequency(victim) >= candidate_frequency for victim in victims):
+                self.rejections += 1
+                self._evict(candidate)
+                return
+            for victim in victims:
+                self._evict(victim)
+                self.evictions += 1
+
+        self._move(candidate, self.WINDOW, self.PROBATION)
+
+    def _shrink_main(self, keep: str) -> None:
+        """Evict main-space entries other than ``keep`` until within the byte budget."""
+        while self.total_bytes > self.max_bytes:
+            victim = next((key for key in self._main_victims() if key != keep), None)
+            if victim is None:
+                break
+            self._evict(victim)
+            self.evictions += 1
+
+    def _main_victims(self) -> Iterable[str]:
+        """Main-space entries in eviction order: probation LRU first, then protected."""
+        # Callers stop iterating before removing anything, so no copies
+        yield from self.segments[self.PROBATION]
+        yield from self.segments[self.PROTECTED]
+
+    def _evict(self, key: str) -> None:
+        """Drop an item to stay within the budget"""
+        if self.on_capacity_evict is not None:
+            self.on_capacity_evict(key)
+        self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        """Drop an item and its bookkeeping"""
+        segment = self.segment_of.pop(key)
+        del self.segments[segment][key]
+        self.segment_bytes[segment] -= self.sizes.pop(key)
+        del self.cache[key]
+        del self.timestamps[key]
+        self.ttls.pop(key, None)
+        if self.on_evict is not None:
+            self.on_evict(key)
+
+    def invalidate(self, key: str) -> bool:
+        """
+        Remove item from cache
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if item was removed, False if not found
+        """
+        if key in self.cache:
+            self._remove(key)
+            return True
+        return False
+
+    def invalidate_pattern(self, pattern: str) -> int:
+        """
+        Remove all keys matching pattern
+
+        Args:
+            pattern: Pattern to match (supports * wildcard)
+
+        Returns:
+            Number of keys removed
+        """
+        keys_to_remove = [key for key in self.cache if fnmatch.fnmatch(key, pattern)]
+
+        for key in keys_to_remove:
+            self._remove(key)
+
+        return len(keys_to_remove)
+
+    def clear(self) -> None:
+        """Clear all cached items (access frequencies are kept)"""
+        if self.on_evict is not None:
+            for key in self.cache:
+                self.on_evict(key)
+        self.cache.clear()
+        self.sizes.clear()
+        self.timestamps.clear()
+        self.ttls.clear()
+        self.segment_of.clear()
+        for name, segment in self.segments.items():
+            segment.clear()
+            self.segment_bytes[name] = 0
+
+    def write_trace(self, path: str) -> int:
+        """
+        Write the recorded operations as ``op key size`` lines
+
+        The file is the input format of scripts/benchmark_cache_admission.py.
+
+        Args:
+            path: Output file path
+
+        Returns:
+            Number of operations written
+        """
+        events = list(self.trace or ())
+        with open(path, "w") as trace_file:
+            for op, key, size in events:
+                trace_file.write(f"{op} {key} {size}\n")
+        return len(events)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Cache statistics dictionary (LRUCache fields plus byte usage
+            and admission counters)
+        """
+        total_requests = self.hits + self.misses
+        hit_rate = self.hits / total_requests if total_requests > 0 else 0
+
+        return {
+            "size": len(self.cache),
+            "max_size": self.max_size,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "segments": {
+                name: {"entries": len(segment), "bytes": self.segment_bytes[name]}
+                for name, segment in self.segments.items()
+            },
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "rejections": self.rejections,
+            "oversized": self.oversized,
+            "sketch_resets": self.sketch.resets,
+            "hit_rate": hit_rate,
+            "total_requests": total_requests
+        }
+
+
+__all__ = [
+    'FrequencySketch',
+    'WTinyLFUCache',
+    'estimate_size',
+]
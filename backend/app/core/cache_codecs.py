@@ -0,0 +1,426 @@
+"""
+aclue Cache Codecs - Compact Serialisation for the Redis Tier
+
+Pluggable value codecs and compression for CacheManager's Redis storage.
+
+Problem Addressed:
+Every Redis value was pickled. Pickle is slow for large lists of product
+dicts, stores them verbosely, and ties cached data to Python class layout,
+so renaming a class breaks every cached value that references it.
+
+Wire Format:
+    byte 0   FORMAT_VERSION (bumped on incompatible changes)
+    byte 1   codec id (0 pickle, 1 json)
+    byte 2   compressor id (0 none, 1 zlib, 2 zstd, 3 lz4)
+    byte 3+  payload
+
+Legacy values written before the header existed are raw pickles. These
+always start with the pickle protocol opcode 0x80, which is never a valid
+format version, so both formats can be read during a rolling upgrade.
+
+Codec Selection:
+- Codecs are chosen per key prefix (CacheConfig.PREFIX_CODECS) with a
+  default for all other keys
+- The JSON codec (orjson when installed, stdlib json otherwise) is meant for
+  prefixes holding JSON-shaped data such as Supabase rows. Values it cannot
+  encode fall back to pickle for that write
+- Payloads at or above the compression threshold are compressed, and kept
+  compressed only if that makes them smaller
+
+Usage:
+    from app.core.cache_codecs import CacheSerializer
+
+    serializer = CacheSerializer(prefix_codecs={"product:": "json"})
+    data = serializer.dumps("product:123", value)
+    value = serializer.loads(data)
+"""
+
+import json
+import logging
+import math
+import pickle
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from app.monitoring.metrics import cache_value_bytes
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional compressor
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional compressor
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+HEADER_SIZE = 3
+LEGACY_PICKLE_MARKER = 0x80
+
+
+class CodecError(Exception):
+    """Raised when cached bytes cannot be decoded"""
+
+
+# ==============================================================================
+# CODECS
+# ==============================================================================
+
+class Codec(ABC):
+    """
+    Value codec interface
+    """
+    codec_id: int = -1
+    name: str = ""
+
+    @abstractmethod
+    def encode(self, value: Any) -> bytes:
+        """Encode a value; raises TypeError/ValueError if it is not supported"""
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """Decode bytes produced by ``encode``"""
+
+
+class PickleCodec(Codec):
+    """
+    Pickle codec; handles any picklable value
+    """
+    codec_id = 0
+    name = "pickle"
+
+    def encode(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class JSONCodec(Codec):
+    """
+    JSON codec for JSON-shaped values
+
+    Uses orjson when installed, stdlib json otherwise. Both would convert
+    some values on the way out (tuples to lists, UUIDs, datetimes and enums
+    to strings, NaN to null, non-str dict keys to strings), so every value
+    is validated first: only dicts with str keys, lists, str, int, bool,
+    None and finite floats, of exactly those types, are encoded. Anything
+    else is rejected rather than converted and falls back to pickle, so a
+    cached value decodes the same whichever JSON library is installed.
+    """
+    _SCALARS = frozenset((str, int, bool, type(None)))
+    codec_id = 1
+    name = "json"
+
+    def encode(self, value: Any) -> bytes:
+        self._check(value)
+        if orjson is not None:
+            return orjson.dumps(value)
+        return json.dumps(value, separators=(",", ":"), allow_nan=False).encode()
+
+    def decode(self, data: bytes) -> Any:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    @staticmethod
+    def _reject(value: Any) -> Any:
+        raise TypeError(f"{type(value).__name__} is not JSON serialisable")
+
+    @classmethod
+    def _check(cls, value: Any) -> None:
+        """Reject values either JSON backend would silently alter"""
+        stack = [value]
+        while stack:
+            item = stack.pop()
+            item_type = type(item)
+            if item_type is dict:
+                for key, child in item.items():
+                    if type(key) is not str:
+                        raise TypeError(f"{type(key).__name__} dict key is not JSON serialisable")
+                    stack.append(child)
+            elif item_type is list:
+                stack.extend(item)
+            elif item_type is float:
+                if not math.isfinite(item):
+                    raise ValueError(f"{item} is not JSON serialisable")
+            elif item_type not in cls._SCALARS:
+                cls._reject(item)
+
+
+# ==============================================================================
+# COMPRESSORS
+# ==============================================================================
+
+class Compressor(ABC):
+    """
+    Compression interface
+    """
+    compressor_id: int = 0
+    name: str = ""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Compress a payload"""
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        """Restore a payload produced by ``compress``"""
+
+
+class ZlibCompressor(Compressor):
+    """zlib compression (stdlib, always available)"""
+    compressor_id = 1
+    name = "zlib"
+
+    def __init__(self, level: int = 1):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCompressor(Compressor):
+    """Zstandard compression (requires the zstandard package)"""
+    compressor_id = 2
+    name = "zstd"
+
+    def __init__(self, level: int = 3):
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class LZ4Compressor(Compressor):
+    """LZ4 frame compression (requires the lz4 package)"""
+    compressor_id = 3
+    name = "lz4"
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4_frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4_frame.decompress(data)
+
+
+CODECS: Dict[str, Codec] = {
+    PickleCodec.name: PickleCodec(),
+    JSONCodec.name: JSONCodec(),
+}
+
+
+def available_compressors() -> Dict[str, Compressor]:
+    """
+    Instantiate the compressors whose libraries are installed
+
+    Returns:
+        Compressors keyed by name
+    """
+    compressors: Dict[str, Compressor] = {ZlibCompressor.name: ZlibCompressor()}
+    if zstandard is not None:
+        compressors[ZstdCompressor.name] = ZstdCompressor()
+    if lz4_frame is not None:
+        compressors[LZ4Compressor.name] = LZ4Compressor()
+    return compressors
+
+
+# ==============================================================================
+# SERIALIZER
+# ==============================================================================
+
+class CacheSerializer:
+    """
+    Encodes cache values with the codec configured for their key prefix
+    """
+
+    def __init__(
+        self,
+        default_codec: str = PickleCodec.name,
+        prefix_codecs: Optional[Dict[str, str]] = None,
+        compression: Optional[str] = ZlibCompressor.name,
+        compression_min_bytes: int = 1024
+    ):
+        """
+        Initialize serializer
+
+        Args:
+            default_codec: Codec for keys without a prefix entry
+            prefix_codecs: Codec name by key prefix (longest prefix wins)
+            compression: Preferred compressor name, or None to disable;
+                falls back to zlib if its library is not installed
+            compression_min_bytes: Smallest payload worth compressing
+        """
+        self.default_codec = CODECS[default_codec]
+        self.prefix_codecs = {
+            prefix: CODECS[name] for prefix, name in (prefix_codecs or {}).items()
+        }
+        self.compression_min_bytes = compression_min_bytes
+
+        self.compressors = available_compressors()
+        self.compressors_by_id = {c.compressor_id: c for c in self.compressors.values()}
+        self.codecs_by_id = {c.codec_id: c for c in CODECS.values()}
+
+        self.compressor: Optional[Compressor] = None
+        if compression:
+            self.compressor = self.compressors.get(compression)
+            if self.compressor is None:
+                logger.warning(f"Cache compressor {compression} not installed; using zlib")
+                self.compressor = self.compressors[ZlibCompressor.name]
+
+        # Per-prefix size accounting, keyed by the key's first segment
+        self.size_stats: Dict[str, Dict[str, int]] = {}
+        self.fallbacks = 0
+
+    def codec_for(self, key: str) -> Codec:
+        """
+        Resolve the codec for a key
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Codec of the longest matching prefix, or the default codec
+        """
+        best_prefix = None
+        for prefix in self.prefix_codecs:
+            if key.startswith(prefix) and (best_prefix is None or len(prefix) > len(best_prefix)):
+                best_prefix = prefix
+        return self.prefix_codecs[best_prefix] if best_prefix is not None else self.default_codec
+
+    def dumps(self, key: str, value: Any) -> bytes:
+        """
+        Encode a value for storage under ``key``
+
+        Args:
+            key: Cache key (selects the codec and labels size metrics)
+            value: Value to encode
+
+        Returns:
+            Header-prefixed bytes
+        """
+        codec = self.codec_for(key)
+        try:
+            payload = codec.encode(value)
+        except (TypeError, ValueError):
+            if codec.codec_id == PickleCodec.codec_id:
+                raise
+            self.fallbacks += 1
+            codec = CODECS[PickleCodec.name]
+            payload = codec.encode(value)
+
+        raw_size = len(payload)
+        compressor_id = 0
+        if self.compressor is not None and raw_size >= self.compression_min_bytes:
+            compressed = self.compressor.compress(payload)
+            if len(compressed) < raw_size:
+                payload = compressed
+                compressor_id = self.compressor.compressor_id
+
+        data = bytes((FORMAT_VERSION, codec.codec_id, compressor_id)) + payload
+        self._record_size(key, codec, raw_size, len(data))
+        return data
+
+    def loads(self, data: bytes) -> Any:
+        """
+        Decode bytes written by ``dumps`` (or a legacy raw pickle)
+
+        Args:
+            data: Stored bytes
+
+        Returns:
+            Decoded value
+
+        Raises:
+            CodecError: Unknown format version, codec or compressor
+        """
+        if self.is_legacy(data):
+            return pickle.loads(data)
+
+        if len(data) < HEADER_SIZE or data[0] != FORMAT_VERSION:
+            raise CodecError(f"Unsupported cache format version {data[:1]!r}")
+
+        codec = self.codecs_by_id.get(data[1])
+        if codec is None:
+            raise CodecError(f"Unknown cache codec id {data[1]}")
+
+        payload = data[HEADER_SIZE:]
+        if data[2]:
+            compressor = self.compressors_by_id.get(data[2])
+            if compressor is None:
+                raise CodecError(f"Cache compressor id {data[2]} not available")
+            payload = compressor.decompress(payload)
+
+        return codec.decode(payload)
+
+    @staticmethod
+    def is_legacy(data: bytes) -> bool:
+        """Whether ``data`` is a raw pickle written before the codec header"""
+        return bool(data) and data[0] == LEGACY_PICKLE_MARKER
+
+    def _record_size(self, key: str, codec: Codec, raw_size: int, stored_size: int) -> None:
+        """Track serialised sizes per key prefix"""
+        prefix = key.split(":", 1)[0]
+        cache_value_bytes.labels(prefix=prefix, codec=codec.name).observe(stored_size)
+
+        stats = self.size_stats.get(prefix)
+        if stats is None:
+            stats = self.size_stats[prefix] = {
+                "writes": 0, "raw_bytes": 0, "stored_bytes": 0, "max_bytes": 0
+            }
+        stats["writes"] += 1
+        stats["raw_bytes"] += raw_size
+        stats["stored_bytes"] += stored_size
+        stats["max_bytes"] = max(stats["max_bytes"], stored_size)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get serialisation statistics
+
+        Returns:
+            Codec configuration and per-prefix size totals
+        """
+        prefixes = {}
+        for prefix, stats in self.size_stats.items():
+            prefixes[prefix] = {
+                **stats,
+                "avg_bytes": stats["stored_bytes"] / stats["writes"],
+                "compression_ratio": (
+                    stats["raw_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 1.0
+                )
+            }
+
+        return {
+            "default_codec": self.default_codec.name,
+            "compression": self.compressor.name if self.compressor else None,
+            "json_backend": "orjson" if orjson is not None else "json",
+            "fallbacks": self.fallbacks,
+            "prefixes": prefixes
+        }
+
+
+__all__ = [
+    'CacheSerializer',
+    'Codec',
+    'CodecError',
+    'Compressor',
+    'JSONCodec',
+    'PickleCodec',
+    'FORMAT_VERSION',
+]
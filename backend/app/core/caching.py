@@ -22,16 +22,56 @@ Cache Strategies:
     - Write-through (synchronous writes)
     - Write-behind (asynchronous writes)
     - Refresh-ahead (proactive refresh)
+
+Freshness Model:
+    Every entry carries a soft expiry (its TTL) and a hard expiry (TTL plus
+    the prefix policy's stale window). get_or_set serves a value past its soft
+    expiry immediately and refreshes it in the background; hot keys can also
+    be refreshed shortly before the soft expiry (XFetch, Vattani et al.), so
+    most requests never wait on a recomputation. Plain get() treats values
+    past their soft expiry as misses.
+
+Tag Invalidation:
+    Entries are indexed under tags (the product or user they describe,
+    "search", or caller-supplied tags) in a Redis set per tag and an
+    in-memory reverse map, so invalidating a tag costs O(keys in the tag)
+    instead of a fnmatch pass over memory and a SCAN of the keyspace.
+
+Memory Tier:
+    The in-process tier is a byte-bounded W-TinyLFU cache
+    (app.core.cache_admission): new keys pass through a small LRU window and
+    only displace main-space entries they are accessed more often than, so
+    large values cannot exceed the budget and one-off scans do not flush
+    hot keys.
+
+Serialisation:
+    Redis values are encoded by app.core.cache_codecs: a per-prefix codec
+    (pickle or JSON) plus compression above a size threshold, behind a
+    format-version header. Raw pickles from older deployments are still read.
+
+Cross-Worker Invalidation:
+    Each worker has its own memory tier. When the invalidation bus is
+    running, deletes, pattern deletes, tag invalidations and full clears are
+    published on a Redis channel and every other worker evicts the same
+    entries from its memory tier, so in-memory TTLs can be raised safely.
+
+HTTP Response Cache:
+    HTTPCacheMiddleware stores whole GET responses for configured routes,
+    keyed by path, query string and auth scope, with an ETag hashed from the
+    response body. Repeat and conditional requests are answered from the
+    cache without running the endpoint.
 """
 
 import asyncio
 import hashlib
 import json
-import pickle
+import math
+import random
 import time
+import uuid
 from datetime import datetime, timedelta
 from functools import wraps
-from typing import Any, Dict, Optional, Union, Callable, List, TypeVar, Set
+from typing import Any, Dict, Iterable, Optional, Union, Callable, List, NamedTuple, Tuple, TypeVar, Set
 from collections import OrderedDict
 import logging
 
@@ -39,11 +79,71 @@ import redis.asyncio as redis
 from redis.asyncio import ConnectionPool
 from fastapi import Request, Response
 from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache_admission import WTinyLFUCache
+from app.core.cache_codecs import CacheSerializer
+from app.monitoring.metrics import (
+    cache_memory_bytes,
+    cache_memory_entries,
+    cache_redis_latency_seconds,
+    cache_warmup_duration_seconds,
+    cache_warmup_keys,
+    record_cache_eviction,
+    record_cache_lookup
+)
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Delete a lock only if it still holds our token
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Delete every key indexed under a tag, then the tag set itself
+_INVALIDATE_TAG_SCRIPT = """
+local keys = redis.call("smembers", KEYS[1])
+local deleted = 0
+for i = 1, #keys, 500 do
+    deleted = deleted + redis.call("del", unpack(keys, i, math.min(i + 499, #keys)))
+end
+redis.call("del", KEYS[1])
+return deleted
+"""
+
+
+class CachePolicy(NamedTuple):
+    """
+    Freshness policy for a family of cache keys
+
+    Attributes:
+        ttl: Freshness TTL used when the caller passes none (None falls back
+            to CacheConfig.DEFAULT_TTL)
+        stale_ttl: Seconds after the TTL during which get_or_set still serves
+            the old value while one background refresh runs (0 disables)
+        beta: XFetch early refresh factor; 0 disables, 1.0 is the usual
+            setting and larger values refresh earlier
+    """
+    ttl: Optional[int] = None
+    stale_ttl: int = 0
+    beta: float = 0.0
+
+
+class CacheEntry(NamedTuple):
+    """
+    Cached value with its expiry metadata, as stored in both cache tiers
+    """
+    value: Any
+    fresh_until: float  # Soft expiry (epoch seconds)
+    expires_at: float  # Hard expiry (epoch seconds)
+    compute_time: float  # Seconds the factory took; XFetch delta
+    tags: Tuple[str, ...] = ()  # Invalidation tags
+
 
 class CacheConfig:
     """
@@ -72,14 +172,81 @@ class CacheConfig:
     RECOMMENDATION_PREFIX: str = "rec:"
     SEARCH_PREFIX: str = "search:"
     SESSION_PREFIX: str = "session:"
-
-    # Memory cache settings
-    MEMORY_CACHE_SIZE: int = 1000  # Maximum number of items
+    HTTP_PREFIX: str = "http:"  # Stored responses (HTTPCacheMiddleware)
+
+    # Memory cache settings. "tinylfu" bounds the memory tier by estimated
+    # bytes with frequency-based admission (app.core.cache_admission);
+    # "lru" is the entry-counted LRUCache
+    MEMORY_CACHE_POLICY: str = "tinylfu"
+    MEMORY_CACHE_SIZE: int = 1000  # Maximum number of items (lru policy)
+    MEMORY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Byte budget (tinylfu policy)
+    MEMORY_CACHE_MAX_ENTRIES: int = 100_000  # Entry bound (tinylfu policy)
     MEMORY_CACHE_TTL: int = 60  # Default TTL for memory cache
 
     # Cache warming settings
     WARM_CACHE_ON_STARTUP: bool = True
     WARM_CACHE_INTERVAL: int = 3600  # Re-warm every hour
+    WARM_CACHE_CONCURRENCY: int = 4  # Warmers running at once
+
+    # Stampede protection settings (distributed lock variant)
+    LOCK_PREFIX: str = "lock:"
+    STAMPEDE_LOCK_TTL: float = 10.0  # Lock expiry if the holder dies
+    STAMPEDE_LOCK_WAIT: float = 5.0  # Max wait for another worker's result
+    STAMPEDE_LOCK_POLL_INTERVAL: float = 0.05
+
+    # Freshness policies by key prefix (longest matching prefix wins)
+    DEFAULT_POLICY: CachePolicy = CachePolicy()
+    PREFIX_POLICIES: Dict[str, CachePolicy] = {
+        PRODUCT_PREFIX: CachePolicy(stale_ttl=300, beta=1.0),
+        RECOMMENDATION_PREFIX: CachePolicy(stale_ttl=600, beta=1.0),
+        SEARCH_PREFIX: CachePolicy(stale_ttl=120, beta=1.0),
+    }
+
+    # Tag index settings. Keys under an entity prefix are tagged with the id
+    # that follows it ("rec:<user_id>:..." -> "user:<user_id>"); keys under a
+    # prefix in PREFIX_TAGS all share one tag
+    TAG_PREFIX: str = "tag:"
+    TAG_INDEX_TTL: int = VERY_LONG_TTL  # Refreshed on every write to the tag
+    SEARCH_TAG: str = "search"
+    HTTP_TAG: str = "http"
+    ENTITY_TAG_PREFIXES: Dict[str, str] = {
+        PRODUCT_PREFIX: PRODUCT_PREFIX,
+        USER_PREFIX: USER_PREFIX,
+        SESSION_PREFIX: USER_PREFIX,
+        RECOMMENDATION_PREFIX: USER_PREFIX,
+    }
+    PREFIX_TAGS: Dict[str, str] = {
+        SEARCH_PREFIX: SEARCH_TAG,
+        HTTP_PREFIX: HTTP_TAG,
+    }
+
+    # Serialisation settings (see app.core.cache_codecs). JSON prefixes must
+    # hold JSON-shaped data; tuples come back as lists, and values JSON
+    # cannot encode are pickled instead
+    CACHE_CODEC: str = "pickle"
+    PREFIX_CODECS: Dict[str, str] = {
+        PRODUCT_PREFIX: "json",
+        RECOMMENDATION_PREFIX: "json",
+        SEARCH_PREFIX: "json",
+    }
+    CACHE_COMPRESSION: Optional[str] = "zlib"  # "zstd"/"lz4" when installed
+    COMPRESSION_MIN_BYTES: int = 1024
+
+    # Observability: key prefixes reported as metric labels (others are
+    # grouped as "other" to bound label cardinality)
+    METRICS_CACHE_NAME: str = "cache_manager"
+    METRIC_PREFIXES: Tuple[str, ...] = (
+        "product", "user", "rec", "search", "session", "http", "category", "cache",
+    )
+    MEMORY_USAGE_REFRESH_INTERVAL: float = 5.0  # Seconds between per-prefix size scans
+
+    # Batch operation settings (get_many/set_many)
+    MGET_BATCH_SIZE: int = 500  # Keys per MGET / pipeline execute
+
+    # Invalidation bus settings
+    INVALIDATION_CHANNEL: str = "cache:invalidations"
+    INVALIDATION_POLL_TIMEOUT: float = 1.0
+    INVALIDATION_RECONNECT_DELAY: float = 1.0
 
 
 class LRUCache:
@@ -87,18 +254,31 @@ class LRUCache:
     Thread-safe LRU cache implementation for in-memory caching
     """
 
-    def __init__(self, max_size: int = 1000, ttl: int = 60):
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ttl: int = 60,
+        on_evict: Optional[Callable[[str], None]] = None,
+        on_capacity_evict: Optional[Callable[[str], None]] = None
+    ):
         """
         Initialize LRU cache
 
         Args:
             max_size: Maximum number of items to cache
             ttl: Time to live for cached items in seconds
+            on_evict: Called with the key whenever an item leaves the cache
+                (eviction, expiry, invalidation or clear)
+            on_capacity_evict: Called with the key of each item evicted to
+                make room (before on_evict)
         """
         self.max_size = max_size
         self.ttl = ttl
+        self.on_evict = on_evict
+        self.on_capacity_evict = on_capacity_evict
         self.cache: OrderedDict = OrderedDict()
         self.timestamps: Dict[str, float] = {}
+        self.ttls: Dict[str, float] = {}  # Per-entry TTL overrides
         self.hits: int = 0
         self.misses: int = 0
         self.evictions: int = 0
@@ -118,9 +298,8 @@ class LRUCache:
             return None
 
         # Check if expired
-        if time.time() - self.timestamps[key] > self.ttl:
-            del self.cache[key]
-            del self.timestamps[key]
+        if time.time() - self.timestamps[key] > self.ttls.get(key, self.ttl):
+            self._remove(key)
             self.misses += 1
             return None
 
@@ -129,25 +308,39 @@ class LRUCache:
         self.hits += 1
         return self.cache[key]
 
-    def set(self, key: str, value: Any) -> None:
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
         """
         Set item in cache
 
         Args:
             key: Cache key
             value: Value to cache
+            ttl: Time to live for this item (defaults to the cache TTL)
         """
         # Remove oldest if at capacity
         if len(self.cache) >= self.max_size and key not in self.cache:
-            oldest_key = next(iter(self.cache))
-            del self.cache[oldest_key]
-            del self.timestamps[oldest_key]
+            oldest = next(iter(self.cache))
+            if self.on_capacity_evict is not None:
+                self.on_capacity_evict(oldest)
+            self._remove(oldest)
             self.evictions += 1
 
         self.cache[key] = value
         self.timestamps[key] = time.time()
+        if ttl is None:
+            self.ttls.pop(key, None)
+        else:
+            self.ttls[key] = ttl
         self.cache.move_to_end(key)
 
+    def _remove(self, key: str) -> None:
+        """Drop an item and its bookkeeping"""
+        del self.cache[key]
+        del self.timestamps[key]
+        self.ttls.pop(key, None)
+        if self.on_evict is not None:
+            self.on_evict(key)
+
     def invalidate(self, key: str) -> bool:
         """
         Remove item from cache
@@ -159,8 +352,7 @@ class LRUCache:
             True if item was removed, False if not found
         """
         if key in self.cache:
-            del self.cache[key]
-            del self.timestamps[key]
+            self._remove(key)
             return True
         return False
 
@@ -181,15 +373,18 @@ class LRUCache:
         ]
 
         for key in keys_to_remove:
-            del self.cache[key]
-            del self.timestamps[key]
+            self._remove(key)
 
         return len(keys_to_remove)
 
     def clear(self) -> None:
         """Clear all cached items"""
+        if self.on_evict is not None:
+            for key in self.cache:
+                self.on_evict(key)
         self.cache.clear()
         self.timestamps.clear()
+        self.ttls.clear()
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -227,11 +422,94 @@ class CacheManager:
         self.config = config
         self.redis_pool: Optional[ConnectionPool] = None
         self.redis_client: Optional[redis.Redis] = None
-        self.memory_cache = LRUCache(
-            max_size=config.MEMORY_CACHE_SIZE,
-            ttl=config.MEMORY_CACHE_TTL
-        )
+        if config.MEMORY_CACHE_POLICY == "tinylfu":
+            self.memory_cache: Union[LRUCache, WTinyLFUCache] = WTinyLFUCache(
+                max_bytes=config.MEMORY_CACHE_MAX_BYTES,
+                ttl=config.MEMORY_CACHE_TTL,
+                max_size=config.MEMORY_CACHE_MAX_ENTRIES,
+                on_evict=self._unindex_memory_key,
+                on_capacity_evict=self._record_eviction
+            )
+        else:
+            self.memory_cache = LRUCache(
+                max_size=config.MEMORY_CACHE_SIZE,
+                ttl=config.MEMORY_CACHE_TTL,
+                on_evict=self._unindex_memory_key,
+                on_capacity_evict=self._record_eviction
+            )
         self.is_connected = False
+        self.serializer = CacheSerializer(
+            default_codec=config.CACHE_CODEC,
+            prefix_codecs=config.PREFIX_CODECS,
+            compression=config.CACHE_COMPRESSION,
+            compression_min_bytes=config.COMPRESSION_MIN_BYTES
+        )
+
+        # Reverse tag index for the memory tier (Redis keeps one set per tag)
+        self.tag_index: Dict[str, Set[str]] = {}
+        self.key_tags: Dict[str, Tuple[str, ...]] = {}
+
+        # Cache warming: registered loaders run at startup and on an interval
+        self.warmers: Dict[str, Dict[str, Any]] = {}
+        self._warm_task: Optional[asyncio.Task] = None
+        self._warm_loop_task: Optional[asyncio.Task] = None
+        self.warm_stats: Dict[str, Any] = {
+            "runs": 0,
+            "last_run_at": None,
+            "last_duration_ms": 0.0,
+            "last_keys": 0,
+            "last_coverage": 0.0,
+            "warmers": {}
+        }
+
+        # Invalidation bus: memory-tier evictions shared with other workers
+        self.instance_id = uuid.uuid4().hex
+        self._bus_task: Optional[asyncio.Task] = None
+        self.bus_stats: Dict[str, int] = {
+            "published": 0,
+            "publish_errors": 0,
+            "received": 0,
+            "applied": 0,
+            "reconnects": 0
+        }
+        self.stats_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+        # Single-flight: one in-progress load per key within this worker
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stampede_stats: Dict[str, int] = {
+            "loads": 0,
+            "coalesced": 0,
+            "lock_acquired": 0,
+            "lock_waits": 0,
+            "lock_wait_hits": 0,
+            "lock_timeouts": 0
+        }
+        self.revalidation_stats: Dict[str, int] = {
+            "stale_served": 0,
+            "early_refreshes": 0,
+            "refreshes": 0,
+            "refresh_errors": 0
+        }
+
+        # Per-prefix lookup, eviction and Redis latency totals
+        self.metric_prefixes = frozenset(config.METRIC_PREFIXES)
+        self.prefix_stats: Dict[str, Dict[str, float]] = {}
+        self._memory_usage: Dict[str, Dict[str, int]] = {}
+        self._memory_usage_at = 0.0
+
+    def register_stats_provider(
+        self,
+        name: str,
+        provider: Callable[[], Dict[str, Any]]
+    ) -> None:
+        """
+        Register an external cache whose statistics are reported by get_stats
+
+        Args:
+            name: Key the provider's statistics are reported under
+            provider: Callable returning a statistics dictionary
+        """
+        self.stats_providers[name] = provider
 
     async def connect(self) -> None:
         """Connect to Redis"""
@@ -261,12 +539,57 @@ class CacheManager:
 
     async def disconnect(self) -> None:
         """Disconnect from Redis"""
+        await self.stop_invalidation_bus()
         if self.redis_client:
             await self.redis_client.close()
         if self.redis_pool:
             await self.redis_pool.disconnect()
         self.is_connected = False
 
+    def policy_for(self, key: str) -> CachePolicy:
+        """
+        Resolve the freshness policy for a key
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Policy of the longest matching prefix, or the default policy
+        """
+        best_prefix = None
+        for prefix in self.config.PREFIX_POLICIES:
+            if key.startswith(prefix) and (best_prefix is None or len(prefix) > len(best_prefix)):
+                best_prefix = prefix
+
+        if best_prefix is None:
+            return self.config.DEFAULT_POLICY
+        return self.config.PREFIX_POLICIES[best_prefix]
+
+    def tags_for(self, key: str, tags: Optional[Iterable[str]] = None) -> Tuple[str, ...]:
+        """
+        Resolve the invalidation tags for a key
+
+        Args:
+            key: Cache key
+            tags: Additional caller-supplied tags
+
+        Returns:
+            Tags derived from the key prefix plus any extra tags
+        """
+        resolved = set(tags or ())
+
+        for prefix, tag_prefix in self.config.ENTITY_TAG_PREFIXES.items():
+            if key.startswith(prefix):
+                entity_id = key[len(prefix):].split(":", 1)[0]
+                if entity_id:
+                    resolved.add(f"{tag_prefix}{entity_id}")
+
+        for prefix, tag in self.config.PREFIX_TAGS.items():
+            if key.startswith(prefix):
+                resolved.add(tag)
+
+        return tuple(sorted(resolved))
+
     async def get(
         self,
         key: str,
@@ -275,6 +598,9 @@ class CacheManager:
         """
         Get value from cache (memory first, then Redis)
 
+        Values past their soft expiry are reported as misses; only
+        get_or_set, which can refresh them, serves stale values.
+
         Args:
             key: Cache key
             use_memory_cache: Whether to check memory cache first
@@ -282,63 +608,640 @@ class CacheManager:
         Returns:
             Cached value or None
         """
+        entry = await self.get_entry(key, use_memory_cache)
+        if entry is None or entry.fresh_until <= time.time():
+            return None
+        return entry.value
+
+    async def get_entry(
+        self,
+        key: str,
+        use_memory_cache: bool = True
+    ) -> Optional[CacheEntry]:
+        """
+        Get the cached entry for a key, fresh or stale
+
+        A stale memory copy is checked against Redis, where another worker
+        may already have stored a refreshed value.
+
+        Args:
+            key: Cache key
+            use_memory_cache: Whether to check memory cache first
+
+        Returns:
+            Cache entry or None if the key is absent or hard-expired
+        """
+        entry = None
+        prefix = self._metric_prefix(key)
+
         # Check memory cache first
         if use_memory_cache:
-            value = self.memory_cache.get(key)
-            if value is not None:
-                return value
+            entry = self._as_entry(self.memory_cache.get(key))
+            if entry is not None and entry.fresh_until > time.time():
+                self._record_lookup(prefix, "memory", True)
+                return entry
+            self._record_lookup(prefix, "memory", False)
 
         # Check Redis
         if self.is_connected:
+            remote = None
             try:
+                started = time.perf_counter()
                 value = await self.redis_client.get(key)
+                self._observe_redis("get", prefix, started)
                 if value:
                     # Deserialize and store in memory cache
-                    deserialized = pickle.loads(value)
-                    if use_memory_cache:
-                        self.memory_cache.set(key, deserialized)
-                    return deserialized
+                    remote = self._decode_entry(value)
+                    if remote is not None and (entry is None or remote.fresh_until > entry.fresh_until):
+                        entry = remote
+                        if use_memory_cache:
+                            self._set_memory(key, entry)
             except Exception as e:
                 logger.error(f"Redis get error for key {key}: {str(e)}")
+            self._record_lookup(prefix, "redis", remote is not None)
 
-        return None
+        return entry
 
     async def set(
         self,
         key: str,
         value: Any,
         ttl: Optional[int] = None,
-        use_memory_cache: bool = True
+        use_memory_cache: bool = True,
+        compute_time: float = 0.0,
+        tags: Optional[Iterable[str]] = None
     ) -> bool:
         """
         Set value in cache
 
+        The value is fresh for ``ttl`` seconds and kept for the key's
+        policy stale window after that. It is indexed under the tags derived
+        from its key plus ``tags``.
+
         Args:
             key: Cache key
             value: Value to cache
             ttl: Time to live in seconds
             use_memory_cache: Whether to also store in memory cache
+            compute_time: Seconds it took to compute the value (XFetch)
+            tags: Extra invalidation tags
 
         Returns:
             True if successful
         """
-        ttl = ttl or self.config.DEFAULT_TTL
+        entry, redis_ttl = self._new_entry(key, value, ttl, compute_time, tags)
 
         # Store in memory cache
         if use_memory_cache:
-            self.memory_cache.set(key, value)
+            self._set_memory(key, entry)
 
         # Store in Redis
         if self.is_connected:
             try:
-                serialized = pickle.dumps(value)
-                await self.redis_client.setex(key, ttl, serialized)
+                serialized = self._encode_entry(key, entry)
+                started = time.perf_counter()
+                if not entry.tags:
+                    await self.redis_client.setex(key, redis_ttl, serialized)
+                    self._observe_redis("set", self._metric_prefix(key), started)
+                    return True
+
+                # Value and tag index in one round trip
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.setex(key, redis_ttl, serialized)
+                    for tag in entry.tags:
+                        tag_key = f"{self.config.TAG_PREFIX}{tag}"
+                        pipe.sadd(tag_key, key)
+                        pipe.expire(tag_key, max(redis_ttl, self.config.TAG_INDEX_TTL))
+                    await pipe.execute()
+                self._observe_redis("set", self._metric_prefix(key), started)
                 return True
             except Exception as e:
                 logger.error(f"Redis set error for key {key}: {str(e)}")
 
         return False
 
+    def _new_entry(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int],
+        compute_time: float = 0.0,
+        tags: Optional[Iterable[str]] = None
+    ) -> Tuple[CacheEntry, int]:
+        """Build the entry for a write and its Redis TTL (soft TTL plus stale window)."""
+        policy = self.policy_for(key)
+        ttl = ttl or policy.ttl or self.config.DEFAULT_TTL
+        now = time.time()
+        entry = CacheEntry(
+            value, now + ttl, now + ttl + policy.stale_ttl, compute_time, self.tags_for(key, tags)
+        )
+        return entry, ttl + policy.stale_ttl
+
+    async def get_many(
+        self,
+        keys: Iterable[str],
+        use_memory_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Get several values at once (memory first, then one MGET for the rest)
+
+        Performance Implementation:
+        Keys fresh in the memory tier are answered locally; only the misses
+        go to Redis, in MGET batches of MGET_BATCH_SIZE, so a page of N
+        products costs at most one round trip instead of N. Values found in
+        Redis are copied into the memory tier. As with get(), values past
+        their soft expiry count as misses.
+
+        Args:
+            keys: Cache keys
+            use_memory_cache: Whether to check and fill the memory cache
+
+        Returns:
+            Values of the keys found, keyed by cache key (misses are absent)
+        """
+        keys = list(dict.fromkeys(keys))
+        now = time.time()
+        found: Dict[str, Any] = {}
+        stale: Dict[str, CacheEntry] = {}
+        missing: List[str] = []
+
+        for key in keys:
+            entry = self._as_entry(self.memory_cache.get(key)) if use_memory_cache else None
+            if entry is not None and entry.fresh_until > now:
+                found[key] = entry.value
+                self._record_lookup(self._metric_prefix(key), "memory", True)
+                continue
+            if use_memory_cache:
+                self._record_lookup(self._metric_prefix(key), "memory", False)
+            if entry is not None:
+                stale[key] = entry
+            missing.append(key)
+
+        if missing and self.is_connected:
+            batch_size = self.config.MGET_BATCH_SIZE
+            for start in range(0, len(missing), batch_size):
+                batch = missing[start:start + batch_size]
+                try:
+                    started = time.perf_counter()
+                    values = await self.redis_client.mget(batch)
+                    self._observe_redis("mget", self._metric_prefix(batch[0]), started)
+                except Exception as e:
+                    logger.error(f"Redis mget error for {len(batch)} keys: {str(e)}")
+                    continue
+
+                for key, value in zip(batch, values):
+                    self._record_lookup(self._metric_prefix(key), "redis", bool(value))
+                    if not value:
+                        continue
+                    try:
+                        remote = self._decode_entry(value)
+                    except Exception as e:
+                        logger.error(f"Redis get error for key {key}: {str(e)}")
+                        continue
+                    if remote is None or remote.fresh_until <= now:
+                        continue
+                    local = stale.get(key)
+                    if local is None or remote.fresh_until > local.fresh_until:
+                        found[key] = remote.value
+                        if use_memory_cache:
+                            self._set_memory(key, remote)
+
+        return {key: found[key] for key in keys if key in found}
+
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: Optional[int] = None,
+        use_memory_cache: bool = True,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """
+        Set several values at once
+
+        Performance Implementation:
+        All SETEX commands and tag index updates go through one pipeline per
+        MGET_BATCH_SIZE keys, with one SADD per tag for the whole batch.
+
+        Args:
+            items: Values keyed by cache key
+            ttl: Time to live in seconds
+            use_memory_cache: Whether to also store in memory cache
+            tags: Extra invalidation tags applied to every item
+
+        Returns:
+            True if successful
+        """
+        tags = tuple(tags or ())
+        entries = {}
+        for key, value in items.items():
+            entries[key] = self._new_entry(key, value, ttl, tags=tags)
+            if use_memory_cache:
+                self._set_memory(key, entries[key][0])
+
+        if not entries or not self.is_connected:
+            return False
+
+        keys = list(entries)
+        batch_size = self.config.MGET_BATCH_SIZE
+        try:
+            for start in range(0, len(keys), batch_size):
+                tag_keys: Dict[str, List[str]] = {}
+                tag_ttls: Dict[str, int] = {}
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for key in keys[start:start + batch_size]:
+                        entry, redis_ttl = entries[key]
+                        pipe.setex(key, redis_ttl, self._encode_entry(key, entry))
+                        for tag in entry.tags:
+                            tag_keys.setdefault(tag, []).append(key)
+                            tag_ttls[tag] = max(tag_ttls.get(tag, 0), redis_ttl)
+
+                    for tag, tagged in tag_keys.items():
+                        tag_key = f"{self.config.TAG_PREFIX}{tag}"
+                        pipe.sadd(tag_key, *tagged)
+                        pipe.expire(tag_key, max(tag_ttls[tag], self.config.TAG_INDEX_TTL))
+                    started = time.perf_counter()
+                    await pipe.execute()
+                    self._observe_redis("set_many", self._metric_prefix(keys[start]), started)
+            return True
+        except Exception as e:
+            logger.error(f"Redis set_many error for {len(keys)} keys: {str(e)}")
+
+        return False
+
+    # ==========================================================================
+    # INSTRUMENTATION
+    # ==========================================================================
+
+    def _metric_prefix(self, key: str) -> str:
+        """Metric label for a key: its first segment if known, else "other"."""
+        prefix = key.split(":", 1)[0]
+        return prefix if prefix in self.metric_prefixes else "other"
+
+    def _prefix_counters(self, prefix: str) -> Dict[str, float]:
+        """Running totals for one prefix."""
+        counters = self.prefix_stats.get(prefix)
+        if counters is None:
+            counters = self.prefix_stats[prefix] = {
+                "memory_hits": 0, "memory_misses": 0,
+                "redis_hits": 0, "redis_misses": 0,
+                "evictions": 0, "redis_calls": 0, "redis_seconds": 0.0
+            }
+        return counters
+
+    def _record_lookup(self, prefix: str, tier: str, hit: bool) -> None:
+        """Count a lookup in one tier."""
+        self._prefix_counters(prefix)[f"{tier}_{'hits' if hit else 'misses'}"] += 1
+        record_cache_lookup(self.config.METRICS_CACHE_NAME, tier, prefix, hit)
+
+    def _record_eviction(self, key: str) -> None:
+        """Count a memory-tier capacity eviction (memory cache hook)."""
+        prefix = self._metric_prefix(key)
+        self._prefix_counters(prefix)["evictions"] += 1
+        record_cache_eviction(self.config.METRICS_CACHE_NAME, "memory", prefix)
+
+    def _observe_redis(self, operation: str, prefix: str, started: float) -> None:
+        """Record the round-trip time of a Redis call started at ``started``."""
+        elapsed = time.perf_counter() - started
+        counters = self._prefix_counters(prefix)
+        counters["redis_calls"] += 1
+        counters["redis_seconds"] += elapsed
+        cache_redis_latency_seconds.labels(operation=operation, prefix=prefix).observe(elapsed)
+
+    def memory_usage(self, max_age: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Entries and estimated bytes per prefix in the memory tier
+
+        Scans the memory tier at most once per MEMORY_USAGE_REFRESH_INTERVAL.
+        Bytes are only known for the byte-bounded tier (0 with the lru
+        policy).
+
+        Args:
+            max_age: Reuse a scan younger than this many seconds
+
+        Returns:
+            {"entries", "bytes"} keyed by prefix
+        """
+        if max_age is None:
+            max_age = self.config.MEMORY_USAGE_REFRESH_INTERVAL
+        now = time.monotonic()
+        if self._memory_usage_at and now - self._memory_usage_at < max_age:
+            return self._memory_usage
+
+        sizes = getattr(self.memory_cache, "sizes", {})
+        usage: Dict[str, Dict[str, int]] = {}
+        for key in list(self.memory_cache.cache):
+            prefix_usage = usage.setdefault(self._metric_prefix(key), {"entries": 0, "bytes": 0})
+            prefix_usage["entries"] += 1
+            prefix_usage["bytes"] += sizes.get(key, 0)
+
+        self._memory_usage = usage
+        self._memory_usage_at = now
+        return usage
+
+    def register_metrics(self) -> None:
+        """Report memory-tier usage per prefix through the cache_memory_* gauges at scrape time"""
+        for prefix in self.metric_prefixes | {"other"}:
+            cache_memory_entries.labels(prefix=prefix).set_function(
+                lambda prefix=prefix: self.memory_usage().get(prefix, {}).get("entries", 0)
+            )
+            cache_memory_bytes.labels(prefix=prefix).set_function(
+                lambda prefix=prefix: self.memory_usage().get(prefix, {}).get("bytes", 0)
+            )
+
+    def get_prefix_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-prefix cache statistics
+
+        Returns:
+            Hits, misses and hit rates per tier, evictions, memory usage and
+            mean Redis latency, keyed by prefix
+        """
+        usage = self.memory_usage()
+        stats = {}
+        for prefix in sorted(set(self.prefix_stats) | set(usage)):
+            counters = self._prefix_counters(prefix)
+            memory_lookups = counters["memory_hits"] + counters["memory_misses"]
+            redis_lookups = counters["redis_hits"] + counters["redis_misses"]
+            stats[prefix] = {
+                **counters,
+                "memory_hit_rate": counters["memory_hits"] / memory_lookups if memory_lookups else 0.0,
+                "redis_hit_rate": counters["redis_hits"] / redis_lookups if redis_lookups else 0.0,
+                "memory_entries": usage.get(prefix, {}).get("entries", 0),
+                "memory_bytes": usage.get(prefix, {}).get("bytes", 0),
+                "redis_avg_ms": (
+                    counters["redis_seconds"] / counters["redis_calls"] * 1000
+                    if counters["redis_calls"] else 0.0
+                )
+            }
+        return stats
+
+    def _set_memory(self, key: str, entry: CacheEntry) -> None:
+        """Keep an entry in memory no longer than its hard expiry."""
+        # Index before storing: the memory tier may reject the entry right
+        # away, and its on_evict hook then removes the index again
+        self._unindex_memory_key(key)
+        if entry.tags:
+            self.key_tags[key] = entry.tags
+            for tag in entry.tags:
+                self.tag_index.setdefault(tag, set()).add(key)
+
+        remaining = entry.expires_at - time.time()
+        self.memory_cache.set(key, entry, ttl=min(self.memory_cache.ttl, remaining))
+
+    def _unindex_memory_key(self, key: str) -> None:
+        """Remove a key from the memory tag index (LRUCache on_evict hook)."""
+        for tag in self.key_tags.pop(key, ()):
+            keys = self.tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_index[tag]
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Delete every entry indexed under any of the given tags
+
+        Performance Implementation:
+        - Memory tier: reverse map lookup, O(keys in the tags)
+        - Redis tier: one script per tag deletes the tag's members and the
+          tag set atomically, so keys tagged concurrently are not orphaned
+
+        Args:
+            *tags: Tags to invalidate
+
+        Returns:
+            Number of entries deleted (memory and Redis counted separately)
+        """
+        # Remove from memory cache
+        count = self._invalidate_memory_tags(tags)
+
+        # Remove from Redis
+        if self.is_connected:
+            for tag in tags:
+                try:
+                    started = time.perf_counter()
+                    count += await self.redis_client.eval(
+                        _INVALIDATE_TAG_SCRIPT, 1, f"{self.config.TAG_PREFIX}{tag}"
+                    )
+                    self._observe_redis("invalidate_tag", self._metric_prefix(tag), started)
+                except Exception as e:
+                    logger.error(f"Redis tag invalidation error for {tag}: {str(e)}")
+
+        await self.publish_invalidation(tags=list(tags))
+        return count
+
+    def _invalidate_memory_tags(self, tags: Iterable[str]) -> int:
+        """Evict memory-tier entries indexed under the given tags."""
+        count = 0
+        for tag in tags:
+            for key in list(self.tag_index.get(tag, ())):
+                if self.memory_cache.invalidate(key):
+                    count += 1
+            self.tag_index.pop(tag, None)
+        return count
+
+    async def clear(self) -> None:
+        """Clear the memory tier and Redis database, in every worker"""
+        self.memory_cache.clear()
+
+        if self.is_connected:
+            try:
+                await self.redis_client.flushdb()
+            except Exception as e:
+                logger.error(f"Redis flush error: {str(e)}")
+
+        await self.publish_invalidation(clear=True)
+
+    # ==========================================================================
+    # INVALIDATION BUS
+    # ==========================================================================
+
+    @property
+    def invalidation_bus_running(self) -> bool:
+        """Whether this worker is subscribed to the invalidation channel"""
+        return self._bus_task is not None and not self._bus_task.done()
+
+    async def start_invalidation_bus(self) -> bool:
+        """
+        Subscribe to the invalidation channel and start publishing evictions
+
+        Returns:
+            True if the bus is running (requires a Redis connection)
+        """
+        if self.invalidation_bus_running:
+            return True
+        if not self.is_connected:
+            logger.warning("Cache invalidation bus not started: Redis is not connected")
+            return False
+
+        self._bus_task = asyncio.create_task(self._run_invalidation_bus())
+        logger.info(f"Cache invalidation bus started on {self.config.INVALIDATION_CHANNEL}")
+        return True
+
+    async def stop_invalidation_bus(self) -> None:
+        """Stop listening for invalidations from other workers"""
+        task, self._bus_task = self._bus_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def publish_invalidation(
+        self,
+        keys: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
+        patterns: Optional[List[str]] = None,
+        clear: bool = False,
+        products: Optional[List[str]] = None
+    ) -> None:
+        """
+        Tell other workers to evict entries from their memory tier
+
+        Does nothing unless the bus is running. Publish failures are logged;
+        the other workers' copies then expire with the memory TTL.
+
+        Args:
+            keys: Exact keys to evict
+            tags: Tags whose keys to evict
+            patterns: fnmatch patterns to evict
+            clear: Clear the whole memory tier
+            products: Product ids whose invalidation hooks to run
+        """
+        if not self.invalidation_bus_running:
+            return
+
+        message = {"origin": self.instance_id}
+        if keys:
+            message["keys"] = keys
+        if tags:
+            message["tags"] = tags
+        if patterns:
+            message["patterns"] = patterns
+        if clear:
+            message["clear"] = True
+        if products:
+            message["products"] = products
+
+        try:
+            await self.redis_client.publish(self.config.INVALIDATION_CHANNEL, json.dumps(message))
+            self.bus_stats["published"] += 1
+        except Exception as e:
+            self.bus_stats["publish_errors"] += 1
+            logger.error(f"Cache invalidation publish error: {str(e)}")
+
+    def apply_invalidation(self, message: Dict[str, Any]) -> int:
+        """
+        Evict the memory-tier entries named in a bus message
+
+        Args:
+            message: Decoded invalidation message
+
+        Returns:
+            Number of memory entries evicted
+        """
+        if message.get("origin") == self.instance_id:
+            return 0
+
+        if message.get("clear"):
+            evicted = len(self.memory_cache.cache)
+            self.memory_cache.clear()
+            return evicted
+
+        evicted = 0
+        for key in message.get("keys", ()):
+            if self.memory_cache.invalidate(key):
+                evicted += 1
+        evicted += self._invalidate_memory_tags(message.get("tags", ()))
+        for pattern in message.get("patterns", ()):
+            evicted += self.memory_cache.invalidate_pattern(pattern)
+        return evicted
+
+    async def _apply_bus_message(self, message: Dict[str, Any]) -> int:
+        """
+        Apply a bus message, including caches outside the cache manager
+
+        Product ids in the message run this worker's product invalidation
+        hooks, so per-process caches such as product metadata are dropped
+        in every worker, not only the one that saw the change.
+
+        Args:
+            message: Decoded invalidation message
+
+        Returns:
+            Number of entries evicted
+        """
+        evicted = self.apply_invalidation(message)
+        if message.get("origin") != self.instance_id:
+            for product_id in message.get("products", ()):
+                evicted += await CacheInvalidator.run_product_hooks(product_id)
+        return evicted
+
+    async def _run_invalidation_bus(self) -> None:
+        """
+        Listen for invalidations, resubscribing after connection errors
+
+        Messages missed while disconnected cannot be replayed, so the memory
+        tier is cleared after every reconnect.
+        """
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.config.INVALIDATION_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=self.config.INVALIDATION_POLL_TIMEOUT
+                    )
+                    if message is None or message.get("type") != "message":
+                        continue
+
+                    self.bus_stats["received"] += 1
+                    try:
+                        self.bus_stats["applied"] += await self._apply_bus_message(json.loads(message["data"]))
+                    except (TypeError, ValueError) as e:
+                        logger.error(f"Malformed cache invalidation message: {str(e)}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.bus_stats["reconnects"] += 1
+                logger.error(f"Cache invalidation bus error, resubscribing: {str(e)}")
+                self.memory_cache.clear()
+                await asyncio.sleep(self.config.INVALIDATION_RECONNECT_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def _encode_entry(self, key: str, entry: CacheEntry) -> bytes:
+        """Encode a CacheEntry for Redis as a JSON-shaped list (tuples would force pickle)."""
+        return self.serializer.dumps(key, [
+            entry.value, entry.fresh_until, entry.expires_at, entry.compute_time, list(entry.tags)
+        ])
+
+    def _decode_entry(self, data: bytes) -> Optional[CacheEntry]:
+        """Decode a Redis value into a CacheEntry."""
+        decoded = self.serializer.loads(data)
+        if self.serializer.is_legacy(data):
+            return self._as_entry(decoded)
+
+        value, fresh_until, expires_at, compute_time, tags = decoded
+        return self._as_entry(CacheEntry(value, fresh_until, expires_at, compute_time, tuple(tags)))
+
+    @staticmethod
+    def _as_entry(value: Any) -> Optional[CacheEntry]:
+        """Normalise a stored value to a CacheEntry (None values are misses)."""
+        if value is None:
+            return None
+        if isinstance(value, CacheEntry):
+            return value if value.value is not None else None
+        # Raw values (sync decorator, or written before entries carried
+        # metadata) stay fresh until their tier expires them
+        return CacheEntry(value, math.inf, math.inf, 0.0)
+
     async def delete(self, key: str) -> bool:
         """
         Delete value from cache
@@ -353,14 +1256,18 @@ class CacheManager:
         self.memory_cache.invalidate(key)
 
         # Remove from Redis
+        deleted = False
         if self.is_connected:
             try:
+                started = time.perf_counter()
                 result = await self.redis_client.delete(key)
-                return result > 0
+                self._observe_redis("delete", self._metric_prefix(key), started)
+                deleted = result > 0
             except Exception as e:
                 logger.error(f"Redis delete error for key {key}: {str(e)}")
 
-        return False
+        await self.publish_invalidation(keys=[key])
+        return deleted
 
     async def delete_pattern(self, pattern: str) -> int:
         """
@@ -392,55 +1299,373 @@ class CacheManager:
             except Exception as e:
                 logger.error(f"Redis delete pattern error: {str(e)}")
 
+        await self.publish_invalidation(patterns=[pattern])
         return count
 
     async def get_or_set(
         self,
         key: str,
         factory: Callable,
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        distributed_lock: bool = False,
+        tags: Optional[Iterable[str]] = None
     ) -> Any:
         """
         Get value from cache or compute and store
 
+        Concurrent misses for the same key share a single computation
+        (single-flight), so an expiring hot key triggers one factory call per
+        worker instead of one per request. With ``distributed_lock`` a Redis
+        lock additionally limits the computation to one worker; the others
+        wait for the value to appear in the cache.
+
+        Stale values (past the TTL but inside the policy's stale window) are
+        returned immediately while a single background refresh runs. With a
+        policy ``beta`` hot keys are also refreshed early, with a probability
+        that rises as the TTL approaches and with the cost of the factory.
+
         Args:
             key: Cache key
-            factory: Function to compute value if not cached
+            factory: Function (sync or async) to compute value if not cached
             ttl: Time to live in seconds
+            distributed_lock: Coordinate the computation across workers
+            tags: Extra invalidation tags for the computed value
 
         Returns:
             Cached or computed value
         """
         # Try to get from cache
-        value = await self.get(key)
-        if value is not None:
-            return value
+        entry = await self.get_entry(key)
+        if entry is not None:
+            now = time.time()
+            if now < entry.fresh_until:
+                if not self._should_refresh_early(key, entry, now):
+                    return entry.value
+                self.revalidation_stats["early_refreshes"] += 1
+            else:
+                self.revalidation_stats["stale_served"] += 1
 
-        # Compute value
-        if asyncio.iscoroutinefunction(factory):
-            value = await factory()
+            # Serve the current value; refresh it once in the background
+            if key not in self._inflight:
+                self._start_load(
+                    key, self._refresh(key, factory, ttl, distributed_lock, tags, entry.value)
+                )
+            return entry.value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stampede_stats["coalesced"] += 1
         else:
-            value = factory()
+            task = self._start_load(key, self._load(key, factory, ttl, distributed_lock, tags))
+
+        # Shield so a cancelled caller does not cancel the shared load
+        return await asyncio.shield(task)
+
+    def _should_refresh_early(self, key: str, entry: CacheEntry, now: float) -> bool:
+        """
+        XFetch: refresh early if now - delta * beta * ln(U) passes the TTL
+
+        delta is the last computation time, so expensive values start
+        refreshing sooner; U is uniform on (0, 1].
+        """
+        beta = self.policy_for(key).beta
+        if beta <= 0 or entry.compute_time <= 0:
+            return False
+        return now - entry.compute_time * beta * math.log(1.0 - random.random()) >= entry.fresh_until
+
+    def _start_load(self, key: str, coro) -> asyncio.Task:
+        """Run a load as the single in-flight computation for a key."""
+        task = asyncio.ensure_future(coro)
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._load_done(key, t))
+        return task
+
+    def _load_done(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished load and mark its exception as retrieved."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(
+        self,
+        key: str,
+        factory: Callable,
+        ttl: Optional[int],
+        distributed_lock: bool,
+        tags: Optional[Iterable[str]] = None
+    ) -> Any:
+        """Compute a missing value (once per worker) and store it."""
+        if distributed_lock and self.is_connected:
+            return await self._load_with_lock(key, factory, ttl, tags)
+
+        return await self._compute_and_store(key, factory, ttl, tags)
 
-        # Store in cache
-        await self.set(key, value, ttl)
+    async def _refresh(
+        self,
+        key: str,
+        factory: Callable,
+        ttl: Optional[int],
+        distributed_lock: bool,
+        tags: Optional[Iterable[str]],
+        current_value: Any
+    ) -> Any:
+        """
+        Recompute a stale or soon-to-expire value in the background
+
+        Failures are logged and the current value keeps being served until
+        its hard expiry. With ``distributed_lock`` a refresh another worker
+        is already running is not duplicated.
+        """
+        lock_key = f"{self.config.LOCK_PREFIX}{key}"
+        token = self._lock_token()
+        acquired = None
+        if distributed_lock and self.is_connected:
+            acquired = await self._acquire_lock(lock_key, token)
+            if acquired is False:
+                return current_value
 
+        try:
+            value = await self._compute_and_store(key, factory, ttl, tags)
+            self.revalidation_stats["refreshes"] += 1
+            return value
+        except Exception as e:
+            self.revalidation_stats["refresh_errors"] += 1
+            logger.error(f"Background refresh failed for key {key}: {str(e)}")
+            return current_value
+        finally:
+            if acquired:
+                await self._release_lock(lock_key, token)
+
+    async def _compute_and_store(
+        self,
+        key: str,
+        factory: Callable,
+        ttl: Optional[int],
+        tags: Optional[Iterable[str]] = None
+    ) -> Any:
+        """Call the factory, timing it for XFetch, and cache the result."""
+        self.stampede_stats["loads"] += 1
+        started = time.perf_counter()
+        value = await self._call_factory(factory)
+        await self.set(key, value, ttl, compute_time=time.perf_counter() - started, tags=tags)
         return value
 
-    async def warm_cache(self) -> None:
+    async def _load_with_lock(
+        self,
+        key: str,
+        factory: Callable,
+        ttl: Optional[int],
+        tags: Optional[Iterable[str]] = None
+    ) -> Any:
         """
-        Warm cache with frequently accessed data
+        Compute a missing value under a Redis lock shared by all workers
+
+        The lock is a ``SET NX PX`` key holding a random token, released only
+        by its owner. Workers that lose the race poll the cache until the
+        value appears; if it does not appear within STAMPEDE_LOCK_WAIT they
+        compute it themselves rather than fail the request.
         """
-        logger.info("Starting cache warming")
+        lock_key = f"{self.config.LOCK_PREFIX}{key}"
+        token = self._lock_token()
+        acquired = await self._acquire_lock(lock_key, token)
+
+        if acquired is False:
+            self.stampede_stats["lock_waits"] += 1
+            deadline = time.monotonic() + self.config.STAMPEDE_LOCK_WAIT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.config.STAMPEDE_LOCK_POLL_INTERVAL)
+                value = await self.get(key)
+                if value is not None:
+                    self.stampede_stats["lock_wait_hits"] += 1
+                    return value
+            self.stampede_stats["lock_timeouts"] += 1
+            logger.warning(f"Timed out waiting for cache lock on {key}; computing locally")
+        elif acquired:
+            self.stampede_stats["lock_acquired"] += 1
+
+        try:
+            # Another worker may have filled the key before we took the lock
+            if acquired:
+                value = await self.get(key)
+                if value is not None:
+                    return value
+
+            return await self._compute_and_store(key, factory, ttl, tags)
+        finally:
+            if acquired:
+                await self._release_lock(lock_key, token)
+
+    def _lock_token(self) -> str:
+        """Random token identifying this lock holder."""
+        return hashlib.sha1(f"{id(self)}:{time.time_ns()}:{random.random()}".encode()).hexdigest()
+
+    async def _acquire_lock(self, lock_key: str, token: str) -> Optional[bool]:
+        """
+        Try to take a stampede lock
 
+        Returns:
+            True if acquired, False if another worker holds it, None if
+            Redis failed (callers proceed without the lock)
+        """
         try:
-            # Warm product cache
-            # This would typically load popular products from database
-            # For now, we'll just log the intention
-            logger.info("Cache warming completed")
+            acquired = await self.redis_client.set(
+                lock_key, token, nx=True, px=int(self.config.STAMPEDE_LOCK_TTL * 1000)
+            )
+            return bool(acquired)
+        except Exception as e:
+            logger.error(f"Redis lock error for key {lock_key}: {str(e)}")
+            return None
 
+    async def _release_lock(self, lock_key: str, token: str) -> None:
+        """Release a stampede lock if we still own it."""
+        try:
+            await self.redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
         except Exception as e:
-            logger.error(f"Cache warming failed: {str(e)}")
+            logger.error(f"Redis lock release error for key {lock_key}: {str(e)}")
+
+    @staticmethod
+    async def _call_factory(factory: Callable) -> Any:
+        """Call a sync or async factory."""
+        value = factory()
+        if asyncio.iscoroutine(value) or isinstance(value, asyncio.Future):
+            value = await value
+        return value
+
+    # ==========================================================================
+    # CACHE WARMING
+    # ==========================================================================
+
+    def register_warmer(
+        self,
+        name: str,
+        loader: Callable,
+        ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Register a loader that pre-populates the cache
+
+        Args:
+            name: Warmer name used in reports and metrics
+            loader: Function (sync or async) returning a dict of cache key
+                to value
+            ttl: Time to live for the warmed entries
+            tags: Extra invalidation tags for the warmed entries
+        """
+        self.warmers[name] = {"loader": loader, "ttl": ttl, "tags": tags}
+
+    async def warm_cache(self) -> Dict[str, Any]:
+        """
+        Warm cache with frequently accessed data
+
+        Runs every registered warmer, at most WARM_CACHE_CONCURRENCY at a
+        time. A call made while a run is in progress joins that run, and a
+        caller that stops waiting (e.g. a startup timeout) does not cancel it.
+
+        Returns:
+            Warm-up report: duration, keys written and per-warmer results
+        """
+        if self._warm_task is None or self._warm_task.done():
+            self._warm_task = asyncio.ensure_future(self._run_warmers())
+        return await asyncio.shield(self._warm_task)
+
+    async def _run_warmers(self) -> Dict[str, Any]:
+        """Run all warmers with bounded parallelism and record the report."""
+        logger.info("Starting cache warming")
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.config.WARM_CACHE_CONCURRENCY)
+
+        names = list(self.warmers)
+        results = await asyncio.gather(
+            *[self._run_warmer(name, self.warmers[name], semaphore) for name in names]
+        )
+        warmers = dict(zip(names, results))
+
+        succeeded = sum(1 for result in warmers.values() if result["status"] == "ok")
+        report = {
+            "duration_ms": (time.perf_counter() - started) * 1000,
+            "keys": sum(result["keys"] for result in warmers.values()),
+            "coverage": succeeded / len(warmers) if warmers else 1.0,
+            "warmers": warmers
+        }
+
+        self.warm_stats.update({
+            "runs": self.warm_stats["runs"] + 1,
+            "last_run_at": datetime.utcnow().isoformat(),
+            "last_duration_ms": report["duration_ms"],
+            "last_keys": report["keys"],
+            "last_coverage": report["coverage"],
+            "warmers": warmers
+        })
+
+        logger.info(
+            f"Cache warming completed: {report['keys']} keys from "
+            f"{succeeded}/{len(warmers)} warmers in {report['duration_ms']:.0f}ms"
+        )
+        return report
+
+    async def _run_warmer(
+        self,
+        name: str,
+        warmer: Dict[str, Any],
+        semaphore: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        """Run one warmer and store what it loads; failures are reported, not raised."""
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                entries = await self._call_factory(warmer["loader"]) or {}
+                for key, value in entries.items():
+                    await self.set(key, value, warmer["ttl"], tags=warmer["tags"])
+                result = {"status": "ok", "keys": len(entries)}
+            except Exception as e:
+                logger.error(f"Cache warmer {name} failed: {str(e)}")
+                result = {"status": "error", "keys": 0, "error": str(e)}
+
+            duration = time.perf_counter() - started
+            result["duration_ms"] = duration * 1000
+            cache_warmup_duration_seconds.labels(warmer=name, status=result["status"]).observe(duration)
+            cache_warmup_keys.labels(warmer=name).set(result["keys"])
+            return result
+
+    @property
+    def warming_loop_running(self) -> bool:
+        """Whether periodic re-warming is scheduled"""
+        return self._warm_loop_task is not None and not self._warm_loop_task.done()
+
+    def start_warming_loop(self, interval: Optional[float] = None) -> None:
+        """
+        Re-warm the cache periodically
+
+        Args:
+            interval: Seconds between runs (defaults to WARM_CACHE_INTERVAL)
+        """
+        if self.warming_loop_running:
+            return
+        self._warm_loop_task = asyncio.create_task(
+            self._warming_loop(interval or self.config.WARM_CACHE_INTERVAL)
+        )
+
+    async def stop_warming_loop(self) -> None:
+        """Stop periodic re-warming"""
+        task, self._warm_loop_task = self._warm_loop_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _warming_loop(self, interval: float) -> None:
+        """Run warm_cache every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.warm_cache()
+            except Exception as e:
+                logger.error(f"Cache warming failed: {str(e)}")
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -459,11 +1684,39 @@ class CacheManager:
             # For sync context, we'll just indicate connection status
             stats["redis"] = {"connected": True}
 
+        stats["stampede"] = {
+            **self.stampede_stats,
+            "inflight_keys": len(self._inflight)
+        }
+        stats["revalidation"] = dict(self.revalidation_stats)
+        stats["prefixes"] = self.get_prefix_stats()
+        stats["serialization"] = self.serializer.get_stats()
+        stats["warming"] = {
+            **self.warm_stats,
+            "registered": list(self.warmers),
+            "loop_running": self.warming_loop_running
+        }
+        stats["invalidation_bus"] = {
+            **self.bus_stats,
+            "running": self.invalidation_bus_running
+        }
+        stats["tags"] = {
+            "memory_tags": len(self.tag_index),
+            "memory_tagged_keys": len(self.key_tags)
+        }
+
+        for name, provider in self.stats_providers.items():
+            try:
+                stats[name] = provider()
+            except Exception as e:
+                logger.error(f"Cache stats provider {name} failed: {str(e)}")
+
         return stats
 
 
 # Global cache manager instance
 cache_manager = CacheManager()
+cache_manager.register_metrics()
 
 
 def cache_key_builder(
@@ -501,15 +1754,23 @@ def cache_key_builder(
 def cached(
     ttl: int = 300,
     prefix: str = "cache",
-    key_builder: Optional[Callable] = None
+    key_builder: Optional[Callable] = None,
+    distributed_lock: bool = False,
+    tags: Optional[Callable[..., Iterable[str]]] = None
 ):
     """
     Decorator for caching function results
 
+    Concurrent async calls that miss on the same key share one execution
+    (see CacheManager.get_or_set).
+
     Args:
         ttl: Time to live in seconds
         prefix: Cache key prefix
         key_builder: Custom key builder function
+        distributed_lock: Also coordinate misses across workers via Redis
+        tags: Callable receiving the function arguments and returning extra
+            invalidation tags for the cached result
 
     Returns:
         Decorated function
@@ -527,20 +1788,14 @@ def cached(
                 key_parts.extend(f"{k}:{v}" for k, v in sorted(kwargs.items()))
                 cache_key = ":".join(key_parts)
 
-            # Try to get from cache
-            cached_value = await cache_manager.get(cache_key)
-            if cached_value is not None:
-                logger.debug(f"Cache hit for {cache_key}")
-                return cached_value
-
-            # Execute function
-            result = await func(*args, **kwargs)
-
-            # Store in cache
-            await cache_manager.set(cache_key, result, ttl)
-            logger.debug(f"Cached result for {cache_key}")
-
-            return result
+            # Cache hit, or one shared execution per key on a miss
+            return await cache_manager.get_or_set(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl,
+                distributed_lock=distributed_lock,
+                tags=tags(*args, **kwargs) if tags else None
+            )
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
@@ -562,7 +1817,7 @@ def cached(
             result = func(*args, **kwargs)
 
             # Store in memory cache
-            cache_manager.memory_cache.set(cache_key, result)
+            cache_manager.memory_cache.set(cache_key, result, ttl=ttl)
 
             return result
 
@@ -574,11 +1829,102 @@ def cached(
     return decorator
 
 
+def cached_batch(
+    ttl: int = 300,
+    prefix: str = "cache",
+    key_builder: Optional[Callable] = None
+):
+    """
+    Decorator for caching per-id results of functions that take a list of ids
+
+    The decorated coroutine is called as ``func(ids, *args, **kwargs)`` and
+    returns a dict of id to result. Each id is cached under its own key:
+    cached ids are read with one get_many, the function runs once for the
+    misses only, and its results are written with one set_many. Ids the
+    function returns no result (or None) for are not cached.
+
+    Unlike @cached, concurrent misses are not coalesced per id.
+
+    Args:
+        ttl: Time to live in seconds
+        prefix: Cache key prefix
+        key_builder: Custom key builder called as ``key_builder(id, *args, **kwargs)``
+
+    Returns:
+        Decorated function returning results for the ids found, in input order
+
+    Usage:
+        @cached_batch(ttl=600, key_builder=lambda product_id: f"product:{product_id}:card")
+        async def get_product_cards(product_ids):
+            ...
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(ids: Iterable[Any], *args, **kwargs) -> Dict[Any, Any]:
+            ids = list(dict.fromkeys(ids))
+
+            # Build one cache key per id
+            if key_builder:
+                keys = {item_id: key_builder(item_id, *args, **kwargs) for item_id in ids}
+            else:
+                key_parts = [prefix, func.__name__]
+                key_parts.extend(str(arg) for arg in args)
+                key_parts.extend(f"{k}:{v}" for k, v in sorted(kwargs.items()))
+                base_key = ":".join(key_parts)
+                keys = {item_id: f"{base_key}:{item_id}" for item_id in ids}
+
+            cached_values = await cache_manager.get_many(keys.values())
+            results = {
+                item_id: cached_values[key] for item_id, key in keys.items() if key in cached_values
+            }
+
+            # One call for every id that missed
+            missing = [item_id for item_id in ids if item_id not in results]
+            if missing:
+                loaded = await func(missing, *args, **kwargs) or {}
+                fresh = {item_id: value for item_id, value in loaded.items() if value is not None}
+                await cache_manager.set_many(
+                    {keys[item_id]: value for item_id, value in fresh.items() if item_id in keys},
+                    ttl
+                )
+                results.update(fresh)
+
+            return {item_id: results[item_id] for item_id in ids if item_id in results}
+
+        return wrapper
+
+    return decorator
+
+
 class HTTPCacheMiddleware:
     """
     HTTP caching middleware for FastAPI
+
+    Performance Implementation:
+    GET responses of routes listed in ``route_ttls`` are stored in the cache
+    manager (both tiers) under the path, sorted query string and auth scope.
+    A stored response is replayed without calling the endpoint, and a
+    request whose If-None-Match matches its ETag gets a bodiless 304. ETags
+    are hashes of the response body, so they change exactly when the
+    content does. Every other GET still gets a body ETag and 304 support,
+    though the endpoint runs to produce the body.
+
+    The instance is a middleware factory: calling it with the wrapped app
+    returns a plain ASGI app, so the response is captured from the inner
+    app's send messages without a BaseHTTPMiddleware task per request, and
+    the instance stays reachable for its statistics. Bodies larger than
+    ``max_body_bytes`` and event streams are passed through as they arrive.
+
+    Usage:
+        response_cache = HTTPCacheMiddleware(route_ttls={"/api/v1/products/": 60})
+        app.add_middleware(response_cache)
     """
 
+    CACHEABLE_METHODS = ("GET",)
+
+    # Headers that describe one transfer rather than the stored content
+    UNSTORED_HEADERS = frozenset(("content-length", "date", "x-cache-status", "transfer-encoding"))
+
     def __init__(
         self,
         max_age: int = 300,
@@ -591,7 +1937,10 @@ class HTTPCacheMiddleware:
         no_transform: bool = False,
         immutable: bool = False,
         stale_while_revalidate: Optional[int] = None,
-        stale_if_error: Optional[int] = None
+        stale_if_error: Optional[int] = None,
+        route_ttls: Optional[Dict[str, int]] = None,
+        max_body_bytes: int = 1024 * 1024,
+        manager: Optional["CacheManager"] = None
     ):
         """
         Initialize HTTP cache middleware
@@ -608,6 +1957,11 @@ class HTTPCacheMiddleware:
             immutable: Mark as immutable
             stale_while_revalidate: Serve stale while revalidating
             stale_if_error: Serve stale on error
+            route_ttls: Server-side TTL by path prefix (longest prefix wins;
+                0 disables storage for that prefix)
+            max_body_bytes: Largest response body stored server-side
+            manager: Cache manager to store responses in (defaults to the
+                global cache_manager)
         """
         self.cache_control_parts = []
 
@@ -650,64 +2004,254 @@ class HTTPCacheMiddleware:
 
         self.cache_control = ", ".join(self.cache_control_parts)
 
-    async def __call__(self, request: Request, call_next):
+        # Shared caches must not reuse responses to authenticated requests
+        self.private_cache_control = self.cache_control.replace("public", "private", 1)
+
+        self.route_ttls = dict(route_ttls or {})
+        self.max_body_bytes = max_body_bytes
+        self.manager = manager
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0, "stored": 0, "bypassed": 0}
+
+    @property
+    def cache(self) -> "CacheManager":
+        """Cache manager holding stored responses"""
+        return self.manager or cache_manager
+
+    def __call__(self, app: ASGIApp) -> ASGIApp:
         """
-        Process request with cache headers
+        Wrap an ASGI app with this response cache
 
         Args:
-            request: FastAPI request
-            call_next: Next middleware/handler
+            app: Inner ASGI application
 
         Returns:
-            Response with cache headers
+            ASGI application serving and storing cached responses
+        """
+        async def cached_app(scope: Scope, receive: Receive, send: Send) -> None:
+            await self.handle(app, scope, receive, send)
+
+        return cached_app
+
+    async def handle(self, app: ASGIApp, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Process request with cache headers
+
+        Args:
+            app: Inner ASGI application
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        # Generate ETag from request
-        etag = self._generate_etag(request)
+        if scope["type"] != "http" or scope["method"] not in self.CACHEABLE_METHODS:
+            await app(scope, receive, send)
+            return
 
-        # Check If-None-Match header
+        request = Request(scope)
+        ttl = self.ttl_for(request.url.path)
+        key = self._cache_key(request) if ttl else None
         if_none_match = request.headers.get("if-none-match")
-        if if_none_match == etag:
-            # Return 304 Not Modified
-            return Response(status_code=304)
 
-        # Process request
-        response = await call_next(request)
+        # Replay a stored response unless the client asked to bypass caches
+        if key is not None and not self._bypasses_cache(request):
+            stored = await self.cache.get(key)
+            if stored is not None:
+                self.stats["hits"] += 1
+                response = self._stored_response(request, stored, if_none_match, "HIT")
+                await response(scope, receive, send)
+                return
+
+        start_message: Optional[Message] = None
+        chunks: List[bytes] = []
+        buffered = 0
+        passthrough = False
+
+        async def capture(message: Message) -> None:
+            nonlocal start_message, buffered, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                if (
+                    message["status"] != 200
+                    or "set-cookie" in headers
+                    or headers.get("content-type", "").startswith("text/event-stream")
+                ):
+                    self.stats["bypassed"] += 1
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            buffered += len(chunks[-1])
+            if buffered > self.max_body_bytes and message.get("more_body", False):
+                # Too large to store: stream the rest without an ETag
+                self.stats["bypassed"] += 1
+                passthrough = True
+                await send(start_message)
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+                return
+
+            if not message.get("more_body", False):
+                # Respond now, so the inner app's background tasks still run
+                # after the client has its response
+                await self._complete(
+                    request, scope, receive, send, start_message, b"".join(chunks),
+                    key, ttl, if_none_match
+                )
 
-        # Add cache headers
-        response.headers["Cache-Control"] = self.cache_control
-        response.headers["ETag"] = etag
-        response.headers["Vary"] = "Accept-Encoding"
+        await app(scope, receive, capture)
+
+    async def _complete(
+        self,
+        request: Request,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        start_message: Message,
+        body: bytes,
+        key: Optional[str],
+        ttl: int,
+        if_none_match: Optional[str]
+    ) -> None:
+        """Store a fully captured 200 response and send it (or a 304)."""
+        headers = Headers(raw=start_message.get("headers", []))
+        etag = headers.get("etag") or self._generate_etag(body)
+        stored = {
+            "status_code": start_message["status"],
+            "headers": [
+                (name, value) for name, value in headers.items()
+                if name not in self.UNSTORED_HEADERS
+            ],
+            "body": body,
+            "etag": etag
+        }
 
-        # Add cache status header
-        cache_status = "MISS"
-        if hasattr(response, "_from_cache") and response._from_cache:
-            cache_status = "HIT"
-        response.headers["X-Cache-Status"] = cache_status
+        if key is None:
+            self.stats["bypassed"] += 1
+        else:
+            self.stats["misses"] += 1
+            response_cache_control = headers.get("cache-control", "")
+            if "no-store" not in response_cache_control and len(body) <= self.max_body_bytes:
+                await self.cache.set(key, stored, ttl)
+                self.stats["stored"] += 1
+
+        response = self._stored_response(request, stored, if_none_match, "MISS")
+        await response(scope, receive, send)
+
+    def ttl_for(self, path: str) -> int:
+        """
+        Resolve the server-side TTL for a request path
+
+        Args:
+            path: Request path
+
+        Returns:
+            TTL of the longest matching route prefix, 0 if none matches
+        """
+        best_prefix = None
+        for prefix in self.route_ttls:
+            if path.startswith(prefix) and (best_prefix is None or len(prefix) > len(best_prefix)):
+                best_prefix = prefix
+        return self.route_ttls[best_prefix] if best_prefix is not None else 0
+
+    def _cache_key(self, request: Request) -> str:
+        """Key for a request: route, normalised query string and auth scope."""
+        query = "&".join(sorted(
+            f"{name}={value}" for name, value in request.query_params.multi_items()
+        ))
+        key_source = "|".join((request.url.path, query, self._auth_scope(request)))
+        digest = hashlib.sha256(key_source.encode()).hexdigest()[:32]
+        return f"{CacheConfig.HTTP_PREFIX}{request.url.path}:{digest}"
+
+    @staticmethod
+    def _auth_scope(request: Request) -> str:
+        """Cache partition for the caller: anonymous, or a hash of their credentials."""
+        authorization = request.headers.get("authorization")
+        if not authorization:
+            return "public"
+        return hashlib.sha256(authorization.encode()).hexdigest()
+
+    @staticmethod
+    def _bypasses_cache(request: Request) -> bool:
+        """Whether the request's Cache-Control forbids a stored response."""
+        cache_control = request.headers.get("cache-control", "")
+        return "no-cache" in cache_control or "no-store" in cache_control
+
+    def _stored_response(
+        self,
+        request: Request,
+        stored: Dict[str, Any],
+        if_none_match: Optional[str],
+        cache_status: str
+    ) -> Response:
+        """Build the 304 or full response for a stored (or just generated) response."""
+        cache_headers = {
+            "ETag": stored["etag"],
+            "Cache-Control": (
+                self.private_cache_control if request.headers.get("authorization")
+                else self.cache_control
+            ),
+            "Vary": "Accept-Encoding, Authorization",
+            "X-Cache-Status": cache_status
+        }
+
+        if if_none_match and self._etag_matches(if_none_match, stored["etag"]):
+            # Return 304 Not Modified
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=cache_headers)
 
+        response = Response(
+            content=stored["body"],
+            status_code=stored["status_code"],
+            headers=dict(stored["headers"])
+        )
+        for name, value in cache_headers.items():
+            if name != "Cache-Control" or "cache-control" not in response.headers:
+                response.headers[name] = value
         return response
 
-    def _generate_etag(self, request: Request) -> str:
+    @staticmethod
+    def _etag_matches(if_none_match: str, etag: str) -> bool:
+        """Weak comparison of an If-None-Match header against an ETag."""
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in candidates
+
+    @staticmethod
+    def _generate_etag(body: bytes) -> str:
         """
-        Generate ETag for request
+        Generate ETag for a response body
 
         Args:
-            request: FastAPI request
+            body: Response body bytes
 
         Returns:
-            ETag string
-        """
-        # Create hash from URL and relevant headers
-        etag_parts = [
-            str(request.url),
-            request.headers.get("accept", ""),
-            request.headers.get("accept-encoding", ""),
-            request.headers.get("accept-language", "")
-        ]
+            Strong ETag string
+        """
+        return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
 
-        etag_string = "|".join(etag_parts)
-        etag_hash = hashlib.md5(etag_string.encode()).hexdigest()
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get response cache statistics
 
-        return f'"{etag_hash}"'
+        Returns:
+            Hit, miss, 304 and store counts plus the hit ratio
+        """
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": self.stats["hits"] / lookups if lookups else 0.0,
+            "routes": dict(self.route_ttls)
+        }
 
 
 # Cache invalidation strategies
@@ -716,36 +2260,52 @@ class CacheInvalidator:
     Cache invalidation strategies
     """
 
+    # Callbacks for caches outside the cache manager, called with a product id
+    product_invalidation_hooks: List[Callable[[str], Any]] = []
+
+    @classmethod
+    def register_product_invalidation_hook(cls, hook: Callable[[str], Any]) -> None:
+        """Register a callback run whenever a product's cache is invalidated"""
+        cls.product_invalidation_hooks.append(hook)
+
+    @classmethod
+    async def run_product_hooks(cls, product_id: str) -> int:
+        """Run the registered product hooks in this worker; returns how many removed an entry"""
+        removed = 0
+        for hook in cls.product_invalidation_hooks:
+            try:
+                result = hook(product_id)
+                if asyncio.iscoroutine(result):
+                    result = await result
+                if result:
+                    removed += 1
+            except Exception as e:
+                logger.error(f"Product invalidation hook failed for {product_id}: {str(e)}")
+        return removed
+
     @staticmethod
     async def invalidate_user_cache(user_id: str):
-        """Invalidate all user-related cache entries"""
-        patterns = [
-            f"{CacheConfig.USER_PREFIX}{user_id}:*",
-            f"{CacheConfig.SESSION_PREFIX}{user_id}:*",
-            f"{CacheConfig.RECOMMENDATION_PREFIX}{user_id}:*"
-        ]
-
-        total_deleted = 0
-        for pattern in patterns:
-            deleted = await cache_manager.delete_pattern(pattern)
-            total_deleted += deleted
+        """Invalidate all user-related cache entries (user, session, rec keys)"""
+        total_deleted = await cache_manager.invalidate_tags(
+            f"{CacheConfig.USER_PREFIX}{user_id}"
+        )
 
         logger.info(f"Invalidated {total_deleted} cache entries for user {user_id}")
         return total_deleted
 
     @staticmethod
     async def invalidate_product_cache(product_id: str):
-        """Invalidate product-related cache entries"""
-        patterns = [
+        """Invalidate product-related cache entries, search results and stored responses"""
+        total_deleted = await cache_manager.invalidate_tags(
             f"{CacheConfig.PRODUCT_PREFIX}{product_id}",
-            f"{CacheConfig.PRODUCT_PREFIX}{product_id}:*",
-            f"{CacheConfig.SEARCH_PREFIX}*"  # Invalidate search results
-        ]
+            CacheConfig.SEARCH_TAG,
+            CacheConfig.HTTP_TAG
+        )
+
+        total_deleted += await CacheInvalidator.run_product_hooks(product_id)
 
-        total_deleted = 0
-        for pattern in patterns:
-            deleted = await cache_manager.delete_pattern(pattern)
-            total_deleted += deleted
+        # Other workers run their own hooks for this product
+        await cache_manager.publish_invalidation(products=[product_id])
 
         logger.info(f"Invalidated {total_deleted} cache entries for product {product_id}")
         return total_deleted
@@ -753,12 +2313,8 @@ class CacheInvalidator:
     @staticmethod
     async def invalidate_all():
         """Invalidate all cache entries"""
-        # Clear memory cache
-        cache_manager.memory_cache.clear()
-
-        # Clear Redis cache
-        if cache_manager.is_connected:
-            await cache_manager.redis_client.flushdb()
+        # Clears the memory tier of every worker and the Redis cache
+        await cache_manager.clear()
 
         logger.info("Invalidated all cache entries")
 
@@ -766,9 +2322,12 @@ class CacheInvalidator:
 # Export public API
 __all__ = [
     'CacheConfig',
+    'CacheEntry',
+    'CachePolicy',
     'CacheManager',
     'cache_manager',
     'cached',
+    'cached_batch',
     'cache_key_builder',
     'HTTPCacheMiddleware',
     'CacheInvalidator',
@@ -187,6 +187,161 @@ class Settings(BaseSettings):
         description="Supabase service role key (keep secure)",
     )
 
+    SUPABASE_EXECUTOR_MAX_WORKERS: int = Field(
+        default=32,
+        ge=1,
+        le=256,
+        description="Worker threads used to run blocking Supabase queries",
+    )
+
+    SUPABASE_DEFAULT_TABLE_CONCURRENCY: int = Field(
+        default=16,
+        ge=1,
+        le=256,
+        description="Default maximum in-flight Supabase queries per table",
+    )
+
+    SUPABASE_TABLE_CONCURRENCY: Dict[str, int] = Field(
+        default_factory=dict,
+        description='Per-table in-flight query limits, e.g. {"swipe_interactions": 8}',
+    )
+
+    SUPABASE_INSTRUMENTATION_ENABLED: bool = Field(
+        default=False,
+        description="Record latency, rows and payload size of every Supabase call",
+    )
+
+    SUPABASE_SLOW_QUERY_THRESHOLD_MS: float = Field(
+        default=100.0,
+        gt=0,
+        description="Supabase calls slower than this are logged as slow queries",
+    )
+
+    # =========================================================================
+    # SWIPE INGESTION CONFIGURATION
+    # =========================================================================
+
+    SWIPE_WRITE_BEHIND_ENABLED: bool = Field(
+        default=False,
+        description="Acknowledge swipes immediately and persist them in batches",
+    )
+
+    SWIPE_FLUSH_BATCH_SIZE: int = Field(
+        default=200, ge=1, le=5000, description="Swipes per multi-row insert"
+    )
+
+    SWIPE_FLUSH_INTERVAL_SECONDS: float = Field(
+        default=0.5,
+        gt=0,
+        le=60,
+        description="Maximum time a buffered swipe waits before being flushed",
+    )
+
+    SWIPE_BUFFER_MAX_PENDING: int = Field(
+        default=10000,
+        ge=1,
+        description="Maximum buffered swipes before producers are back-pressured",
+    )
+
+    SWIPE_ENQUEUE_TIMEOUT_SECONDS: float = Field(
+        default=0.1,
+        ge=0,
+        description="How long a request waits for buffer space before writing directly",
+    )
+
+    SWIPE_SPILL_DIR: str = Field(
+        default="/tmp/aclue/swipe_spill",
+        description="Directory for swipe batches that failed to flush",
+    )
+
+    # =========================================================================
+    # COUNTER AGGREGATION CONFIGURATION
+    # =========================================================================
+
+    COUNTER_COALESCING_ENABLED: bool = Field(
+        default=False,
+        description="Coalesce hot counter increments in memory and flush them in batches",
+    )
+
+    COUNTER_FLUSH_INTERVAL_SECONDS: float = Field(
+        default=1.0,
+        gt=0,
+        le=60,
+        description="Seconds between counter delta flushes",
+    )
+
+    COUNTER_MAX_PENDING_KEYS: int = Field(
+        default=50000,
+        ge=1,
+        description="Maximum distinct counters held in memory between flushes",
+    )
+
+    # =========================================================================
+    # PRODUCT METADATA CACHE CONFIGURATION
+    # =========================================================================
+
+    PRODUCT_METADATA_CACHE_SIZE: int = Field(
+        default=5000,
+        ge=1,
+        description="Maximum products whose click metadata is cached in process",
+    )
+
+    PRODUCT_METADATA_CACHE_TTL_SECONDS: int = Field(
+        default=300,
+        ge=1,
+        description="How long cached product price and commission data is served",
+    )
+
+    PRODUCT_METADATA_NEGATIVE_TTL_SECONDS: int = Field(
+        default=30,
+        ge=1,
+        description="How long unknown or inactive product ids are remembered",
+    )
+
+    # =========================================================================
+    # RECOMMENDATION CONFIGURATION
+    # =========================================================================
+
+    PREFERENCE_RECONCILE_INTERVAL_HOURS: float = Field(
+        default=24.0,
+        gt=0,
+        description="Age after which incrementally maintained preferences are fully recalculated",
+    )
+
+    PREFERENCE_RECONCILE_JOB_ENABLED: bool = Field(
+        default=False,
+        description="Periodically recalculate the stalest stored preferences in the background",
+    )
+
+    PREFERENCE_RECONCILE_JOB_INTERVAL_SECONDS: float = Field(
+        default=3600.0,
+        gt=0,
+        description="Seconds between background runs of the stale preference reconcile job",
+    )
+
+    PREFERENCE_RECONCILE_JOB_BATCH_SIZE: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        description="Maximum users recalculated per run of the stale preference reconcile job",
+    )
+
+    RECOMMENDATION_CANDIDATE_POOL_SIZE: int = Field(
+        default=500,
+        ge=1,
+        le=10000,
+        description="Candidate products fetched and scored per personalised recommendation request",
+    )
+
+    # =========================================================================
+    # ANALYTICS CONFIGURATION
+    # =========================================================================
+
+    USER_ANALYTICS_ROLLUPS_ENABLED: bool = Field(
+        default=False,
+        description="Build user analytics summaries from user_daily_activity rollups",
+    )
+
     # =========================================================================
     # REDIS CONFIGURATION
     # =========================================================================
@@ -203,6 +358,105 @@ class Settings(BaseSettings):
         default=10, ge=1, le=100, description="Maximum Redis connections"
     )
 
+    CACHE_INVALIDATION_BUS_ENABLED: bool = Field(
+        default=False,
+        description="Connect the cache to Redis and share in-process cache evictions between workers via pub/sub",
+    )
+
+    CACHE_MEMORY_TTL_SECONDS: int = Field(
+        default=300,
+        ge=1,
+        description="In-process cache TTL used while the invalidation bus is running",
+    )
+
+    # =========================================================================
+    # CACHE WARMING CONFIGURATION
+    # =========================================================================
+
+    CACHE_WARMING_ENABLED: bool = Field(
+        default=False,
+        description="Warm trending, featured, category and top-user caches at startup and periodically",
+    )
+
+    CACHE_WARMUP_TIMEOUT_SECONDS: float = Field(
+        default=30.0,
+        gt=0,
+        description="Longest startup waits for the initial warm-up (it continues in the background)",
+    )
+
+    CACHE_WARM_PRODUCT_LIST_SIZE: int = Field(
+        default=50,
+        ge=1,
+        le=500,
+        description="Products cached for the trending and featured lists",
+    )
+
+    CACHE_WARM_TOP_USERS: int = Field(
+        default=200,
+        ge=0,
+        description="Most recently active users whose preferences are preloaded",
+    )
+
+    USER_PREFERENCES_CACHE_TTL_SECONDS: int = Field(
+        default=0,
+        ge=0,
+        description="Cache stored user preferences for this long (0 disables; per-swipe updates show after at most this delay)",
+    )
+
+    # =========================================================================
+    # HTTP RESPONSE CACHE CONFIGURATION
+    # =========================================================================
+
+    HTTP_RESPONSE_CACHE_ENABLED: bool = Field(
+        default=False,
+        description="Store GET responses of the routes in HTTP_RESPONSE_CACHE_ROUTE_TTLS and answer conditional requests with body ETags",
+    )
+
+    HTTP_RESPONSE_CACHE_ROUTE_TTLS: Dict[str, int] = Field(
+        default_factory=lambda: {
+            "/api/v1/products/": 60,
+            "/api/v1/products/trending/": 300,
+        },
+        description='Server-side response TTL in seconds by path prefix (longest prefix wins; 0 disables), e.g. {"/api/v1/products/": 60}',
+    )
+
+    HTTP_RESPONSE_CACHE_MAX_BODY_BYTES: int = Field(
+        default=1024 * 1024,
+        ge=0,
+        description="Largest response body stored by the response cache",
+    )
+
+    # =========================================================================
+    # EVENT LOOP MONITOR CONFIGURATION
+    # =========================================================================
+
+    EVENT_LOOP_MONITOR_ENABLED: bool = Field(
+        default=False,
+        description="Measure event loop lag and capture stacks of callbacks that block the loop",
+    )
+
+    EVENT_LOOP_MONITOR_INTERVAL_MS: float = Field(
+        default=50.0,
+        ge=1,
+        le=1000,
+        description="Interval between event loop lag probes",
+    )
+
+    EVENT_LOOP_BLOCK_THRESHOLD_MS: float = Field(
+        default=100.0,
+        ge=5,
+        description="Loop stalls longer than this are reported with the blocking stack",
+    )
+
+    # =========================================================================
+    # SAMPLING PROFILER CONFIGURATION
+    # =========================================================================
+
+    PROFILER_TOKEN: Optional[str] = Field(
+        default=None,
+        description="Token required in X-Profiler-Token to use the profiler routes; unset denies all access",
+    )
+
     # =========================================================================
     # EMAIL CONFIGURATION
     # =========================================================================
@@ -393,6 +647,13 @@ class Settings(BaseSettings):
         description="Health check endpoint path",
     )
 
+    PERFORMANCE_METRICS_CACHE_TTL_SECONDS: float = Field(
+        default=30.0,
+        ge=0,
+        le=3600,
+        description="How long database performance metrics are served from cache (0 disables)",
+    )
+
     # =========================================================================
     # FEATURE FLAGS
     # =========================================================================
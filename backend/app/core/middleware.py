@@ -1,4 +1,11 @@
-"""Middleware configuration for FastAPI application."""
+"""Middleware configuration for FastAPI application.
+
+The custom middlewares here are plain ASGI callables rather than
+BaseHTTPMiddleware subclasses: they edit the ``http.response.start`` message
+in a send wrapper instead of awaiting ``call_next``, so each layer costs a
+function call instead of an extra task and memory stream per request, and
+streaming responses pass through unbuffered.
+"""
 
 import time
 import uuid
@@ -7,11 +14,13 @@ from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import structlog
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
+from app.core.caching import HTTPCacheMiddleware, cache_manager
 from app.core.config import settings
 
 logger = structlog.get_logger(__name__)
@@ -37,14 +46,22 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     return response
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """Middleware for logging requests and responses."""
-    
-    async def dispatch(self, request: Request, call_next):
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Generate request ID
         request_id = str(uuid.uuid4())
         start_time = time.time()
-        
+        request = Request(scope)
+
         # Log request
         logger.info(
             "Request started",
@@ -54,13 +71,32 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             client_ip=request.client.host if request.client else None,
             user_agent=request.headers.get("user-agent"),
         )
-        
+
         # Add request ID to request state
         request.state.request_id = request_id
-        
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Calculate processing time
+                process_time = time.time() - start_time
+
+                # Log response
+                logger.info(
+                    "Request completed",
+                    request_id=request_id,
+                    status_code=message["status"],
+                    process_time=process_time,
+                )
+
+                # Add headers
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-Process-Time"] = str(process_time)
+            await send(message)
+
         # Process request
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             logger.error(
                 "Request failed",
@@ -69,26 +105,9 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                 error_type=type(e).__name__,
             )
             raise
-        
-        # Calculate processing time
-        process_time = time.time() - start_time
-        
-        # Log response
-        logger.info(
-            "Request completed",
-            request_id=request_id,
-            status_code=response.status_code,
-            process_time=process_time,
-        )
-        
-        # Add headers
-        response.headers["X-Request-ID"] = request_id
-        response.headers["X-Process-Time"] = str(process_time)
-        
-        return response
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """Middleware for adding comprehensive security headers.
 
     Implements OWASP security headers best practices including:
@@ -98,20 +117,32 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     - X-Content-Type-Options for MIME sniffing prevention
     - Referrer Policy for privacy
     - Permissions Policy for feature restrictions
+
+    The header values only depend on settings, so they are built once here
+    rather than on every response.
     """
 
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
+    # Remove sensitive headers that might leak information
+    REMOVED_HEADERS = ("X-Powered-By", "Server")
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.headers = self.build_headers()
 
+    @staticmethod
+    def build_headers() -> dict:
+        """Security headers applied to every response."""
         # Core security headers - Always applied
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["X-Permitted-Cross-Domain-Policies"] = "none"
+        headers = {
+            "X-Content-Type-Options": "nosniff",
+            "X-Frame-Options": "DENY",
+            "X-XSS-Protection": "1; mode=block",
+            "Referrer-Policy": "strict-origin-when-cross-origin",
+            "X-Permitted-Cross-Domain-Policies": "none",
+        }
 
         # Permissions Policy - Restrict browser features
-        response.headers["Permissions-Policy"] = (
+        headers["Permissions-Policy"] = (
             "accelerometer=(), camera=(), geolocation=(), gyroscope=(), "
             "magnetometer=(), microphone=(), payment=(), usb=()"
         )
@@ -134,26 +165,37 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         if settings.ENVIRONMENT == "production":
             csp_directives.append("report-uri /api/v1/csp-report")
 
-        response.headers["Content-Security-Policy"] = "; ".join(csp_directives)
+        headers["Content-Security-Policy"] = "; ".join(csp_directives)
 
         # Production-only security headers
         if settings.ENVIRONMENT == "production":
             # HTTP Strict Transport Security - Force HTTPS
-            response.headers["Strict-Transport-Security"] = (
+            headers["Strict-Transport-Security"] = (
                 "max-age=63072000; includeSubDomains; preload"
             )
             # Expect-CT for certificate transparency
-            response.headers["Expect-CT"] = (
+            headers["Expect-CT"] = (
                 "max-age=86400, enforce"
             )
 
-        # Remove sensitive headers that might leak information
-        if "X-Powered-By" in response.headers:
-            del response.headers["X-Powered-By"]
-        if "Server" in response.headers:
-            del response.headers["Server"]
+        return headers
 
-        return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in self.headers.items():
+                    headers[name] = value
+                for name in self.REMOVED_HEADERS:
+                    if name in headers:
+                        del headers[name]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
 
 
 def setup_middleware(app: FastAPI) -> None:
@@ -163,6 +205,16 @@ def setup_middleware(app: FastAPI) -> None:
     app.state.limiter = limiter
     app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
 
+    # Response cache (innermost, so stored bodies are uncompressed and
+    # security headers are added to replayed responses too)
+    if settings.HTTP_RESPONSE_CACHE_ENABLED:
+        response_cache = HTTPCacheMiddleware(
+            route_ttls=settings.HTTP_RESPONSE_CACHE_ROUTE_TTLS,
+            max_body_bytes=settings.HTTP_RESPONSE_CACHE_MAX_BODY_BYTES
+        )
+        app.add_middleware(response_cache)
+        cache_manager.register_stats_provider("http_response_cache", response_cache.get_stats)
+
     # Security headers middleware
     app.add_middleware(SecurityHeadersMiddleware)
 
@@ -0,0 +1,232 @@
+"""
+aclue Supabase Execution Layer
+
+Runs synchronous supabase-py queries without blocking the event loop.
+
+Problem Addressed:
+The supabase-py client exposes a synchronous ``.execute()`` for PostgREST
+queries. Calling it directly from an ``async def`` handler blocks the event
+loop for the full network round trip, so a single slow query stalls every
+in-flight request on the worker.
+
+Execution Model:
+- Queries are dispatched to a bounded thread pool shared by the process
+- Each table has its own in-flight limit (asyncio semaphore) so one hot or
+  slow table cannot monopolise the pool
+- Limits are configured through ``SUPABASE_TABLE_CONCURRENCY`` with
+  ``SUPABASE_DEFAULT_TABLE_CONCURRENCY`` as the fallback
+
+Instrumentation:
+Observers registered with ``add_observer`` are called in the worker thread
+after every ``execute`` with the query, table, response, duration and error.
+With no observers registered ``execute`` takes the uninstrumented path.
+
+Usage:
+    from app.core.supabase_executor import get_supabase_executor
+
+    query = client.table("products").select("*").eq("id", product_id)
+    response = await get_supabase_executor().execute(query, "products")
+"""
+
+import asyncio
+import functools
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_TABLE = "default"
+
+# observer(query, table, response, duration_seconds, error)
+QueryObserver = Callable[[Any, str, Any, float, Optional[BaseException]], None]
+
+
+class SupabaseExecutor:
+    """
+    Bounded executor for blocking Supabase/PostgREST calls.
+
+    The thread pool bounds total concurrency for the worker process while
+    per-table semaphores bound concurrency for each table. Semaphores are
+    created per event loop so the executor is safe to share between test
+    loops and application loops.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 32,
+        default_table_limit: int = 16,
+        table_limits: Optional[Dict[str, int]] = None
+    ):
+        """
+        Initialise executor.
+
+        Args:
+            max_workers: Maximum worker threads for blocking calls
+            default_table_limit: In-flight limit for tables without an override
+            table_limits: Per-table in-flight limit overrides
+        """
+        self.max_workers = max_workers
+        self.default_table_limit = default_table_limit
+        self.table_limits: Dict[str, int] = dict(table_limits or {})
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._in_flight: Dict[str, int] = {}
+        self._completed: Dict[str, int] = {}
+        self._observers: List[QueryObserver] = []
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get or create the worker thread pool."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="supabase"
+            )
+        return self._executor
+
+    def _get_semaphore(self, table: str) -> asyncio.Semaphore:
+        """Get the in-flight semaphore for a table on the running loop."""
+        loop = asyncio.get_running_loop()
+        semaphores = self._semaphores.get(loop)
+        if semaphores is None:
+            semaphores = {}
+            self._semaphores[loop] = semaphores
+
+        semaphore = semaphores.get(table)
+        if semaphore is None:
+            limit = self.table_limits.get(table, self.default_table_limit)
+            semaphore = asyncio.Semaphore(limit)
+            semaphores[table] = semaphore
+        return semaphore
+
+    async def run(self, func: Callable, *args, table: str = DEFAULT_TABLE, **kwargs) -> Any:
+        """
+        Run a blocking callable on the executor under the table's limit.
+
+        Args:
+            func: Blocking callable (e.g. a query builder's ``execute``)
+            *args: Positional arguments for ``func``
+            table: Table name used to select the concurrency limit
+            **kwargs: Keyword arguments for ``func``
+
+        Returns:
+            Whatever ``func`` returns
+        """
+        semaphore = self._get_semaphore(table)
+        loop = asyncio.get_running_loop()
+
+        async with semaphore:
+            self._in_flight[table] = self._in_flight.get(table, 0) + 1
+            try:
+                return await loop.run_in_executor(
+                    self._get_executor(),
+                    functools.partial(func, *args, **kwargs)
+                )
+            finally:
+                self._in_flight[table] -= 1
+                self._completed[table] = self._completed.get(table, 0) + 1
+
+    async def execute(self, query: Any, table: str = DEFAULT_TABLE) -> Any:
+        """
+        Execute a PostgREST query builder without blocking the event loop.
+
+        Args:
+            query: supabase-py query or RPC builder exposing ``execute()``
+            table: Table (or RPC) name used to select the concurrency limit
+
+        Returns:
+            The supabase-py API response
+        """
+        if not self._observers:
+            return await self.run(query.execute, table=table)
+        return await self.run(self._observed_execute, query, table, table=table)
+
+    def _observed_execute(self, query: Any, table: str) -> Any:
+        """Run ``query.execute`` in the worker thread and notify observers."""
+        response = None
+        error: Optional[BaseException] = None
+        start = time.perf_counter()
+        try:
+            response = query.execute()
+            return response
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            for observer in self._observers:
+                try:
+                    observer(query, table, response, duration, error)
+                except Exception as e:
+                    logger.warning("Supabase query observer failed", table=table, error=str(e))
+
+    def add_observer(self, observer: QueryObserver) -> None:
+        """
+        Register a callback invoked after every executed query.
+
+        Observers run in the worker thread, so they must be thread-safe and
+        must not block.
+
+        Args:
+            observer: Callable taking (query, table, response, duration, error)
+        """
+        if observer not in self._observers:
+            self._observers.append(observer)
+
+    def remove_observer(self, observer: QueryObserver) -> None:
+        """Unregister a previously added observer."""
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get executor statistics.
+
+        Returns:
+            Pool size, per-table limits and per-table in-flight/completed counts
+        """
+        return {
+            "max_workers": self.max_workers,
+            "default_table_limit": self.default_table_limit,
+            "table_limits": dict(self.table_limits),
+            "in_flight": dict(self._in_flight),
+            "completed": dict(self._completed)
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker thread pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# Lazy initialization to avoid import-time settings access
+_supabase_executor: Optional[SupabaseExecutor] = None
+
+
+def get_supabase_executor() -> SupabaseExecutor:
+    """Get or create the process-wide Supabase executor"""
+    global _supabase_executor
+    if _supabase_executor is None:
+        from app.core.config import settings
+
+        _supabase_executor = SupabaseExecutor(
+            max_workers=settings.SUPABASE_EXECUTOR_MAX_WORKERS,
+            default_table_limit=settings.SUPABASE_DEFAULT_TABLE_CONCURRENCY,
+            table_limits=settings.SUPABASE_TABLE_CONCURRENCY
+        )
+        logger.info(
+            "Supabase executor initialised",
+            max_workers=_supabase_executor.max_workers,
+            default_table_limit=_supabase_executor.default_table_limit,
+            table_limits=_supabase_executor.table_limits
+        )
+    return _supabase_executor
+
+
+__all__ = ['SupabaseExecutor', 'QueryObserver', 'get_supabase_executor']
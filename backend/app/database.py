@@ -4,6 +4,7 @@ Database connection and utilities for aclue using official Supabase client
 from typing import Optional, Dict, Any, List
 from supabase import create_client, Client
 from app.core.config import settings
+from app.core.supabase_executor import get_supabase_executor
 
 # Initialize Supabase clients
 def create_supabase_client(use_service_key: bool = False) -> Client:
@@ -43,7 +44,11 @@ supabase_anon = None  # Will be initialized lazily
 supabase_service = None  # Will be initialized lazily
 
 class SupabaseClient:
-    """Wrapper class for Supabase operations with backward compatibility"""
+    """Wrapper class for Supabase operations with backward compatibility
+
+    Queries run on the shared Supabase executor so the blocking
+    supabase-py ``execute()`` never stalls the event loop.
+    """
     
     def __init__(self):
         pass
@@ -66,13 +71,14 @@ class SupabaseClient:
         if limit > 0:
             query = query.limit(limit)
         
-        response = query.execute()
+        response = await get_supabase_executor().execute(query, table)
         return response.data
     
     async def insert(self, table: str, data: dict, use_service_key: bool = False):
         """Insert data into a table using Supabase query builder"""
         client = self._get_client(use_service_key)
-        response = client.table(table).insert(data).execute()
+        query = client.table(table).insert(data)
+        response = await get_supabase_executor().execute(query, table)
         return response.data
     
     async def update(self, table: str, data: dict, filters: dict, use_service_key: bool = False):
@@ -84,7 +90,7 @@ class SupabaseClient:
         for key, value in filters.items():
             query = query.eq(key, value)
         
-        response = query.execute()
+        response = await get_supabase_executor().execute(query, table)
         return response.data
     
     async def delete(self, table: str, filters: dict, use_service_key: bool = False):
@@ -96,7 +102,7 @@ class SupabaseClient:
         for key, value in filters.items():
             query = query.eq(key, value)
         
-        response = query.execute()
+        response = await get_supabase_executor().execute(query, table)
         return response.data
     
     async def upsert(self, table: str, data: dict, use_service_key: bool = False, on_conflict: str = None):
@@ -107,7 +113,7 @@ class SupabaseClient:
         if on_conflict:
             query = query.on_conflict(on_conflict)
         
-        response = query.execute()
+        response = await get_supabase_executor().execute(query, table)
         return response.data
 
 # Global instance for backward compatibility
@@ -29,6 +29,7 @@ Dependencies:
 - Supabase: Backend-as-a-service with PostgreSQL
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -40,6 +41,12 @@ from app.core.config import settings          # Application configuration
 from app.core.database import create_tables   # Database initialization
 from app.api.v1.api import api_router         # API route definitions
 from app.core.middleware import setup_middleware  # Custom middleware setup
+from app.services.database_service import database_service  # Swipe ingestion lifecycle
+from app.services.counter_service import counter_aggregator  # Batched counter flushes
+from app.core.caching import cache_manager    # Multi-layer cache and invalidation bus
+from app.core.supabase_executor import get_supabase_executor  # Supabase query execution
+from app.middleware.performance_monitoring import SupabasePerformanceMonitor  # Supabase query metrics
+from app.monitoring.loop_monitor import event_loop_monitor  # Event loop lag and blocking stacks
 
 
 # ================================
@@ -130,10 +137,65 @@ async def lifespan(app: FastAPI):
         # Connect to Redis for session storage and API caching
         # await initialize_redis()
         
+        # Redis cache tier with cross-worker eviction of in-process caches;
+        # with evictions shared, in-process entries can live longer
+        if settings.CACHE_INVALIDATION_BUS_ENABLED and settings.REDIS_URL:
+            cache_manager.config.REDIS_URL = str(settings.REDIS_URL)
+            await cache_manager.connect()
+            if await cache_manager.start_invalidation_bus():
+                cache_manager.memory_cache.ttl = settings.CACHE_MEMORY_TTL_SECONDS
+        
         # External service health checks
         # Verify Supabase connectivity, Amazon Associates API, etc.
         # await verify_external_services()
         
+        # Event loop lag probe and watchdog for callbacks that block the loop
+        if settings.EVENT_LOOP_MONITOR_ENABLED:
+            event_loop_monitor.start(
+                interval=settings.EVENT_LOOP_MONITOR_INTERVAL_MS / 1000,
+                block_threshold=settings.EVENT_LOOP_BLOCK_THRESHOLD_MS / 1000
+            )
+        
+        # Supabase call instrumentation (latency, rows, payload size, slow queries)
+        if settings.SUPABASE_INSTRUMENTATION_ENABLED:
+            SupabasePerformanceMonitor.setup(
+                get_supabase_executor(),
+                slow_query_threshold_ms=settings.SUPABASE_SLOW_QUERY_THRESHOLD_MS
+            )
+        
+        # Write-behind swipe ingestion (no-op unless SWIPE_WRITE_BEHIND_ENABLED)
+        # Also replays any swipe batches spilled to disk by a previous process
+        await database_service.start_swipe_ingestion()
+        
+        # Cache warm-up: trending, featured, category tree and active users'
+        # preferences; startup waits up to the timeout, then it continues in
+        # the background and re-runs every WARM_CACHE_INTERVAL
+        if settings.CACHE_WARMING_ENABLED:
+            try:
+                report = await asyncio.wait_for(
+                    cache_manager.warm_cache(), timeout=settings.CACHE_WARMUP_TIMEOUT_SECONDS
+                )
+                logger.info(
+                    "Cache warm-up complete",
+                    duration_ms=round(report["duration_ms"], 1),
+                    keys=report["keys"],
+                    coverage=report["coverage"]
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Cache warm-up still running after timeout; continuing startup")
+            cache_manager.start_warming_loop()
+        
+        # Coalesced counter increments (sessions, products, gift links)
+        if settings.COUNTER_COALESCING_ENABLED:
+            counter_aggregator.flush_interval = settings.COUNTER_FLUSH_INTERVAL_SECONDS
+            counter_aggregator.max_keys = settings.COUNTER_MAX_PENDING_KEYS
+            await counter_aggregator.start()
+        
+        # Periodic full recalculation of the stalest incrementally maintained
+        # preferences, for users who no longer trigger an on-read reconcile
+        if settings.PREFERENCE_RECONCILE_JOB_ENABLED:
+            database_service.start_preference_reconcile_loop()
+        
         logger.info("aclue API startup complete - ready to serve requests")
         
     except Exception as e:
@@ -159,6 +221,22 @@ async def lifespan(app: FastAPI):
         # Flush any pending analytics or logs
         # await flush_pending_data()
         
+        # Stop the preference reconcile job and in-flight per-user reconciles
+        await database_service.stop_preference_reconcile_loop()
+        
+        # Drain buffered swipes; batches that cannot be written are spilled to disk
+        await database_service.stop_swipe_ingestion()
+        
+        # Apply remaining counter deltas (after swipes, which produce some)
+        await counter_aggregator.stop()
+        
+        # Stop periodic cache warming, the invalidation bus and Redis connections
+        await cache_manager.stop_warming_loop()
+        if cache_manager.is_connected:
+            await cache_manager.disconnect()
+        
+        await event_loop_monitor.stop()
+        
         logger.info("aclue API shutdown complete - all resources cleaned up")
         
     except Exception as e:
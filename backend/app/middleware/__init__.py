@@ -7,6 +7,7 @@ Collection of middleware components for FastAPI application enhancement.
 from .performance_monitoring import (
     PerformanceMonitoringMiddleware,
     DatabasePerformanceMonitor,
+    SupabasePerformanceMonitor,
     RequestTracingMiddleware,
     setup_performance_monitoring,
     performance_metrics
@@ -15,6 +16,7 @@ from .performance_monitoring import (
 __all__ = [
     'PerformanceMonitoringMiddleware',
     'DatabasePerformanceMonitor',
+    'SupabasePerformanceMonitor',
     'RequestTracingMiddleware',
     'setup_performance_monitoring',
     'performance_metrics'
@@ -9,7 +9,11 @@ Key Features:
     - Database query performance monitoring
     - Memory and CPU usage tracking
     - Endpoint-specific metrics
+    - Streaming latency quantiles over 1m/5m/1h windows
     - Slow query detection and alerting
+    - Fingerprinted statement statistics (pg_stat_statements style)
+    - On-demand sampling profiler with flame-graph export
+    - Event loop lag and blocking-call stack reports
     - Resource exhaustion prevention
 
 Performance Targets:
@@ -31,22 +35,35 @@ import time
 import asyncio
 import psutil
 import resource
-import tracemalloc
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
 from contextlib import contextmanager
+import hmac
 import json
 import logging
+import os
 
-from fastapi import FastAPI, Request, Response
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Response
 from fastapi.routing import APIRoute
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.types import ASGIApp, Scope, Receive, Send
 from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, generate_latest
 from sqlalchemy import event
 from sqlalchemy.engine import Engine
 
+from app.core.config import settings
+from app.monitoring.metrics import (
+    db_query_duration_seconds as app_db_query_duration_seconds,
+    db_query_rows as app_db_query_rows,
+    db_query_payload_bytes as app_db_query_payload_bytes,
+    db_query_errors_total as app_db_query_errors_total,
+)
+from app.monitoring.sketches import DEFAULT_WINDOWS, WindowedSketch, merge_exports, summarize
+from app.monitoring.loop_monitor import event_loop_monitor
+from app.monitoring.profiler import sampling_profiler
+from app.monitoring.statements import StatementStats, fingerprint_postgrest, fingerprint_sql
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -123,45 +140,90 @@ error_count = Counter(
 class PerformanceMetrics:
     """
     Performance metrics aggregator for real-time monitoring and analysis
+
+    Performance Implementation:
+        Request latencies are recorded in per-endpoint DDSketches over
+        rotating 1m/5m/1h windows instead of a deque of the last N samples.
+        Recording is O(1), reading p50/p95/p99 costs a walk over the sketch
+        buckets (bounded by the latency range, not by traffic), and every
+        estimate is within 1% relative error. Sketch exports from several
+        workers merge into one fleet-wide summary.
+
+        Database calls are aggregated per fingerprint in a bounded
+        StatementStats store, and the slow query/endpoint samples are ring
+        buffers, so a long-running worker's memory stays flat.
     """
 
-    def __init__(self, window_size: int = 100):
+    SUMMARY_WINDOW = "5m"
+
+    def __init__(
+        self,
+        window_size: int = 100,
+        windows=DEFAULT_WINDOWS,
+        max_statements: int = 500,
+        slow_sample_size: int = 100
+    ):
         """
         Initialize performance metrics tracker
 
         Args:
-            window_size: Size of rolling window for metrics
+            window_size: Size of rolling window for error and system samples
+            windows: (name, seconds, slots) latency windows
+            max_statements: Maximum number of query fingerprints tracked
+            slow_sample_size: Number of recent slow queries/endpoints kept
         """
         self.window_size = window_size
-        self.request_times: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window_size))
-        self.query_times: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window_size))
+        self.windows = tuple(windows)
+        self.request_times: Dict[str, WindowedSketch] = defaultdict(lambda: WindowedSketch(self.windows))
+        self.query_times = StatementStats(max_entries=max_statements, slow_threshold=0.1)
         self.error_rates: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window_size))
         self.memory_snapshots: deque = deque(maxlen=window_size)
         self.cpu_snapshots: deque = deque(maxlen=window_size)
-        self.slow_queries: List[Dict[str, Any]] = []
-        self.slow_endpoints: List[Dict[str, Any]] = []
+        self.slow_queries: deque = deque(maxlen=slow_sample_size)
+        self.slow_endpoints: deque = deque(maxlen=slow_sample_size)
+        self.slow_query_count = 0
+        self.slow_endpoint_count = 0
 
     def add_request_time(self, endpoint: str, duration: float):
         """Record request execution time"""
-        self.request_times[endpoint].append(duration)
+        self.request_times[endpoint].add(duration)
 
         # Check for slow endpoint
         if duration > 1.0:  # > 1 second
+            self.slow_endpoint_count += 1
             self.slow_endpoints.append({
                 'endpoint': endpoint,
                 'duration': duration,
                 'timestamp': datetime.utcnow().isoformat()
             })
 
-    def add_query_time(self, query: str, duration: float):
-        """Record database query execution time"""
-        self.query_times[query].append(duration)
+    def add_query_time(
+        self,
+        query: str,
+        duration: float,
+        rows: Optional[int] = None,
+        fingerprint: Optional[str] = None
+    ):
+        """
+        Record database query execution time
+
+        Args:
+            query: Raw query text (kept as the fingerprint's sample)
+            duration: Execution time in seconds
+            rows: Rows returned or affected, if known
+            fingerprint: Precomputed fingerprint; SQL is fingerprinted otherwise
+        """
+        fingerprint = fingerprint or fingerprint_sql(query)
+        self.query_times.record(fingerprint, duration, rows=rows, sample=query)
 
         # Check for slow query
         if duration > 0.1:  # > 100ms
+            self.slow_query_count += 1
             self.slow_queries.append({
-                'query': query,
+                'query': query[:500],
+                'fingerprint': fingerprint,
                 'duration': duration,
+                'rows': rows,
                 'timestamp': datetime.utcnow().isoformat()
             })
 
@@ -172,15 +234,57 @@ class PerformanceMetrics:
             'timestamp': datetime.utcnow().isoformat()
         })
 
-    def get_percentile(self, endpoint: str, percentile: float = 0.95) -> Optional[float]:
-        """Get percentile response time for endpoint"""
-        times = self.request_times.get(endpoint, [])
-        if not times:
+    def get_percentile(
+        self,
+        endpoint: str,
+        percentile: float = 0.95,
+        window: str = SUMMARY_WINDOW
+    ) -> Optional[float]:
+        """
+        Get percentile response time for endpoint
+
+        Args:
+            endpoint: "METHOD /route" key
+            percentile: Quantile in [0, 1]
+            window: Window name ("1m", "5m", "1h")
+
+        Returns:
+            Estimated response time in seconds, or None without samples
+        """
+        sketches = self.request_times.get(endpoint)
+        if sketches is None:
             return None
+        return sketches.window(window).quantile(percentile)
 
-        sorted_times = sorted(times)
-        index = int(len(sorted_times) * percentile)
-        return sorted_times[min(index, len(sorted_times) - 1)]
+    def export_request_sketches(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Export per-endpoint window sketches for cross-worker aggregation
+
+        Returns:
+            {endpoint: {window: sketch dict}}, JSON-serialisable
+        """
+        return {endpoint: sketches.to_dict() for endpoint, sketches in list(self.request_times.items())}
+
+    @staticmethod
+    def merge_request_sketches(exports: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Merge ``export_request_sketches`` output from several workers
+
+        Args:
+            exports: One export per worker
+
+        Returns:
+            {endpoint: {window: summary}} with count, mean, min, max and p50/p95/p99
+        """
+        by_endpoint: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for export in exports:
+            for endpoint, windows in export.items():
+                by_endpoint[endpoint].append(windows)
+
+        return {
+            endpoint: {name: summarize(sketch) for name, sketch in merge_exports(windows).items()}
+            for endpoint, windows in by_endpoint.items()
+        }
 
     def get_summary(self) -> Dict[str, Any]:
         """Get performance summary"""
@@ -191,31 +295,26 @@ class PerformanceMetrics:
             'errors': {}
         }
 
-        # Endpoint metrics
-        for endpoint, times in self.request_times.items():
-            if times:
+        # Endpoint metrics (top level: SUMMARY_WINDOW; every window under 'windows')
+        for endpoint, sketches in list(self.request_times.items()):
+            windows = {name: sketches.quantiles(name) for name in sketches.rings}
+            if windows[self.SUMMARY_WINDOW]['count'] or sketches.total.count:
                 summary['endpoints'][endpoint] = {
-                    'count': len(times),
-                    'mean': sum(times) / len(times),
-                    'p50': self.get_percentile(endpoint, 0.50),
-                    'p95': self.get_percentile(endpoint, 0.95),
-                    'p99': self.get_percentile(endpoint, 0.99),
-                    'min': min(times),
-                    'max': max(times)
+                    **windows[self.SUMMARY_WINDOW],
+                    'total_count': sketches.total.count,
+                    'windows': windows
                 }
 
         # Database metrics
-        total_queries = sum(len(times) for times in self.query_times.values())
-        if total_queries > 0:
-            all_query_times = []
-            for times in self.query_times.values():
-                all_query_times.extend(times)
-
+        totals = self.query_times.totals()
+        if totals['calls'] > 0:
             summary['database'] = {
-                'total_queries': total_queries,
-                'mean_time': sum(all_query_times) / len(all_query_times),
-                'slow_queries': len(self.slow_queries),
-                'slow_query_samples': self.slow_queries[-10:]  # Last 10 slow queries
+                'total_queries': totals['calls'],
+                'mean_time': totals['mean_time'],
+                'fingerprints': totals['tracked'],
+                'slow_queries': self.slow_query_count,
+                'slow_query_samples': list(self.slow_queries)[-10:],  # Last 10 slow queries
+                'top_statements': self.query_times.top(5)
             }
 
         # System metrics
@@ -249,23 +348,35 @@ class PerformanceMetrics:
 performance_metrics = PerformanceMetrics()
 
 
-class PerformanceMonitoringMiddleware(BaseHTTPMiddleware):
+class PerformanceMonitoringMiddleware:
     """
     FastAPI middleware for comprehensive performance monitoring
+
+    Implemented as a plain ASGI middleware: timing and response headers are
+    handled in a send wrapper, so there is no per-request task or body
+    stream, and streaming responses are measured without being buffered.
+
+    With ``enable_profiling``, requests matching a running filtered
+    sampling_profiler session register their task so the profiler samples
+    them; nothing is done per request while no session runs.
     """
 
     def __init__(self, app: ASGIApp, enable_profiling: bool = False):
-        super().__init__(app)
+        self.app = app
         self.enable_profiling = enable_profiling
         self.process = psutil.Process()
 
         # Start background monitoring tasks
         asyncio.create_task(self._monitor_system_resources())
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """
         Process request with performance monitoring
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Start timing
         start_time = time.time()
 
@@ -273,31 +384,44 @@ class PerformanceMonitoringMiddleware(BaseHTTPMiddleware):
         active_connections.inc()
 
         # Get endpoint path
-        endpoint = f"{request.method} {request.url.path}"
+        method = scope["method"]
+        path = scope["path"]
+        endpoint = f"{method} {path}"
+        response_bytes = 0
+
+        # Attribute profiler samples to this request if a session selects it
+        profiled_task = sampling_profiler.enter_request(scope) if self.enable_profiling else None
+
+        async def send_wrapper(message):
+            nonlocal response_bytes
+            if message["type"] == "http.response.start":
+                duration = time.time() - start_time
+
+                # Record successful request
+                request_count.labels(
+                    method=method,
+                    endpoint=path,
+                    status=message["status"]
+                ).inc()
 
-        # Memory tracking for profiling mode
-        if self.enable_profiling:
-            tracemalloc.start()
-            mem_before = tracemalloc.get_traced_memory()[0]
+                # Add performance headers
+                headers = MutableHeaders(scope=message)
+                headers['X-Response-Time'] = f"{duration * 1000:.2f}ms"
+                headers['X-Process-Time'] = f"{duration * 1000:.2f}ms"
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
 
         try:
             # Process request
-            response = await call_next(request)
-
-            # Record successful request
-            status = response.status_code
-            request_count.labels(
-                method=request.method,
-                endpoint=request.url.path,
-                status=status
-            ).inc()
+            await self.app(scope, receive, send_wrapper)
 
         except Exception as e:
             # Record error
             error_type = type(e).__name__
             error_count.labels(
                 type=error_type,
-                endpoint=request.url.path
+                endpoint=path
             ).inc()
 
             performance_metrics.add_error(endpoint, error_type)
@@ -312,46 +436,35 @@ class PerformanceMonitoringMiddleware(BaseHTTPMiddleware):
 
             # Record metrics
             request_duration.labels(
-                method=request.method,
-                endpoint=request.url.path
+                method=method,
+                endpoint=path
             ).observe(duration)
 
-            performance_metrics.add_request_time(endpoint, duration)
+            # Key latency sketches by route template so path parameters do
+            # not create one sketch per product id; paths no route matched
+            # (404s, scanners) share one bucket per method
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "<unmatched>"
+            performance_metrics.add_request_time(f"{method} {route_path}", duration)
 
-            # Memory profiling
-            if self.enable_profiling:
-                mem_after = tracemalloc.get_traced_memory()[0]
-                mem_used = mem_after - mem_before
-
-                if mem_used > 10 * 1024 * 1024:  # > 10MB
-                    logger.warning(
-                        f"High memory usage for {endpoint}: {mem_used / 1024 / 1024:.2f}MB"
-                    )
-
-                tracemalloc.stop()
+            sampling_profiler.exit_request(profiled_task)
 
             # Track response size
-            if hasattr(response, 'body'):
+            if response_bytes:
                 response_size.labels(
-                    method=request.method,
-                    endpoint=request.url.path
-                ).observe(len(response.body))
+                    method=method,
+                    endpoint=path
+                ).observe(response_bytes)
 
             # Decrement active connections
             active_connections.dec()
 
-            # Add performance headers
-            response.headers['X-Response-Time'] = f"{duration * 1000:.2f}ms"
-            response.headers['X-Process-Time'] = f"{duration * 1000:.2f}ms"
-
             # Log slow requests
             if duration > 1.0:
                 logger.warning(
                     f"Slow request: {endpoint} took {duration:.2f}s"
                 )
 
-        return response
-
     async def _monitor_system_resources(self):
         """
         Background task to monitor system resources
@@ -429,7 +542,10 @@ class DatabasePerformanceMonitor:
                     table=table
                 ).inc()
 
-                performance_metrics.add_query_time(query_str[:100], duration)
+                rowcount = getattr(result, 'rowcount', None)
+                performance_metrics.add_query_time(
+                    query_str, duration, rows=rowcount if rowcount and rowcount > 0 else None
+                )
 
                 # Log slow queries
                 if duration > 0.1:  # > 100ms
@@ -438,6 +554,145 @@ class DatabasePerformanceMonitor:
                     )
 
 
+class SupabasePerformanceMonitor:
+    """
+    Monitor Supabase/PostgREST call performance
+
+    Most production traffic bypasses SQLAlchemy, so DatabasePerformanceMonitor
+    never sees it. This monitor observes every call made through the
+    SupabaseExecutor and records operation, table, row count, payload bytes
+    and latency.
+    """
+
+    # HTTP method -> operation, for PostgREST table requests
+    OPERATIONS = {
+        'GET': 'select',
+        'HEAD': 'count',
+        'POST': 'insert',
+        'PATCH': 'update',
+        'PUT': 'upsert',
+        'DELETE': 'delete'
+    }
+
+    slow_query_threshold: float = 0.1
+
+    @staticmethod
+    def setup(executor, slow_query_threshold_ms: float = 100.0):
+        """
+        Set up Supabase performance monitoring
+
+        Args:
+            executor: SupabaseExecutor running the application's queries
+            slow_query_threshold_ms: Calls slower than this are logged
+        """
+        SupabasePerformanceMonitor.slow_query_threshold = slow_query_threshold_ms / 1000
+        executor.add_observer(SupabasePerformanceMonitor.observe)
+
+    @staticmethod
+    def teardown(executor):
+        """Stop observing an executor"""
+        executor.remove_observer(SupabasePerformanceMonitor.observe)
+
+    @staticmethod
+    def describe(query, table: str) -> tuple:
+        """
+        Derive (operation, table) from a PostgREST request builder
+
+        Args:
+            query: supabase-py request builder
+            table: Table name the call was scheduled under
+
+        Returns:
+            Tuple of operation and target table or RPC name
+        """
+        path = getattr(query, 'path', None)
+        method = getattr(query, 'http_method', None)
+        if not isinstance(path, str) or not isinstance(method, str):
+            return 'unknown', table
+
+        target = path.rstrip('/').rsplit('/', 1)[-1] or table
+        if '/rpc/' in path:
+            return 'rpc', target
+
+        operation = SupabasePerformanceMonitor.OPERATIONS.get(method.upper(), method.lower())
+        if operation == 'insert':
+            headers = getattr(query, 'headers', None) or {}
+            prefer = headers.get('Prefer', '') if hasattr(headers, 'get') else ''
+            if 'resolution=' in prefer:
+                operation = 'upsert'
+        return operation, target
+
+    @staticmethod
+    def payload_size(payload) -> int:
+        """Size in bytes of a JSON payload"""
+        if payload is None:
+            return 0
+        try:
+            return len(json.dumps(payload, default=str))
+        except (TypeError, ValueError):
+            return 0
+
+    @staticmethod
+    def observe(query, table: str, response, duration: float, error: Optional[BaseException]):
+        """
+        Record one executed Supabase call
+
+        Runs in the executor's worker thread, off the event loop.
+
+        Args:
+            query: supabase-py request builder that was executed
+            table: Table name the call was scheduled under
+            response: API response, or None if the call failed
+            duration: Call latency in seconds
+            error: Exception raised by the call, if any
+        """
+        operation, target = SupabasePerformanceMonitor.describe(query, table)
+
+        data = getattr(response, 'data', None)
+        if isinstance(data, list):
+            rows = len(data)
+        else:
+            rows = 1 if data else 0
+
+        request_json = getattr(query, 'json', None)
+        request_bytes = SupabasePerformanceMonitor.payload_size(
+            request_json if isinstance(request_json, (dict, list)) else None
+        )
+        response_bytes = SupabasePerformanceMonitor.payload_size(data)
+
+        db_query_duration.labels(operation=operation, table=target).observe(duration)
+        db_query_count.labels(operation=operation, table=target).inc()
+
+        app_db_query_duration_seconds.labels(query_type=operation, table=target).observe(duration)
+        app_db_query_rows.labels(query_type=operation, table=target).observe(rows)
+        if request_bytes:
+            app_db_query_payload_bytes.labels(
+                query_type=operation, table=target, direction='request'
+            ).observe(request_bytes)
+        if response_bytes:
+            app_db_query_payload_bytes.labels(
+                query_type=operation, table=target, direction='response'
+            ).observe(response_bytes)
+        if error is not None:
+            app_db_query_errors_total.labels(query_type=operation, table=target).inc()
+
+        params = getattr(query, 'params', '')
+        fingerprint = fingerprint_postgrest(operation, target, params)
+        performance_metrics.add_query_time(
+            f"supabase {operation} {target} {str(params)[:200]}".rstrip(),
+            duration,
+            rows=rows,
+            fingerprint=fingerprint
+        )
+
+        # Log slow queries
+        if duration > SupabasePerformanceMonitor.slow_query_threshold:
+            logger.warning(
+                f"Slow Supabase query ({duration:.3f}s): {operation} {target} "
+                f"rows={rows} bytes={request_bytes + response_bytes} {str(params)[:200]}"
+            )
+
+
 class RequestTracingMiddleware:
     """
     Distributed tracing middleware for request correlation
@@ -472,12 +727,42 @@ class RequestTracingMiddleware:
             await self.app(scope, receive, send)
 
 
-def create_performance_router(app: FastAPI) -> APIRoute:
+def profiler_token_dependency(token: Optional[str]):
+    """
+    Build the dependency guarding the profiler routes
+
+    The profiler exposes stack contents and adds sampling overhead to the
+    worker, so every control and export route requires the configured token
+    in the X-Profiler-Token header. Without a configured token the routes
+    deny all requests.
+
+    Args:
+        token: Expected token, or None to deny access
+
+    Returns:
+        Callable: FastAPI dependency raising 403/401 on denied requests
+    """
+    async def require_profiler_token(x_profiler_token: Optional[str] = Header(default=None)):
+        if not token:
+            raise HTTPException(status_code=403, detail="Profiler access is disabled: PROFILER_TOKEN is not set")
+        if not x_profiler_token or not hmac.compare_digest(x_profiler_token.encode(), token.encode()):
+            raise HTTPException(status_code=401, detail="Invalid or missing X-Profiler-Token")
+
+    return require_profiler_token
+
+
+def create_performance_router(
+    app: FastAPI,
+    enable_profiling: bool = False,
+    profiler_token: Optional[str] = None
+) -> APIRoute:
     """
     Create performance monitoring endpoints
 
     Args:
         app: FastAPI application instance
+        enable_profiling: Add the sampling profiler control and export routes
+        profiler_token: Token the profiler routes require (defaults to settings.PROFILER_TOKEN)
 
     Returns:
         APIRoute: Performance monitoring router
@@ -499,6 +784,15 @@ def create_performance_router(app: FastAPI) -> APIRoute:
         """Get performance summary"""
         return performance_metrics.get_summary()
 
+    @router.get("/sketches")
+    async def get_latency_sketches():
+        """Get mergeable per-endpoint latency sketches for this worker"""
+        return {
+            "pid": os.getpid(),
+            "windows": [name for name, _, _ in performance_metrics.windows],
+            "endpoints": performance_metrics.export_request_sketches()
+        }
+
     @router.get("/health")
     async def health_check():
         """Health check endpoint"""
@@ -509,21 +803,78 @@ def create_performance_router(app: FastAPI) -> APIRoute:
         }
 
     @router.get("/slow-queries")
-    async def get_slow_queries(limit: int = 10):
-        """Get recent slow queries"""
+    async def get_slow_queries(limit: int = 10, sort: str = "total_time"):
+        """Get query fingerprints ranked by total time, plus recent slow queries"""
+        if sort not in StatementStats.SORT_KEYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"sort must be one of {', '.join(StatementStats.SORT_KEYS)}"
+            )
+
         return {
-            "slow_queries": performance_metrics.slow_queries[-limit:],
-            "total_count": len(performance_metrics.slow_queries)
+            "statements": performance_metrics.query_times.top(limit, sort=sort),
+            "totals": performance_metrics.query_times.totals(),
+            "slow_queries": list(performance_metrics.slow_queries)[-limit:],
+            "total_count": performance_metrics.slow_query_count
         }
 
     @router.get("/slow-endpoints")
     async def get_slow_endpoints(limit: int = 10):
         """Get recent slow endpoints"""
         return {
-            "slow_endpoints": performance_metrics.slow_endpoints[-limit:],
-            "total_count": len(performance_metrics.slow_endpoints)
+            "slow_endpoints": list(performance_metrics.slow_endpoints)[-limit:],
+            "total_count": performance_metrics.slow_endpoint_count
         }
 
+    @router.get("/event-loop")
+    async def get_event_loop_report(limit: int = Query(20, ge=1, le=100)):
+        """Get event loop lag and the call paths that blocked the loop"""
+        return event_loop_monitor.get_report(limit)
+
+    if enable_profiling:
+        guarded = [Depends(profiler_token_dependency(profiler_token or settings.PROFILER_TOKEN))]
+
+        @router.post("/profiler/start", dependencies=guarded)
+        async def start_profiler(
+            duration: float = Query(30.0, gt=0, le=sampling_profiler.MAX_DURATION),
+            interval: float = Query(sampling_profiler.DEFAULT_INTERVAL, ge=sampling_profiler.MIN_INTERVAL, le=1.0),
+            route: List[str] = Query(default=[]),
+            header: Optional[str] = None
+        ):
+            """Start sampling for a time window, optionally only for matching routes or a header"""
+            try:
+                session = sampling_profiler.start(
+                    duration=duration, interval=interval, routes=route, header=header
+                )
+            except RuntimeError as e:
+                raise HTTPException(status_code=409, detail=str(e))
+            return {"status": "started", "session": session.to_dict()}
+
+        @router.post("/profiler/stop", dependencies=guarded)
+        async def stop_profiler():
+            """Stop sampling; aggregated stacks stay available for export"""
+            sampling_profiler.stop()
+            return sampling_profiler.get_stats()
+
+        @router.get("/profiler", dependencies=guarded)
+        async def get_profiler_status():
+            """Get profiler state, sample counts and sampling overhead"""
+            return sampling_profiler.get_stats()
+
+        @router.get("/profiler/collapsed", dependencies=guarded)
+        async def get_profile_collapsed():
+            """Get aggregated stacks in collapsed format (flamegraph.pl, speedscope)"""
+            return Response(content=sampling_profiler.collapsed(), media_type="text/plain")
+
+        @router.get("/profiler/speedscope", dependencies=guarded)
+        async def get_profile_speedscope():
+            """Get aggregated stacks as a speedscope profile"""
+            return Response(
+                content=json.dumps(sampling_profiler.speedscope(f"aclue worker {os.getpid()}")),
+                media_type="application/json",
+                headers={"Content-Disposition": 'attachment; filename="profile.speedscope.json"'}
+            )
+
     return router
 
 
@@ -537,7 +888,7 @@ def setup_performance_monitoring(
 
     Args:
         app: FastAPI application instance
-        enable_profiling: Enable memory profiling
+        enable_profiling: Enable the on-demand sampling profiler and its routes
         enable_tracing: Enable distributed tracing
     """
     # Add performance monitoring middleware
@@ -551,7 +902,7 @@ def setup_performance_monitoring(
         app.add_middleware(RequestTracingMiddleware)
 
     # Add performance monitoring routes
-    router = create_performance_router(app)
+    router = create_performance_router(app, enable_profiling=enable_profiling)
     app.include_router(router)
 
     # Store start time
@@ -564,6 +915,7 @@ def setup_performance_monitoring(
 __all__ = [
     'PerformanceMonitoringMiddleware',
     'DatabasePerformanceMonitor',
+    'SupabasePerformanceMonitor',
     'RequestTracingMiddleware',
     'setup_performance_monitoring',
     'performance_metrics'
@@ -0,0 +1,342 @@
+"""
+Event loop lag monitor for aclue performance monitoring
+
+Detects callbacks that block the asyncio event loop (synchronous Supabase
+``.execute()`` calls, pandas/NumPy work inside async handlers) and records
+where they were blocked.
+
+Performance Implementation:
+    A probe task sleeps for ``interval`` and measures how late it wakes;
+    that scheduling lag is exported as the event_loop_lag_seconds
+    histogram. A watchdog thread checks the probe's heartbeat every half
+    threshold. When the heartbeat is older than ``block_threshold``, the
+    loop is stuck inside one callback, so the watchdog reads the loop
+    thread's current frame via ``sys._current_frames()`` and records its
+    stack while the blocking call is still on it. Stacks are deduplicated
+    by call path into a bounded report, and captures are rate-limited so a
+    persistently slow loop cannot turn the watchdog into the bottleneck.
+
+Usage:
+    from app.monitoring.loop_monitor import event_loop_monitor
+
+    event_loop_monitor.start(interval=0.05, block_threshold=0.1)
+    event_loop_monitor.get_report()           # Lag stats and blocking stacks
+    await event_loop_monitor.stop()
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.monitoring.metrics import (
+    event_loop_blocked_seconds_total,
+    event_loop_blocked_total,
+    event_loop_lag_seconds,
+)
+
+logger = logging.getLogger(__name__)
+
+Signature = Tuple[Tuple[str, str], ...]
+
+
+class BlockingReport:
+    """
+    Occurrences of one blocking call path
+    """
+
+    __slots__ = (
+        "signature", "stack", "task", "count", "total_blocked",
+        "max_blocked", "first_seen", "last_seen",
+    )
+
+    def __init__(self, signature: Signature, stack: List[str], task: Optional[str], now: float):
+        self.signature = signature
+        self.stack = stack
+        self.task = task
+        self.count = 0
+        self.total_blocked = 0.0
+        self.max_blocked = 0.0
+        self.first_seen = now
+        self.last_seen = now
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_blocked": self.total_blocked,
+            "max_blocked": self.max_blocked,
+            "task": self.task,
+            "location": self.stack[-1].strip().splitlines()[0] if self.stack else None,
+            "stack": self.stack,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+        }
+
+
+class EventLoopMonitor:
+    """
+    Event loop lag probe with a blocking-call watchdog
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        block_threshold: float = 0.1,
+        max_reports: int = 50,
+        max_captures_per_minute: int = 30,
+        stack_limit: int = 40
+    ):
+        """
+        Initialize event loop monitor
+
+        Args:
+            interval: Seconds between lag probes
+            block_threshold: Loop stalls longer than this capture a stack
+            max_reports: Maximum distinct blocking call paths kept
+            max_captures_per_minute: Stack captures allowed per rolling minute
+            stack_limit: Innermost frames kept per captured stack
+        """
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.max_reports = max_reports
+        self.max_captures_per_minute = max_captures_per_minute
+        self.stack_limit = stack_limit
+
+        self.reports: "OrderedDict[Signature, BlockingReport]" = OrderedDict()
+        self.lag_samples = 0
+        self.lag_total = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.blocked_count = 0
+        self.blocked_seconds = 0.0
+        self.captures = 0
+        self.suppressed = 0
+
+        self._heartbeat = time.monotonic()
+        self._captured_heartbeat: Optional[float] = None
+        self._pending: Optional[Tuple[float, BlockingReport]] = None
+        self._capture_times: deque = deque()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._probe_task is not None and not self._probe_task.done()
+
+    def start(self, interval: Optional[float] = None, block_threshold: Optional[float] = None) -> None:
+        """
+        Start the lag probe and watchdog on the running event loop
+
+        Args:
+            interval: Override the probe interval
+            block_threshold: Override the blocking threshold
+        """
+        if self.running:
+            return
+        if interval is not None:
+            self.interval = interval
+        if block_threshold is not None:
+            self.block_threshold = block_threshold
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+
+        self._probe_task = asyncio.create_task(self._probe(), name="event-loop-lag-probe")
+        self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            f"Event loop monitor started (interval {self.interval * 1000:.0f}ms, "
+            f"threshold {self.block_threshold * 1000:.0f}ms)"
+        )
+
+    async def stop(self) -> None:
+        """Stop the probe and watchdog"""
+        self._stop.set()
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join, 1.0)
+            self._watchdog = None
+
+    # ==========================================================================
+    # LAG PROBE (event loop)
+    # ==========================================================================
+
+    async def _probe(self) -> None:
+        while True:
+            scheduled = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+
+            lag = max(0.0, now - scheduled - self.interval)
+            event_loop_lag_seconds.observe(lag)
+            self.lag_samples += 1
+            self.lag_total += lag
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+
+            if lag >= self.block_threshold:
+                self.blocked_count += 1
+                self.blocked_seconds += lag
+                event_loop_blocked_total.inc()
+                event_loop_blocked_seconds_total.inc(lag)
+
+    # ==========================================================================
+    # WATCHDOG (own thread)
+    # ==========================================================================
+
+    def _watch(self) -> None:
+        check_every = max(self.block_threshold / 2, 0.005)
+        while not self._stop.wait(check_every):
+            try:
+                self._check()
+            except Exception as e:  # Keep watching; a failed capture is not fatal
+                logger.error(f"Event loop watchdog error: {str(e)}")
+
+    def _check(self) -> None:
+        heartbeat = self._heartbeat
+        now = time.monotonic()
+
+        # The loop recovered: charge the stall to the stack captured during it
+        pending = self._pending
+        if pending is not None and heartbeat != pending[0]:
+            blocked_for = max(0.0, heartbeat - pending[0] - self.interval)
+            with self._lock:
+                report = pending[1]
+                report.total_blocked += blocked_for
+                report.max_blocked = max(report.max_blocked, blocked_for)
+            self._pending = None
+
+        stalled = now - heartbeat - self.interval
+        if stalled >= self.block_threshold and self._captured_heartbeat != heartbeat:
+            self._captured_heartbeat = heartbeat
+            report = self._capture(now)
+            if report is not None:
+                self._pending = (heartbeat, report)
+
+    def _capture(self, now: float) -> Optional[BlockingReport]:
+        """Record the loop thread's current stack (once per stall, rate-limited)"""
+        while self._capture_times and now - self._capture_times[0] > 60:
+            self._capture_times.popleft()
+        if len(self._capture_times) >= self.max_captures_per_minute:
+            self.suppressed += 1
+            return None
+
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return None
+        self._capture_times.append(now)
+        self.captures += 1
+
+        summary = traceback.extract_stack(frame, limit=self.stack_limit)
+        signature: Signature = tuple((entry.filename, entry.name) for entry in summary)
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+
+        with self._lock:
+            report = self.reports.get(signature)
+            if report is None:
+                report = BlockingReport(
+                    signature,
+                    traceback.format_list(summary),
+                    task.get_name() if task is not None else None,
+                    time.time()
+                )
+                self.reports[signature] = report
+                if len(self.reports) > self.max_reports:
+                    self.reports.popitem(last=False)
+            else:
+                self.reports.move_to_end(signature)
+            report.count += 1
+            report.last_seen = time.time()
+
+        if report.count == 1:
+            logger.warning(
+                f"Event loop blocked for over {self.block_threshold * 1000:.0f}ms at "
+                f"{report.to_dict()['location']}"
+            )
+        return report
+
+    # ==========================================================================
+    # REPORTING
+    # ==========================================================================
+
+    def get_report(self, limit: int = 20) -> Dict[str, Any]:
+        """
+        Lag statistics and the most costly blocking call paths
+
+        Args:
+            limit: Number of blocking reports returned
+
+        Returns:
+            Probe settings, lag stats, blocked totals, capture counts and
+            reports ordered by total blocked time
+        """
+        with self._lock:
+            reports = sorted(
+                self.reports.values(),
+                key=lambda report: (report.total_blocked, report.count),
+                reverse=True
+            )
+            entries = [report.to_dict() for report in reports[:limit]]
+
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "block_threshold": self.block_threshold,
+            "lag": {
+                "samples": self.lag_samples,
+                "last": self.last_lag,
+                "max": self.max_lag,
+                "mean": self.lag_total / self.lag_samples if self.lag_samples else 0.0,
+            },
+            "blocked": {
+                "count": self.blocked_count,
+                "total_seconds": self.blocked_seconds,
+            },
+            "captures": self.captures,
+            "suppressed": self.suppressed,
+            "distinct_stacks": len(self.reports),
+            "reports": entries,
+        }
+
+    def reset(self) -> None:
+        """Clear statistics and reports"""
+        with self._lock:
+            self.reports.clear()
+        self.lag_samples = 0
+        self.lag_total = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.blocked_count = 0
+        self.blocked_seconds = 0.0
+        self.captures = 0
+        self.suppressed = 0
+        self._capture_times.clear()
+
+
+# Global event loop monitor instance
+event_loop_monitor = EventLoopMonitor()
+
+
+__all__ = [
+    'BlockingReport',
+    'EventLoopMonitor',
+    'event_loop_monitor',
+]
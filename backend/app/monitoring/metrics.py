@@ -12,8 +12,9 @@ from prometheus_client import (
     CONTENT_TYPE_LATEST,
     CollectorRegistry,
 )
-from fastapi import Request, Response
-from typing import Callable
+from fastapi import Response
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import time
 import psutil
 import os
@@ -97,6 +98,29 @@ db_query_duration_seconds = Histogram(
     buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
 )
 
+db_query_rows = Histogram(
+    "db_query_rows",
+    "Rows returned or written per database call",
+    ["query_type", "table"],
+    registry=registry,
+    buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000),
+)
+
+db_query_payload_bytes = Histogram(
+    "db_query_payload_bytes",
+    "JSON payload size per database call",
+    ["query_type", "table", "direction"],
+    registry=registry,
+    buckets=(64, 256, 1024, 4096, 16384, 65536, 262144, 1048576),
+)
+
+db_query_errors_total = Counter(
+    "db_query_errors_total",
+    "Total failed database calls",
+    ["query_type", "table"],
+    registry=registry,
+)
+
 db_connections_active = Gauge(
     "db_connections_active", "Number of active database connections", registry=registry
 )
@@ -105,22 +129,118 @@ db_connections_idle = Gauge(
     "db_connections_idle", "Number of idle database connections", registry=registry
 )
 
-# Cache metrics
+# Cache metrics (tier is "memory" or "redis"; prefix is the key's first segment)
 cache_hits_total = Counter(
-    "cache_hits_total", "Total number of cache hits", ["cache_name"], registry=registry
+    "cache_hits_total",
+    "Total number of cache hits",
+    ["cache_name", "tier", "prefix"],
+    registry=registry,
 )
 
 cache_misses_total = Counter(
     "cache_misses_total",
     "Total number of cache misses",
-    ["cache_name"],
+    ["cache_name", "tier", "prefix"],
     registry=registry,
 )
 
 cache_evictions_total = Counter(
     "cache_evictions_total",
     "Total number of cache evictions",
-    ["cache_name"],
+    ["cache_name", "tier", "prefix"],
+    registry=registry,
+)
+
+cache_memory_bytes = Gauge(
+    "cache_memory_bytes",
+    "Estimated bytes held in the in-process cache tier",
+    ["prefix"],
+    registry=registry,
+)
+
+cache_memory_entries = Gauge(
+    "cache_memory_entries",
+    "Entries held in the in-process cache tier",
+    ["prefix"],
+    registry=registry,
+)
+
+cache_redis_latency_seconds = Histogram(
+    "cache_redis_latency_seconds",
+    "Redis round-trip time of cache operations",
+    ["operation", "prefix"],
+    registry=registry,
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+cache_value_bytes = Histogram(
+    "cache_value_bytes",
+    "Serialised size of values written to the Redis cache tier",
+    ["prefix", "codec"],
+    registry=registry,
+    buckets=(128, 512, 2048, 8192, 32768, 131072, 524288, 2097152),
+)
+
+cache_warmup_duration_seconds = Histogram(
+    "cache_warmup_duration_seconds",
+    "Time taken by one cache warmer run",
+    ["warmer", "status"],
+    registry=registry,
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+cache_warmup_keys = Gauge(
+    "cache_warmup_keys",
+    "Cache keys written by the last run of each warmer",
+    ["warmer"],
+    registry=registry,
+)
+
+# Counter aggregation metrics
+counter_flush_duration_seconds = Histogram(
+    "counter_flush_duration_seconds",
+    "Time to apply one batch of coalesced counter deltas",
+    registry=registry,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+counter_increments_flushed_total = Counter(
+    "counter_increments_flushed_total",
+    "Total counter increments written through the counter aggregator",
+    ["table", "column"],
+    registry=registry,
+)
+
+counter_lost_updates_total = Counter(
+    "counter_lost_updates_total",
+    "Total counter increments that could not be applied",
+    ["reason"],
+    registry=registry,
+)
+
+counter_pending_keys = Gauge(
+    "counter_pending_keys",
+    "Counter keys with unflushed deltas",
+    registry=registry,
+)
+
+# Event loop metrics
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between a scheduled event loop wake-up and when it ran",
+    registry=registry,
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+event_loop_blocked_total = Counter(
+    "event_loop_blocked_total",
+    "Number of times a callback blocked the event loop beyond the threshold",
+    registry=registry,
+)
+
+event_loop_blocked_seconds_total = Counter(
+    "event_loop_blocked_seconds_total",
+    "Total time the event loop spent blocked beyond the threshold",
     registry=registry,
 )
 
@@ -184,57 +304,71 @@ rate_limit_hits_total = Counter(
 
 
 # Middleware for automatic request metrics
-async def prometheus_middleware(request: Request, call_next: Callable) -> Response:
+class PrometheusMiddleware:
     """
-    Middleware to automatically collect request metrics
-    """
-    # Start timing
-    start_time = time.time()
-
-    # Get request size
-    request_size = 0
-    if request.headers.get("content-length"):
-        request_size = int(request.headers.get("content-length", 0))
+    ASGI middleware to automatically collect request metrics
 
-    # Process request
-    try:
-        response = await call_next(request)
-    except Exception as e:
-        # Track unhandled exceptions
-        unhandled_exceptions_total.labels(exception_type=type(e).__name__).inc()
-        raise
+    Reads the status and content length from the response start message
+    instead of wrapping the request in a BaseHTTPMiddleware task.
 
-    # Calculate duration
-    duration = time.time() - start_time
+    Usage:
+        app.add_middleware(PrometheusMiddleware)
+    """
 
-    # Get endpoint path
-    endpoint = request.url.path
-    method = request.method
-    status = response.status_code
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-    # Update metrics
-    http_requests_total.labels(
-        method=method, endpoint=endpoint, status=str(status)
-    ).inc()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    http_request_duration_seconds.labels(method=method, endpoint=endpoint).observe(
-        duration
-    )
+        # Start timing
+        start_time = time.time()
 
-    if request_size > 0:
-        http_request_size_bytes.labels(method=method, endpoint=endpoint).observe(
-            request_size
-        )
+        # Get endpoint path
+        endpoint = scope["path"]
+        method = scope["method"]
 
-    # Get response size
-    response_size = 0
-    if response.headers.get("content-length"):
-        response_size = int(response.headers.get("content-length", 0))
-        http_response_size_bytes.labels(method=method, endpoint=endpoint).observe(
-            response_size
-        )
+        # Get request size
+        request_headers = Headers(scope=scope)
+        request_size = int(request_headers.get("content-length") or 0)
 
-    return response
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Calculate duration
+                duration = time.time() - start_time
+                status = message["status"]
+
+                # Update metrics
+                http_requests_total.labels(
+                    method=method, endpoint=endpoint, status=str(status)
+                ).inc()
+
+                http_request_duration_seconds.labels(method=method, endpoint=endpoint).observe(
+                    duration
+                )
+
+                if request_size > 0:
+                    http_request_size_bytes.labels(method=method, endpoint=endpoint).observe(
+                        request_size
+                    )
+
+                # Get response size
+                response_size = Headers(raw=message.get("headers", [])).get("content-length")
+                if response_size:
+                    http_response_size_bytes.labels(method=method, endpoint=endpoint).observe(
+                        int(response_size)
+                    )
+            await send(message)
+
+        # Process request
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            # Track unhandled exceptions
+            unhandled_exceptions_total.labels(exception_type=type(e).__name__).inc()
+            raise
 
 
 def track_db_query(query_type: str, table: str):
@@ -274,20 +408,34 @@ def track_db_query(query_type: str, table: str):
     return decorator
 
 
-def track_cache_operation(cache_name: str):
+def record_cache_lookup(cache_name: str, tier: str, prefix: str, hit: bool) -> None:
+    """
+    Count one cache lookup as a hit or miss
+    """
+    if hit:
+        cache_hits_total.labels(cache_name=cache_name, tier=tier, prefix=prefix).inc()
+    else:
+        cache_misses_total.labels(cache_name=cache_name, tier=tier, prefix=prefix).inc()
+
+
+def record_cache_eviction(cache_name: str, tier: str, prefix: str) -> None:
+    """
+    Count one capacity eviction
+    """
+    cache_evictions_total.labels(cache_name=cache_name, tier=tier, prefix=prefix).inc()
+
+
+def track_cache_operation(cache_name: str, tier: str = "memory", prefix: str = "other"):
     """
     Context manager to track cache operations
     """
 
     @asynccontextmanager
     async def cache_tracker(hit: bool = False, eviction: bool = False):
-        if hit:
-            cache_hits_total.labels(cache_name=cache_name).inc()
-        else:
-            cache_misses_total.labels(cache_name=cache_name).inc()
+        record_cache_lookup(cache_name, tier, prefix, hit)
 
         if eviction:
-            cache_evictions_total.labels(cache_name=cache_name).inc()
+            record_cache_eviction(cache_name, tier, prefix)
 
         yield
 
@@ -360,9 +508,11 @@ async def metrics_endpoint():
 
 # Export commonly used decorators and functions
 __all__ = [
-    "prometheus_middleware",
+    "PrometheusMiddleware",
     "track_db_query",
     "track_cache_operation",
+    "record_cache_lookup",
+    "record_cache_eviction",
     "track_business_metric",
     "metrics_endpoint",
     "update_system_metrics",
@@ -0,0 +1,381 @@
+"""
+Streaming quantile sketches for aclue performance monitoring
+
+Mergeable latency sketches with bounded memory, used by PerformanceMetrics in
+place of sorting raw samples.
+
+DDSketch (Masson et al., VLDB 2019):
+    Values are counted in logarithmic buckets whose boundaries grow by
+    gamma = (1 + a) / (1 - a). Every quantile estimate is then within a
+    relative error ``a`` of the true value, at any traffic level. Adding a
+    value is O(1); reading a quantile walks the populated buckets, whose
+    number depends on the value range (a few hundred for 0.1ms-100s at 1%),
+    not on the number of samples. Two sketches with the same accuracy merge
+    by adding bucket counts, so per-worker sketches combine exactly.
+
+Time Windows:
+    WindowedSketch keeps, for each window (1m, 5m, 1h by default), a ring of
+    sub-window sketches. Adding a value updates the current slot of each
+    window; reading a window merges its slots. A window therefore covers
+    between its nominal length and one slot more.
+
+Usage:
+    from app.monitoring.sketches import DDSketch, WindowedSketch
+
+    latencies = WindowedSketch()
+    latencies.add(0.042)
+    latencies.quantiles("5m")                # {"p50": ..., "p95": ..., "p99": ...}
+
+    merged = DDSketch.from_dict(worker_a).merge(DDSketch.from_dict(worker_b))
+"""
+
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+# (name, window seconds, slots per window)
+DEFAULT_WINDOWS: Tuple[Tuple[str, float, int], ...] = (
+    ("1m", 60, 6),
+    ("5m", 300, 10),
+    ("1h", 3600, 12),
+)
+
+
+class DDSketch:
+    """
+    Relative-error quantile sketch over positive values
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        min_value: float = 1e-9
+    ):
+        """
+        Initialize sketch
+
+        Args:
+            relative_accuracy: Maximum relative error of quantile estimates
+            min_value: Values at or below this are counted as zero
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """Record one value (negative values are counted as zero)"""
+        if value > self.min_value:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + 1
+        else:
+            self.zero_count += 1
+
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "DDSketch") -> "DDSketch":
+        """
+        Add another sketch's counts into this one
+
+        Args:
+            other: Sketch with the same relative accuracy
+
+        Returns:
+            This sketch
+
+        Raises:
+            ValueError: The sketches use different accuracies
+        """
+        if not math.isclose(other.gamma, self.gamma):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile
+
+        Args:
+            q: Quantile in [0, 1]
+
+        Returns:
+            Estimated value, or None if the sketch is empty
+        """
+        return self.quantiles((q,))[0]
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        """
+        Estimate several quantiles in one pass over the buckets
+
+        Args:
+            qs: Quantiles in [0, 1]
+
+        Returns:
+            Estimates in the order requested (None if the sketch is empty)
+        """
+        qs = list(qs)
+        if self.count == 0:
+            return [None] * len(qs)
+
+        ranks = sorted((q * (self.count - 1), position) for position, q in enumerate(qs))
+        results: List[Optional[float]] = [None] * len(qs)
+        pending = iter(ranks)
+        rank, position = next(pending)
+
+        cumulative = self.zero_count
+        while cumulative > rank:
+            results[position] = 0.0 if self.min > 0 else self.min
+            try:
+                rank, position = next(pending)
+            except StopIteration:
+                return results
+
+        for index in sorted(self.bins):
+            cumulative += self.bins[index]
+            while cumulative > rank:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i], clamped to the observed range
+                estimate = 2 * self.gamma ** index / (1 + self.gamma)
+                results[position] = min(max(estimate, self.min), self.max)
+                try:
+                    rank, position = next(pending)
+                except StopIteration:
+                    return results
+
+        for _, position in [(rank, position), *pending]:
+            results[position] = self.max
+        return results
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def copy(self) -> "DDSketch":
+        """Independent copy of this sketch"""
+        return DDSketch(self.relative_accuracy, self.min_value).merge(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-serialisable form, for shipping to another worker
+
+        Returns:
+            Sketch state
+        """
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "min_value": self.min_value,
+            "bins": {str(index): count for index, count in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DDSketch":
+        """
+        Rebuild a sketch from ``to_dict`` output
+
+        Args:
+            data: Sketch state
+
+        Returns:
+            Sketch
+        """
+        sketch = cls(data["relative_accuracy"], data.get("min_value", 1e-9))
+        sketch.bins = {int(index): count for index, count in data["bins"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+
+def summarize(sketch: DDSketch, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Any]:
+    """
+    Summary statistics of a sketch
+
+    Args:
+        sketch: Sketch to summarise
+        quantiles: Quantiles to report (as pXX keys)
+
+    Returns:
+        count, mean, min, max and the requested quantiles
+    """
+    quantiles = tuple(quantiles)
+    estimates = sketch.quantiles(quantiles)
+    summary = {
+        "count": sketch.count,
+        "mean": sketch.mean,
+        "min": sketch.min if sketch.count else None,
+        "max": sketch.max if sketch.count else None,
+    }
+    for q, estimate in zip(quantiles, estimates):
+        summary[f"p{q * 100:g}"] = estimate
+    return summary
+
+
+class _SlotRing:
+    """
+    Ring of per-slot sketches covering one window
+
+    Completed slots no longer change, so their merge is kept until the
+    current slot rolls over; a read only merges the partial current slot
+    into a copy of it.
+    """
+
+    def __init__(self, window: float, slots: int, relative_accuracy: float):
+        self.window = window
+        self.slot_seconds = window / slots
+        self.relative_accuracy = relative_accuracy
+        # slot number -> sketch; at most slots + 1 kept (the current one is partial)
+        self.slots: Dict[int, DDSketch] = {}
+        self.span = slots
+        self._completed: Optional[DDSketch] = None  # Merge of the slots before _completed_slot
+        self._completed_slot: Optional[int] = None
+
+    def add(self, value: float, now: float) -> None:
+        slot = int(now // self.slot_seconds)
+        sketch = self.slots.get(slot)
+        if sketch is None:
+            sketch = self.slots[slot] = DDSketch(self.relative_accuracy)
+            self._expire(slot)
+        sketch.add(value)
+        if self._completed_slot is not None and slot < self._completed_slot:
+            self._completed = None  # Late value for a slot already merged
+
+    def _expire(self, current: int) -> None:
+        for slot in [slot for slot in self.slots if slot < current - self.span]:
+            del self.slots[slot]
+
+    def merged(self, now: float) -> DDSketch:
+        current = int(now // self.slot_seconds)
+        if self._completed is None or self._completed_slot != current:
+            self._expire(current)
+            completed = DDSketch(self.relative_accuracy)
+            for slot, sketch in self.slots.items():
+                if slot < current:
+                    completed.merge(sketch)
+            self._completed, self._completed_slot = completed, current
+
+        partial = self.slots.get(current)
+        if partial is None:
+            return self._completed
+        return self._completed.copy().merge(partial)
+
+
+class WindowedSketch:
+    """
+    Latency sketches over rotating time windows
+    """
+
+    def __init__(
+        self,
+        windows: Iterable[Tuple[str, float, int]] = DEFAULT_WINDOWS,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        clock=time.monotonic
+    ):
+        """
+        Initialize windowed sketch
+
+        Args:
+            windows: (name, seconds, slots) for each window
+            relative_accuracy: Relative error of the quantile estimates
+            clock: Time source in seconds
+        """
+        self.clock = clock
+        self.rings: Dict[str, _SlotRing] = {
+            name: _SlotRing(seconds, slots, relative_accuracy) for name, seconds, slots in windows
+        }
+        self.total = DDSketch(relative_accuracy)  # Since start, for lifetime counts
+
+    def add(self, value: float) -> None:
+        """Record one value in every window"""
+        now = self.clock()
+        for ring in self.rings.values():
+            ring.add(value, now)
+        self.total.add(value)
+
+    def window(self, name: str) -> DDSketch:
+        """
+        Merged sketch of one window, including values recorded in the
+        current slot
+
+        Args:
+            name: Window name, e.g. "5m"
+
+        Returns:
+            Sketch of the values recorded in that window
+        """
+        return self.rings[name].merged(self.clock())
+
+    def quantiles(self, name: str, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Any]:
+        """
+        Summary of one window
+
+        Args:
+            name: Window name
+            quantiles: Quantiles to report
+
+        Returns:
+            count, mean, min, max and pXX estimates
+        """
+        return summarize(self.window(name), quantiles)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Each window's merged sketch in JSON-serialisable form"""
+        return {name: self.window(name).to_dict() for name in self.rings}
+
+
+def merge_exports(exports: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, DDSketch]:
+    """
+    Merge ``WindowedSketch.to_dict`` exports from several workers
+
+    Args:
+        exports: One export per worker
+
+    Returns:
+        Merged sketch per window name
+    """
+    merged: Dict[str, DDSketch] = {}
+    for export in exports:
+        for name, data in export.items():
+            sketch = DDSketch.from_dict(data)
+            if name in merged:
+                merged[name].merge(sketch)
+            else:
+                merged[name] = sketch
+    return merged
+
+
+__all__ = [
+    'DDSketch',
+    'WindowedSketch',
+    'DEFAULT_WINDOWS',
+    'merge_exports',
+    'summarize',
+]
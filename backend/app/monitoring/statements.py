@@ -0,0 +1,319 @@
+"""
+Statement statistics for aclue performance monitoring
+
+In-process, pg_stat_statements-style aggregation of database calls. Queries
+are normalised into fingerprints with their literals stripped, so
+"... WHERE id = 'p1'" and "... WHERE id = 'p2'" share one entry, and each
+fingerprint keeps calls, total/mean/min/max time and rows.
+
+Bounded Memory:
+    At most ``max_entries`` fingerprints are kept. When a new fingerprint
+    would exceed that, the 5% of entries with the least total time are
+    deallocated in one pass, so the statements that cost the most stay and
+    the sort is amortised over many inserts (the same policy
+    pg_stat_statements applies by call count). Entries created since the
+    previous deallocation are only chosen once older entries run out, so
+    a new statement gets one cycle to accumulate time before it competes.
+
+Usage:
+    from app.monitoring.statements import StatementStats, fingerprint_sql
+
+    statements = StatementStats(max_entries=500)
+    statements.record(fingerprint_sql(sql), duration, rows=rowcount, sample=sql)
+    statements.top(10)                        # Ranked by total time
+"""
+
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+# ==============================================================================
+# FINGERPRINTING
+# ==============================================================================
+
+_SQL_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_SQL_STRINGS = re.compile(r"(?:[EeBbXxNn])?'(?:[^']|'')*'")
+_SQL_NUMBERS = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_SQL_PARAMS = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?")  # Not "::type" casts
+_SQL_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SQL_VALUES = re.compile(r"(VALUES\s*)\((?:\s*\?\s*,?)*\)(?:\s*,\s*\((?:\s*\?\s*,?)*\))*", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+# PostgREST filter operators; a filter value is "[not.]operator.literal"
+_POSTGREST_OPERATORS = {
+    "eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "match", "imatch",
+    "is", "isdistinct", "in", "cs", "cd", "ov", "sl", "sr", "nxl", "nxr", "adj",
+    "fts", "plfts", "phfts", "wfts",
+}
+_POSTGREST_STRUCTURAL = {"select", "order", "columns", "on_conflict"}
+_POSTGREST_PAGING = {"limit", "offset"}
+_POSTGREST_NESTED = re.compile(r"\.((?:not\.)?(\w+))\.(?:\([^)]*\)|[^,()]+)")
+
+
+def fingerprint_sql(query: str) -> str:
+    """
+    Normalise a SQL statement into its fingerprint
+
+    Comments are removed, string and numeric literals and bind parameters
+    become "?", IN lists and multi-row VALUES collapse to a single
+    placeholder and whitespace is collapsed.
+
+    Args:
+        query: SQL text
+
+    Returns:
+        Fingerprint text
+    """
+    normalized = _SQL_COMMENTS.sub(" ", query)
+    normalized = _SQL_STRINGS.sub("?", normalized)
+    normalized = _SQL_PARAMS.sub("?", normalized)
+    normalized = _SQL_NUMBERS.sub("?", normalized)
+    normalized = _SQL_VALUES.sub(r"\1(...)", normalized)
+    normalized = _SQL_LISTS.sub("(...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def _postgrest_filter(value: str) -> str:
+    """Strip the literal from one PostgREST filter value"""
+    if value.startswith("(") and value.endswith(")"):
+        # or=(a.eq.1,b.gt.2) and friends
+        return _POSTGREST_NESTED.sub(
+            lambda match: f".{match.group(1)}.?" if match.group(2) in _POSTGREST_OPERATORS else match.group(0),
+            value
+        )
+
+    parts = value.split(".")
+    kept = []
+    for part in parts:
+        if part in _POSTGREST_OPERATORS or part == "not":
+            kept.append(part)
+            if part != "not":
+                break
+        else:
+            return "?"
+    return ".".join(kept + ["?"])
+
+
+def fingerprint_postgrest(operation: str, target: str, params: Any = None) -> str:
+    """
+    Fingerprint a Supabase/PostgREST call
+
+    Filters keep their column and operator but not their value; select,
+    order and conflict targets are kept as written because they change the
+    plan; limit and offset become "?". Inserts and upserts are keyed by
+    operation and table only.
+
+    Args:
+        operation: select, count, insert, upsert, update, delete or rpc
+        target: Table or RPC name
+        params: Request query string (str or httpx.QueryParams)
+
+    Returns:
+        Fingerprint text
+    """
+    base = f"supabase {operation} {target}"
+    if operation in ("insert", "upsert") or not params:
+        return base
+
+    terms = []
+    for key, value in parse_qsl(str(params), keep_blank_values=True):
+        if key in _POSTGREST_STRUCTURAL:
+            terms.append(f"{key}={value}")
+        elif key in _POSTGREST_PAGING:
+            terms.append(f"{key}=?")
+        else:
+            terms.append(f"{key}={_postgrest_filter(value)}")
+
+    return f"{base} {'&'.join(sorted(terms))}" if terms else base
+
+# ==============================================================================
+# STATEMENT STATISTICS
+# ==============================================================================
+
+class StatementStat:
+    """
+    Aggregated statistics for one fingerprint
+    """
+
+    __slots__ = (
+        "fingerprint", "calls", "total_time", "min_time", "max_time",
+        "rows", "slow_calls", "sample", "first_seen", "last_seen", "generation",
+    )
+
+    def __init__(self, fingerprint: str, sample: Optional[str], now: float, generation: int = 0):
+        self.fingerprint = fingerprint
+        self.generation = generation  # Deallocation cycle the entry was created in
+        self.calls = 0
+        self.total_time = 0.0
+        self.min_time = float("inf")
+        self.max_time = 0.0
+        self.rows = 0
+        self.slow_calls = 0
+        self.sample = sample
+        self.first_seen = now
+        self.last_seen = now
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "calls": self.calls,
+            "total_time": self.total_time,
+            "mean_time": self.mean_time,
+            "min_time": self.min_time if self.calls else None,
+            "max_time": self.max_time,
+            "rows": self.rows,
+            "rows_per_call": self.rows / self.calls if self.calls else 0.0,
+            "slow_calls": self.slow_calls,
+            "sample": self.sample,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+        }
+
+
+class StatementStats:
+    """
+    Bounded per-fingerprint statement statistics
+    """
+
+    SORT_KEYS = ("total_time", "mean_time", "max_time", "calls", "rows")
+    DEALLOC_FRACTION = 0.05
+
+    def __init__(self, max_entries: int = 500, slow_threshold: float = 0.1, sample_length: int = 500):
+        """
+        Initialize statement statistics
+
+        Args:
+            max_entries: Maximum number of fingerprints kept
+            slow_threshold: Calls slower than this (seconds) count as slow
+            sample_length: Characters of the first raw query kept per fingerprint
+        """
+        self.max_entries = max_entries
+        self.slow_threshold = slow_threshold
+        self.sample_length = sample_length
+        self.entries: Dict[str, StatementStat] = {}
+        self.deallocations = 0
+        self.evicted = 0
+        # Observers record from executor threads as well as the event loop
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        fingerprint: str,
+        duration: float,
+        rows: Optional[int] = None,
+        sample: Optional[str] = None
+    ) -> StatementStat:
+        """
+        Add one call to its fingerprint's statistics
+
+        Args:
+            fingerprint: Normalised statement (see fingerprint_sql / fingerprint_postgrest)
+            duration: Call latency in seconds
+            rows: Rows returned or affected, if known
+            sample: Raw query text, kept for the first call only
+
+        Returns:
+            Updated statistics entry
+        """
+        now = time.time()
+        with self._lock:
+            stat = self.entries.get(fingerprint)
+            if stat is None:
+                if len(self.entries) >= self.max_entries:
+                    self._deallocate()
+                stat = self.entries[fingerprint] = StatementStat(
+                    fingerprint, sample[:self.sample_length] if sample else None, now,
+                    generation=self.deallocations
+                )
+
+            stat.calls += 1
+            stat.total_time += duration
+            stat.min_time = min(stat.min_time, duration)
+            stat.max_time = max(stat.max_time, duration)
+            if rows:
+                stat.rows += rows
+            if duration > self.slow_threshold:
+                stat.slow_calls += 1
+            stat.last_seen = now
+            return stat
+
+    def _deallocate(self) -> None:
+        """Drop the least expensive fingerprints, oldest cycles first (caller holds the lock)"""
+        count = max(1, int(self.max_entries * self.DEALLOC_FRACTION))
+        current = self.deallocations
+        victims = sorted(
+            self.entries.values(),
+            key=lambda stat: (stat.generation == current, stat.total_time)
+        )[:count]
+        for stat in victims:
+            del self.entries[stat.fingerprint]
+        self.deallocations += 1
+        self.evicted += len(victims)
+
+    def top(self, limit: int = 10, sort: str = "total_time") -> List[Dict[str, Any]]:
+        """
+        Most expensive fingerprints
+
+        Args:
+            limit: Number of entries returned
+            sort: One of SORT_KEYS
+
+        Returns:
+            Entry dicts, most expensive first
+        """
+        if sort not in self.SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(self.SORT_KEYS)}")
+
+        with self._lock:
+            ranked = sorted(self.entries.values(), key=lambda stat: getattr(stat, sort), reverse=True)
+            return [stat.to_dict() for stat in ranked[:limit]]
+
+    def totals(self) -> Dict[str, Any]:
+        """
+        Aggregate figures across every tracked fingerprint
+
+        Returns:
+            calls, total_time, mean_time, tracked fingerprints and evictions
+        """
+        with self._lock:
+            calls = sum(stat.calls for stat in self.entries.values())
+            total_time = sum(stat.total_time for stat in self.entries.values())
+            return {
+                "calls": calls,
+                "total_time": total_time,
+                "mean_time": total_time / calls if calls else 0.0,
+                "tracked": len(self.entries),
+                "max_entries": self.max_entries,
+                "evicted": self.evicted,
+                "deallocations": self.deallocations,
+            }
+
+    def reset(self) -> None:
+        """Discard all statistics"""
+        with self._lock:
+            self.entries.clear()
+            self.deallocations = 0
+            self.evicted = 0
+
+    def get(self, fingerprint: str) -> Optional[StatementStat]:
+        return self.entries.get(fingerprint)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+__all__ = [
+    'StatementStat',
+    'StatementStats',
+    'fingerprint_postgrest',
+    'fingerprint_sql',
+]
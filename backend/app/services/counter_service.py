@@ -0,0 +1,307 @@
+"""
+aclue Counter Service - Coalescing Counter Aggregator
+
+Accumulates hot counter increments in memory and applies them in batches.
+
+Problem Addressed:
+Engagement counters were written one request at a time: an RPC per swipe
+for ``swipe_sessions.total_swipes``, a read-then-write per affiliate click
+for ``session_analytics.affiliate_clicks`` (which also loses updates under
+concurrency) and an ORM commit per product view or click. Counter writes
+therefore scaled linearly with request rate.
+
+Aggregation Model:
+- ``incr()`` adds a delta to an in-memory map keyed by (table, row, column);
+  it is synchronous, O(1) and never touches the network
+- A background task flushes the map every ``flush_interval`` seconds as a
+  single ``apply_counter_deltas`` RPC, applied atomically in one transaction
+- Failed flushes are merged back and retried on the next tick
+- Deltas are reported as lost only when they cannot be retried (key limit
+  reached, failure during shutdown, or target row missing)
+
+Supported Counters:
+Only the (table, column) pairs in ``COUNTER_TARGETS`` are accepted; the
+database function enforces the same whitelist.
+
+Usage:
+    from app.services.counter_service import counter_aggregator
+
+    counter_aggregator.incr("products", product_id, "view_count")
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import structlog
+
+from app.monitoring.metrics import (
+    counter_flush_duration_seconds,
+    counter_increments_flushed_total,
+    counter_lost_updates_total,
+    counter_pending_keys,
+)
+
+logger = structlog.get_logger(__name__)
+
+# (table, column) pairs that may be incremented; mirrors apply_counter_deltas
+COUNTER_TARGETS = {
+    ("swipe_sessions", "total_swipes"),
+    ("session_analytics", "affiliate_clicks"),
+    ("products", "view_count"),
+    ("products", "click_count"),
+    ("gift_links", "view_count"),
+    ("gift_links", "click_count"),
+}
+
+CounterKey = Tuple[str, str, str]
+
+
+async def apply_counter_deltas_rpc(deltas: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply counter deltas through the ``apply_counter_deltas`` database function.
+
+    Args:
+        deltas: List of {"table", "key", "column", "delta"} dicts
+
+    Returns:
+        Dict with ``applied`` and ``unmatched`` delta counts
+    """
+    from app.core.supabase_executor import get_supabase_executor
+    from app.database import get_supabase_service
+
+    client = get_supabase_service()
+    response = await get_supabase_executor().execute(
+        client.rpc("apply_counter_deltas", {"deltas": deltas}), "rpc"
+    )
+
+    result = response.data
+    if isinstance(result, list):
+        result = result[0] if result else {}
+    return result or {}
+
+
+class CounterAggregator:
+    """
+    In-process coalescing aggregator for hot database counters.
+
+    N increments of the same counter between flushes become one delta, and
+    all deltas of a flush are sent in one round trip.
+    """
+
+    def __init__(
+        self,
+        flusher: Callable[[List[Dict[str, Any]]], Awaitable[Dict[str, Any]]] = apply_counter_deltas_rpc,
+        flush_interval: float = 1.0,
+        max_keys: int = 50000
+    ):
+        """
+        Initialise aggregator.
+
+        Args:
+            flusher: Coroutine applying a list of deltas atomically
+            flush_interval: Seconds between flushes
+            max_keys: Maximum distinct pending counters held in memory
+        """
+        self.flusher = flusher
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys
+
+        self._pending: Dict[CounterKey, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+        self.stats = {
+            "increments": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "flushed_deltas": 0,
+            "flushed_increments": 0,
+            "unmatched": 0,
+            "lost_updates": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0
+        }
+
+    @property
+    def running(self) -> bool:
+        """Whether the background flush task is active."""
+        return self._task is not None and not self._stop_event.is_set()
+
+    def incr(self, table: str, key: Any, column: str, delta: int = 1) -> None:
+        """
+        Add a delta to a counter.
+
+        Args:
+            table: Counter table (see COUNTER_TARGETS)
+            key: Row identifier (primary key, or session_id for session_analytics)
+            column: Counter column
+            delta: Amount to add
+
+        Raises:
+            ValueError: If the (table, column) pair is not a supported counter
+        """
+        if (table, column) not in COUNTER_TARGETS:
+            raise ValueError(f"Unsupported counter: {table}.{column}")
+
+        counter_key = (table, str(key), column)
+        pending = self._pending.get(counter_key)
+        if pending is None:
+            if len(self._pending) >= self.max_keys:
+                self._record_lost(delta, "overflow")
+                return
+            self._pending[counter_key] = delta
+            counter_pending_keys.set(len(self._pending))  # Only new keys change the count
+        else:
+            self._pending[counter_key] = pending + delta
+        self.stats["increments"] += 1
+
+    async def start(self) -> None:
+        """Start the periodic flush task."""
+        if self._task is not None:
+            return
+
+        self._stop_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run(), name="counter-aggregator")
+        logger.info(
+            "Counter aggregator started",
+            flush_interval=self.flush_interval,
+            max_keys=self.max_keys
+        )
+
+    async def stop(self) -> None:
+        """Stop the flush task and apply everything still pending."""
+        if self._task is None:
+            return
+
+        self._stop_event.set()
+        await self._task
+        self._task = None
+
+        # Final flush; anything that still fails cannot be retried
+        if not await self.flush() and self._pending:
+            lost = sum(self._pending.values())
+            self._pending.clear()
+            counter_pending_keys.set(0)
+            self._record_lost(lost, "shutdown")
+
+        logger.info("Counter aggregator stopped", **self.get_stats())
+
+    async def _run(self) -> None:
+        """Flush every ``flush_interval`` seconds until stopped."""
+        while not self._stop_event.is_set():
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            if not self._stop_event.is_set():
+                await self.flush()
+
+    async def flush(self) -> bool:
+        """
+        Apply all pending deltas in one batch.
+
+        Returns:
+            bool: False if the batch failed and was queued for retry
+        """
+        if not self._pending:
+            return True
+
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            batch, self._pending = self._pending, {}
+            counter_pending_keys.set(0)
+
+            deltas = [
+                {"table": table, "key": key, "column": column, "delta": delta}
+                for (table, key, column), delta in batch.items()
+                if delta
+            ]
+            if not deltas:
+                return True
+
+            start = time.perf_counter()
+            try:
+                result = await self.flusher(deltas)
+            except Exception as e:
+                self.stats["failed_flushes"] += 1
+                self._requeue(batch)
+                logger.warning(
+                    "Counter flush failed - deltas queued for retry",
+                    deltas=len(deltas),
+                    error=str(e)
+                )
+                return False
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            counter_flush_duration_seconds.observe(elapsed_ms / 1000)
+
+            increments = sum(item["delta"] for item in deltas)
+            self.stats["flushes"] += 1
+            self.stats["flushed_deltas"] += len(deltas)
+            self.stats["flushed_increments"] += increments
+            self.stats["last_flush_ms"] = elapsed_ms
+            self.stats["total_flush_ms"] += elapsed_ms
+            self.stats["max_flush_ms"] = max(self.stats["max_flush_ms"], elapsed_ms)
+
+            for item in deltas:
+                counter_increments_flushed_total.labels(
+                    table=item["table"], column=item["column"]
+                ).inc(item["delta"])
+
+            unmatched = int((result or {}).get("unmatched", 0))
+            if unmatched:
+                self.stats["unmatched"] += unmatched
+                self._record_lost(unmatched, "unmatched")
+
+            return True
+
+    def _requeue(self, batch: Dict[CounterKey, int]) -> None:
+        """Merge a failed batch back into pending deltas, respecting max_keys."""
+        for counter_key, delta in batch.items():
+            if counter_key in self._pending or len(self._pending) < self.max_keys:
+                self._pending[counter_key] = self._pending.get(counter_key, 0) + delta
+            else:
+                self._record_lost(delta, "overflow")
+        counter_pending_keys.set(len(self._pending))
+
+    def _record_lost(self, amount: int, reason: str) -> None:
+        """Count increments that will never be applied."""
+        self.stats["lost_updates"] += amount
+        counter_lost_updates_total.labels(reason=reason).inc(amount)
+        logger.warning("Counter updates lost", amount=amount, reason=reason)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get aggregator statistics.
+
+        Returns:
+            Flush counts, flush latency (last/avg/max ms), coalescing ratio
+            and lost-update totals
+        """
+        flushes = self.stats["flushes"]
+        return {
+            **self.stats,
+            "pending_keys": len(self._pending),
+            "avg_flush_ms": self.stats["total_flush_ms"] / flushes if flushes else 0.0,
+            "coalescing_ratio": (
+                self.stats["flushed_increments"] / self.stats["flushed_deltas"]
+                if self.stats["flushed_deltas"] else 0.0
+            ),
+            "running": self.running
+        }
+
+
+# Global counter aggregator instance
+counter_aggregator = CounterAggregator()
+
+
+__all__ = [
+    'CounterAggregator',
+    'counter_aggregator',
+    'apply_counter_deltas_rpc',
+    'COUNTER_TARGETS'
+]
@@ -51,15 +51,23 @@ Usage Examples:
 # IMPORTS AND DEPENDENCIES
 # ==============================================================================
 
+import asyncio
 import logging
+import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union, Tuple
+from typing import Dict, List, Optional, Any, Union, Tuple, Set, AsyncIterable, AsyncIterator
 from decimal import Decimal
 import structlog
 
 from supabase import Client
+from app.core.config import settings
 from app.database import get_supabase_service, get_supabase_anon
+from app.core.supabase_executor import get_supabase_executor
+from app.services.swipe_ingestion import SwipeWriteBehindBuffer, SwipeBufferFullError
+from app.services.counter_service import counter_aggregator
+from app.services.preference_scoring import rank_products
+from app.core.caching import LRUCache, CacheConfig, CacheInvalidator, cache_manager
 from app.models import (
     User, Product, SwipeInteraction, Recommendation, 
     SwipeSession, GiftLink, ProductCreate
@@ -68,6 +76,11 @@ from app.models import (
 # Configure structured logging
 logger = structlog.get_logger(__name__)
 
+# Shared cache keys for catalog reads (kept warm by the warmers registered below)
+TRENDING_PRODUCTS_CACHE_KEY = f"{CacheConfig.SEARCH_PREFIX}trending"
+FEATURED_PRODUCTS_CACHE_KEY = f"{CacheConfig.SEARCH_PREFIX}featured"
+CATEGORY_TREE_CACHE_KEY = "category:tree"
+
 # ==============================================================================
 # EXCEPTION CLASSES
 # ==============================================================================
@@ -113,7 +126,9 @@ class DatabaseService:
     
     Performance Optimisations:
     - Connection pooling through Supabase client
+    - Non-blocking query execution on a bounded, per-table limited executor
     - Query batching for bulk operations
+    - Optional write-behind swipe ingestion with multi-row inserts
     - Efficient JSONB operations for flexible data
     - Proper use of database indexes
     - Pagination for large result sets
@@ -135,6 +150,22 @@ class DatabaseService:
         """
         self._service_client: Optional[Client] = None
         self._anon_client: Optional[Client] = None
+        self._swipe_buffer: Optional[SwipeWriteBehindBuffer] = None
+        self._reconciling_users: Set[str] = set()
+        self._reconcile_tasks: Set[asyncio.Task] = set()
+        self._reconcile_loop_task: Optional[asyncio.Task] = None
+        self._performance_metrics_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._performance_metrics_lock = asyncio.Lock()
+        self._product_cache = LRUCache(
+            max_size=settings.PRODUCT_METADATA_CACHE_SIZE,
+            ttl=settings.PRODUCT_METADATA_CACHE_TTL_SECONDS
+        )
+        self._missing_product_cache = LRUCache(
+            max_size=settings.PRODUCT_METADATA_CACHE_SIZE,
+            ttl=settings.PRODUCT_METADATA_NEGATIVE_TTL_SECONDS
+        )
+        self._product_cache_generation = 0
+        self._product_cache_invalidations = 0
         self.logger = logger.bind(service="database_service")
     
     def _get_service_client(self) -> Client:
@@ -176,6 +207,25 @@ class DatabaseService:
             self._anon_client = get_supabase_anon()
         return self._anon_client
     
+    async def _execute(self, query: Any, table: str) -> Any:
+        """
+        Execute a Supabase query without blocking the event loop.
+        
+        Execution Model:
+        supabase-py's ``execute()`` is synchronous and would otherwise hold
+        the event loop for a full PostgREST round trip. Queries are handed to
+        the shared Supabase executor, which runs them on a bounded thread pool
+        under a per-table in-flight limit.
+        
+        Args:
+            query: supabase-py query or RPC builder
+            table: Table (or RPC) name used for concurrency limiting
+            
+        Returns:
+            The supabase-py API response
+        """
+        return await get_supabase_executor().execute(query, table)
+    
     # ==========================================================================
     # USER OPERATIONS
     # ==========================================================================
@@ -214,7 +264,9 @@ class DatabaseService:
             )
             
             # First, try to get user from profiles table (preferred approach)
-            profiles_response = client.table("profiles").select("*").eq("id", user_id).execute()
+            profiles_response = await self._execute(
+                client.table("profiles").select("*").eq("id", user_id), "profiles"
+            )
             
             if profiles_response.data and len(profiles_response.data) > 0:
                 # Profile exists - return complete user data
@@ -224,7 +276,9 @@ class DatabaseService:
             
             # Fallback: Get user from auth.users with metadata (current workaround)
             # Reference: Authentication workaround documented in database audit
-            auth_response = client.auth.admin.get_user_by_id(user_id)
+            auth_response = await get_supabase_executor().run(
+                client.auth.admin.get_user_by_id, user_id, table="auth.users"
+            )
             
             if auth_response.user:
                 # Convert auth user to standardised format
@@ -267,7 +321,8 @@ class DatabaseService:
         direction: str = "right",
         time_spent_seconds: Optional[int] = None,
         interaction_context: Optional[Dict[str, Any]] = None,
-        preference_strength: float = 0.5
+        preference_strength: float = 0.5,
+        interaction_id: Optional[str] = None
     ) -> str:
         """
         Record a swipe interaction in the database.
@@ -295,6 +350,7 @@ class DatabaseService:
             time_spent_seconds: Time user spent viewing before swiping
             interaction_context: Additional context data (viewport, position, etc.)
             preference_strength: Calculated preference strength (0.0-1.0)
+            interaction_id: Client-generated UUID (generated if omitted)
             
         Returns:
             str: UUID of created swipe interaction record
@@ -319,37 +375,23 @@ class DatabaseService:
             )
         """
         try:
-            # Validation: Ensure required fields are provided
-            # Business Rule: Must have either product_id or category_id for meaningful preference signal
-            if not product_id and not category_id:
-                raise ValidationError("Must specify either product_id or category_id for swipe interaction")
-            
-            # Validation: Check direction is valid
-            valid_directions = ["left", "right", "up", "down"]
-            if direction not in valid_directions:
-                raise ValidationError(f"Invalid swipe direction: {direction}. Must be one of {valid_directions}")
-            
-            # Validation: Preference strength must be between 0.0 and 1.0
-            if not 0.0 <= preference_strength <= 1.0:
-                raise ValidationError(f"Preference strength must be between 0.0 and 1.0, got: {preference_strength}")
-            
-            # Prepare interaction data following database schema
-            interaction_data = {
-                "id": str(uuid.uuid4()),  # Generate UUID for primary key
-                "session_id": session_id,
-                "user_id": user_id,
-                "product_id": product_id,
-                "category_id": category_id,
-                "swipe_direction": direction,
-                "swipe_timestamp": datetime.utcnow().isoformat(),
-                "time_spent_seconds": time_spent_seconds,
-                "interaction_context": interaction_context or {},
-                "preference_strength": preference_strength
-            }
+            interaction_data = self._build_swipe_record(
+                user_id=user_id,
+                session_id=session_id,
+                product_id=product_id,
+                category_id=category_id,
+                direction=direction,
+                time_spent_seconds=time_spent_seconds,
+                interaction_context=interaction_context,
+                preference_strength=preference_strength,
+                interaction_id=interaction_id
+            )
             
             # Record interaction using service client (bypasses RLS for recording)
             client = self._get_service_client()
-            response = client.table("swipe_interactions").insert(interaction_data).execute()
+            response = await self._execute(
+                client.table("swipe_interactions").insert(interaction_data), "swipe_interactions"
+            )
             
             if not response.data:
                 raise DatabaseServiceError("Failed to record swipe interaction - no data returned")
@@ -401,13 +443,23 @@ class DatabaseService:
         UPDATE swipe_sessions SET total_swipes = total_swipes + 1 
         WHERE id = session_id
         
+        When the counter aggregator is running the increment is coalesced in
+        memory and applied with the next batched flush instead.
+        
         Args:
             session_id: UUID of the swipe session
             client: Supabase client for database access
         """
+        if counter_aggregator.running:
+            counter_aggregator.incr("swipe_sessions", session_id, "total_swipes")
+            return
+        
         try:
             # Use raw SQL for atomic increment to avoid race conditions
-            client.rpc("increment_session_swipes", {"session_id_param": session_id}).execute()
+            await self._execute(
+                client.rpc("increment_session_swipes", {"session_id_param": session_id}),
+                "swipe_sessions"
+            )
             
         except Exception as e:
             # Log error but don't fail the main operation
@@ -417,6 +469,231 @@ class DatabaseService:
                 error=str(e)
             )
     
+    def _build_swipe_record(
+        self,
+        user_id: str,
+        session_id: str,
+        product_id: Optional[str],
+        category_id: Optional[str],
+        direction: str,
+        time_spent_seconds: Optional[int],
+        interaction_context: Optional[Dict[str, Any]],
+        preference_strength: float,
+        interaction_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Validate swipe input and build the swipe_interactions row.
+        
+        Shared by the synchronous and write-behind recording paths so both
+        enforce the same business rules and produce identical rows.
+        
+        Returns:
+            Dict ready for insertion into swipe_interactions
+            
+        Raises:
+            ValidationError: If required data is missing or invalid
+        """
+        # Validation: Ensure required fields are provided
+        # Business Rule: Must have either product_id or category_id for meaningful preference signal
+        if not product_id and not category_id:
+            raise ValidationError("Must specify either product_id or category_id for swipe interaction")
+        
+        # Validation: Check direction is valid
+        valid_directions = ["left", "right", "up", "down"]
+        if direction not in valid_directions:
+            raise ValidationError(f"Invalid swipe direction: {direction}. Must be one of {valid_directions}")
+        
+        # Validation: Preference strength must be between 0.0 and 1.0
+        if not 0.0 <= preference_strength <= 1.0:
+            raise ValidationError(f"Preference strength must be between 0.0 and 1.0, got: {preference_strength}")
+        
+        # Validation: Client-generated IDs double as idempotency keys
+        if interaction_id is not None:
+            try:
+                interaction_id = str(uuid.UUID(str(interaction_id)))
+            except ValueError:
+                raise ValidationError(f"Invalid interaction id: {interaction_id}. Must be a UUID")
+        
+        # Prepare interaction data following database schema
+        return {
+            "id": interaction_id or str(uuid.uuid4()),  # Generate UUID for primary key
+            "session_id": session_id,
+            "user_id": user_id,
+            "product_id": product_id,
+            "category_id": category_id,
+            "swipe_direction": direction,
+            "swipe_timestamp": datetime.utcnow().isoformat(),
+            "time_spent_seconds": time_spent_seconds,
+            "interaction_context": interaction_context or {},
+            "preference_strength": preference_strength
+        }
+    
+    # ==========================================================================
+    # WRITE-BEHIND SWIPE INGESTION
+    # ==========================================================================
+    
+    def get_swipe_buffer(self) -> SwipeWriteBehindBuffer:
+        """
+        Get or create the write-behind swipe buffer.
+        
+        The buffer is configured from the SWIPE_* settings and writes
+        through ``_write_swipe_batch``.
+        """
+        if self._swipe_buffer is None:
+            self._swipe_buffer = SwipeWriteBehindBuffer(
+                writer=self._write_swipe_batch,
+                flush_size=settings.SWIPE_FLUSH_BATCH_SIZE,
+                flush_interval=settings.SWIPE_FLUSH_INTERVAL_SECONDS,
+                max_pending=settings.SWIPE_BUFFER_MAX_PENDING,
+                enqueue_timeout=settings.SWIPE_ENQUEUE_TIMEOUT_SECONDS,
+                spill_dir=settings.SWIPE_SPILL_DIR
+            )
+        return self._swipe_buffer
+    
+    async def start_swipe_ingestion(self) -> None:
+        """Start the write-behind buffer if SWIPE_WRITE_BEHIND_ENABLED is set."""
+        if settings.SWIPE_WRITE_BEHIND_ENABLED:
+            await self.get_swipe_buffer().start()
+    
+    async def stop_swipe_ingestion(self) -> None:
+        """Drain and stop the write-behind buffer (no-op if never started)."""
+        if self._swipe_buffer is not None:
+            await self._swipe_buffer.stop()
+    
+    async def enqueue_swipe_interaction(
+        self,
+        user_id: str,
+        session_id: str,
+        product_id: Optional[str] = None,
+        category_id: Optional[str] = None,
+        direction: str = "right",
+        time_spent_seconds: Optional[int] = None,
+        interaction_context: Optional[Dict[str, Any]] = None,
+        preference_strength: float = 0.5,
+        interaction_id: Optional[str] = None
+    ) -> Tuple[str, bool]:
+        """
+        Accept a swipe for write-behind persistence.
+        
+        Ingestion Model:
+        The swipe is validated and buffered, and the caller is acknowledged
+        before any database round trip. The buffer flushes batches with a
+        single multi-row insert and one session counter update per session.
+        
+        Fallback Behaviour:
+        When write-behind is disabled, or the buffer stays full for longer
+        than SWIPE_ENQUEUE_TIMEOUT_SECONDS, the swipe is written synchronously
+        via ``record_swipe_interaction``. A saturated buffer therefore slows
+        producers down rather than growing without bound.
+        
+        Args:
+            Same as ``record_swipe_interaction``
+            
+        Returns:
+            Tuple of (interaction UUID, whether the swipe was queued)
+            
+        Raises:
+            ValidationError: If required data is missing or invalid
+            DatabaseServiceError: If the synchronous fallback fails
+        """
+        record = self._build_swipe_record(
+            user_id=user_id,
+            session_id=session_id,
+            product_id=product_id,
+            category_id=category_id,
+            direction=direction,
+            time_spent_seconds=time_spent_seconds,
+            interaction_context=interaction_context,
+            preference_strength=preference_strength,
+            interaction_id=interaction_id
+        )
+        
+        buffer = self._swipe_buffer
+        if buffer is not None and buffer.running:
+            try:
+                await buffer.enqueue(record)
+                return record["id"], True
+            except SwipeBufferFullError as e:
+                self.logger.warning(
+                    "Swipe buffer unavailable - writing synchronously",
+                    interaction_id=record["id"],
+                    error=str(e)
+                )
+        
+        recorded_id = await self.record_swipe_interaction(
+            user_id=user_id,
+            session_id=session_id,
+            product_id=product_id,
+            category_id=category_id,
+            direction=direction,
+            time_spent_seconds=time_spent_seconds,
+            interaction_context=interaction_context,
+            preference_strength=preference_strength,
+            interaction_id=record["id"]
+        )
+        return recorded_id, False
+    
+    async def _write_swipe_batch(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Persist a batch of buffered swipes.
+        
+        Performance Implementation:
+        One multi-row upsert replaces N single-row inserts, and session swipe
+        counts are aggregated per session so each session costs one
+        ``increment_session_swipes_by`` RPC per batch instead of one per swipe.
+        
+        Idempotency:
+        Rows are upserted on ``id`` ignoring duplicates, so replaying a spilled
+        batch never creates duplicate swipes. Only rows actually inserted are
+        returned by PostgREST, and only those are counted towards sessions.
+        
+        Args:
+            records: swipe_interactions rows built by ``_build_swipe_record``
+            
+        Raises:
+            Exception: Propagated so the buffer can spill the batch
+        """
+        client = self._get_service_client()
+        response = await self._execute(
+            client.table("swipe_interactions").upsert(
+                records, on_conflict="id", ignore_duplicates=True
+            ),
+            "swipe_interactions"
+        )
+        
+        session_counts: Dict[str, int] = {}
+        for row in response.data or []:
+            if row.get("session_id"):
+                session_counts[row["session_id"]] = session_counts.get(row["session_id"], 0) + 1
+        
+        for session_id, count in session_counts.items():
+            if counter_aggregator.running:
+                counter_aggregator.incr("swipe_sessions", session_id, "total_swipes", count)
+                continue
+            try:
+                await self._execute(
+                    client.rpc(
+                        "increment_session_swipes_by",
+                        {"session_id_param": session_id, "increment_param": count}
+                    ),
+                    "swipe_sessions"
+                )
+            except Exception as e:
+                # Counter drift is tolerable; the swipes themselves are stored
+                self.logger.warning(
+                    "Failed to increment session swipe count",
+                    session_id=session_id,
+                    increment=count,
+                    error=str(e)
+                )
+        
+        self.logger.info(
+            "Swipe batch flushed",
+            batch_size=len(records),
+            inserted=len(response.data or []),
+            sessions=len(session_counts)
+        )
+    
     # ==========================================================================
     # USER PREFERENCES OPERATIONS  
     # ==========================================================================
@@ -459,17 +736,17 @@ class DatabaseService:
             DatabaseServiceError: If database operation fails
         """
         try:
-            client = self._get_service_client()
-            
-            response = client.table("user_preferences").select("*").eq("user_id", user_id).execute()
+            # Optionally served from the shared cache (preloaded for active users)
+            if settings.USER_PREFERENCES_CACHE_TTL_SECONDS > 0:
+                preferences = await cache_manager.get_or_set(
+                    self._preferences_cache_key(user_id),
+                    lambda: self._load_user_preferences(user_id),
+                    settings.USER_PREFERENCES_CACHE_TTL_SECONDS
+                )
+            else:
+                preferences = await self._load_user_preferences(user_id)
             
-            if response.data and len(response.data) > 0:
-                preferences = response.data[0]
-                
-                # Convert timestamps to strings for JSON serialisation
-                if preferences.get("last_calculated"):
-                    preferences["last_calculated"] = preferences["last_calculated"]
-                
+            if preferences:
                 self.logger.debug("User preferences retrieved", user_id=user_id)
                 return preferences
             
@@ -486,14 +763,28 @@ class DatabaseService:
             )
             raise DatabaseServiceError(f"Failed to retrieve user preferences: {str(e)}")
     
+    async def _load_user_preferences(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a user's stored preferences row (None if never calculated)."""
+        client = self._get_service_client()
+        
+        response = await self._execute(
+            client.table("user_preferences").select("*").eq("user_id", user_id), "user_preferences"
+        )
+        
+        return response.data[0] if response.data else None
+    
+    @staticmethod
+    def _preferences_cache_key(user_id: str) -> str:
+        """Cache key for a user's stored preferences (tagged with the user)."""
+        return f"{CacheConfig.USER_PREFIX}{user_id}:preferences"
+    
     async def calculate_user_preferences(self, user_id: str) -> Dict[str, Any]:
         """
-        Calculate user preferences from swipe interaction data.
+        Recalculate user preferences from the user's full swipe history.
         
         ML Algorithm Implementation:
-        This method implements the preference calculation logic that was
-        identified as missing in the database audit. It analyses historical
-        swipe data to generate preference profiles for recommendation algorithms.
+        Analyses historical swipe data to generate the preference profile
+        used by the recommendation algorithms.
         
         Calculation Logic:
         1. Aggregate swipe interactions by direction (like/dislike signals)
@@ -503,16 +794,22 @@ class DatabaseService:
         5. Calculate engagement metrics and confidence scores
         
         Performance Considerations:
-        - Uses efficient JSONB aggregation queries
-        - Limits analysis to recent interactions (last 1000 swipes)
-        - Caches results in user_preferences table
-        - Updates incrementally rather than full recalculation
+        - Runs entirely in the reconcile_user_preferences database function:
+          one round trip, aggregates computed next to the data
+        - Between calculations, each new swipe updates the stored counters in
+          O(1) via the apply_swipe_to_preferences trigger; this method is the
+          periodic full reconcile that corrects any drift
+        - Aggregates all of the user's swipes, the same population the
+          trigger counts, so a reconcile never truncates the running counters
+        - The function holds the user_preferences row lock the trigger takes,
+          so swipes recorded during a reconcile are neither lost nor counted
+          twice
         
         Args:
             user_id: UUID of the user to calculate preferences for
             
         Returns:
-            Dict containing calculated preferences
+            Dict containing the stored preferences row
             
         Raises:
             UserNotFoundError: If user doesn't exist
@@ -526,178 +823,24 @@ class DatabaseService:
             if not user_data:
                 raise UserNotFoundError(f"User {user_id} not found")
             
-            # Get user's swipe interaction history (last 1000 interactions)
-            # Performance Note: Limit to recent interactions for relevancy and speed
-            interactions_response = client.table("swipe_interactions").select("""
-                swipe_direction,
-                product_id,
-                category_id,
-                preference_strength,
-                swipe_timestamp,
-                time_spent_seconds,
-                products!inner(
-                    title,
-                    price_min,
-                    price_max,
-                    currency,
-                    brand,
-                    category_id,
-                    categories!inner(name, slug)
-                )
-            """).eq("user_id", user_id).order("swipe_timestamp", desc=True).limit(1000).execute()
-            
-            if not interactions_response.data:
-                # No swipe data - return default preferences
-                default_preferences = {
-                    "user_id": user_id,
-                    "category_preferences": {},
-                    "category_confidence": {},
-                    "price_range": {"min": 0, "max": 1000, "currency": "GBP"},
-                    "liked_brands": [],
-                    "disliked_brands": [],
-                    "brand_scores": {},
-                    "style_scores": {},
-                    "total_swipes": 0,
-                    "right_swipes": 0,
-                    "left_swipes": 0,
-                    "super_likes": 0,
-                    "engagement_rate": 0.0,
-                    "ml_features": {},
-                    "last_calculated": datetime.utcnow().isoformat(),
-                    "calculation_version": "v2.0",
-                    "data_quality_score": 0.0
-                }
-                
-                # Store default preferences
-                await self._store_user_preferences(user_id, default_preferences, client)
-                return default_preferences
-            
-            # Analyse swipe interactions
-            interactions = interactions_response.data
-            category_stats = {}
-            brand_stats = {}
-            price_data = []
-            
-            total_swipes = len(interactions)
-            right_swipes = 0
-            left_swipes = 0
-            super_likes = 0
-            
-            # Process each interaction
-            for interaction in interactions:
-                direction = interaction["swipe_direction"]
-                product = interaction.get("products")
-                
-                # Count swipe directions
-                if direction == "right":
-                    right_swipes += 1
-                elif direction == "left":
-                    left_swipes += 1
-                elif direction == "up":
-                    super_likes += 1
-                
-                # Process product data if available
-                if product:
-                    category_name = product.get("categories", {}).get("name", "Unknown")
-                    brand = product.get("brand")
-                    price_min = product.get("price_min")
-                    
-                    # Track category preferences
-                    if category_name not in category_stats:
-                        category_stats[category_name] = {"likes": 0, "total": 0}
-                    
-                    category_stats[category_name]["total"] += 1
-                    if direction in ["right", "up"]:  # Positive signals
-                        category_stats[category_name]["likes"] += 1
-                    
-                    # Track brand preferences  
-                    if brand:
-                        if brand not in brand_stats:
-                            brand_stats[brand] = {"likes": 0, "total": 0}
-                        
-                        brand_stats[brand]["total"] += 1
-                        if direction in ["right", "up"]:
-                            brand_stats[brand]["likes"] += 1
-                    
-                    # Collect price data from liked products
-                    if direction in ["right", "up"] and price_min and price_min > 0:
-                        price_data.append(price_min)
-            
-            # Calculate category preferences
-            category_preferences = {}
-            category_confidence = {}
-            for category, stats in category_stats.items():
-                if stats["total"] > 0:
-                    preference_score = stats["likes"] / stats["total"]
-                    confidence = min(1.0, stats["total"] / 10.0)  # More interactions = higher confidence
-                    
-                    category_preferences[category] = round(preference_score, 3)
-                    category_confidence[category] = round(confidence, 3)
-            
-            # Calculate brand scores
-            brand_scores = {}
-            liked_brands = []
-            disliked_brands = []
-            
-            for brand, stats in brand_stats.items():
-                if stats["total"] >= 3:  # Minimum interactions for reliability
-                    score = stats["likes"] / stats["total"]
-                    brand_scores[brand] = round(score, 3)
-                    
-                    if score >= 0.7:
-                        liked_brands.append(brand)
-                    elif score <= 0.3:
-                        disliked_brands.append(brand)
-            
-            # Calculate price preferences
-            price_range = {"min": 0, "max": 1000, "currency": "GBP"}
-            if price_data:
-                price_range["min"] = max(0, int(min(price_data) * 0.8))  # 20% below minimum
-                price_range["max"] = int(max(price_data) * 1.2)  # 20% above maximum
-                price_range["avg"] = int(sum(price_data) / len(price_data))
-            
-            # Calculate engagement rate
-            engagement_rate = (right_swipes + super_likes) / total_swipes if total_swipes > 0 else 0.0
-            
-            # Calculate data quality score
-            data_quality_score = min(1.0, total_swipes / 50.0)  # Higher with more data
-            
-            # Prepare preference data
-            preferences = {
-                "user_id": user_id,
-                "category_preferences": category_preferences,
-                "category_confidence": category_confidence,
-                "price_range": price_range,
-                "liked_brands": liked_brands[:10],  # Top 10
-                "disliked_brands": disliked_brands[:5],  # Top 5
-                "brand_scores": brand_scores,
-                "style_scores": {},  # TODO: Implement style analysis
-                "total_swipes": total_swipes,
-                "right_swipes": right_swipes,
-                "left_swipes": left_swipes,
-                "super_likes": super_likes,
-                "engagement_rate": round(engagement_rate, 3),
-                "ml_features": {
-                    "diversity_score": len(category_preferences),
-                    "price_flexibility": (price_range["max"] - price_range["min"]) / price_range["avg"] if price_data else 1.0,
-                    "brand_loyalty": len(liked_brands) / max(1, len(brand_scores))
-                },
-                "last_calculated": datetime.utcnow().isoformat(),
-                "calculation_version": "v2.0",
-                "data_quality_score": round(data_quality_score, 2)
-            }
+            response = await self._execute(
+                client.rpc("reconcile_user_preferences", {"user_id_param": user_id}), "rpc"
+            )
+            preferences = response.data
+            if not preferences:
+                raise DatabaseServiceError("Preference reconcile returned no row")
             
-            # Store calculated preferences
-            await self._store_user_preferences(user_id, preferences, client)
+            if settings.USER_PREFERENCES_CACHE_TTL_SECONDS > 0:
+                await cache_manager.delete(self._preferences_cache_key(user_id))
             
             # Audit Log: Record preference calculation
             self.logger.info(
                 "User preferences calculated",
                 user_id=user_id,
-                total_swipes=total_swipes,
-                engagement_rate=engagement_rate,
-                categories_count=len(category_preferences),
-                data_quality_score=data_quality_score
+                total_swipes=preferences.get("total_swipes"),
+                engagement_rate=preferences.get("engagement_rate"),
+                categories_count=len(preferences.get("category_preferences") or {}),
+                data_quality_score=preferences.get("data_quality_score")
             )
             
             return preferences
@@ -713,36 +856,158 @@ class DatabaseService:
             )
             raise DatabaseServiceError(f"Failed to calculate user preferences: {str(e)}")
     
-    async def _store_user_preferences(self, user_id: str, preferences: Dict[str, Any], client: Client):
+    async def get_current_user_preferences(self, user_id: str) -> Dict[str, Any]:
         """
-        Store calculated user preferences in the database.
+        Get preferences for recommendation generation without a full recompute.
         
-        Database Operation:
-        Uses UPSERT operation to either insert new preferences or update existing ones.
-        This handles both first-time calculations and periodic updates efficiently.
+        Performance Implementation:
+        Stored preferences are kept current by the per-swipe incremental
+        counters, so this is a single primary-key lookup regardless of how
+        many swipes the user has made. A full ``calculate_user_preferences``
+        runs inline only for users who have never been calculated.
+        
+        Drift Reconciliation:
+        If the last full calculation is older than
+        PREFERENCE_RECONCILE_INTERVAL_HOURS, or the row predates incremental
+        counters, a reconcile is scheduled in the background and the stored
+        (incrementally maintained) preferences are returned immediately.
         
         Args:
             user_id: UUID of the user
-            preferences: Calculated preference data
-            client: Supabase client for database access
-        """
-        try:
-            # Use upsert to handle both insert and update cases
-            response = client.table("user_preferences").upsert(preferences).execute()
             
-            if not response.data:
-                raise DatabaseServiceError("Failed to store user preferences - no data returned")
+        Returns:
+            Dict containing user preferences
             
-            self.logger.debug("User preferences stored", user_id=user_id)
+        Raises:
+            UserNotFoundError: If the user doesn't exist (first calculation)
+            DatabaseServiceError: If database operation fails
+        """
+        preferences = await self.get_user_preferences(user_id)
+        if not preferences:
+            return await self.calculate_user_preferences(user_id)
+        
+        if self._preferences_need_reconcile(preferences):
+            self._schedule_preference_reconcile(user_id)
+        
+        return preferences
+    
+    def _preferences_need_reconcile(self, preferences: Dict[str, Any]) -> bool:
+        """Whether stored preferences are due a full recalculation."""
+        if not preferences.get("preference_counters"):
+            return True
+        
+        last_calculated = preferences.get("last_calculated")
+        if not last_calculated:
+            return True
+        
+        try:
+            calculated_at = datetime.fromisoformat(str(last_calculated).replace("Z", "+00:00"))
+        except ValueError:
+            return True
+        
+        if calculated_at.tzinfo is not None:
+            calculated_at = calculated_at.replace(tzinfo=None) - calculated_at.utcoffset()
+        
+        max_age = timedelta(hours=settings.PREFERENCE_RECONCILE_INTERVAL_HOURS)
+        return datetime.utcnow() - calculated_at > max_age
+    
+    def _schedule_preference_reconcile(self, user_id: str) -> None:
+        """Run a background full recalculation, at most one per user at a time."""
+        if user_id in self._reconciling_users:
+            return
+        
+        self._reconciling_users.add(user_id)
+        
+        async def reconcile():
+            try:
+                await self.calculate_user_preferences(user_id)
+            except Exception as e:
+                self.logger.warning("Preference reconcile failed", user_id=user_id, error=str(e))
+            finally:
+                self._reconciling_users.discard(user_id)
+        
+        # Keep a reference until done so the task is not garbage collected
+        task = asyncio.create_task(reconcile())
+        self._reconcile_tasks.add(task)
+        task.add_done_callback(self._reconcile_tasks.discard)
+        self.logger.debug("Preference reconcile scheduled", user_id=user_id)
+    
+    async def reconcile_stale_user_preferences(self, limit: int = 100) -> int:
+        """
+        Fully recalculate the stalest stored preferences.
+        
+        Intended for a scheduled job so that users who stop requesting
+        recommendations still get their incremental counters re-anchored.
+        
+        Args:
+            limit: Maximum users to reconcile in this run
             
-        except Exception as e:
-            self.logger.error(
-                "Failed to store user preferences",
-                user_id=user_id,
-                error=str(e),
-                exc_info=True  
-            )
-            raise DatabaseServiceError(f"Failed to store user preferences: {str(e)}")
+        Returns:
+            int: Number of users reconciled
+        """
+        client = self._get_service_client()
+        cutoff = datetime.utcnow() - timedelta(hours=settings.PREFERENCE_RECONCILE_INTERVAL_HOURS)
+        
+        response = await self._execute(
+            client.table("user_preferences")
+            .select("user_id")
+            .lt("last_calculated", cutoff.isoformat())
+            .order("last_calculated")
+            .limit(limit),
+            "user_preferences"
+        )
+        
+        reconciled = 0
+        for row in response.data or []:
+            try:
+                await self.calculate_user_preferences(row["user_id"])
+                reconciled += 1
+            except DatabaseServiceError as e:
+                self.logger.warning("Preference reconcile failed", user_id=row["user_id"], error=str(e))
+        
+        self.logger.info("Stale user preferences reconciled", reconciled=reconciled, limit=limit)
+        return reconciled
+    
+    def start_preference_reconcile_loop(
+        self,
+        interval: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> None:
+        """
+        Run reconcile_stale_user_preferences periodically.
+        
+        Args:
+            interval: Seconds between runs (defaults to PREFERENCE_RECONCILE_JOB_INTERVAL_SECONDS)
+            limit: Users per run (defaults to PREFERENCE_RECONCILE_JOB_BATCH_SIZE)
+        """
+        if self._reconcile_loop_task is not None and not self._reconcile_loop_task.done():
+            return
+        self._reconcile_loop_task = asyncio.create_task(
+            self._preference_reconcile_loop(
+                interval or settings.PREFERENCE_RECONCILE_JOB_INTERVAL_SECONDS,
+                limit or settings.PREFERENCE_RECONCILE_JOB_BATCH_SIZE
+            ),
+            name="preference-reconcile"
+        )
+    
+    async def stop_preference_reconcile_loop(self) -> None:
+        """Stop the periodic job and cancel per-user reconciles still running."""
+        tasks = list(self._reconcile_tasks)
+        if self._reconcile_loop_task is not None:
+            tasks.append(self._reconcile_loop_task)
+            self._reconcile_loop_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _preference_reconcile_loop(self, interval: float, limit: int) -> None:
+        """Reconcile the stalest preferences every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reconcile_stale_user_preferences(limit=limit)
+            except Exception as e:
+                self.logger.error("Stale preference reconcile run failed", error=str(e))
     
     # ==========================================================================
     # AFFILIATE TRACKING OPERATIONS
@@ -778,6 +1043,11 @@ class DatabaseService:
         - Commission Junction: Multi-merchant tracking
         - Direct partnerships: Custom tracking parameters
         
+        Performance Implementation:
+        Product price and commission data come from the product metadata
+        cache, and the session counter is coalesced by the counter aggregator,
+        so the common case is a single insert with no reads.
+        
         Args:
             user_id: UUID of authenticated user (optional for anonymous tracking)
             product_id: UUID of product being clicked
@@ -841,7 +1111,9 @@ class DatabaseService:
             
             # Record click using service client
             client = self._get_service_client()
-            response = client.table("affiliate_clicks").insert(click_data).execute()
+            response = await self._execute(
+                client.table("affiliate_clicks").insert(click_data), "affiliate_clicks"
+            )
             
             if not response.data:
                 raise DatabaseServiceError("Failed to record affiliate click - no data returned")
@@ -882,27 +1154,105 @@ class DatabaseService:
         """
         Get product data needed for affiliate click recording.
         
+        Performance Implementation:
+        Read-through cache keyed by product id. Clicks concentrate on a few
+        hundred products, so in the common case no query is issued. Unknown
+        or inactive ids are cached negatively for a shorter TTL so repeated
+        bad ids cannot hammer the products table. Query errors are never
+        cached.
+        
         Args:
             product_id: UUID of the product
             
         Returns:
             Dict containing product data or None if not found
         """
+        product = self._product_cache.get(product_id)
+        if product is not None:
+            return product
+        if self._missing_product_cache.get(product_id) is not None:
+            return None
+        
+        # An invalidation while the query is in flight makes its result stale
+        generation = self._product_cache_generation
+        
         try:
             client = self._get_anon_client()
-            response = client.table("products").select(
-                "id, title, price_min, price_max, commission_rate, affiliate_network"
-            ).eq("id", product_id).eq("is_active", True).execute()
+            response = await self._execute(
+                client.table("products").select(
+                    "id, title, price_min, price_max, commission_rate, affiliate_network"
+                ).eq("id", product_id).eq("is_active", True),
+                "products"
+            )
             
-            if response.data and len(response.data) > 0:
-                return response.data[0]
+            product = response.data[0] if response.data else None
             
-            return None
+            if generation == self._product_cache_generation:
+                if product is not None:
+                    self._product_cache.set(product_id, product)
+                else:
+                    self._missing_product_cache.set(product_id, True)
+            
+            return product
             
         except Exception as e:
             self.logger.error("Failed to get product for affiliate click", product_id=product_id, error=str(e))
             return None
     
+    def invalidate_product_metadata(self, product_id: Optional[str] = None) -> bool:
+        """
+        Drop cached product metadata after a product changes.
+        
+        Registered as a CacheInvalidator product hook, so it runs whenever
+        ``CacheInvalidator.invalidate_product_cache`` is called, and in every
+        other worker when the invalidation bus delivers the product id.
+        
+        Args:
+            product_id: Product to invalidate; None clears the whole cache
+            
+        Returns:
+            bool: True if a cached entry was removed
+        """
+        self._product_cache_generation += 1
+        self._product_cache_invalidations += 1
+        
+        if product_id is None:
+            removed = bool(self._product_cache.cache or self._missing_product_cache.cache)
+            self._product_cache.clear()
+            self._missing_product_cache.clear()
+            return removed
+        
+        removed = self._product_cache.invalidate(product_id)
+        return self._missing_product_cache.invalidate(product_id) or removed
+    
+    def get_product_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get product metadata cache statistics.
+        
+        Every lookup consults the positive cache first, so its hits plus
+        misses are the total lookups; negative hits also avoid a query.
+        
+        Returns:
+            Dict with sizes, hits, database fetches and hit rate
+        """
+        positive = self._product_cache.get_stats()
+        negative_hits = self._missing_product_cache.hits
+        lookups = positive["total_requests"]
+        hits = positive["hits"] + negative_hits
+        
+        return {
+            "size": positive["size"],
+            "negative_size": len(self._missing_product_cache.cache),
+            "max_size": positive["max_size"],
+            "hits": positive["hits"],
+            "negative_hits": negative_hits,
+            "fetches": lookups - hits,
+            "evictions": positive["evictions"] + self._missing_product_cache.evictions,
+            "invalidations": self._product_cache_invalidations,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "total_requests": lookups
+        }
+    
     def _detect_affiliate_network(self, affiliate_url: str) -> str:
         """
         Detect affiliate network from URL for tracking purposes.
@@ -938,16 +1288,30 @@ class DatabaseService:
         """
         Update session analytics with affiliate click event.
         
+        Performance Implementation:
+        The increment is applied atomically in the database rather than as a
+        read-then-write, which lost clicks under concurrency. With the counter
+        aggregator running it costs no round trip at all; otherwise it is a
+        single ``apply_counter_deltas`` RPC.
+        
         Args:
             session_id: Browser session identifier
             client: Supabase client for database access
         """
+        if counter_aggregator.running:
+            counter_aggregator.incr("session_analytics", session_id, "affiliate_clicks")
+            return
+        
         try:
-            # Increment affiliate click counter in session analytics
-            client.table("session_analytics").update({
-                "affiliate_clicks": client.table("session_analytics").select("affiliate_clicks").eq("session_id", session_id).execute().data[0].get("affiliate_clicks", 0) + 1,
-                "last_activity_at": datetime.utcnow().isoformat()
-            }).eq("session_id", session_id).execute()
+            await self._execute(
+                client.rpc("apply_counter_deltas", {"deltas": [{
+                    "table": "session_analytics",
+                    "key": session_id,
+                    "column": "affiliate_clicks",
+                    "delta": 1
+                }]}),
+                "session_analytics"
+            )
             
         except Exception as e:
             # Log warning but don't fail the main operation
@@ -981,6 +1345,12 @@ class DatabaseService:
         5. Prioritise products with good ratings/reviews
         6. Apply diversity to avoid over-recommendation of similar items
         
+        Performance Implementation:
+        Personalised requests fetch up to RECOMMENDATION_CANDIDATE_POOL_SIZE
+        candidates and rank them with the NumPy scorer in
+        app/services/preference_scoring.py (identical results to
+        ``_score_products_by_preferences`` in one vectorised pass).
+        
         Args:
             user_preferences: User preference data from get_user_preferences()
             category_filter: Optional list of category names to filter by
@@ -1040,11 +1410,14 @@ class DatabaseService:
             # Order by rating and review count for quality
             query = query.order("rating", desc=True).order("review_count", desc=True)
             
-            # Apply limit
-            query = query.limit(limit * 2)  # Get extra for filtering
+            # Apply limit: personalised requests score a larger candidate pool
+            if user_preferences:
+                query = query.limit(max(limit * 2, settings.RECOMMENDATION_CANDIDATE_POOL_SIZE))
+            else:
+                query = query.limit(limit * 2)  # Get extra for filtering
             
             # Execute query
-            response = query.execute()
+            response = await self._execute(query, "products")
             
             if not response.data:
                 self.logger.warning("No products found matching recommendation criteria")
@@ -1052,9 +1425,9 @@ class DatabaseService:
             
             products = response.data
             
-            # Post-processing: Apply preference-based scoring and filtering
+            # Post-processing: vectorised preference scoring with top-k selection
             if user_preferences:
-                products = self._score_products_by_preferences(products, user_preferences)
+                return rank_products(products, user_preferences, top_k=limit)
             
             # Return top products up to limit
             return products[:limit]
@@ -1133,6 +1506,143 @@ class DatabaseService:
         # Sort by relevance score (highest first)
         return sorted(scored_products, key=lambda p: p["_relevance_score"], reverse=True)
 
+    # ==========================================================================
+    # CACHED CATALOG READS AND CACHE WARMERS
+    # ==========================================================================
+
+    async def get_trending_products(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Get the most clicked and viewed active products.
+        
+        Performance Implementation:
+        Served from the shared cache, which the ``trending_products`` warmer
+        fills at startup and on every warm interval. The list is cached once
+        at CACHE_WARM_PRODUCT_LIST_SIZE and sliced, so every limit shares
+        one entry; a cold miss is computed once per key (single-flight).
+        
+        Args:
+            limit: Number of products to return
+            
+        Returns:
+            Products ordered by click count, then view count
+        """
+        products = await cache_manager.get_or_set(
+            TRENDING_PRODUCTS_CACHE_KEY, self._load_trending_products, CacheConfig.LONG_TTL
+        )
+        return products[:limit]
+
+    async def get_featured_products(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get featured products (highest rated active products).
+        
+        The products table has no featured flag, so featured means best
+        rated with the most reviews, the same quality ordering used for
+        recommendations. Cached like ``get_trending_products``.
+        
+        Args:
+            limit: Number of products to return
+            
+        Returns:
+            Products ordered by rating, then review count
+        """
+        products = await cache_manager.get_or_set(
+            FEATURED_PRODUCTS_CACHE_KEY, self._load_featured_products, CacheConfig.LONG_TTL
+        )
+        return products[:limit]
+
+    async def get_category_tree(self) -> List[Dict[str, Any]]:
+        """
+        Get active categories as a tree of root categories with children.
+        
+        Returns:
+            Root categories, each with a ``children`` list
+        """
+        return await cache_manager.get_or_set(
+            CATEGORY_TREE_CACHE_KEY, self._load_category_tree, CacheConfig.LONG_TTL
+        )
+
+    async def _load_trending_products(self) -> List[Dict[str, Any]]:
+        """Query the trending product list from Supabase."""
+        client = self._get_anon_client()
+        response = await self._execute(
+            client.table("products")
+            .select("*, categories(id, name, slug)")
+            .eq("is_active", True)
+            .order("click_count", desc=True)
+            .order("view_count", desc=True)
+            .limit(settings.CACHE_WARM_PRODUCT_LIST_SIZE),
+            "products"
+        )
+        return response.data or []
+
+    async def _load_featured_products(self) -> List[Dict[str, Any]]:
+        """Query the featured product list from Supabase."""
+        client = self._get_anon_client()
+        response = await self._execute(
+            client.table("products")
+            .select("*, categories(id, name, slug)")
+            .eq("is_active", True)
+            .order("rating", desc=True)
+            .order("review_count", desc=True)
+            .limit(settings.CACHE_WARM_PRODUCT_LIST_SIZE),
+            "products"
+        )
+        return response.data or []
+
+    async def _load_category_tree(self) -> List[Dict[str, Any]]:
+        """Query active categories and nest children under their parents."""
+        client = self._get_anon_client()
+        response = await self._execute(
+            client.table("categories").select("*").eq("is_active", True).order("sort_order"),
+            "categories"
+        )
+        
+        categories = response.data or []
+        by_id = {category["id"]: {**category, "children": []} for category in categories}
+        tree = []
+        for category in by_id.values():
+            parent = by_id.get(category.get("parent_id"))
+            if parent is not None:
+                parent["children"].append(category)
+            elif category.get("parent_id") is None:
+                tree.append(category)
+        return tree
+
+    async def warm_trending_products(self) -> Dict[str, Any]:
+        """Cache warmer: the trending product list."""
+        return {TRENDING_PRODUCTS_CACHE_KEY: await self._load_trending_products()}
+
+    async def warm_featured_products(self) -> Dict[str, Any]:
+        """Cache warmer: the featured product list."""
+        return {FEATURED_PRODUCTS_CACHE_KEY: await self._load_featured_products()}
+
+    async def warm_category_tree(self) -> Dict[str, Any]:
+        """Cache warmer: the category tree."""
+        return {CATEGORY_TREE_CACHE_KEY: await self._load_category_tree()}
+
+    async def warm_top_user_preferences(self) -> Dict[str, Any]:
+        """
+        Cache warmer: stored preferences of the most recently active users.
+        
+        One query for CACHE_WARM_TOP_USERS rows. Does nothing unless
+        preference caching is enabled (USER_PREFERENCES_CACHE_TTL_SECONDS).
+        """
+        if settings.USER_PREFERENCES_CACHE_TTL_SECONDS <= 0 or settings.CACHE_WARM_TOP_USERS <= 0:
+            return {}
+        
+        client = self._get_service_client()
+        response = await self._execute(
+            client.table("user_preferences")
+            .select("*")
+            .order("updated_at", desc=True)
+            .limit(settings.CACHE_WARM_TOP_USERS),
+            "user_preferences"
+        )
+        return {
+            self._preferences_cache_key(row["user_id"]): row
+            for row in response.data or []
+        }
+
     # ==========================================================================
     # PERFORMANCE MONITORING OPERATIONS
     # ==========================================================================
@@ -1153,23 +1663,55 @@ class DatabaseService:
         4. Index usage efficiency
         5. Business KPIs and engagement metrics
         
+        Performance Implementation:
+        All aggregation happens in the database and the three RPCs run
+        concurrently. The result is cached in-process for
+        PERFORMANCE_METRICS_CACHE_TTL_SECONDS, and concurrent callers on a
+        cold cache share one collection, so dashboards polling this method
+        cost constant time regardless of data volume.
+        
         Returns:
             Dict containing comprehensive performance metrics
             
         Raises:
             DatabaseServiceError: If metrics collection fails
         """
-        try:
-            client = self._get_service_client()
+        ttl = settings.PERFORMANCE_METRICS_CACHE_TTL_SECONDS
+        
+        cached = self._performance_metrics_cache
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        
+        async with self._performance_metrics_lock:
+            # Another caller may have refreshed the cache while we waited
+            cached = self._performance_metrics_cache
+            if cached and time.monotonic() - cached[0] < ttl:
+                return cached[1]
             
-            # Get database connection stats
-            connection_stats = client.rpc('get_connection_stats').execute()
+            metrics = await self._collect_performance_metrics()
+            if ttl > 0:
+                self._performance_metrics_cache = (time.monotonic(), metrics)
+            return metrics
+    
+    async def _collect_performance_metrics(self) -> Dict[str, Any]:
+        """
+        Collect performance metrics from the database (uncached).
+        
+        Returns:
+            Dict containing comprehensive performance metrics
             
-            # Get table size metrics
-            size_metrics = client.rpc('get_table_sizes').execute()
+        Raises:
+            DatabaseServiceError: If metrics collection fails
+        """
+        try:
+            client = self._get_service_client()
             
-            # Get business metrics
-            business_metrics = await self._get_business_metrics(client)
+            # Connection stats, table sizes and business KPIs are independent
+            connection_stats, size_metrics, business_metrics = await asyncio.gather(
+                self._execute(client.rpc('get_connection_stats'), "rpc"),
+                self._execute(client.rpc('get_table_sizes'), "rpc"),
+                self._get_business_metrics(client)
+            )
             
             metrics = {
                 "timestamp": datetime.utcnow().isoformat(),
@@ -1207,6 +1749,12 @@ class DatabaseService:
         - Recommendation system effectiveness
         - Platform usage patterns
         
+        Performance Implementation:
+        Counts are computed server-side by the ``get_business_metrics`` RPC
+        (database/06_business_metrics_aggregates.sql) using indexed range
+        scans, so only a small JSON document crosses the network instead of
+        every user, swipe and click row.
+        
         Args:
             client: Supabase client for database access
             
@@ -1214,56 +1762,17 @@ class DatabaseService:
             Dict containing business intelligence metrics
         """
         try:
-            # User engagement metrics
-            users_response = client.table("users").select("id, last_login_at, created_at").execute()
-            
-            total_users = len(users_response.data) if users_response.data else 0
-            
-            # Active users in last 7 days
-            seven_days_ago = (datetime.utcnow() - timedelta(days=7)).isoformat()
-            active_users_7d = len([
-                user for user in (users_response.data or [])
-                if user.get('last_login_at') and user['last_login_at'] > seven_days_ago
-            ])
-            
-            # Swipe interaction metrics
-            swipes_response = client.table("swipe_interactions").select(
-                "id, user_id, swipe_direction, swipe_timestamp"
-            ).gte("swipe_timestamp", seven_days_ago).execute()
-            
-            total_swipes_7d = len(swipes_response.data) if swipes_response.data else 0
-            unique_active_users = len(set(
-                swipe['user_id'] for swipe in (swipes_response.data or [])
-            ))
-            
-            # Affiliate click metrics
-            affiliate_response = client.table("affiliate_clicks").select(
-                "id, is_converted, expected_commission, actual_commission"
-            ).gte("click_timestamp", seven_days_ago).execute()
-            
-            affiliate_clicks = len(affiliate_response.data) if affiliate_response.data else 0
-            conversions = len([
-                click for click in (affiliate_response.data or [])
-                if click.get('is_converted') == True
-            ])
-            
-            return {
-                "users": {
-                    "total": total_users,
-                    "active_7d": active_users_7d,
-                    "engagement_rate": round((active_users_7d / max(1, total_users)) * 100, 2)
-                },
-                "interactions": {
-                    "swipes_7d": total_swipes_7d,
-                    "active_swipe_users": unique_active_users,
-                    "avg_swipes_per_user": round(total_swipes_7d / max(1, unique_active_users), 1)
-                },
-                "revenue": {
-                    "affiliate_clicks_7d": affiliate_clicks,
-                    "conversions_7d": conversions,
-                    "conversion_rate": round((conversions / max(1, affiliate_clicks)) * 100, 2)
-                }
-            }
+            response = await self._execute(
+                client.rpc('get_business_metrics', {"window_days": 7}), "rpc"
+            )
+            
+            metrics = response.data
+            if isinstance(metrics, list):
+                metrics = metrics[0] if metrics else None
+            if not metrics:
+                raise DatabaseServiceError("get_business_metrics returned no data")
+            
+            return metrics
             
         except Exception as e:
             self.logger.warning(
@@ -1323,25 +1832,12 @@ class DatabaseService:
                 batch = view_records[i:i + batch_size]
                 
                 # Prepare batch data with UUIDs and timestamps
-                batch_data = []
-                for record in batch:
-                    view_data = {
-                        "id": str(uuid.uuid4()),
-                        "product_id": record['product_id'],
-                        "user_id": record.get('user_id'),
-                        "session_id": record['session_id'],
-                        "view_timestamp": record.get('view_timestamp', datetime.utcnow().isoformat()),
-                        "view_source": record.get('view_source', 'api'),
-                        "view_position": record.get('view_position'),
-                        "view_duration_seconds": record.get('view_duration_seconds'),
-                        "interaction_type": record.get('interaction_type', 'impression'),
-                        "device_type": record.get('device_type', 'unknown'),
-                        "recommendation_id": record.get('recommendation_id')
-                    }
-                    batch_data.append(view_data)
+                batch_data = [self._build_product_view_record(record) for record in batch]
                 
                 # Insert batch
-                response = client.table("product_views").insert(batch_data).execute()
+                response = await self._execute(
+                    client.table("product_views").insert(batch_data), "product_views"
+                )
                 
                 if response.data:
                     batch_recorded = len(response.data)
@@ -1372,6 +1868,205 @@ class DatabaseService:
             )
             raise DatabaseServiceError(f"Failed to bulk record product views: {str(e)}")
     
+    def _build_product_view_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build a product_views row from a view event.
+        
+        Args:
+            record: View event with at least product_id and session_id
+            
+        Returns:
+            Dict: Row ready for insertion, with a generated primary key
+        """
+        return {
+            "id": str(uuid.uuid4()),
+            "product_id": record['product_id'],
+            "user_id": record.get('user_id'),
+            "session_id": record['session_id'],
+            "view_timestamp": record.get('view_timestamp', datetime.utcnow().isoformat()),
+            "view_source": record.get('view_source', 'api'),
+            "view_position": record.get('view_position'),
+            "view_duration_seconds": record.get('view_duration_seconds'),
+            "interaction_type": record.get('interaction_type', 'impression'),
+            "device_type": record.get('device_type', 'unknown'),
+            "recommendation_id": record.get('recommendation_id')
+        }
+    
+    async def stream_record_product_views(
+        self,
+        view_records: AsyncIterable[Dict[str, Any]],
+        batch_size: int = 500,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        retry_backoff_seconds: float = 0.5
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream product view events into the database with pipelined batches.
+        
+        Streaming Bulk Implementation:
+        Records are pulled from an async iterator and grouped into batches.
+        Up to ``max_concurrency`` batches are in flight at once; the iterator
+        is only advanced when a slot is free, so memory stays bounded by
+        ``batch_size * (max_concurrency + 1)`` records however long the
+        stream is (suitable for million-row backfills).
+        
+        Failure Handling:
+        - Invalid records (missing product_id or session_id) are skipped and
+          counted per batch rather than aborting the stream
+        - Failed batches are retried with exponential backoff
+        - Row ids are generated once per batch and rows are upserted with
+          duplicates ignored, so retrying a batch whose insert actually
+          succeeded does not duplicate views
+        - Batches that exhaust their retries are reported as failed, never
+          silently dropped
+        
+        Args:
+            view_records: Async iterator of product view data dictionaries
+            batch_size: Number of records per insert
+            max_concurrency: Maximum batches in flight at once
+            max_retries: Retries per batch after the first attempt
+            retry_backoff_seconds: Initial backoff, doubled per retry
+            
+        Yields:
+            Dict: Per-batch report in completion order with ``batch``,
+            ``offset``, ``submitted``, ``invalid``, ``recorded``, ``attempts``,
+            ``status`` ('recorded' or 'failed'), ``error`` and ``duration_ms``
+            
+        Example:
+            async for report in database_service.stream_record_product_views(rows):
+                if report["status"] == "failed":
+                    ...
+        """
+        if batch_size < 1 or max_concurrency < 1:
+            raise ValidationError("batch_size and max_concurrency must be at least 1")
+        
+        client = self._get_service_client()
+        in_flight: Set[asyncio.Task] = set()
+        batch: List[Dict[str, Any]] = []
+        invalid = 0
+        offset = 0
+        batch_number = 0
+        
+        try:
+            async for record in view_records:
+                if record.get('product_id') and record.get('session_id'):
+                    batch.append(self._build_product_view_record(record))
+                else:
+                    invalid += 1
+                
+                if len(batch) + invalid < batch_size:
+                    continue
+                
+                # Backpressure: wait for a free slot before reading further
+                while len(in_flight) >= max_concurrency:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                
+                in_flight.add(asyncio.create_task(self._insert_product_view_batch(
+                    client, batch_number, offset, batch, invalid, max_retries, retry_backoff_seconds
+                )))
+                offset += len(batch) + invalid
+                batch_number += 1
+                batch, invalid = [], 0
+            
+            if batch or invalid:
+                while len(in_flight) >= max_concurrency:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                in_flight.add(asyncio.create_task(self._insert_product_view_batch(
+                    client, batch_number, offset, batch, invalid, max_retries, retry_backoff_seconds
+                )))
+            
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+                    
+        finally:
+            # Consumer stopped early or the stream failed; abandon in-flight batches
+            for task in in_flight:
+                task.cancel()
+    
+    async def _insert_product_view_batch(
+        self,
+        client: Client,
+        batch_number: int,
+        offset: int,
+        rows: List[Dict[str, Any]],
+        invalid: int,
+        max_retries: int,
+        retry_backoff_seconds: float
+    ) -> Dict[str, Any]:
+        """
+        Insert one streamed batch of product views with retry.
+        
+        Args:
+            client: Supabase client for database access
+            batch_number: Sequence number of the batch in the stream
+            offset: Stream position of the batch's first record
+            rows: product_views rows built by ``_build_product_view_record``
+            invalid: Records of this batch skipped by validation
+            max_retries: Retries after the first attempt
+            retry_backoff_seconds: Initial backoff, doubled per retry
+            
+        Returns:
+            Dict: Per-batch report (see ``stream_record_product_views``)
+        """
+        report = {
+            "batch": batch_number,
+            "offset": offset,
+            "submitted": len(rows) + invalid,
+            "invalid": invalid,
+            "recorded": 0,
+            "attempts": 0,
+            "status": "recorded",
+            "error": None,
+            "duration_ms": 0.0
+        }
+        if not rows:
+            return report
+        
+        start = time.perf_counter()
+        while True:
+            report["attempts"] += 1
+            try:
+                response = await self._execute(
+                    client.table("product_views").upsert(
+                        rows, on_conflict="id", ignore_duplicates=True
+                    ),
+                    "product_views"
+                )
+                report["recorded"] = len(response.data or [])
+                break
+            except Exception as e:
+                if report["attempts"] > max_retries:
+                    report["status"] = "failed"
+                    report["error"] = str(e)
+                    self.logger.error(
+                        "Product views batch failed after retries",
+                        batch=batch_number,
+                        offset=offset,
+                        rows=len(rows),
+                        attempts=report["attempts"],
+                        error=str(e)
+                    )
+                    break
+                
+                delay = retry_backoff_seconds * (2 ** (report["attempts"] - 1))
+                self.logger.warning(
+                    "Product views batch failed - retrying",
+                    batch=batch_number,
+                    attempt=report["attempts"],
+                    retry_in_seconds=delay,
+                    error=str(e)
+                )
+                await asyncio.sleep(delay)
+        
+        report["duration_ms"] = (time.perf_counter() - start) * 1000
+        return report
+    
     # ==========================================================================
     # ANALYTICS AND REPORTING OPERATIONS
     # ==========================================================================
@@ -1396,6 +2091,16 @@ class DatabaseService:
         4. Recommendation performance and feedback
         5. Session activity and engagement metrics
         
+        Performance Implementation:
+        The user lookup and the event queries run concurrently. With
+        USER_ANALYTICS_ROLLUPS_ENABLED the events are read from the
+        trigger-maintained user_daily_activity table, so the cost is one row
+        per active day in the window rather than one row per event.
+        
+        Window: the last ``days`` UTC calendar days including today,
+        starting at midnight, so the raw and rollup paths cover exactly
+        the same events.
+        
         Args:
             user_id: UUID of the user
             days: Number of days to include in analysis
@@ -1408,40 +2113,59 @@ class DatabaseService:
             DatabaseServiceError: If analytics collection fails
         """
         try:
-            # Verify user exists
-            user_data = await self.get_user_by_id(user_id, use_service_role=True)
-            if not user_data:
-                raise UserNotFoundError(f"User {user_id} not found")
-            
             client = self._get_service_client()
-            date_filter = (datetime.utcnow() - timedelta(days=days)).isoformat()
-            
-            # Get swipe interactions
-            swipes_response = client.table("swipe_interactions").select(
-                "swipe_direction, product_id, swipe_timestamp, preference_strength, products!inner(category_id, categories!inner(name))"
-            ).eq("user_id", user_id).gte("swipe_timestamp", date_filter).execute()
-            
-            # Get affiliate clicks
-            clicks_response = client.table("affiliate_clicks").select(
-                "product_id, affiliate_network, is_converted, expected_commission, actual_commission"
-            ).eq("user_id", user_id).gte("click_timestamp", date_filter).execute()
-            
-            # Get product views
-            views_response = client.table("product_views").select(
-                "product_id, view_source, view_duration_seconds, interaction_type"
-            ).eq("user_id", user_id).gte("view_timestamp", date_filter).execute()
-            
-            # Process swipe analytics
-            swipes = swipes_response.data or []
-            swipe_analytics = self._process_swipe_analytics(swipes)
-            
-            # Process click analytics
-            clicks = clicks_response.data or []
-            click_analytics = self._process_click_analytics(clicks)
-            
-            # Process view analytics
-            views = views_response.data or []
-            view_analytics = self._process_view_analytics(views)
+            # Rollups are per UTC day, so both paths start at a day boundary
+            today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+            since = today - timedelta(days=max(days, 1) - 1)
+            
+            if settings.USER_ANALYTICS_ROLLUPS_ENABLED:
+                # O(days): one pre-aggregated row per active day
+                user_data, rollups_response = await asyncio.gather(
+                    self.get_user_by_id(user_id, use_service_role=True),
+                    self._execute(
+                        client.table("user_daily_activity").select("*")
+                        .eq("user_id", user_id).gte("activity_date", since.date().isoformat()),
+                        "user_daily_activity"
+                    )
+                )
+                if not user_data:
+                    raise UserNotFoundError(f"User {user_id} not found")
+                
+                swipe_analytics, click_analytics, view_analytics = self._process_rollup_analytics(
+                    rollups_response.data or []
+                )
+            else:
+                date_filter = since.isoformat()
+                
+                # The user check and the three event queries are independent,
+                # so they run concurrently rather than back to back
+                user_data, swipes_response, clicks_response, views_response = await asyncio.gather(
+                    self.get_user_by_id(user_id, use_service_role=True),
+                    self._execute(
+                        client.table("swipe_interactions").select(
+                            "swipe_direction, product_id, swipe_timestamp, preference_strength, products!inner(category_id, categories!inner(name))"
+                        ).eq("user_id", user_id).gte("swipe_timestamp", date_filter),
+                        "swipe_interactions"
+                    ),
+                    self._execute(
+                        client.table("affiliate_clicks").select(
+                            "product_id, affiliate_network, is_converted, expected_commission, actual_commission"
+                        ).eq("user_id", user_id).gte("click_timestamp", date_filter),
+                        "affiliate_clicks"
+                    ),
+                    self._execute(
+                        client.table("product_views").select(
+                            "product_id, view_source, view_duration_seconds, interaction_type"
+                        ).eq("user_id", user_id).gte("view_timestamp", date_filter),
+                        "product_views"
+                    )
+                )
+                if not user_data:
+                    raise UserNotFoundError(f"User {user_id} not found")
+                
+                swipe_analytics = self._process_swipe_analytics(swipes_response.data or [])
+                click_analytics = self._process_click_analytics(clicks_response.data or [])
+                view_analytics = self._process_view_analytics(views_response.data or [])
             
             analytics_summary = {
                 "user_id": user_id,
@@ -1570,6 +2294,99 @@ class DatabaseService:
             "interaction_types": interactions
         }
     
+    def _process_rollup_analytics(
+        self,
+        rollups: List[Dict]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """
+        Build swipe, click and view analytics from user_daily_activity rows.
+        
+        Produces the same shapes as ``_process_swipe_analytics``,
+        ``_process_click_analytics`` and ``_process_view_analytics`` by
+        summing the per-day counters maintained by database triggers.
+        
+        Args:
+            rollups: user_daily_activity rows for the reporting window
+            
+        Returns:
+            Tuple of (swipe_analytics, click_analytics, view_analytics)
+        """
+        totals: Dict[str, float] = {}
+        categories: Dict[str, Dict[str, int]] = {}
+        networks: Dict[str, Dict[str, int]] = {}
+        sources: Dict[str, int] = {}
+        interactions: Dict[str, int] = {}
+        
+        for row in rollups:
+            for field in (
+                'swipes', 'right_swipes', 'super_likes', 'preference_strength_sum',
+                'clicks', 'conversions', 'revenue',
+                'views', 'view_duration_sum', 'view_duration_count'
+            ):
+                totals[field] = totals.get(field, 0) + float(row.get(field) or 0)
+            
+            for name, stats in (row.get('category_stats') or {}).items():
+                merged = categories.setdefault(name, {'total': 0, 'likes': 0})
+                merged['total'] += int(stats.get('total', 0))
+                merged['likes'] += int(stats.get('likes', 0))
+            for name, stats in (row.get('network_stats') or {}).items():
+                merged = networks.setdefault(name, {'clicks': 0, 'conversions': 0})
+                merged['clicks'] += int(stats.get('clicks', 0))
+                merged['conversions'] += int(stats.get('conversions', 0))
+            for name, count in (row.get('view_sources') or {}).items():
+                sources[name] = sources.get(name, 0) + int(count)
+            for name, count in (row.get('interaction_types') or {}).items():
+                interactions[name] = interactions.get(name, 0) + int(count)
+        
+        total_swipes = int(totals.get('swipes', 0))
+        if total_swipes:
+            right_swipes = int(totals['right_swipes'])
+            super_likes = int(totals['super_likes'])
+            swipe_analytics = {
+                "total_swipes": total_swipes,
+                "right_swipes": right_swipes,
+                "super_likes": super_likes,
+                "engagement_rate": round((right_swipes + super_likes) / total_swipes, 3),
+                "category_preferences": {
+                    name: round(stats['likes'] / stats['total'], 3)
+                    for name, stats in categories.items()
+                    if stats['total'] > 0
+                },
+                "avg_preference_strength": round(totals['preference_strength_sum'] / total_swipes, 3)
+            }
+        else:
+            swipe_analytics = {"total_swipes": 0, "engagement_rate": 0.0, "category_preferences": {}}
+        
+        total_clicks = int(totals.get('clicks', 0))
+        if total_clicks:
+            conversions = int(totals['conversions'])
+            revenue = totals['revenue']
+            click_analytics = {
+                "total_clicks": total_clicks,
+                "conversions": conversions,
+                "conversion_rate": round(conversions / total_clicks, 3),
+                "revenue_generated": float(revenue),
+                "avg_revenue_per_click": round(float(revenue) / total_clicks, 2),
+                "network_performance": networks
+            }
+        else:
+            click_analytics = {"total_clicks": 0, "conversion_rate": 0.0, "revenue_generated": 0.0}
+        
+        total_views = int(totals.get('views', 0))
+        if total_views:
+            duration_count = totals['view_duration_count']
+            avg_duration = totals['view_duration_sum'] / duration_count if duration_count else 0
+            view_analytics = {
+                "total_views": total_views,
+                "avg_view_duration": round(avg_duration, 1),
+                "view_sources": sources,
+                "interaction_types": interactions
+            }
+        else:
+            view_analytics = {"total_views": 0, "avg_view_duration": 0.0, "interaction_types": {}}
+        
+        return swipe_analytics, click_analytics, view_analytics
+    
     def _calculate_engagement_score(
         self,
         swipe_analytics: Dict,
@@ -1593,6 +2410,20 @@ class DatabaseService:
 # This follows the singleton pattern for database connection management
 database_service = DatabaseService()
 
+# Expose the product metadata cache through the shared cache tooling
+cache_manager.register_stats_provider("product_metadata_cache", database_service.get_product_cache_stats)
+CacheInvalidator.register_product_invalidation_hook(database_service.invalidate_product_metadata)
+
+# Catalog and preference warm-up (run from the application lifespan)
+cache_manager.register_warmer("trending_products", database_service.warm_trending_products, ttl=CacheConfig.LONG_TTL)
+cache_manager.register_warmer("featured_products", database_service.warm_featured_products, ttl=CacheConfig.LONG_TTL)
+cache_manager.register_warmer("category_tree", database_service.warm_category_tree, ttl=CacheConfig.LONG_TTL)
+cache_manager.register_warmer(
+    "top_user_preferences",
+    database_service.warm_top_user_preferences,
+    ttl=settings.USER_PREFERENCES_CACHE_TTL_SECONDS or None
+)
+
 # Export the service instance and key classes
 __all__ = [
     'DatabaseService',
@@ -0,0 +1,388 @@
+"""
+aclue Swipe Ingestion - Write-Behind Buffer
+
+Batches swipe interactions in memory and persists them with multi-row inserts.
+
+Problem Addressed:
+Recording a swipe synchronously costs two PostgREST round trips (the
+``swipe_interactions`` INSERT and the ``increment_session_swipes`` RPC).
+At peak swipe traffic those round trips dominate request latency even
+though the client only needs an acknowledgement.
+
+Ingestion Model:
+- Requests enqueue a fully-formed swipe record and are acknowledged at once
+- A background task flushes when ``flush_size`` records are buffered or the
+  oldest buffered record has waited ``flush_interval`` seconds
+- Each flush is one multi-row insert plus one session counter update per
+  distinct session in the batch
+- The queue is bounded; producers wait for space (backpressure) and callers
+  decide what to do when the wait times out
+- Batches that fail to flush are spilled to JSON Lines files and replayed
+  once the database accepts writes again; spill file I/O (including fsync)
+  runs in a worker thread so it never stalls the event loop
+
+Durability Note:
+Records that are buffered but not yet flushed are lost if the process is
+killed without a graceful shutdown. ``stop()`` drains the queue, and a
+failed final flush still spills to disk.
+
+Usage:
+    buffer = SwipeWriteBehindBuffer(writer=database_service._write_swipe_batch)
+    await buffer.start()
+    await buffer.enqueue(record)
+    await buffer.stop()
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+SPILL_FILE_PREFIX = "swipes-"
+SPILL_FILE_SUFFIX = ".jsonl"
+SPILL_QUARANTINE_SUFFIX = ".bad"
+
+
+class SwipeBufferFullError(Exception):
+    """Raised when the buffer has no space within the enqueue timeout"""
+    pass
+
+
+class SwipeWriteBehindBuffer:
+    """
+    Bounded in-process write-behind buffer for swipe interactions.
+
+    The buffer is agnostic of Supabase: ``writer`` receives a list of swipe
+    records and must persist them atomically (one multi-row insert), raising
+    on failure so the batch can be spilled.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+        flush_size: int = 200,
+        flush_interval: float = 0.5,
+        max_pending: int = 10000,
+        enqueue_timeout: float = 0.1,
+        spill_dir: Optional[str] = None
+    ):
+        """
+        Initialise buffer.
+
+        Args:
+            writer: Coroutine persisting a batch of swipe records
+            flush_size: Records per flush
+            flush_interval: Maximum seconds a record waits before flushing
+            max_pending: Queue bound; producers wait once it is reached
+            enqueue_timeout: Seconds ``enqueue`` waits for space
+            spill_dir: Directory for failed batches (spilling disabled if None)
+        """
+        self.writer = writer
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+        self.spill_dir = spill_dir
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._stop_event: Optional[asyncio.Event] = None
+        self._spill_pending = False
+
+        self.stats = {
+            "enqueued": 0,
+            "flushed": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "spill_files_quarantined": 0,
+            "rejected": 0,
+            "last_flush_ms": 0.0
+        }
+
+    @property
+    def running(self) -> bool:
+        """Whether the flush task is accepting records."""
+        return self._task is not None and not self._stopping
+
+    @property
+    def pending(self) -> int:
+        """Number of records waiting to be flushed."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        """Start the background flush task and replay spilled batches."""
+        if self._task is not None:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._stop_event = asyncio.Event()
+        self._stopping = False
+
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self._spill_pending = bool(self._spill_files())
+            await self._replay_spilled()
+
+        self._task = asyncio.create_task(self._run(), name="swipe-write-behind")
+        logger.info(
+            "Swipe write-behind buffer started",
+            flush_size=self.flush_size,
+            flush_interval=self.flush_interval,
+            max_pending=self.max_pending
+        )
+
+    async def stop(self) -> None:
+        """Stop accepting records, drain the queue and flush what remains."""
+        if self._task is None:
+            return
+
+        self._stopping = True
+        self._stop_event.set()
+        await self._task
+        self._task = None
+
+        logger.info("Swipe write-behind buffer stopped", **self.get_stats())
+
+    async def enqueue(self, record: Dict[str, Any]) -> None:
+        """
+        Buffer a swipe record for the next flush.
+
+        Backpressure:
+        When ``max_pending`` records are already buffered the caller waits up
+        to ``enqueue_timeout`` seconds for space.
+
+        Args:
+            record: Swipe interaction row ready for insertion
+
+        Raises:
+            SwipeBufferFullError: If the buffer is stopped or stays full
+        """
+        if not self.running:
+            raise SwipeBufferFullError("Swipe buffer is not running")
+
+        try:
+            await asyncio.wait_for(self._queue.put(record), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.stats["rejected"] += 1
+            raise SwipeBufferFullError(
+                f"Swipe buffer full ({self.max_pending} pending)"
+            )
+
+        self.stats["enqueued"] += 1
+
+    async def flush(self) -> None:
+        """Flush everything currently buffered (used by tests and shutdown)."""
+        while self._queue is not None and not self._queue.empty():
+            batch = self._drain(self.flush_size)
+            await self._flush(batch)
+
+    # ==========================================================================
+    # FLUSH LOOP
+    # ==========================================================================
+
+    async def _run(self) -> None:
+        """Collect batches until stopped, then drain the queue."""
+        while not self._stopping:
+            batch = await self._collect_batch()
+            if batch:
+                await self._flush(batch)
+
+        await self.flush()
+
+    async def _collect_batch(self) -> List[Dict[str, Any]]:
+        """
+        Wait for the next batch.
+
+        Returns once ``flush_size`` records are collected or ``flush_interval``
+        has passed since the first record of the batch arrived. Returns an
+        empty list as soon as ``stop()`` is called while idle.
+        """
+        get_task = asyncio.ensure_future(self._queue.get())
+        stop_task = asyncio.ensure_future(self._stop_event.wait())
+        await asyncio.wait({get_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+        stop_task.cancel()
+
+        if not get_task.done():
+            get_task.cancel()
+            return []
+        first = get_task.result()
+
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.flush_size:
+            batch.extend(self._drain(self.flush_size - len(batch)))
+            if len(batch) >= self.flush_size:
+                break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stopping:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        """Take up to ``limit`` records without waiting."""
+        records = []
+        while len(records) < limit:
+            try:
+                records.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return records
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        """Persist a batch, spilling it to disk if the write fails."""
+        start = time.perf_counter()
+        try:
+            await self.writer(batch)
+        except Exception as e:
+            self.stats["failed_flushes"] += 1
+            logger.error(
+                "Swipe batch flush failed",
+                batch_size=len(batch),
+                error=str(e)
+            )
+            await self._spill(batch)
+            return
+
+        self.stats["flushes"] += 1
+        self.stats["flushed"] += len(batch)
+        self.stats["last_flush_ms"] = (time.perf_counter() - start) * 1000
+
+        if self._spill_pending:
+            await self._replay_spilled()
+
+    # ==========================================================================
+    # SPILL TO DISK
+    # ==========================================================================
+
+    def _spill_files(self) -> List[str]:
+        """Spilled batch files, oldest first."""
+        if not self.spill_dir or not os.path.isdir(self.spill_dir):
+            return []
+        return sorted(
+            os.path.join(self.spill_dir, name)
+            for name in os.listdir(self.spill_dir)
+            if name.startswith(SPILL_FILE_PREFIX) and name.endswith(SPILL_FILE_SUFFIX)
+        )
+
+    async def _spill(self, batch: List[Dict[str, Any]]) -> None:
+        """Write a failed batch to a new spill file."""
+        if not self.spill_dir:
+            logger.error("Swipe batch dropped - spilling disabled", batch_size=len(batch))
+            return
+
+        name = f"{SPILL_FILE_PREFIX}{time.time_ns()}-{uuid.uuid4().hex[:8]}{SPILL_FILE_SUFFIX}"
+        path = os.path.join(self.spill_dir, name)
+
+        try:
+            await asyncio.to_thread(self._write_spill_file, path, batch)
+        except OSError as e:
+            logger.error(
+                "Failed to spill swipe batch",
+                batch_size=len(batch),
+                path=path,
+                error=str(e)
+            )
+            return
+
+        self.stats["spilled"] += len(batch)
+        self._spill_pending = True
+        logger.warning("Swipe batch spilled to disk", batch_size=len(batch), path=path)
+
+    @staticmethod
+    def _write_spill_file(path: str, batch: List[Dict[str, Any]]) -> None:
+        """Durably write a batch as JSON Lines (blocking; run in a thread)."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in batch:
+                f.write(json.dumps(record, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read_spill_file(path: str) -> List[Dict[str, Any]]:
+        """Read a spilled batch (blocking; run in a thread)."""
+        with open(path, "r", encoding="utf-8") as f:
+            batch = [json.loads(line) for line in f if line.strip()]
+        if not all(isinstance(record, dict) for record in batch):
+            raise ValueError("spill file contains non-object records")
+        return batch
+
+    async def _replay_spilled(self) -> None:
+        """
+        Re-submit spilled batches, oldest first.
+
+        Stops at the first failure and leaves that file in place. The writer
+        is expected to be idempotent on record id so a batch that was
+        partially applied before spilling is safe to replay. Files that
+        cannot be read or parsed are renamed with a ``.bad`` suffix, so they
+        are kept for inspection but not retried on every replay.
+        """
+        for path in await asyncio.to_thread(self._spill_files):
+            try:
+                batch = await asyncio.to_thread(self._read_spill_file, path)
+            except (OSError, ValueError) as e:
+                self._quarantine(path, e)
+                continue
+
+            try:
+                await self.writer(batch)
+            except Exception as e:
+                logger.warning("Swipe spill replay deferred", path=path, error=str(e))
+                return
+
+            await asyncio.to_thread(os.remove, path)
+            self.stats["replayed"] += len(batch)
+            logger.info("Swipe spill file replayed", path=path, batch_size=len(batch))
+
+        self._spill_pending = False
+
+    def _quarantine(self, path: str, error: Exception) -> None:
+        """Move a corrupt spill file out of the replay set."""
+        bad_path = path + SPILL_QUARANTINE_SUFFIX
+        try:
+            os.replace(path, bad_path)
+        except OSError as e:
+            logger.error("Failed to quarantine swipe spill file", path=path, error=str(e))
+            return
+
+        self.stats["spill_files_quarantined"] += 1
+        logger.error(
+            "Unreadable swipe spill file quarantined",
+            path=path,
+            quarantined_as=bad_path,
+            error=str(error)
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get buffer statistics.
+
+        Returns:
+            Counters for enqueued, flushed, spilled and replayed records
+        """
+        return {
+            **self.stats,
+            "pending": self.pending,
+            "running": self.running,
+            "spill_files": len(self._spill_files())
+        }
+
+
+__all__ = ['SwipeWriteBehindBuffer', 'SwipeBufferFullError']
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Replay a cache key trace against LRU and W-TinyLFU memory tiers.
+
+Compares hit rate and peak estimated bytes for the entry-counted LRUCache,
+a byte-bounded plain LRU and the byte-bounded WTinyLFUCache at the same
+memory budget. Traces are "op key size" lines ("get"/"set"), as written by
+WTinyLFUCache.write_trace on a worker running with trace_size > 0. Without
+--trace a synthetic workload is generated: Zipf-distributed reads over
+mostly small keys with a few large search results, interrupted by one-off
+scans.
+
+Usage:
+    python scripts/benchmark_cache_admission.py
+    python scripts/benchmark_cache_admission.py --budget-mb 4 --operations 200000
+    python scripts/benchmark_cache_admission.py --trace /tmp/cache-trace.txt --budget-mb 64
+"""
+
+import argparse
+import os
+import random
+import sys
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Dict, Iterator, List, Tuple
+
+# Add the parent directory to the path so we can import our app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache_admission import WTinyLFUCache
+from app.core.caching import LRUCache
+
+Operation = Tuple[str, str, int]
+
+
+class ByteLRU:
+    """Plain LRU evicting by estimated bytes (the no-admission baseline)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.cache: "OrderedDict[str, int]" = OrderedDict()
+        self.bytes = 0
+
+    def get(self, key: str):
+        if key not in self.cache:
+            return None
+        self.cache.move_to_end(key)
+        return self.cache[key]
+
+    def set(self, key: str, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        self.bytes += size - self.cache.pop(key, 0)
+        self.cache[key] = size
+        while self.bytes > self.max_bytes:
+            _, evicted = self.cache.popitem(last=False)
+            self.bytes -= evicted
+
+
+def read_trace(path: str) -> List[Operation]:
+    """Load "op key size" lines."""
+    operations = []
+    with open(path) as trace_file:
+        for line in trace_file:
+            op, _, rest = line.rstrip("\n").partition(" ")
+            key, _, size = rest.rpartition(" ")
+            if op in ("get", "set") and key and size.isdigit():
+                operations.append((op, key, int(size)))
+    return operations
+
+
+def synthetic_trace(operations: int, keys: int, seed: int) -> List[Operation]:
+    """Cache-aside reads with Zipf popularity, large search results and scans."""
+    rng = random.Random(seed)
+    cum_weights = list(accumulate(1 / (rank + 1) ** 0.9 for rank in range(keys)))
+    sizes: Dict[str, int] = {}
+    trace: List[Operation] = []
+
+    def size_of(key: str) -> int:
+        if key not in sizes:
+            large = key.startswith("search:") and rng.random() < 0.2
+            sizes[key] = rng.randint(200_000, 800_000) if large else rng.randint(500, 5_000)
+        return sizes[key]
+
+    population = [
+        f"search:q{rank}" if rank % 10 == 0 else f"product:p{rank}" for rank in range(keys)
+    ]
+    scan = 0
+    while len(trace) < operations:
+        if rng.random() < 0.002:
+            # One-off scan (crawler, export) over keys never read again
+            for _ in range(rng.randint(500, 2000)):
+                scan += 1
+                key = f"product:scan{scan}"
+                trace.append(("get", key, 0))
+                trace.append(("set", key, size_of(key)))
+            continue
+
+        key = rng.choices(population, cum_weights=cum_weights)[0]
+        trace.append(("get", key, 0))
+        trace.append(("set", key, size_of(key)))
+    return trace[:operations]
+
+
+def replay(trace: List[Operation], cache) -> Dict[str, float]:
+    """Replay gets and cache-aside sets; sets only follow misses."""
+    hits = misses = 0
+    peak_bytes = 0
+    missed = set()
+    sets = 0
+    for op, key, size in trace:
+        if op == "get":
+            if cache.get(key) is None:
+                misses += 1
+                missed.add(key)
+            else:
+                hits += 1
+            continue
+
+        if key not in missed:
+            continue
+        missed.discard(key)
+        cache.set(key, size)
+        sets += 1
+        if sets % 64 == 0:
+            peak_bytes = max(peak_bytes, _resident_bytes(cache))
+
+    lookups = hits + misses
+    return {
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "lookups": lookups,
+        "peak_mb": peak_bytes / (1024 * 1024)
+    }
+
+
+def _resident_bytes(cache) -> int:
+    """Estimated bytes held, from the stored sizes (sampled by replay)."""
+    if isinstance(cache, WTinyLFUCache):
+        return cache.total_bytes
+    if isinstance(cache, ByteLRU):
+        return cache.bytes
+    return sum(cache.cache.values())
+
+
+def iter_results(trace: List[Operation], budget: int, mean_size: float) -> Iterator[Tuple[str, Dict[str, float]]]:
+    """Run every policy at the same budget."""
+    count_bound = max(1, int(budget / mean_size))
+    yield f"lru (count, {count_bound} entries)", replay(
+        trace, LRUCache(max_size=count_bound, ttl=10 ** 9)
+    )
+    yield "lru (bytes)", replay(trace, ByteLRU(budget))
+    yield "w-tinylfu (bytes)", replay(
+        trace, WTinyLFUCache(max_bytes=budget, ttl=10 ** 9, size_of=lambda size: size)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trace", help="Recorded trace file (\"op key size\" lines)")
+    parser.add_argument("--budget-mb", type=float, default=8.0, help="Memory budget in MiB")
+    parser.add_argument("--operations", type=int, default=200_000, help="Synthetic trace length")
+    parser.add_argument("--keys", type=int, default=20_000, help="Synthetic key population")
+    parser.add_argument("--seed", type=int, default=7, help="Synthetic trace seed")
+    args = parser.parse_args()
+
+    trace = read_trace(args.trace) if args.trace else synthetic_trace(args.operations, args.keys, args.seed)
+    sizes = [size for op, _, size in trace if op == "set"]
+    mean_size = sum(sizes) / len(sizes) if sizes else 1.0
+    budget = int(args.budget_mb * 1024 * 1024)
+
+    print(f"Operations: {len(trace)}  budget: {args.budget_mb:.1f} MiB  mean entry: {mean_size / 1024:.1f} KiB")
+    print(f"{'policy':<32}{'hit rate':>10}{'vs lru':>10}{'peak MiB':>10}")
+
+    baseline = None
+    for name, result in iter_results(trace, budget, mean_size):
+        if baseline is None:
+            baseline = result["hit_rate"]
+        delta = (result["hit_rate"] - baseline) * 100
+        print(f"{name:<32}{result['hit_rate']:>10.2%}{delta:>+9.2f}pp{result['peak_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Measure the per-request overhead of the application middleware stack.
+
+Builds a bare FastAPI app with one small JSON endpoint, the same app wrapped
+by setup_middleware (security headers, request logging, gzip, CORS and the
+response cache when enabled) and, for reference, the bare app behind three
+no-op BaseHTTPMiddleware layers. Requests are driven straight through the
+ASGI interface, without a server or HTTP client, so the difference between
+the runs is the middleware itself.
+
+Logging below --log-level is filtered before formatting, as in production;
+use --log-level INFO to include the cost of the request log lines.
+
+Usage:
+    python scripts/benchmark_middleware_stack.py
+    python scripts/benchmark_middleware_stack.py --requests 20000 --concurrency 50
+    python scripts/benchmark_middleware_stack.py --path /items?page=2 --log-level INFO
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+# Add the parent directory to the path so we can import our app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import structlog
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.middleware import setup_middleware
+
+ITEMS = [{"id": f"p{i}", "title": f"Product {i}", "price": 10.0 + i} for i in range(20)]
+
+
+def make_app(configure: Callable[[FastAPI], None] = None) -> FastAPI:
+    """App with one JSON endpoint, optionally wrapped by ``configure``."""
+    app = FastAPI()
+
+    @app.get("/items")
+    async def items(page: int = 1):
+        return {"page": page, "items": ITEMS}
+
+    if configure is not None:
+        configure(app)
+    return app
+
+
+def with_base_http_layers(app: FastAPI, layers: int = 3) -> None:
+    """Reference stack: no-op BaseHTTPMiddleware layers."""
+    async def passthrough(request, call_next):
+        return await call_next(request)
+
+    for _ in range(layers):
+        app.add_middleware(BaseHTTPMiddleware, dispatch=passthrough)
+
+
+def make_scope(path: str) -> Dict:
+    """Minimal HTTP scope for a GET request."""
+    path, _, query = path.partition("?")
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"accept", b"application/json"),
+            (b"accept-encoding", b"gzip"),
+            (b"user-agent", b"benchmark"),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+
+
+async def request(app, path: str) -> float:
+    """Send one request through the ASGI app; returns seconds taken."""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    started = time.perf_counter()
+    await app(make_scope(path), receive, send)
+    elapsed = time.perf_counter() - started
+    if status != [200]:
+        raise RuntimeError(f"Unexpected response status {status} for {path}")
+    return elapsed
+
+
+async def run(app, path: str, requests: int, concurrency: int) -> List[float]:
+    """Issue ``requests`` requests, ``concurrency`` at a time."""
+    latencies: List[float] = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            latencies.append(await request(app, path))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def measure(name: str, app, args) -> Dict[str, float]:
+    """Warm up, then time ``args.requests`` requests."""
+    await run(app, args.path, args.warmup, args.concurrency)
+    started = time.perf_counter()
+    latencies = await run(app, args.path, args.requests, args.concurrency)
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "name": name,
+        "mean_us": statistics.fmean(latencies) * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+        "per_request_us": wall / len(latencies) * 1e6,
+        "throughput": len(latencies) / wall,
+    }
+
+
+async def main_async(args) -> None:
+    results = []
+    results.append(await measure("bare app", make_app(), args))
+    results.append(await measure("setup_middleware stack", make_app(setup_middleware), args))
+    if not args.skip_reference:
+        results.append(await measure("3x BaseHTTPMiddleware (no-op)", make_app(with_base_http_layers), args))
+
+    bare = results[0]["per_request_us"]
+    print(f"Requests: {args.requests}  concurrency: {args.concurrency}  path: {args.path}")
+    print(f"{'stack':<34}{'mean us':>10}{'p99 us':>10}{'wall us/req':>13}{'overhead us':>13}{'req/s':>10}")
+    for result in results:
+        overhead = result["per_request_us"] - bare
+        print(
+            f"{result['name']:<34}{result['mean_us']:>10.1f}{result['p99_us']:>10.1f}"
+            f"{result['per_request_us']:>13.1f}{overhead:>+13.1f}{result['throughput']:>10.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000, help="Timed requests per stack")
+    parser.add_argument("--warmup", type=int, default=500, help="Untimed requests per stack")
+    parser.add_argument("--concurrency", type=int, default=1, help="Requests in flight at once")
+    parser.add_argument("--path", default="/items?page=1", help="Request path and query string")
+    parser.add_argument("--log-level", default="WARNING", help="Log level for the request log lines")
+    parser.add_argument("--skip-reference", action="store_true", help="Skip the BaseHTTPMiddleware reference stack")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()), stream=sys.stderr)
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.JSONRenderer(),
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
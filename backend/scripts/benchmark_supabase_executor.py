@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark Supabase query throughput with and without the executor layer.
+
+Simulates concurrent API requests that each perform one blocking PostgREST
+round trip. "direct" calls ``execute()`` on the event loop exactly as the
+service layer used to; "executor" dispatches through SupabaseExecutor.
+
+Usage:
+    python scripts/benchmark_supabase_executor.py
+    python scripts/benchmark_supabase_executor.py --requests 500 --concurrency 50 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add the parent directory to the path so we can import our app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.supabase_executor import SupabaseExecutor
+
+
+class SimulatedQuery:
+    """Stand-in for a supabase-py builder with a blocking execute()."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def execute(self):
+        time.sleep(self.latency)
+        return {"data": []}
+
+
+async def run_direct(requests: int, concurrency: int, latency: float) -> float:
+    """Run requests calling execute() directly on the event loop."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handler():
+        async with semaphore:
+            SimulatedQuery(latency).execute()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[handler() for _ in range(requests)])
+    return time.perf_counter() - start
+
+
+async def run_executor(
+    requests: int,
+    concurrency: int,
+    latency: float,
+    workers: int,
+    table_limit: int
+) -> float:
+    """Run requests through the bounded Supabase executor."""
+    executor = SupabaseExecutor(max_workers=workers, default_table_limit=table_limit)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handler():
+        async with semaphore:
+            await executor.execute(SimulatedQuery(latency), "products")
+
+    start = time.perf_counter()
+    await asyncio.gather(*[handler() for _ in range(requests)])
+    elapsed = time.perf_counter() - start
+    executor.shutdown()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200, help="Total simulated requests")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent in-flight requests")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated round trip in seconds")
+    parser.add_argument("--workers", type=int, default=32, help="Executor worker threads")
+    parser.add_argument("--table-limit", type=int, default=16, help="Per-table in-flight limit")
+    args = parser.parse_args()
+
+    direct = await run_direct(args.requests, args.concurrency, args.latency)
+    pooled = await run_executor(
+        args.requests, args.concurrency, args.latency, args.workers, args.table_limit
+    )
+
+    print(f"requests={args.requests} concurrency={args.concurrency} latency={args.latency * 1000:.0f}ms")
+    print(f"  direct   : {direct:7.3f}s  {args.requests / direct:9.1f} req/s")
+    print(f"  executor : {pooled:7.3f}s  {args.requests / pooled:9.1f} req/s")
+    print(f"  speedup  : {direct / pooled:7.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
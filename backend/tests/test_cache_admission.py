@@ -0,0 +1,214 @@
+"""
+aclue Cache Admission Unit Test Suite
+
+Unit tests for the byte-bounded W-TinyLFU memory tier in
+app.core.cache_admission.
+
+Test Coverage:
+- Size estimation for nested product-shaped values
+- Byte budget enforcement and rejection of oversized values
+- Main-space entries growing in place without rejecting window entries
+- Frequency-based admission keeping hot keys through a scan
+- Promotion to the protected segment and sketch aging
+- LRUCache-compatible TTLs, invalidation and on_evict hook
+- CacheManager memory tier selection and eviction cleanup
+"""
+
+# ==============================================================================
+# IMPORTS AND DEPENDENCIES
+# ==============================================================================
+
+import sys
+import time
+
+import pytest
+
+from app.core.cache_admission import FrequencySketch, WTinyLFUCache, estimate_size
+from app.core.caching import CacheConfig, CacheManager
+
+# ==============================================================================
+# TEST HELPERS
+# ==============================================================================
+
+def fixed_size(value):
+    """Size estimator for tests: values are their own size in bytes."""
+    return value
+
+
+def make_cache(max_bytes=1000, **kwargs) -> WTinyLFUCache:
+    """Cache whose entries weigh exactly their integer value."""
+    kwargs.setdefault("window_ratio", 0.1)
+    return WTinyLFUCache(max_bytes=max_bytes, size_of=fixed_size, **kwargs)
+
+# ==============================================================================
+# SIZE ESTIMATION TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+class TestEstimateSize:
+    """Test suite for estimate_size."""
+
+    def test_counts_nested_containers(self):
+        """Nested dicts and lists count their contents, not just the shell."""
+        product = {"id": "p1", "title": "x" * 1000, "tags": ["audio", "gift"]}
+
+        assert estimate_size(product) > sys.getsizeof(product) + 1000
+        assert estimate_size([product] * 10) > 10 * 1000
+
+    def test_samples_long_sequences(self):
+        """Long lists are extrapolated from a sample, within a small error."""
+        rows = [{"id": str(i), "title": "t" * 50} for i in range(1000)]
+        sampled = estimate_size(rows)
+        exact = sys.getsizeof(rows) + sum(estimate_size(row) for row in rows)
+
+        assert abs(sampled - exact) / exact < 0.05
+
+# ==============================================================================
+# ADMISSION AND EVICTION TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+class TestWTinyLFUCache:
+    """Test suite for WTinyLFUCache."""
+
+    def test_byte_budget_is_enforced(self):
+        """Total estimated bytes never exceed the budget."""
+        cache = make_cache(max_bytes=1000)
+
+        for i in range(100):
+            cache.set(f"k{i}", 90)
+            assert cache.total_bytes <= 1000
+
+        assert len(cache.cache) <= 11
+        assert cache.get_stats()["bytes"] == cache.total_bytes
+
+    def test_oversized_values_are_not_cached(self):
+        """A value larger than the whole budget is dropped, replacing any old value."""
+        cache = make_cache(max_bytes=1000)
+        cache.set("big", 10)
+
+        cache.set("big", 5000)
+
+        assert cache.get("big") is None
+        assert cache.oversized == 1
+
+    def test_growing_main_entry_evicts_from_main_space(self):
+        """Replacing a probation entry with a larger value keeps the budget."""
+        cache = make_cache(max_bytes=1000)
+        for i in range(10):
+            cache.set(f"k{i}", 100)
+        assert cache.total_bytes == 1000
+        assert cache.segment_of["k1"] == WTinyLFUCache.PROBATION
+
+        cache.set("k1", 600)
+
+        assert cache.total_bytes <= 1000
+        assert cache.rejections == 0
+        assert cache.get("k1") == 600
+        assert cache.get("k9") == 100  # The window entry is left alone
+        assert "k0" not in cache.cache
+
+    def test_hot_keys_survive_a_scan(self):
+        """One-off keys cannot displace frequently read keys."""
+        cache = make_cache(max_bytes=1000)
+        for i in range(8):
+            cache.set(f"hot{i}", 100)
+        for _ in range(5):
+            for i in range(8):
+                cache.get(f"hot{i}")
+
+        for i in range(500):
+            cache.get(f"scan{i}")
+            cache.set(f"scan{i}", 100)
+
+        assert all(cache.get(f"hot{i}") == 100 for i in range(8))
+        assert cache.rejections > 0
+
+    def test_frequent_newcomer_displaces_cold_entry(self):
+        """A key read more often than the main-space victim is admitted."""
+        cache = make_cache(max_bytes=500)
+        for i in range(5):
+            cache.set(f"cold{i}", 90)
+        for _ in range(3):
+            cache.get("new")
+
+        cache.set("new", 90)
+        cache.set("filler", 40)
+
+        assert cache.get("new") == 90
+        assert cache.evictions >= 1
+
+    def test_probation_hits_are_promoted(self):
+        """A second hit in probation moves the entry to the protected segment."""
+        cache = make_cache(max_bytes=1000)
+        cache.set("a", 100)
+        cache.set("b", 100)  # pushes "a" out of the 100-byte window
+
+        assert cache.segment_of["a"] == WTinyLFUCache.PROBATION
+        cache.get("a")
+        assert cache.segment_of["a"] == WTinyLFUCache.PROTECTED
+
+    def test_ttl_invalidate_and_on_evict(self):
+        """Per-entry TTLs, invalidation and clear behave like LRUCache."""
+        evicted = []
+        cache = make_cache(on_evict=evicted.append)
+        cache.set("short", 10, ttl=0.01)
+        cache.set("long", 10)
+        cache.set("user:1:a", 10)
+
+        time.sleep(0.02)
+        assert cache.get("short") is None
+        assert cache.invalidate_pattern("user:*") == 1
+        assert cache.invalidate("long")
+        cache.set("x", 10)
+        cache.clear()
+
+        assert evicted == ["short", "user:1:a", "long", "x"]
+        assert cache.total_bytes == 0
+
+    def test_trace_records_operations(self, tmp_path):
+        """Recorded operations are written in the benchmark's trace format."""
+        cache = make_cache(trace_size=10)
+        cache.get("a")
+        cache.set("a", 42)
+        cache.get("a")
+
+        path = tmp_path / "trace.txt"
+        assert cache.write_trace(str(path)) == 3
+        assert path.read_text().splitlines() == ["get a 0", "set a 42", "get a 42"]
+
+    def test_sketch_ages_counts(self):
+        """Counters saturate at 15 and are halved after the sample period."""
+        sketch = FrequencySketch(16)
+        for _ in range(20):
+            sketch.increment("k")
+        assert sketch.frequency("k") == 15
+
+        sketch.additions = sketch.sample_size - 1
+        sketch.increment("other")
+
+        assert sketch.resets == 1
+        assert sketch.frequency("k") == 7
+
+# ==============================================================================
+# CACHE MANAGER INTEGRATION TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestCacheManagerMemoryTier:
+    """Test suite for the W-TinyLFU memory tier in CacheManager."""
+
+    async def test_manager_uses_byte_bounded_tier(self):
+        """The default memory tier enforces MEMORY_CACHE_MAX_BYTES."""
+        config = CacheConfig()
+        config.MEMORY_CACHE_MAX_BYTES = 20_000
+        manager = CacheManager(config)
+
+        for i in range(200):
+            await manager.set(f"search:q{i}", ["result " * 50] * 5, ttl=60)
+
+        stats = manager.get_stats()["memory_cache"]
+        assert isinstance(manager.memory_cache, WTinyLFUCache)
+        assert stats["bytes"] <= 20_000
+        assert set(manager.key_tags) <= set(manager.memory_cache.cache)
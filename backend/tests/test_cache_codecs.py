@@ -0,0 +1,248 @@
+"""
+aclue Cache Codecs Unit Test Suite
+
+Unit tests for the Redis tier serialiser in app.core.cache_codecs.
+
+Test Coverage:
+- Round trips through the pickle and JSON codecs
+- Per-prefix codec selection and pickle fallback for non-JSON values
+- Both JSON backends rejecting values they would alter
+- Compression above the size threshold and the wire header
+- Reading legacy raw pickles and rejecting unknown formats
+- Per-prefix size statistics
+- CacheManager entries written with codecs and read back from Redis
+"""
+
+# ==============================================================================
+# IMPORTS AND DEPENDENCIES
+# ==============================================================================
+
+import pickle
+import uuid
+from datetime import datetime
+from enum import Enum
+
+import pytest
+
+from app.core import cache_codecs
+from app.core.cache_codecs import FORMAT_VERSION, CacheSerializer, CodecError
+from app.core.caching import CacheConfig, CacheEntry, CacheManager
+
+# ==============================================================================
+# TEST HELPERS
+# ==============================================================================
+
+PRODUCTS = [
+    {"id": f"p{i}", "title": "Wireless headphones", "price_min": 49.99,
+     "brand": "Sony", "tags": ["audio", "gift"], "rating": None}
+    for i in range(50)
+]
+
+
+class Availability(str, Enum):
+    """Enum member that JSON libraries would write as its value."""
+    IN_STOCK = "in_stock"
+
+
+def make_serializer(**kwargs) -> CacheSerializer:
+    """Serializer with JSON for product keys and the default threshold."""
+    kwargs.setdefault("prefix_codecs", {"product:": "json"})
+    return CacheSerializer(**kwargs)
+
+
+class BytesRedis:
+    """Stores raw bytes like Redis; enough for CacheManager get/set."""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def pipeline(self, transaction=True):
+        return BytesPipeline(self)
+
+
+class BytesPipeline:
+    """Pipeline stand-in that applies setex and ignores the tag index."""
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def setex(self, key, ttl, value):
+        self.redis_client.store[key] = value
+
+    def sadd(self, *args):
+        pass
+
+    def expire(self, *args):
+        pass
+
+    async def execute(self):
+        return []
+
+# ==============================================================================
+# SERIALIZER TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+class TestCacheSerializer:
+    """Test suite for CacheSerializer."""
+
+    def test_json_round_trip_for_configured_prefix(self):
+        """Product keys use the JSON codec and decode to equal values."""
+        serializer = make_serializer(compression=None)
+
+        data = serializer.dumps("product:list", PRODUCTS)
+
+        assert data[0] == FORMAT_VERSION
+        assert data[1] == 1  # json
+        assert serializer.loads(data) == PRODUCTS
+
+    def test_pickle_is_default_codec(self):
+        """Keys without a prefix codec are pickled, preserving types."""
+        serializer = make_serializer()
+        value = {"when": datetime(2024, 1, 1), "ids": ("a", "b")}
+
+        data = serializer.dumps("user:1", value)
+
+        assert data[1] == 0  # pickle
+        assert serializer.loads(data) == value
+
+    def test_non_json_value_falls_back_to_pickle(self):
+        """Values JSON would alter are pickled instead of converted."""
+        serializer = make_serializer()
+        value = {"created_at": datetime(2024, 1, 1)}
+
+        data = serializer.dumps("product:1", value)
+
+        assert data[1] == 0
+        assert serializer.loads(data) == value
+        assert serializer.fallbacks == 1
+
+    @pytest.mark.parametrize("backend", ["orjson", "json"])
+    def test_json_backends_fall_back_for_values_they_would_alter(self, backend, monkeypatch):
+        """With either JSON library, converted types are pickled and decode unchanged."""
+        if backend == "orjson":
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr(cache_codecs, "orjson", None)
+        serializer = make_serializer(compression=None)
+        altered = [
+            {"ids": ("a", "b")},
+            {1: "one"},
+            {"nested": [{"key": (1, 2)}]},
+            {"id": uuid.UUID("12345678-1234-5678-1234-567812345678")},
+            {"status": Availability.IN_STOCK},
+            {"score": float("nan")},
+            {"price": float("inf")},
+        ]
+
+        encoded = [serializer.dumps("product:1", value) for value in altered]
+        plain = serializer.dumps("product:2", PRODUCTS)
+
+        assert [data[1] for data in encoded] == [0] * len(altered)  # pickle
+        assert repr([serializer.loads(data) for data in encoded]) == repr(altered)
+        assert serializer.fallbacks == len(altered)
+        assert plain[1] == 1  # json
+        assert serializer.loads(plain) == PRODUCTS
+        assert serializer.get_stats()["json_backend"] == backend
+
+    def test_large_payloads_are_compressed(self):
+        """Payloads above the threshold are compressed; small ones are not."""
+        serializer = make_serializer(compression_min_bytes=256)
+
+        large = serializer.dumps("product:list", PRODUCTS)
+        small = serializer.dumps("product:1", PRODUCTS[0])
+        uncompressed = make_serializer(compression=None).dumps("product:list", PRODUCTS)
+
+        assert large[2] == 1  # zlib
+        assert small[2] == 0
+        assert len(large) < len(uncompressed) / 4
+        assert serializer.loads(large) == PRODUCTS
+
+    def test_unavailable_compressor_falls_back_to_zlib(self):
+        """Asking for a compressor that is not installed uses zlib."""
+        serializer = make_serializer(compression="not-installed")
+
+        assert serializer.compressor.name == "zlib"
+
+    def test_reads_legacy_pickles(self):
+        """Raw pickles from before the codec header still decode."""
+        serializer = make_serializer()
+        legacy = pickle.dumps({"id": "p1"})
+
+        assert serializer.is_legacy(legacy)
+        assert serializer.loads(legacy) == {"id": "p1"}
+
+    def test_rejects_unknown_format(self):
+        """Unknown versions, codecs and compressors raise CodecError."""
+        serializer = make_serializer()
+
+        with pytest.raises(CodecError):
+            serializer.loads(bytes((FORMAT_VERSION + 1, 0, 0)) + b"x")
+        with pytest.raises(CodecError):
+            serializer.loads(bytes((FORMAT_VERSION, 9, 0)) + b"x")
+        with pytest.raises(CodecError):
+            serializer.loads(bytes((FORMAT_VERSION, 0, 9)) + b"x")
+
+    def test_size_stats_per_prefix(self):
+        """Serialised sizes are tracked per key prefix."""
+        serializer = make_serializer(compression_min_bytes=256)
+        serializer.dumps("product:list", PRODUCTS)
+        serializer.dumps("product:1", PRODUCTS[0])
+        serializer.dumps("user:1", {"id": "u1"})
+
+        stats = serializer.get_stats()
+
+        assert set(stats["prefixes"]) == {"product", "user"}
+        product = stats["prefixes"]["product"]
+        assert product["writes"] == 2
+        assert product["raw_bytes"] > product["stored_bytes"]
+        assert product["compression_ratio"] > 1.0
+        assert stats["default_codec"] == "pickle"
+
+# ==============================================================================
+# CACHE MANAGER INTEGRATION TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestCacheManagerCodecs:
+    """Test suite for codec use in CacheManager's Redis tier."""
+
+    async def test_entries_round_trip_through_redis(self):
+        """An entry written by one worker is read intact by another."""
+        redis_client = BytesRedis()
+        writer = CacheManager(CacheConfig())
+        reader = CacheManager(CacheConfig())
+        for manager in (writer, reader):
+            manager.redis_client = redis_client
+            manager.is_connected = True
+
+        await writer.set("product:list", PRODUCTS, ttl=60, tags=["category:audio"])
+        entry = await reader.get_entry("product:list")
+
+        assert redis_client.store["product:list"][1] == 1  # json
+        assert entry.value == PRODUCTS
+        assert entry.tags == ("category:audio", "product:list")
+        assert isinstance(entry, CacheEntry)
+
+    async def test_legacy_pickled_values_are_read(self):
+        """Values pickled by older deployments are served until they expire."""
+        redis_client = BytesRedis()
+        redis_client.store["product:old"] = pickle.dumps({"id": "old"})
+        manager = CacheManager(CacheConfig())
+        manager.redis_client = redis_client
+        manager.is_connected = True
+
+        assert await manager.get("product:old") == {"id": "old"}
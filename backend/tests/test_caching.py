@@ -0,0 +1,1061 @@
+"""
+aclue Caching Unit Test Suite
+
+Unit tests for the multi-layer CacheManager and the @cached decorator.
+
+Test Coverage:
+- Single-flight coalescing of concurrent misses in get_or_set
+- Errors propagate to every waiter and are not cached
+- @cached shares one execution across concurrent callers
+- Distributed Redis lock acquisition, waiting and timeout fallback
+- Stampede statistics in get_stats
+- Stale-while-revalidate within the policy stale window
+- XFetch probabilistic early refresh and per-prefix policies
+- Per-entry TTLs in LRUCache
+- Tag-indexed invalidation in both tiers and the LRUCache on_evict hook
+- Cross-worker memory-tier invalidation over Redis pub/sub, including
+  product invalidation hooks
+- Cache warm-up: bounded parallelism, failure reporting, coalescing and the
+  periodic warming loop
+- HTTP response cache: body ETags, 304s and replay without the endpoint,
+  per-route TTLs and auth-scoped keys
+- Batched get_many/set_many and the @cached_batch decorator
+- Per-prefix, per-tier hit/miss/eviction counts, memory usage and Redis
+  latency metrics
+"""
+
+# ==============================================================================
+# IMPORTS AND DEPENDENCIES
+# ==============================================================================
+
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core import caching
+from app.monitoring.metrics import registry
+from app.core.caching import (
+    CacheConfig,
+    CacheEntry,
+    CacheInvalidator,
+    CacheManager,
+    CachePolicy,
+    HTTPCacheMiddleware,
+    LRUCache,
+    cached,
+    cached_batch
+)
+
+# ==============================================================================
+# TEST HELPERS
+# ==============================================================================
+
+class FakeRedis:
+    """Minimal in-process stand-in for the redis.asyncio commands used by the cache."""
+
+    def __init__(self):
+        self.store = {}
+        self.evals = []
+        self.ttls = {}
+        self.subscribers = {}
+        self.broken_pubsubs = 0
+        self.mgets = []
+        self.pipelines = 0
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def mget(self, keys):
+        self.mgets.append(list(keys))
+        return [self.store.get(key) for key in keys]
+
+    async def delete(self, *keys):
+        return sum(1 for key in keys if self.store.pop(key, None) is not None)
+
+    async def sadd(self, key, *members):
+        self.store.setdefault(key, set()).update(members)
+
+    async def expire(self, key, ttl):
+        self.ttls[key] = ttl
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def publish(self, channel, message):
+        queues = self.subscribers.get(channel, [])
+        for queue in queues:
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+        return len(queues)
+
+    async def flushdb(self):
+        self.store.clear()
+
+    def pubsub(self):
+        broken = self.broken_pubsubs > 0
+        self.broken_pubsubs -= 1
+        return FakePubSub(self, broken)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+        return True
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, *args):
+        self.evals.append((key, *args))
+        if script == caching._INVALIDATE_TAG_SCRIPT:
+            members = self.store.pop(key, set())
+            return await self.delete(*members)
+        if self.store.get(key) == args[0]:
+            del self.store[key]
+            return 1
+        return 0
+
+
+class FakePubSub:
+    """Channel subscription on a FakeRedis; optionally fails like a dropped connection."""
+
+    def __init__(self, redis_client, broken=False):
+        self.redis_client = redis_client
+        self.broken = broken
+        self.queue = asyncio.Queue()
+        self.channels = []
+
+    async def subscribe(self, channel):
+        self.channels.append(channel)
+        self.redis_client.subscribers.setdefault(channel, []).append(self.queue)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        if self.broken:
+            raise ConnectionError("connection lost")
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        for channel in self.channels:
+            self.redis_client.subscribers[channel].remove(self.queue)
+        self.channels = []
+
+
+class FakePipeline:
+    """Buffers FakeRedis commands until execute(), like a redis pipeline."""
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        method = getattr(self.redis_client, name)
+        return lambda *args, **kwargs: self.commands.append(method(*args, **kwargs))
+
+    async def execute(self):
+        self.redis_client.pipelines += 1
+        return [await command for command in self.commands]
+
+
+class SlowFactory:
+    """Async factory that counts calls and yields before returning."""
+
+    def __init__(self, value="computed", delay=0.01, error=None):
+        self.value = value
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def make_manager(redis_client=None) -> CacheManager:
+    """Create an isolated cache manager, optionally backed by a fake Redis."""
+    manager = CacheManager(CacheConfig())
+    if redis_client is not None:
+        manager.redis_client = redis_client
+        manager.is_connected = True
+    return manager
+
+
+def seed_entry(manager, key, value, fresh_for, stale_for=300, compute_time=0.0):
+    """Place an entry with explicit soft/hard expiry in the memory tier."""
+    now = time.time()
+    entry = CacheEntry(value, now + fresh_for, now + fresh_for + stale_for, compute_time)
+    manager.memory_cache.set(key, entry, ttl=fresh_for + stale_for)
+
+
+async def wait_until(condition, timeout=1.0):
+    """Poll until condition() is true or fail after timeout."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.005)
+
+
+async def drain(manager):
+    """Wait for background refreshes to finish."""
+    while manager._inflight:
+        await asyncio.gather(*manager._inflight.values(), return_exceptions=True)
+
+# ==============================================================================
+# SINGLE-FLIGHT TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestSingleFlight:
+    """Test suite for per-key request coalescing."""
+
+    async def test_concurrent_misses_run_factory_once(self):
+        """N concurrent callers for one cold key trigger one computation."""
+        manager = make_manager()
+        factory = SlowFactory()
+
+        results = await asyncio.gather(
+            *[manager.get_or_set("product:1", factory) for _ in range(20)]
+        )
+
+        assert results == ["computed"] * 20
+        assert factory.calls == 1
+        assert manager.stampede_stats["loads"] == 1
+        assert manager.stampede_stats["coalesced"] == 19
+        assert manager._inflight == {}
+
+    async def test_distinct_keys_are_not_coalesced(self):
+        """Single-flight is per key, not global."""
+        manager = make_manager()
+        factory = SlowFactory()
+
+        await asyncio.gather(
+            manager.get_or_set("product:1", factory),
+            manager.get_or_set("product:2", factory)
+        )
+
+        assert factory.calls == 2
+
+    async def test_sync_factory_still_supported(self):
+        """Plain callables work as before."""
+        manager = make_manager()
+
+        assert await manager.get_or_set("user:1", lambda: {"id": 1}) == {"id": 1}
+        assert await manager.get("user:1") == {"id": 1}
+
+    async def test_error_reaches_all_waiters_and_is_not_cached(self):
+        """A failed load raises for every coalesced caller; the next call retries."""
+        manager = make_manager()
+        failing = SlowFactory(error=ConnectionError("db down"))
+
+        results = await asyncio.gather(
+            *[manager.get_or_set("rec:1", failing) for _ in range(5)],
+            return_exceptions=True
+        )
+
+        assert all(isinstance(r, ConnectionError) for r in results)
+        assert failing.calls == 1
+
+        recovered = SlowFactory(value="ok")
+        assert await manager.get_or_set("rec:1", recovered) == "ok"
+        assert recovered.calls == 1
+
+    async def test_cancelled_waiter_does_not_cancel_shared_load(self):
+        """Cancelling one caller leaves the computation running for the others."""
+        manager = make_manager()
+        factory = SlowFactory(delay=0.05)
+
+        first = asyncio.ensure_future(manager.get_or_set("search:q", factory))
+        second = asyncio.ensure_future(manager.get_or_set("search:q", factory))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "computed"
+        assert factory.calls == 1
+
+    async def test_cached_decorator_coalesces(self, monkeypatch):
+        """Concurrent calls to a @cached coroutine execute its body once."""
+        manager = make_manager()
+        monkeypatch.setattr(caching, "cache_manager", manager)
+        calls = []
+
+        @cached(ttl=60, prefix="test")
+        async def load(product_id):
+            calls.append(product_id)
+            await asyncio.sleep(0.01)
+            return {"id": product_id}
+
+        results = await asyncio.gather(*[load("p1") for _ in range(10)])
+
+        assert results == [{"id": "p1"}] * 10
+        assert calls == ["p1"]
+        assert await load("p1") == {"id": "p1"}
+        assert calls == ["p1"]
+
+# ==============================================================================
+# DISTRIBUTED LOCK TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestDistributedLock:
+    """Test suite for the Redis lock variant of get_or_set."""
+
+    async def test_lock_holder_computes_and_releases(self):
+        """The lock is taken around the computation and released by token."""
+        fake = FakeRedis()
+        manager = make_manager(fake)
+        factory = SlowFactory()
+
+        assert await manager.get_or_set("product:9", factory, distributed_lock=True) == "computed"
+
+        assert factory.calls == 1
+        assert manager.stampede_stats["lock_acquired"] == 1
+        assert "lock:product:9" not in fake.store
+        assert fake.evals[0][0] == "lock:product:9"
+
+    async def test_waiter_reads_value_published_by_lock_holder(self):
+        """A worker that loses the lock race uses the other worker's result."""
+        fake = FakeRedis()
+        holder = make_manager(fake)
+        waiter = make_manager(fake)
+        factory = SlowFactory(delay=0.05)
+
+        holder_task = asyncio.ensure_future(
+            holder.get_or_set("product:9", factory, distributed_lock=True)
+        )
+        await asyncio.sleep(0.01)
+        waited = await waiter.get_or_set("product:9", factory, distributed_lock=True)
+
+        assert waited == "computed"
+        assert await holder_task == "computed"
+        assert factory.calls == 1
+        assert waiter.stampede_stats["lock_waits"] == 1
+        assert waiter.stampede_stats["lock_wait_hits"] == 1
+
+    async def test_wait_timeout_falls_back_to_local_computation(self, monkeypatch):
+        """A stuck lock holder does not block callers past STAMPEDE_LOCK_WAIT."""
+        fake = FakeRedis()
+        fake.store["lock:product:9"] = "someone-else"
+        manager = make_manager(fake)
+        monkeypatch.setattr(manager.config, "STAMPEDE_LOCK_WAIT", 0.05)
+        monkeypatch.setattr(manager.config, "STAMPEDE_LOCK_POLL_INTERVAL", 0.01)
+
+        value = await manager.get_or_set("product:9", SlowFactory(), distributed_lock=True)
+
+        assert value == "computed"
+        assert manager.stampede_stats["lock_timeouts"] == 1
+        assert fake.store["lock:product:9"] == "someone-else"
+
+    async def test_stampede_stats_reported(self):
+        """get_stats exposes stampede counters and in-flight keys."""
+        manager = make_manager()
+        await manager.get_or_set("product:1", SlowFactory())
+
+        stats = manager.get_stats()
+
+        assert stats["stampede"]["loads"] == 1
+        assert stats["stampede"]["inflight_keys"] == 0
+
+# ==============================================================================
+# STALE-WHILE-REVALIDATE TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestStaleWhileRevalidate:
+    """Test suite for soft/hard expiry and early refresh."""
+
+    async def test_stale_value_served_while_refreshing(self):
+        """Past the soft TTL the old value returns at once and refreshes once."""
+        manager = make_manager()
+        seed_entry(manager, "product:1", "old", fresh_for=-1)
+        factory = SlowFactory(value="new")
+
+        results = await asyncio.gather(
+            *[manager.get_or_set("product:1", factory) for _ in range(5)]
+        )
+        assert results == ["old"] * 5
+
+        await drain(manager)
+        assert factory.calls == 1
+        assert await manager.get_or_set("product:1", factory) == "new"
+        assert manager.revalidation_stats["stale_served"] == 5
+        assert manager.revalidation_stats["refreshes"] == 1
+
+    async def test_plain_get_treats_stale_as_miss(self):
+        """Only get_or_set serves stale values."""
+        manager = make_manager()
+        seed_entry(manager, "product:1", "old", fresh_for=-1)
+
+        assert await manager.get("product:1") is None
+        assert (await manager.get_entry("product:1")).value == "old"
+
+    async def test_failed_refresh_keeps_stale_value(self):
+        """A failing background refresh is logged and the old value kept."""
+        manager = make_manager()
+        seed_entry(manager, "product:1", "old", fresh_for=-1)
+        failing = SlowFactory(error=ConnectionError("db down"))
+
+        assert await manager.get_or_set("product:1", failing) == "old"
+        await drain(manager)
+
+        assert manager.revalidation_stats["refresh_errors"] == 1
+        assert (await manager.get_entry("product:1")).value == "old"
+
+    async def test_set_keeps_entry_for_stale_window(self):
+        """Entries carry the prefix policy's stale window as hard expiry."""
+        manager = make_manager()
+        await manager.set("product:1", "v", ttl=60)
+        await manager.set("user:1", "v", ttl=60)
+
+        product = await manager.get_entry("product:1")
+        user = await manager.get_entry("user:1")
+
+        assert product.expires_at - product.fresh_until == pytest.approx(300)
+        assert user.expires_at == user.fresh_until
+
+    async def test_xfetch_refreshes_hot_key_early(self, monkeypatch):
+        """A fresh entry near expiry with a costly factory is refreshed early."""
+        manager = make_manager()
+        monkeypatch.setattr(caching.random, "random", lambda: 0.5)
+        seed_entry(manager, "product:1", "old", fresh_for=1, compute_time=10.0)
+        seed_entry(manager, "user:1", "old", fresh_for=1, compute_time=10.0)
+        factory = SlowFactory(value="new")
+
+        assert await manager.get_or_set("product:1", factory) == "old"
+        assert await manager.get_or_set("user:1", factory) == "old"
+        await drain(manager)
+
+        # user: has no early refresh policy
+        assert factory.calls == 1
+        assert manager.revalidation_stats["early_refreshes"] == 1
+        assert await manager.get("product:1") == "new"
+
+    async def test_fresh_cheap_entry_not_refreshed(self):
+        """Entries far from expiry are served without refreshing."""
+        manager = make_manager()
+        seed_entry(manager, "product:1", "old", fresh_for=300, compute_time=0.01)
+        factory = SlowFactory(value="new")
+
+        assert await manager.get_or_set("product:1", factory) == "old"
+        assert factory.calls == 0
+
+    async def test_policy_resolution_uses_longest_prefix(self, monkeypatch):
+        """Per-prefix policies resolve to the most specific prefix."""
+        manager = make_manager()
+        policies = {
+            "product:": CachePolicy(stale_ttl=10),
+            "product:featured:": CachePolicy(ttl=30, stale_ttl=20, beta=2.0),
+        }
+        monkeypatch.setattr(manager.config, "PREFIX_POLICIES", policies)
+
+        assert manager.policy_for("product:featured:1").beta == 2.0
+        assert manager.policy_for("product:1").stale_ttl == 10
+        assert manager.policy_for("session:1") == manager.config.DEFAULT_POLICY
+
+        await manager.set("product:featured:1", "v")
+        entry = await manager.get_entry("product:featured:1")
+        assert entry.expires_at - time.time() == pytest.approx(50, abs=1)
+
+
+@pytest.mark.unit
+class TestLRUCacheTTL:
+    """Test suite for per-entry TTLs in LRUCache."""
+
+    def test_entry_ttl_overrides_default(self):
+        """An explicit ttl replaces the cache-wide TTL for that entry."""
+        cache = LRUCache(max_size=10, ttl=60)
+        cache.set("short", 1, ttl=-1)
+        cache.set("default", 2)
+
+        assert cache.get("short") is None
+        assert cache.get("default") == 2
+        assert "short" not in cache.ttls
+
+# ==============================================================================
+# TAG INVALIDATION TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestTagInvalidation:
+    """Test suite for tag-indexed invalidation."""
+
+    async def test_tags_derived_from_key_prefixes(self):
+        """Entity prefixes map to entity tags; search keys share one tag."""
+        manager = make_manager()
+
+        assert manager.tags_for("product:p1") == ("product:p1",)
+        assert manager.tags_for("product:p1:reviews") == ("product:p1",)
+        assert manager.tags_for("rec:u1:home") == ("user:u1",)
+        assert manager.tags_for("session:u1:abc") == ("user:u1",)
+        assert manager.tags_for("search:q=lamp") == ("search",)
+        assert manager.tags_for("cache:fn:1", ["product:p2"]) == ("product:p2",)
+        assert manager.tags_for("cache:fn:1") == ()
+
+    async def test_product_invalidation_only_touches_tagged_keys(self):
+        """Invalidating a product removes its keys and search results only."""
+        fake = FakeRedis()
+        manager = make_manager(fake)
+        await manager.set("product:p1", "a")
+        await manager.set("product:p1:related", "b")
+        await manager.set("product:p2", "c")
+        await manager.set("search:q=lamp", "d")
+        await manager.set("cache:listing", "e", tags=["product:p1"])
+
+        deleted = await manager.invalidate_tags("product:p1", "search")
+
+        assert deleted == 8  # 4 memory + 4 Redis entries
+        for key in ("product:p1", "product:p1:related", "search:q=lamp", "cache:listing"):
+            assert await manager.get(key) is None
+            assert key not in fake.store
+        assert await manager.get("product:p2") == "c"
+        assert "tag:product:p1" not in fake.store
+        assert fake.store["tag:product:p2"] == {"product:p2"}
+        assert set(manager.tag_index) == {"product:p2"}
+
+    async def test_invalidator_uses_tags(self, monkeypatch):
+        """CacheInvalidator invalidates by tag instead of pattern sweeps."""
+        manager = make_manager()
+        monkeypatch.setattr(caching, "cache_manager", manager)
+
+        async def fail_pattern(pattern):
+            raise AssertionError("pattern sweep used")
+
+        monkeypatch.setattr(manager, "delete_pattern", fail_pattern)
+        await manager.set("rec:u1:home", "a")
+        await manager.set("user:u1:profile", "b")
+        await manager.set("rec:u2:home", "c")
+
+        assert await caching.CacheInvalidator.invalidate_user_cache("u1") == 2
+        assert await manager.get("rec:u2:home") == "c"
+
+    async def test_get_or_set_and_cached_accept_tags(self, monkeypatch):
+        """Caller-supplied tags are indexed for computed values."""
+        manager = make_manager()
+        monkeypatch.setattr(caching, "cache_manager", manager)
+
+        @cached(ttl=60, prefix="listing", tags=lambda category: [f"category:{category}"])
+        async def load(category):
+            return [category]
+
+        await load("books")
+        await manager.get_or_set("cache:x", lambda: 1, tags=["category:books"])
+
+        assert manager.tag_index["category:books"] == {"listing:load:books", "cache:x"}
+        assert await manager.invalidate_tags("category:books") == 2
+
+    async def test_memory_eviction_cleans_tag_index(self):
+        """Keys evicted from the LRU leave the reverse index."""
+        config = CacheConfig()
+        config.MEMORY_CACHE_POLICY = "lru"
+        manager = CacheManager(config)
+        manager.memory_cache.max_size = 2
+
+        await manager.set("product:p1", "a")
+        await manager.set("product:p2", "b")
+        await manager.set("product:p3", "c")
+
+        assert "product:p1" not in manager.tag_index
+        assert set(manager.key_tags) == {"product:p2", "product:p3"}
+
+        manager.memory_cache.clear()
+        assert manager.tag_index == {}
+        assert manager.key_tags == {}
+
+    async def test_lru_on_evict_called_for_every_removal(self):
+        """on_evict fires on eviction, expiry and invalidation."""
+        removed = []
+        cache = LRUCache(max_size=1, ttl=60, on_evict=removed.append)
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3, ttl=-1)
+        cache.get("c")
+        cache.set("d", 4)
+        cache.invalidate("d")
+
+        assert removed == ["a", "b", "c", "d"]
+
+# ==============================================================================
+# INVALIDATION BUS TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestInvalidationBus:
+    """Test suite for cross-worker memory-tier invalidation."""
+
+    async def start_workers(self, fake, count=2):
+        """Managers sharing one Redis, each with the bus running."""
+        workers = [make_manager(fake) for _ in range(count)]
+        for worker in workers:
+            worker.config.INVALIDATION_POLL_TIMEOUT = 0.01
+            assert await worker.start_invalidation_bus()
+        await wait_until(lambda: len(fake.subscribers.get(workers[0].config.INVALIDATION_CHANNEL, [])) == count)
+        return workers
+
+    async def test_delete_evicts_other_workers_memory_copy(self):
+        """A delete in one worker removes the key from every memory tier."""
+        fake = FakeRedis()
+        a, b = await self.start_workers(fake)
+        try:
+            await a.set("user:u1:profile", {"name": "old"})
+            assert await b.get("user:u1:profile") == {"name": "old"}
+            assert "user:u1:profile" in b.memory_cache.cache
+
+            await a.delete("user:u1:profile")
+
+            await wait_until(lambda: "user:u1:profile" not in b.memory_cache.cache)
+            assert a.bus_stats["published"] == 1
+            assert b.bus_stats["applied"] == 1
+        finally:
+            await a.stop_invalidation_bus()
+            await b.stop_invalidation_bus()
+
+    async def test_tag_invalidation_uses_each_workers_index(self):
+        """Tag invalidations are resolved against the receiver's tag index."""
+        fake = FakeRedis()
+        a, b = await self.start_workers(fake)
+        try:
+            await a.set("product:p1:related", ["p2"])
+            b.memory_cache.set("product:p1", "b-only copy")
+            b.key_tags["product:p1"] = ("product:p1",)
+            b.tag_index.setdefault("product:p1", set()).add("product:p1")
+
+            await a.invalidate_tags("product:p1")
+
+            await wait_until(lambda: not b.memory_cache.cache)
+            assert "product:p1" not in b.tag_index
+        finally:
+            await a.stop_invalidation_bus()
+            await b.stop_invalidation_bus()
+
+    async def test_clear_reaches_every_worker(self):
+        """invalidate_all clears the memory tier of every worker."""
+        fake = FakeRedis()
+        a, b = await self.start_workers(fake)
+        try:
+            b.memory_cache.set("cache:x", 1)
+            await a.clear()
+
+            await wait_until(lambda: not b.memory_cache.cache)
+            assert fake.store == {}
+        finally:
+            await a.stop_invalidation_bus()
+            await b.stop_invalidation_bus()
+
+    async def test_product_hooks_run_in_every_worker(self, monkeypatch):
+        """Invalidating a product runs the product hooks once in each worker."""
+        fake = FakeRedis()
+        a, b = await self.start_workers(fake)
+        calls = []
+        monkeypatch.setattr(caching, "cache_manager", a)
+        monkeypatch.setattr(CacheInvalidator, "product_invalidation_hooks", [calls.append])
+        try:
+            await CacheInvalidator.invalidate_product_cache("p1")
+
+            await wait_until(lambda: len(calls) == 2)
+            await asyncio.sleep(0.05)
+            assert calls == ["p1", "p1"]
+            assert b.bus_stats["received"] == 2
+        finally:
+            await a.stop_invalidation_bus()
+            await b.stop_invalidation_bus()
+
+    async def test_own_messages_are_ignored(self):
+        """A worker does not re-apply invalidations it published."""
+        manager = make_manager()
+        manager.memory_cache.set("cache:x", 1)
+
+        assert manager.apply_invalidation({"origin": manager.instance_id, "clear": True}) == 0
+        assert manager.apply_invalidation({"origin": "other", "keys": ["cache:x"]}) == 1
+
+    async def test_bus_requires_redis(self):
+        """Without Redis the bus stays off and publishing is a no-op."""
+        manager = make_manager()
+
+        assert await manager.start_invalidation_bus() is False
+        await manager.delete("cache:x")
+        assert manager.bus_stats["published"] == 0
+
+    async def test_reconnect_clears_memory_tier(self):
+        """After a dropped subscription the memory tier is cleared and the bus resubscribes."""
+        fake = FakeRedis()
+        fake.broken_pubsubs = 1
+        manager = make_manager(fake)
+        manager.config.INVALIDATION_RECONNECT_DELAY = 0.01
+        manager.config.INVALIDATION_POLL_TIMEOUT = 0.01
+        manager.memory_cache.set("cache:x", 1)
+
+        await manager.start_invalidation_bus()
+        try:
+            await wait_until(lambda: manager.bus_stats["reconnects"] == 1)
+            assert not manager.memory_cache.cache
+            await wait_until(lambda: fake.subscribers.get(manager.config.INVALIDATION_CHANNEL))
+            assert manager.invalidation_bus_running
+        finally:
+            await manager.stop_invalidation_bus()
+        assert not manager.invalidation_bus_running
+
+# ==============================================================================
+# CACHE WARMING TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestCacheWarming:
+    """Test suite for registered cache warmers."""
+
+    async def test_warmers_populate_cache_with_bounded_parallelism(self):
+        """All warmers run, at most WARM_CACHE_CONCURRENCY at a time."""
+        manager = make_manager()
+        manager.config.WARM_CACHE_CONCURRENCY = 2
+        running = 0
+        peak = 0
+
+        def make_loader(index):
+            async def loader():
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.02)
+                running -= 1
+                return {f"cache:warm:{index}": index}
+            return loader
+
+        for index in range(5):
+            manager.register_warmer(f"w{index}", make_loader(index), ttl=60)
+
+        report = await manager.warm_cache()
+
+        assert peak == 2
+        assert report["keys"] == 5
+        assert report["coverage"] == 1.0
+        assert await manager.get("cache:warm:3") == 3
+
+    async def test_failing_warmer_is_reported(self):
+        """A failing warmer lowers coverage without stopping the others."""
+        manager = make_manager()
+
+        def broken():
+            raise RuntimeError("database down")
+
+        manager.register_warmer("ok", lambda: {"cache:a": 1, "cache:b": 2})
+        manager.register_warmer("broken", broken)
+
+        report = await manager.warm_cache()
+
+        assert report["coverage"] == 0.5
+        assert report["keys"] == 2
+        assert report["warmers"]["broken"]["status"] == "error"
+        assert "database down" in report["warmers"]["broken"]["error"]
+        stats = manager.get_stats()["warming"]
+        assert stats["runs"] == 1
+        assert stats["last_coverage"] == 0.5
+        assert set(stats["registered"]) == {"ok", "broken"}
+
+    async def test_concurrent_warm_calls_share_one_run(self):
+        """warm_cache called during a run joins it instead of starting another."""
+        manager = make_manager()
+        factory = SlowFactory({"cache:x": 1}, delay=0.05)
+        manager.register_warmer("slow", factory)
+
+        first, second = await asyncio.gather(manager.warm_cache(), manager.warm_cache())
+
+        assert factory.calls == 1
+        assert first is second
+
+    async def test_timeout_does_not_cancel_warm_up(self):
+        """A caller giving up on warm-up leaves it running in the background."""
+        manager = make_manager()
+        manager.register_warmer("slow", SlowFactory({"cache:x": 1}, delay=0.05))
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(manager.warm_cache(), timeout=0.01)
+
+        await wait_until(lambda: manager.warm_stats["runs"] == 1)
+        assert await manager.get("cache:x") == 1
+
+    async def test_warming_loop_rewarms(self):
+        """The warming loop re-runs warmers until stopped."""
+        manager = make_manager()
+        manager.register_warmer("counter", lambda: {"cache:x": 1})
+
+        manager.start_warming_loop(interval=0.01)
+        try:
+            await wait_until(lambda: manager.warm_stats["runs"] >= 2)
+            assert manager.warming_loop_running
+        finally:
+            await manager.stop_warming_loop()
+        assert not manager.warming_loop_running
+
+# ==============================================================================
+# HTTP RESPONSE CACHE TESTS
+# ==============================================================================
+
+def make_cached_app(route_ttls):
+    """App with a counting catalog endpoint behind the response cache."""
+    app = FastAPI()
+    app.state.calls = 0
+    app.state.catalog = ["p1", "p2"]
+    middleware = HTTPCacheMiddleware(route_ttls=route_ttls, manager=make_manager())
+
+    @app.get("/api/v1/products/")
+    async def products(category: str = "all"):
+        app.state.calls += 1
+        return {"category": category, "items": app.state.catalog}
+
+    @app.get("/api/v1/users/me")
+    async def me():
+        app.state.calls += 1
+        return {"id": "u1"}
+
+    app.add_middleware(middleware)
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    return app, middleware, client
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestHTTPResponseCache:
+    """Test suite for HTTPCacheMiddleware."""
+
+    async def test_repeat_requests_skip_endpoint(self):
+        """A stored response is replayed without calling the endpoint."""
+        app, middleware, client = make_cached_app({"/api/v1/products/": 60})
+
+        async with client:
+            first = await client.get("/api/v1/products/?category=tech")
+            second = await client.get("/api/v1/products/?category=tech")
+
+        assert app.state.calls == 1
+        assert first.headers["x-cache-status"] == "MISS"
+        assert second.headers["x-cache-status"] == "HIT"
+        assert second.json() == first.json()
+        assert second.headers["etag"] == first.headers["etag"]
+        assert second.headers["content-type"] == "application/json"
+
+    async def test_conditional_request_returns_304_from_cache(self):
+        """A matching If-None-Match gets a bodiless 304 without running the endpoint."""
+        app, middleware, client = make_cached_app({"/api/v1/products/": 60})
+
+        async with client:
+            etag = (await client.get("/api/v1/products/")).headers["etag"]
+            response = await client.get("/api/v1/products/", headers={"If-None-Match": f"W/{etag}"})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert app.state.calls == 1
+        assert middleware.get_stats()["not_modified"] == 1
+
+    async def test_etag_follows_response_body(self):
+        """Changed content gets a new ETag, so stale validators get a full response."""
+        app, middleware, client = make_cached_app({"/api/v1/products/": 0})
+
+        async with client:
+            old_etag = (await client.get("/api/v1/products/")).headers["etag"]
+            same_etag = (await client.get("/api/v1/products/")).headers["etag"]
+            app.state.catalog = ["p3"]
+            response = await client.get("/api/v1/products/", headers={"If-None-Match": old_etag})
+
+        assert same_etag == old_etag
+        assert response.status_code == 200
+        assert response.headers["etag"] != old_etag
+        assert response.json()["items"] == ["p3"]
+
+    async def test_query_and_auth_scope_partition_the_cache(self):
+        """Different query strings and credentials never share a stored response."""
+        app, middleware, client = make_cached_app({"/api/v1/products/": 60})
+
+        async with client:
+            await client.get("/api/v1/products/?category=tech&page=1")
+            reordered = await client.get("/api/v1/products/?page=1&category=tech")
+            await client.get("/api/v1/products/?category=home")
+            authed = await client.get(
+                "/api/v1/products/?category=tech&page=1",
+                headers={"Authorization": "Bearer token-a"}
+            )
+
+        assert reordered.headers["x-cache-status"] == "HIT"
+        assert authed.headers["x-cache-status"] == "MISS"
+        assert authed.headers["cache-control"].startswith("private")
+        assert app.state.calls == 3
+
+    async def test_unconfigured_routes_are_not_stored(self):
+        """Routes without a TTL run every time but still get ETags."""
+        app, middleware, client = make_cached_app({"/api/v1/products/": 60})
+
+        async with client:
+            first = await client.get("/api/v1/users/me")
+            await client.get("/api/v1/users/me")
+            no_cache = await client.get("/api/v1/products/")
+            bypass = await client.get("/api/v1/products/", headers={"Cache-Control": "no-cache"})
+
+        assert app.state.calls == 4
+        assert "etag" in first.headers
+        assert no_cache.headers["x-cache-status"] == "MISS"
+        assert bypass.headers["x-cache-status"] == "MISS"
+        assert middleware.ttl_for("/api/v1/users/me") == 0
+
+# ==============================================================================
+# BATCH OPERATION TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestBatchOperations:
+    """Test suite for get_many, set_many and @cached_batch."""
+
+    async def test_set_many_uses_one_pipeline(self):
+        """All values and their tag index entries are written in one round trip."""
+        fake = FakeRedis()
+        manager = make_manager(fake)
+
+        assert await manager.set_many({f"product:{i}": {"id": i} for i in range(20)}, ttl=60)
+
+        assert fake.pipelines == 1
+        assert fake.store[f"{manager.config.TAG_PREFIX}product:7"] == {"product:7"}
+        reader = make_manager(fake)
+        assert await reader.get("product:7") == {"id": 7}
+
+    async def test_get_many_sends_only_memory_misses_to_redis(self):
+        """Keys fresh in memory are served locally; the rest share one MGET."""
+        fake = FakeRedis()
+        writer = make_manager(fake)
+        await writer.set_many({f"product:{i}": i for i in range(5)}, ttl=60)
+
+        reader = make_manager(fake)
+        await reader.set("product:0", 0, ttl=60, use_memory_cache=True)
+        fake.mgets.clear()
+
+        values = await reader.get_many(["product:0", "product:1", "product:9", "product:2"])
+
+        assert values == {"product:0": 0, "product:1": 1, "product:2": 2}
+        assert fake.mgets == [["product:1", "product:9", "product:2"]]
+        assert reader.memory_cache.get("product:1") is not None
+
+    async def test_get_many_batches_large_requests(self):
+        """Misses are fetched in MGET_BATCH_SIZE chunks."""
+        fake = FakeRedis()
+        manager = make_manager(fake)
+        manager.config.MGET_BATCH_SIZE = 2
+
+        await manager.get_many([f"cache:{i}" for i in range(5)])
+
+        assert [len(batch) for batch in fake.mgets] == [2, 2, 1]
+
+    async def test_get_many_skips_stale_entries(self):
+        """Entries past their soft expiry are misses, as with get()."""
+        manager = make_manager()
+        seed_entry(manager, "cache:stale", "old", fresh_for=-1)
+        seed_entry(manager, "cache:fresh", "new", fresh_for=60)
+
+        assert await manager.get_many(["cache:stale", "cache:fresh"]) == {"cache:fresh": "new"}
+
+    async def test_cached_batch_loads_only_missing_ids(self, monkeypatch):
+        """The wrapped function runs once, for the ids not already cached."""
+        manager = make_manager(FakeRedis())
+        monkeypatch.setattr(caching, "cache_manager", manager)
+        calls = []
+
+        @cached_batch(ttl=60, key_builder=lambda product_id: f"product:{product_id}:card")
+        async def get_cards(product_ids):
+            calls.append(list(product_ids))
+            return {product_id: {"id": product_id} for product_id in product_ids if product_id != "gone"}
+
+        first = await get_cards(["a", "b"])
+        second = await get_cards(["c", "b", "a", "gone"])
+
+        assert first == {"a": {"id": "a"}, "b": {"id": "b"}}
+        assert list(second) == ["c", "b", "a"]
+        assert calls == [["a", "b"], ["c", "gone"]]
+        assert await manager.get("product:c:card") == {"id": "c"}
+
+# ==============================================================================
+# OBSERVABILITY TESTS
+# ==============================================================================
+
+def metric_value(name, **labels):
+    """Current value of a sample in the application metrics registry."""
+    return registry.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestCacheObservability:
+    """Test suite for per-prefix cache instrumentation."""
+
+    async def test_lookups_counted_per_prefix_and_tier(self):
+        """A memory miss answered by Redis counts once in each tier."""
+        fake = FakeRedis()
+        await make_manager(fake).set("product:p1", {"id": "p1"}, ttl=60)
+        manager = make_manager(fake)
+        labels = {"cache_name": "cache_manager", "prefix": "product"}
+        redis_hits_before = metric_value("cache_hits_total", tier="redis", **labels)
+
+        await manager.get("product:p1")
+        await manager.get("product:p1")
+        await manager.get("user:u1:profile")
+
+        product = manager.get_stats()["prefixes"]["product"]
+        assert product["memory_hits"] == 1
+        assert product["memory_misses"] == 1
+        assert product["redis_hits"] == 1
+        assert product["memory_hit_rate"] == 0.5
+        assert manager.prefix_stats["user"]["redis_misses"] == 1
+        assert metric_value("cache_hits_total", tier="redis", **labels) == redis_hits_before + 1
+
+    async def test_unknown_prefixes_grouped_as_other(self):
+        """Keys outside METRIC_PREFIXES share the "other" label."""
+        manager = make_manager()
+
+        await manager.get("a1b2c3")
+        await manager.get("tmp:x")
+
+        assert manager.prefix_stats["other"]["memory_misses"] == 2
+
+    async def test_redis_latency_recorded(self):
+        """Redis round trips are timed per operation and prefix."""
+        manager = make_manager(FakeRedis())
+        labels = {"operation": "mget", "prefix": "search"}
+        before = metric_value("cache_redis_latency_seconds_count", **labels)
+
+        await manager.set("search:q1", [1], ttl=60)
+        await manager.get_many(["search:q2", "search:q3"])
+
+        search = manager.get_prefix_stats()["search"]
+        assert search["redis_calls"] == 2
+        assert search["redis_misses"] == 2
+        assert metric_value("cache_redis_latency_seconds_count", **labels) == before + 1
+
+    async def test_capacity_evictions_and_memory_usage_by_prefix(self):
+        """Evictions are attributed to the evicted key's prefix; usage is reported in bytes."""
+        config = CacheConfig()
+        config.MEMORY_CACHE_MAX_BYTES = 4000
+        manager = CacheManager(config)
+
+        for i in range(20):
+            await manager.set(f"search:q{i}", "x" * 500, ttl=60)
+        await manager.set("product:p1", "y", ttl=60)
+
+        usage = manager.memory_usage(max_age=0)
+        assert manager.prefix_stats["search"]["evictions"] > 0
+        assert 0 < usage["search"]["bytes"] <= 4000
+        assert usage["product"]["entries"] == 1
@@ -0,0 +1,171 @@
+"""
+aclue Counter Service Unit Test Suite
+
+Unit tests for the coalescing CounterAggregator used for session,
+product and gift-link counters.
+
+Test Coverage:
+- Repeated increments coalesce into one delta per counter
+- Failed flushes are retried with no increments lost
+- Lost updates are counted on overflow and on shutdown
+- Unsupported counters are rejected
+- Flush latency and coalescing statistics
+- The pending keys gauge following new and flushed keys
+"""
+
+# ==============================================================================
+# IMPORTS AND DEPENDENCIES
+# ==============================================================================
+
+import uuid
+
+import pytest
+
+from app.monitoring.metrics import registry
+from app.services.counter_service import CounterAggregator
+
+# ==============================================================================
+# TEST HELPERS
+# ==============================================================================
+
+class RecordingFlusher:
+    """Fake delta flusher that records batches and can be made to fail."""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+        self.unmatched = 0
+
+    async def __call__(self, deltas):
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        self.batches.append(deltas)
+        return {"applied": len(deltas), "unmatched": self.unmatched}
+
+# ==============================================================================
+# COUNTER AGGREGATOR TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestCounterAggregator:
+    """Test suite for CounterAggregator."""
+
+    async def test_increments_coalesce_into_single_delta(self):
+        """N increments of one counter are flushed as one delta in one call."""
+        flusher = RecordingFlusher()
+        aggregator = CounterAggregator(flusher=flusher)
+        product_id = str(uuid.uuid4())
+
+        for _ in range(25):
+            aggregator.incr("products", product_id, "view_count")
+        aggregator.incr("products", product_id, "click_count", 3)
+
+        assert await aggregator.flush() is True
+        assert len(flusher.batches) == 1
+        deltas = {(d["table"], d["key"], d["column"]): d["delta"] for d in flusher.batches[0]}
+        assert deltas == {
+            ("products", product_id, "view_count"): 25,
+            ("products", product_id, "click_count"): 3,
+        }
+
+        stats = aggregator.get_stats()
+        assert stats["flushed_increments"] == 28
+        assert stats["coalescing_ratio"] == 14.0
+        assert stats["pending_keys"] == 0
+
+    async def test_failed_flush_is_retried(self):
+        """A failed batch is merged back and applied by the next flush."""
+        flusher = RecordingFlusher()
+        aggregator = CounterAggregator(flusher=flusher)
+
+        aggregator.incr("session_analytics", "sess_1", "affiliate_clicks")
+        flusher.fail = True
+        assert await aggregator.flush() is False
+
+        aggregator.incr("session_analytics", "sess_1", "affiliate_clicks")
+        flusher.fail = False
+        assert await aggregator.flush() is True
+
+        assert flusher.batches[0] == [{
+            "table": "session_analytics",
+            "key": "sess_1",
+            "column": "affiliate_clicks",
+            "delta": 2
+        }]
+        assert aggregator.stats["failed_flushes"] == 1
+        assert aggregator.stats["lost_updates"] == 0
+
+    async def test_overflow_counts_lost_updates(self):
+        """Increments for new counters beyond max_keys are counted as lost."""
+        aggregator = CounterAggregator(flusher=RecordingFlusher(), max_keys=1)
+
+        aggregator.incr("products", "a", "view_count")
+        aggregator.incr("products", "a", "view_count")
+        aggregator.incr("products", "b", "view_count", 4)
+
+        assert aggregator.get_stats()["pending_keys"] == 1
+        assert aggregator.stats["lost_updates"] == 4
+
+    async def test_pending_keys_gauge_tracks_new_keys(self):
+        """The gauge rises as keys are added, not only after a flush."""
+        aggregator = CounterAggregator(flusher=RecordingFlusher())
+
+        aggregator.incr("products", "a", "view_count")
+        aggregator.incr("products", "a", "view_count")
+        aggregator.incr("products", "b", "click_count")
+        assert registry.get_sample_value("counter_pending_keys") == 2
+
+        await aggregator.flush()
+        assert registry.get_sample_value("counter_pending_keys") == 0
+
+    async def test_stop_flushes_pending_and_counts_failures_as_lost(self):
+        """Shutdown applies pending deltas; unflushable ones are reported lost."""
+        flusher = RecordingFlusher()
+        aggregator = CounterAggregator(flusher=flusher, flush_interval=10)
+        await aggregator.start()
+        assert aggregator.running
+
+        aggregator.incr("swipe_sessions", str(uuid.uuid4()), "total_swipes", 5)
+        await aggregator.stop()
+        assert not aggregator.running
+        assert len(flusher.batches) == 1
+
+        flusher.fail = True
+        await aggregator.start()
+        aggregator.incr("gift_links", str(uuid.uuid4()), "view_count", 2)
+        await aggregator.stop()
+        assert aggregator.stats["lost_updates"] == 2
+
+    async def test_unmatched_rows_are_reported(self):
+        """Deltas the database could not match to a row are counted."""
+        flusher = RecordingFlusher()
+        flusher.unmatched = 3
+        aggregator = CounterAggregator(flusher=flusher)
+
+        aggregator.incr("gift_links", "missing", "click_count", 3)
+        await aggregator.flush()
+
+        assert aggregator.stats["unmatched"] == 3
+        assert aggregator.stats["lost_updates"] == 3
+
+    async def test_rejects_unsupported_counter(self):
+        """Only whitelisted (table, column) pairs can be incremented."""
+        aggregator = CounterAggregator(flusher=RecordingFlusher())
+
+        with pytest.raises(ValueError):
+            aggregator.incr("users", "u1", "is_admin")
+
+    async def test_flush_latency_stats(self):
+        """Flush latency is tracked per successful flush."""
+        aggregator = CounterAggregator(flusher=RecordingFlusher())
+
+        aggregator.incr("products", "p1", "click_count")
+        await aggregator.flush()
+        aggregator.incr("products", "p1", "click_count")
+        await aggregator.flush()
+
+        stats = aggregator.get_stats()
+        assert stats["flushes"] == 2
+        assert stats["avg_flush_ms"] >= 0.0
+        assert stats["max_flush_ms"] >= stats["last_flush_ms"]
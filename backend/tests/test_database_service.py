@@ -45,6 +45,7 @@ from decimal import Decimal
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 
 # Application imports
+from app.core.caching import CacheInvalidator
 from app.services.database_service import (
     DatabaseService, 
     DatabaseServiceError,
@@ -58,6 +59,65 @@ from tests.conftest import (
     assert_valid_uuid, assert_datetime_format, create_test_user_with_preferences
 )
 
+# ==============================================================================
+# TEST HELPERS
+# ==============================================================================
+
+def build_daily_rollups(swipes: List[Dict], clicks: List[Dict], views: List[Dict]) -> List[Dict]:
+    """
+    Aggregate raw events into user_daily_activity rows.
+    
+    Mirrors the trg_rollup_* triggers in
+    database/08_user_daily_activity_rollups.sql: one row per UTC day, and
+    swipes count only when their product has a category.
+    """
+    days: Dict[str, Dict[str, Any]] = {}
+    
+    def day(timestamp: str) -> Dict[str, Any]:
+        return days.setdefault(timestamp[:10], {
+            'activity_date': timestamp[:10], 'swipes': 0, 'right_swipes': 0, 'super_likes': 0,
+            'preference_strength_sum': 0.0, 'category_stats': {},
+            'clicks': 0, 'conversions': 0, 'revenue': 0.0, 'network_stats': {},
+            'views': 0, 'view_duration_sum': 0, 'view_duration_count': 0,
+            'view_sources': {}, 'interaction_types': {}
+        })
+    
+    for swipe in swipes:
+        category = ((swipe.get('products') or {}).get('categories') or {}).get('name')
+        if category is None:
+            continue
+        row = day(swipe['swipe_timestamp'])
+        row['swipes'] += 1
+        row['right_swipes'] += swipe['swipe_direction'] == 'right'
+        row['super_likes'] += swipe['swipe_direction'] == 'up'
+        row['preference_strength_sum'] += swipe.get('preference_strength', 0.5)
+        stats = row['category_stats'].setdefault(category, {'total': 0, 'likes': 0})
+        stats['total'] += 1
+        stats['likes'] += swipe['swipe_direction'] in ('right', 'up')
+    
+    for click in clicks:
+        row = day(click['click_timestamp'])
+        converted = 1 if click.get('is_converted') else 0
+        row['clicks'] += 1
+        row['conversions'] += converted
+        row['revenue'] += click.get('actual_commission') or 0
+        stats = row['network_stats'].setdefault(click.get('affiliate_network') or 'unknown', {'clicks': 0, 'conversions': 0})
+        stats['clicks'] += 1
+        stats['conversions'] += converted
+    
+    for view in views:
+        row = day(view['view_timestamp'])
+        duration = view.get('view_duration_seconds') or 0
+        row['views'] += 1
+        row['view_duration_sum'] += duration if duration > 0 else 0
+        row['view_duration_count'] += 1 if duration > 0 else 0
+        source = view.get('view_source') or 'unknown'
+        interaction = view.get('interaction_type') or 'impression'
+        row['view_sources'][source] = row['view_sources'].get(source, 0) + 1
+        row['interaction_types'][interaction] = row['interaction_types'].get(interaction, 0) + 1
+    
+    return list(days.values())
+
 # ==============================================================================
 # DATABASE SERVICE INITIALIZATION TESTS
 # ==============================================================================
@@ -476,6 +536,87 @@ class TestSwipeInteractions:
                 direction='right'
             )
 
+    async def test_enqueue_swipe_falls_back_when_write_behind_disabled(self):
+        """
+        Test that enqueue writes synchronously with the client ID when no buffer runs.
+        """
+        service = DatabaseService()
+        client_id = str(uuid.uuid4())
+
+        mock_client = Mock()
+        service._service_client = mock_client
+        mock_response = Mock()
+        mock_response.data = [{'id': client_id}]
+        mock_client.table.return_value.insert.return_value.execute.return_value = mock_response
+
+        interaction_id, queued = await service.enqueue_swipe_interaction(
+            user_id=str(uuid.uuid4()),
+            session_id=str(uuid.uuid4()),
+            product_id=str(uuid.uuid4()),
+            direction='right',
+            interaction_id=client_id
+        )
+
+        assert interaction_id == client_id
+        assert queued is False
+        insert_data = mock_client.table.return_value.insert.call_args[0][0]
+        assert insert_data['id'] == client_id
+
+    async def test_enqueue_swipe_rejects_invalid_client_id(self):
+        """
+        Test that client-generated IDs must be UUIDs.
+        """
+        service = DatabaseService()
+
+        with pytest.raises(ValidationError, match="Invalid interaction id"):
+            await service.enqueue_swipe_interaction(
+                user_id=str(uuid.uuid4()),
+                session_id=str(uuid.uuid4()),
+                product_id=str(uuid.uuid4()),
+                interaction_id="swipe_1704067200123"
+            )
+
+    async def test_write_swipe_batch_aggregates_session_counts(self):
+        """
+        Test that a batch is one multi-row upsert plus one RPC per session.
+        """
+        service = DatabaseService()
+        session_a = str(uuid.uuid4())
+        session_b = str(uuid.uuid4())
+        records = [
+            service._build_swipe_record(
+                user_id=str(uuid.uuid4()),
+                session_id=session,
+                product_id=str(uuid.uuid4()),
+                category_id=None,
+                direction='right',
+                time_spent_seconds=None,
+                interaction_context=None,
+                preference_strength=0.8
+            )
+            for session in [session_a, session_a, session_a, session_b]
+        ]
+
+        mock_client = Mock()
+        service._service_client = mock_client
+        mock_response = Mock()
+        mock_response.data = records
+        mock_client.table.return_value.upsert.return_value.execute.return_value = mock_response
+
+        await service._write_swipe_batch(records)
+
+        upsert = mock_client.table.return_value.upsert
+        upsert.assert_called_once_with(records, on_conflict='id', ignore_duplicates=True)
+        assert mock_client.rpc.call_count == 2
+        mock_client.rpc.assert_any_call(
+            'increment_session_swipes_by',
+            {'session_id_param': session_a, 'increment_param': 3}
+        )
+        mock_client.rpc.assert_any_call(
+            'increment_session_swipes_by',
+            {'session_id_param': session_b, 'increment_param': 1}
+        )
+
 # ==============================================================================
 # USER PREFERENCES TESTS
 # ==============================================================================
@@ -563,18 +704,13 @@ class TestUserPreferences:
         # Validate no preferences found
         assert result is None
     
-    async def test_calculate_user_preferences_with_interactions(self):
+    async def test_calculate_user_preferences_reconciles_in_database(self):
         """
-        Test preference calculation with substantial interaction data.
+        Test that preference calculation is one reconcile RPC.
         
-        Validates that the ML preference calculation algorithm correctly
-        processes swipe interaction history to generate accurate preferences.
-        
-        ML Algorithm Validation:
-        - Category preference calculation from swipe ratios
-        - Brand scoring based on positive/negative interactions
-        - Price range determination from liked products
-        - Engagement metrics and confidence calculations
+        Validates that the full recalculation runs in the database over the
+        user's whole swipe history instead of reading a window of swipes
+        into Python and upserting the result over concurrent increments.
         """
         service = DatabaseService()
         user_data = UserFactory.build()
@@ -587,165 +723,52 @@ class TestUserPreferences:
         # Mock user existence check
         service.get_user_by_id = AsyncMock(return_value=user_data)
         
-        # Mock interaction data with clear preference patterns
-        mock_interactions = [
-            # Electronics - strong positive preference
-            {
-                'swipe_direction': 'right',
-                'product_id': str(uuid.uuid4()),
-                'preference_strength': 0.8,
-                'products': {
-                    'title': 'iPhone 15 Pro',
-                    'price_min': 999,
-                    'price_max': 1199,
-                    'brand': 'Apple',
-                    'categories': {'name': 'Electronics'}
-                }
-            },
-            {
-                'swipe_direction': 'right',
-                'product_id': str(uuid.uuid4()),
-                'preference_strength': 0.9,
-                'products': {
-                    'title': 'MacBook Pro',
-                    'price_min': 1299,
-                    'price_max': 1599,
-                    'brand': 'Apple',
-                    'categories': {'name': 'Electronics'}
-                }
-            },
-            # Fashion - mixed signals
-            {
-                'swipe_direction': 'left',
-                'product_id': str(uuid.uuid4()),
-                'preference_strength': 0.2,
-                'products': {
-                    'title': 'Designer Handbag',
-                    'price_min': 500,
-                    'price_max': 800,
-                    'brand': 'Gucci',
-                    'categories': {'name': 'Fashion'}
-                }
-            },
-            {
-                'swipe_direction': 'right',
-                'product_id': str(uuid.uuid4()),
-                'preference_strength': 0.7,
-                'products': {
-                    'title': 'Nike Running Shoes',
-                    'price_min': 120,
-                    'price_max': 180,
-                    'brand': 'Nike',
-                    'categories': {'name': 'Fashion'}
-                }
-            }
-        ]
-        
-        # Mock database responses
-        mock_interactions_response = Mock()
-        mock_interactions_response.data = mock_interactions
-        mock_client.table.return_value.select.return_value.eq.return_value.order.return_value.limit.return_value.execute.return_value = mock_interactions_response
-        
-        # Mock preference storage
-        mock_storage_response = Mock()
-        mock_storage_response.data = [{'user_id': user_id}]
-        mock_client.table.return_value.upsert.return_value.execute.return_value = mock_storage_response
+        # Row returned by reconcile_user_preferences for a long-time user
+        reconciled = {
+            'user_id': user_id,
+            'category_preferences': {'Electronics': 0.8, 'Fashion': 0.5},
+            'price_range': {'min': 96, 'max': 1558, 'avg': 604, 'currency': 'GBP'},
+            'liked_brands': ['Apple'],
+            'brand_scores': {'Apple': 0.9},
+            'total_swipes': 2500,
+            'right_swipes': 1500,
+            'left_swipes': 900,
+            'super_likes': 100,
+            'engagement_rate': 0.64,
+            'data_quality_score': 1.0,
+            'preference_counters': {'total': 2500, 'right': 1500, 'left': 900, 'up': 100},
+            'last_calculated': datetime.utcnow().isoformat()
+        }
+        mock_client.rpc.return_value.execute.return_value = Mock(data=reconciled)
         
         # Test preference calculation
         preferences = await service.calculate_user_preferences(user_id)
         
-        # Validate preference structure
-        assert preferences['user_id'] == user_id
-        assert 'category_preferences' in preferences
-        assert 'brand_scores' in preferences
-        assert 'price_range' in preferences
-        assert 'total_swipes' in preferences
-        assert 'engagement_rate' in preferences
-        assert 'data_quality_score' in preferences
-        
-        # Validate ML calculations
-        assert preferences['total_swipes'] == 4
-        assert preferences['right_swipes'] == 3
-        assert preferences['left_swipes'] == 1
-        
-        # Validate category preferences (Electronics should be higher)
-        category_prefs = preferences['category_preferences']
-        assert 'Electronics' in category_prefs
-        assert 'Fashion' in category_prefs
-        assert category_prefs['Electronics'] > category_prefs['Fashion']
-        assert category_prefs['Electronics'] == 1.0  # 2/2 right swipes
-        assert category_prefs['Fashion'] == 0.5  # 1/2 right swipes
-        
-        # Validate engagement rate calculation
-        expected_engagement = 3 / 4  # 3 right swipes out of 4 total
-        assert abs(preferences['engagement_rate'] - expected_engagement) < 0.01
-        
-        # Validate price range calculation
-        price_range = preferences['price_range']
-        assert price_range['currency'] == 'GBP'
-        assert price_range['min'] >= 0
-        assert price_range['max'] > price_range['min']
-        
-        # Validate brand analysis
-        liked_brands = preferences['liked_brands']
-        brand_scores = preferences['brand_scores']
-        # Apple should be liked (2 right swipes)
-        # Nike should be liked (1 right swipe)
-        # Gucci should have low score (1 left swipe)
-        
-        # Validate data quality score
-        assert 0.0 <= preferences['data_quality_score'] <= 1.0
+        # All-time counters come back unchanged (no 1000-swipe window)
+        assert preferences == reconciled
+        assert preferences['total_swipes'] == 2500
+        mock_client.rpc.assert_called_once_with(
+            'reconcile_user_preferences', {'user_id_param': user_id}
+        )
         
-        # Validate database operations
-        mock_client.table.assert_any_call('swipe_interactions')
-        mock_client.table.assert_any_call('user_preferences')
+        # No read-then-upsert from the application
+        mock_client.table.assert_not_called()
     
-    async def test_calculate_user_preferences_no_data(self):
+    async def test_calculate_user_preferences_requires_reconciled_row(self):
         """
-        Test preference calculation for user with no interaction data.
-        
-        Validates that new users receive sensible default preferences
-        until sufficient data is available for ML analysis.
+        Test that an empty reconcile result is reported as a failure.
         """
         service = DatabaseService()
         user_data = UserFactory.build()
-        user_id = user_data['id']
         
         # Mock service client
         mock_client = Mock()
         service._service_client = mock_client
-        
-        # Mock user existence check
         service.get_user_by_id = AsyncMock(return_value=user_data)
+        mock_client.rpc.return_value.execute.return_value = Mock(data=None)
         
-        # Mock empty interactions response
-        mock_response = Mock()
-        mock_response.data = []
-        mock_client.table.return_value.select.return_value.eq.return_value.order.return_value.limit.return_value.execute.return_value = mock_response
-        
-        # Mock preference storage
-        mock_storage_response = Mock()
-        mock_storage_response.data = [{'user_id': user_id}]
-        mock_client.table.return_value.upsert.return_value.execute.return_value = mock_storage_response
-        
-        # Test preference calculation
-        preferences = await service.calculate_user_preferences(user_id)
-        
-        # Validate default preferences
-        assert preferences['user_id'] == user_id
-        assert preferences['total_swipes'] == 0
-        assert preferences['engagement_rate'] == 0.0
-        assert preferences['data_quality_score'] == 0.0
-        
-        # Validate empty collections
-        assert preferences['category_preferences'] == {}
-        assert preferences['liked_brands'] == []
-        assert preferences['brand_scores'] == {}
-        
-        # Validate default price range
-        assert preferences['price_range']['min'] == 0
-        assert preferences['price_range']['max'] == 1000
-        assert preferences['price_range']['currency'] == 'GBP'
+        with pytest.raises(DatabaseServiceError, match="Failed to calculate user preferences"):
+            await service.calculate_user_preferences(user_data['id'])
     
     async def test_calculate_user_preferences_user_not_found(self):
         """
@@ -764,6 +787,84 @@ class TestUserPreferences:
         with pytest.raises(UserNotFoundError, match=f"User {user_id} not found"):
             await service.calculate_user_preferences(user_id)
 
+    async def test_current_preferences_served_without_recalculation(self):
+        """
+        Test that fresh incrementally maintained preferences skip recalculation.
+        """
+        service = DatabaseService()
+        stored = {
+            'user_id': str(uuid.uuid4()),
+            'category_preferences': {'Electronics': 0.9},
+            'preference_counters': {'total': 12},
+            'last_calculated': datetime.utcnow().isoformat()
+        }
+        service.get_user_preferences = AsyncMock(return_value=stored)
+        service.calculate_user_preferences = AsyncMock()
+        
+        result = await service.get_current_user_preferences(stored['user_id'])
+        await asyncio.sleep(0)
+        
+        assert result == stored
+        service.calculate_user_preferences.assert_not_called()
+    
+    async def test_current_preferences_reconciled_in_background_when_stale(self):
+        """
+        Test that stale or counter-less rows are returned and reconciled once.
+        """
+        service = DatabaseService()
+        user_id = str(uuid.uuid4())
+        stale = {
+            'user_id': user_id,
+            'preference_counters': {'total': 12},
+            'last_calculated': (datetime.utcnow() - timedelta(days=30)).isoformat() + 'Z'
+        }
+        service.get_user_preferences = AsyncMock(return_value=stale)
+        service.calculate_user_preferences = AsyncMock(return_value=stale)
+        
+        results = await asyncio.gather(
+            service.get_current_user_preferences(user_id),
+            service.get_current_user_preferences(user_id)
+        )
+        await asyncio.sleep(0)
+        
+        assert results == [stale, stale]
+        service.calculate_user_preferences.assert_called_once_with(user_id)
+        assert service._reconcile_tasks == set()
+        
+        # Rows written before incremental counters existed also need reconciling
+        assert service._preferences_need_reconcile({'last_calculated': datetime.utcnow().isoformat()})
+    
+    async def test_preference_reconcile_loop_runs_until_stopped(self):
+        """
+        Test that the periodic job reconciles stale rows and stops at shutdown.
+        """
+        service = DatabaseService()
+        service.reconcile_stale_user_preferences = AsyncMock(side_effect=[Exception("timeout")] + [3] * 100)
+        
+        service.start_preference_reconcile_loop(interval=0.01, limit=25)
+        await asyncio.sleep(0.05)
+        await service.stop_preference_reconcile_loop()
+        calls = service.reconcile_stale_user_preferences.await_count
+        await asyncio.sleep(0.02)
+        
+        assert calls >= 2  # A failed run does not stop the loop
+        service.reconcile_stale_user_preferences.assert_awaited_with(limit=25)
+        assert service.reconcile_stale_user_preferences.await_count == calls
+        assert service._reconcile_loop_task is None
+    
+    async def test_current_preferences_calculated_inline_for_new_user(self):
+        """
+        Test that users without stored preferences get a full calculation.
+        """
+        service = DatabaseService()
+        calculated = {'user_id': str(uuid.uuid4()), 'total_swipes': 0}
+        service.get_user_preferences = AsyncMock(return_value=None)
+        service.calculate_user_preferences = AsyncMock(return_value=calculated)
+        
+        result = await service.get_current_user_preferences(calculated['user_id'])
+        
+        assert result == calculated
+
 # ==============================================================================
 # AFFILIATE TRACKING TESTS
 # ==============================================================================
@@ -947,6 +1048,87 @@ class TestAffiliateTracking:
             network = service._detect_affiliate_network(url)
             assert network == 'unknown', f"Should detect unknown for URL: {url}"
 
+    async def test_session_affiliate_click_uses_atomic_increment(self):
+        """
+        Test the session affiliate counter is incremented without a read.
+        
+        Validates that the increment is a single atomic RPC when the counter
+        aggregator is stopped, and is coalesced in memory when it is running.
+        """
+        service = DatabaseService()
+        mock_client = Mock()
+        mock_client.rpc.return_value.execute.return_value = Mock(data={"applied": 1, "unmatched": 0})
+        
+        with patch('app.services.database_service.counter_aggregator') as aggregator:
+            aggregator.running = False
+            await service._update_session_affiliate_click("sess_1", mock_client)
+            
+            mock_client.table.assert_not_called()
+            rpc_name, params = mock_client.rpc.call_args[0]
+            assert rpc_name == "apply_counter_deltas"
+            assert params["deltas"][0]["key"] == "sess_1"
+            
+            aggregator.running = True
+            mock_client.rpc.reset_mock()
+            await service._update_session_affiliate_click("sess_1", mock_client)
+            
+            mock_client.rpc.assert_not_called()
+            aggregator.incr.assert_called_once_with("session_analytics", "sess_1", "affiliate_clicks")
+    
+    async def test_product_metadata_cache_avoids_repeat_reads(self):
+        """
+        Test product metadata is read once and then served from cache.
+        
+        Validates read-through caching, negative caching of unknown ids
+        and invalidation through CacheInvalidator product hooks.
+        """
+        service = DatabaseService()
+        product_id = str(uuid.uuid4())
+        missing_id = str(uuid.uuid4())
+        
+        mock_client = Mock()
+        service._anon_client = mock_client
+        query = mock_client.table.return_value.select.return_value.eq.return_value.eq.return_value
+        query.execute.return_value = Mock(data=[{'id': product_id, 'price_min': 10.0, 'commission_rate': 0.1}])
+        
+        for _ in range(3):
+            product = await service._get_product_for_affiliate_click(product_id)
+            assert product['id'] == product_id
+        assert query.execute.call_count == 1
+        
+        query.execute.return_value = Mock(data=[])
+        assert await service._get_product_for_affiliate_click(missing_id) is None
+        assert await service._get_product_for_affiliate_click(missing_id) is None
+        assert query.execute.call_count == 2
+        
+        stats = service.get_product_cache_stats()
+        assert stats['hits'] == 2
+        assert stats['negative_hits'] == 1
+        assert stats['fetches'] == 2
+        assert stats['hit_rate'] == 0.6
+        
+        with patch.object(CacheInvalidator, 'product_invalidation_hooks', [service.invalidate_product_metadata]):
+            await CacheInvalidator.invalidate_product_cache(product_id)
+        assert await service._get_product_for_affiliate_click(product_id) is None
+        assert query.execute.call_count == 3
+    
+    async def test_product_metadata_cache_ignores_stale_fetch(self):
+        """
+        Test a fetch racing with an invalidation does not repopulate the cache.
+        """
+        service = DatabaseService()
+        product_id = str(uuid.uuid4())
+        
+        async def fetch_then_invalidate(builder, table):
+            service.invalidate_product_metadata(product_id)
+            return Mock(data=[{'id': product_id, 'price_min': 10.0}])
+        
+        service._anon_client = Mock()
+        service._execute = fetch_then_invalidate
+        
+        assert await service._get_product_for_affiliate_click(product_id) is not None
+        assert service.get_product_cache_stats()['size'] == 0
+
 # ==============================================================================
 # PRODUCT RECOMMENDATION TESTS
 # ==============================================================================
@@ -1280,6 +1462,142 @@ class TestPerformanceAndAnalytics:
         # Validate engagement score calculation
         assert 0.0 <= result['engagement_score'] <= 1.0
     
+    async def test_user_analytics_rollups_match_raw_events(self):
+        """
+        Test the rollup read path produces the same summary as raw events.
+        
+        Validates that per-day rollup rows are merged into analytics
+        identical to processing the underlying raw rows.
+        """
+        service = DatabaseService()
+        user_data = UserFactory.build()
+        
+        swipes = [
+            {'swipe_direction': 'right', 'preference_strength': 0.8, 'products': {'categories': {'name': 'Electronics'}}},
+            {'swipe_direction': 'up', 'preference_strength': 0.9, 'products': {'categories': {'name': 'Electronics'}}},
+            {'swipe_direction': 'left', 'preference_strength': 0.3, 'products': {'categories': {'name': 'Fashion'}}}
+        ]
+        clicks = [
+            {'affiliate_network': 'amazon', 'is_converted': True, 'actual_commission': 8.5},
+            {'affiliate_network': 'amazon', 'is_converted': False, 'actual_commission': None}
+        ]
+        views = [
+            {'view_source': 'recommendations', 'view_duration_seconds': 25, 'interaction_type': 'click'},
+            {'view_source': 'swipe', 'view_duration_seconds': None, 'interaction_type': 'impression'},
+            {'view_source': 'swipe', 'view_duration_seconds': 10, 'interaction_type': 'impression'}
+        ]
+        rollups = [
+            {
+                'activity_date': '2026-10-15', 'swipes': 2, 'right_swipes': 1, 'super_likes': 1,
+                'preference_strength_sum': 1.7,
+                'category_stats': {'Electronics': {'total': 2, 'likes': 2}},
+                'clicks': 1, 'conversions': 1, 'revenue': 8.5,
+                'network_stats': {'amazon': {'clicks': 1, 'conversions': 1}},
+                'views': 1, 'view_duration_sum': 25, 'view_duration_count': 1,
+                'view_sources': {'recommendations': 1}, 'interaction_types': {'click': 1}
+            },
+            {
+                'activity_date': '2026-10-16', 'swipes': 1, 'right_swipes': 0, 'super_likes': 0,
+                'preference_strength_sum': 0.3,
+                'category_stats': {'Fashion': {'total': 1, 'likes': 0}},
+                'clicks': 1, 'conversions': 0, 'revenue': 0,
+                'network_stats': {'amazon': {'clicks': 1, 'conversions': 0}},
+                'views': 2, 'view_duration_sum': 10, 'view_duration_count': 1,
+                'view_sources': {'swipe': 2}, 'interaction_types': {'impression': 2}
+            }
+        ]
+        
+        swipe_rollup, click_rollup, view_rollup = service._process_rollup_analytics(rollups)
+        assert swipe_rollup == service._process_swipe_analytics(swipes)
+        assert click_rollup == service._process_click_analytics(clicks)
+        assert view_rollup == service._process_view_analytics(views)
+        assert service._process_rollup_analytics([]) == (
+            service._process_swipe_analytics([]),
+            service._process_click_analytics([]),
+            service._process_view_analytics([])
+        )
+        
+        # Flag-gated read path queries only the rollup table
+        mock_client = Mock()
+        query = mock_client.table.return_value.select.return_value.eq.return_value.gte.return_value
+        query.execute.return_value = Mock(data=rollups)
+        service._service_client = mock_client
+        service.get_user_by_id = AsyncMock(return_value=user_data)
+        
+        with patch('app.services.database_service.settings') as mock_settings:
+            mock_settings.USER_ANALYTICS_ROLLUPS_ENABLED = True
+            result = await service.get_user_analytics_summary(user_data['id'], days=90)
+        
+        mock_client.table.assert_called_once_with('user_daily_activity')
+        assert result['swipe_behaviour']['total_swipes'] == 3
+        assert result['click_behaviour']['revenue_generated'] == 8.5
+    
+    async def test_user_analytics_rollup_and_raw_paths_agree(self):
+        """
+        Test both analytics read paths summarise the same events identically.
+        
+        Validates that the same events produce the same summary whether they
+        are read raw or through daily rollups: uncategorised swipes are
+        excluded by both, and both queries start at the same UTC midnight.
+        """
+        service = DatabaseService()
+        user_data = UserFactory.build()
+        
+        swipes = [
+            {'swipe_direction': 'right', 'preference_strength': 0.8, 'swipe_timestamp': '2026-10-15T08:00:00',
+             'products': {'categories': {'name': 'Electronics'}}},
+            {'swipe_direction': 'up', 'preference_strength': 0.9, 'swipe_timestamp': '2026-10-15T21:30:00',
+             'products': {'categories': {'name': 'Electronics'}}},
+            {'swipe_direction': 'left', 'preference_strength': 0.3, 'swipe_timestamp': '2026-10-16T12:00:00',
+             'products': {'categories': {'name': 'Fashion'}}},
+            {'swipe_direction': 'right', 'preference_strength': 0.7, 'swipe_timestamp': '2026-10-16T13:00:00',
+             'products': {'categories': None}}
+        ]
+        clicks = [
+            {'affiliate_network': 'amazon', 'is_converted': True, 'actual_commission': 8.5,
+             'click_timestamp': '2026-10-15T09:00:00'},
+            {'affiliate_network': 'awin', 'is_converted': False, 'actual_commission': None,
+             'click_timestamp': '2026-10-16T10:00:00'}
+        ]
+        views = [
+            {'view_source': 'recommendations', 'view_duration_seconds': 25, 'interaction_type': 'click',
+             'view_timestamp': '2026-10-15T09:00:00'},
+            {'view_source': 'swipe', 'view_duration_seconds': None, 'interaction_type': 'impression',
+             'view_timestamp': '2026-10-16T10:00:00'}
+        ]
+        
+        # products!inner(categories!inner(...)) drops the uncategorised swipe
+        raw_swipes = [s for s in swipes if s['products'].get('categories')]
+        raw = (
+            service._process_swipe_analytics(raw_swipes),
+            service._process_click_analytics(clicks),
+            service._process_view_analytics(views)
+        )
+        
+        assert service._process_rollup_analytics(build_daily_rollups(swipes, clicks, views)) == raw
+        assert raw[0]['total_swipes'] == 3
+        
+        # Both read paths filter from the same day boundary
+        boundaries = {}
+        for rollups_enabled in (True, False):
+            mock_client = Mock()
+            query = mock_client.table.return_value.select.return_value.eq.return_value
+            query.gte.return_value.execute.return_value = Mock(data=[])
+            service._service_client = mock_client
+            service.get_user_by_id = AsyncMock(return_value=user_data)
+            
+            with patch('app.services.database_service.settings') as mock_settings:
+                mock_settings.USER_ANALYTICS_ROLLUPS_ENABLED = rollups_enabled
+                await service.get_user_analytics_summary(user_data['id'], days=7)
+            
+            boundaries[rollups_enabled] = {call.args[1] for call in query.gte.call_args_list}
+        
+        rollup_start = boundaries[True].pop()
+        raw_start = boundaries[False].pop()
+        assert not boundaries[True] and not boundaries[False]
+        assert raw_start == f"{rollup_start}T00:00:00"
+        assert (datetime.utcnow().date() - datetime.fromisoformat(rollup_start).date()).days == 6
+    
     async def test_bulk_record_product_views(self):
         """
         Test bulk product view recording for performance.
@@ -1344,6 +1662,127 @@ class TestPerformanceAndAnalytics:
         with pytest.raises(ValidationError, match="Missing required fields"):
             await service.bulk_record_product_views(invalid_records)
 
+    async def test_stream_record_product_views_pipelines_and_retries(self):
+        """
+        Test streaming ingestion bounds concurrency and retries failed batches.
+        
+        Validates that batches are pipelined up to max_concurrency, invalid
+        records are counted per batch and a transient failure is retried
+        with the same row ids.
+        """
+        service = DatabaseService()
+        service._service_client = Mock()
+        
+        in_flight = 0
+        peak = 0
+        attempts_by_first_id: Dict[str, int] = {}
+        
+        async def fake_execute(builder, table):
+            nonlocal in_flight, peak
+            rows = service._service_client.table.return_value.upsert.call_args[0][0]
+            first_id = rows[0]['id']
+            attempts_by_first_id[first_id] = attempts_by_first_id.get(first_id, 0) + 1
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                await asyncio.sleep(0.01)
+                if len(attempts_by_first_id) == 2 and attempts_by_first_id[first_id] == 1:
+                    raise ConnectionError("transient failure")
+                return Mock(data=rows)
+            finally:
+                in_flight -= 1
+        
+        service._execute = fake_execute
+        
+        async def records():
+            for i in range(45):
+                if i % 10 == 0:
+                    yield {'product_id': str(uuid.uuid4())}  # Missing session_id
+                else:
+                    yield {'product_id': str(uuid.uuid4()), 'session_id': 'sess'}
+        
+        reports = [
+            report async for report in service.stream_record_product_views(
+                records(), batch_size=10, max_concurrency=2, retry_backoff_seconds=0.001
+            )
+        ]
+        
+        assert len(reports) == 5
+        assert sorted(r['offset'] for r in reports) == [0, 10, 20, 30, 40]
+        assert all(r['status'] == 'recorded' for r in reports)
+        assert sum(r['recorded'] for r in reports) == 40
+        assert sum(r['invalid'] for r in reports) == 5
+        assert max(r['attempts'] for r in reports) == 2
+        assert peak <= 2
+    
+    async def test_stream_record_product_views_reports_failed_batches(self):
+        """
+        Test batches that exhaust their retries are reported, not dropped.
+        """
+        service = DatabaseService()
+        service._service_client = Mock()
+        service._execute = AsyncMock(side_effect=ConnectionError("database unavailable"))
+        
+        async def records():
+            for _ in range(3):
+                yield {'product_id': str(uuid.uuid4()), 'session_id': 'sess'}
+        
+        reports = [
+            report async for report in service.stream_record_product_views(
+                records(), batch_size=2, max_retries=1, retry_backoff_seconds=0.001
+            )
+        ]
+        
+        assert [r['status'] for r in reports] == ['failed', 'failed']
+        assert all(r['attempts'] == 2 for r in reports)
+        assert all('database unavailable' in r['error'] for r in reports)
+
+    async def test_business_metrics_aggregated_server_side(self):
+        """
+        Test that business KPIs come from one aggregate RPC, not table scans.
+        """
+        service = DatabaseService()
+        mock_client = Mock()
+        kpis = {
+            'users': {'total': 1200, 'active_7d': 300, 'engagement_rate': 25.0},
+            'interactions': {'swipes_7d': 5000, 'active_swipe_users': 250, 'avg_swipes_per_user': 20.0},
+            'revenue': {'affiliate_clicks_7d': 400, 'conversions_7d': 20, 'conversion_rate': 5.0}
+        }
+        mock_client.rpc.return_value.execute.return_value = Mock(data=kpis)
+
+        result = await service._get_business_metrics(mock_client)
+
+        assert result == kpis
+        mock_client.rpc.assert_called_once_with('get_business_metrics', {'window_days': 7})
+        mock_client.table.assert_not_called()
+
+    async def test_performance_metrics_cached_and_single_flight(self):
+        """
+        Test that concurrent and repeated calls share one metrics collection.
+        """
+        service = DatabaseService()
+        calls = 0
+
+        async def collect():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {'timestamp': datetime.utcnow().isoformat(), 'business': {}}
+
+        service._collect_performance_metrics = collect
+
+        results = await asyncio.gather(*[service.get_performance_metrics() for _ in range(5)])
+        again = await service.get_performance_metrics()
+
+        assert calls == 1
+        assert all(result is results[0] for result in results)
+        assert again is results[0]
+
+        # Expired entries are refreshed
+        service._performance_metrics_cache = (0.0, results[0])
+        await service.get_performance_metrics()
+        assert calls == 2
+
 # ==============================================================================
 # ERROR HANDLING AND EDGE CASES
 # ==============================================================================
@@ -0,0 +1,201 @@
+"""
+aclue Latency Sketch Unit Test Suite
+
+Unit tests for the streaming quantile sketches in app.monitoring.sketches and
+their use by PerformanceMetrics.
+
+Test Coverage:
+- DDSketch relative accuracy against exact quantiles
+- Merging sketches and round-tripping worker exports
+- Rotating time windows expiring old samples
+- Reuse of completed slots' merge across reads and writes
+- PerformanceMetrics percentiles, summaries and cross-worker merges
+"""
+
+# ==============================================================================
+# IMPORTS AND DEPENDENCIES
+# ==============================================================================
+
+import json
+import random
+
+import pytest
+
+from app.middleware.performance_monitoring import PerformanceMetrics
+from app.monitoring.sketches import DDSketch, WindowedSketch
+
+# ==============================================================================
+# TEST HELPERS
+# ==============================================================================
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def exact_quantile(values, q):
+    """Lower-rank exact quantile, matching the sketch's rank definition."""
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+# ==============================================================================
+# DDSKETCH TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+class TestDDSketch:
+    """Test suite for DDSketch."""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Estimates stay within 1% of the exact quantile on skewed latencies."""
+        rng = random.Random(3)
+        values = [rng.lognormvariate(-3, 1.2) for _ in range(20_000)]
+        sketch = DDSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.5, 0.95, 0.99, 0.999):
+            exact = exact_quantile(values, q)
+            assert abs(sketch.quantile(q) - exact) / exact <= 0.0101
+        assert sketch.count == 20_000
+        assert sketch.max == max(values)
+
+    def test_bucket_count_does_not_grow_with_traffic(self):
+        """Memory depends on the value range, not the number of samples."""
+        rng = random.Random(5)
+        sketch = DDSketch()
+        for _ in range(50_000):
+            sketch.add(rng.uniform(0.001, 2.0))
+
+        assert len(sketch.bins) < 400
+
+    def test_merge_matches_single_sketch(self):
+        """Merged per-worker sketches equal one sketch over all values."""
+        rng = random.Random(11)
+        combined, worker_a, worker_b = DDSketch(), DDSketch(), DDSketch()
+        for i in range(5000):
+            value = rng.expovariate(20)
+            combined.add(value)
+            (worker_a if i % 2 else worker_b).add(value)
+
+        merged = DDSketch.from_dict(json.loads(json.dumps(worker_a.to_dict())))
+        merged.merge(worker_b)
+
+        assert merged.bins == combined.bins
+        assert merged.quantiles((0.5, 0.99)) == combined.quantiles((0.5, 0.99))
+
+    def test_empty_and_zero_values(self):
+        """Empty sketches report None; zero durations are counted."""
+        sketch = DDSketch()
+        assert sketch.quantile(0.5) is None
+
+        sketch.add(0.0)
+        sketch.add(0.0)
+        sketch.add(1.0)
+
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1.0) == pytest.approx(1.0, rel=0.01)
+
+    def test_merge_rejects_different_accuracy(self):
+        """Sketches with different bucket widths cannot be merged."""
+        with pytest.raises(ValueError):
+            DDSketch(0.01).merge(DDSketch(0.02))
+
+# ==============================================================================
+# TIME WINDOW TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+class TestWindowedSketch:
+    """Test suite for WindowedSketch."""
+
+    def test_old_samples_leave_short_windows(self):
+        """Samples expire from 1m before 1h, and never from the lifetime total."""
+        clock = FakeClock()
+        sketches = WindowedSketch(clock=clock)
+        for _ in range(10):
+            sketches.add(2.0)
+
+        clock.now += 120
+        sketches.add(0.1)
+
+        assert sketches.window("1m").count == 1
+        assert sketches.window("1h").count == 11
+        assert sketches.quantiles("1m")["p99"] == pytest.approx(0.1, rel=0.01)
+
+        clock.now += 7200
+        assert sketches.window("1h").count == 0
+        assert sketches.total.count == 11
+
+    def test_completed_slots_merge_is_reused(self):
+        """Writes to the current slot do not discard the merge of completed slots."""
+        clock = FakeClock()
+        sketches = WindowedSketch(clock=clock)
+        ring = sketches.rings["5m"]
+        for _ in range(5):
+            sketches.add(0.5)
+        clock.now += ring.slot_seconds
+
+        assert sketches.window("5m").count == 5
+        completed = ring._completed
+
+        sketches.add(1.0)
+        first = sketches.window("5m")
+        sketches.add(1.0)
+        second = sketches.window("5m")
+
+        assert (first.count, second.count) == (6, 7)
+        assert ring._completed is completed
+        assert completed.count == 5  # Reads merge the current slot into a copy
+        assert second.max == pytest.approx(1.0, rel=0.01)
+
+        clock.now += ring.slot_seconds
+        assert sketches.window("5m").count == 7
+        assert ring._completed is not completed
+
+# ==============================================================================
+# PERFORMANCE METRICS INTEGRATION TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+class TestPerformanceMetricsSketches:
+    """Test suite for sketch-backed PerformanceMetrics."""
+
+    def test_summary_keeps_existing_keys(self):
+        """Endpoint summaries keep count/mean/p50/p95/p99/min/max and add windows."""
+        metrics = PerformanceMetrics()
+        for i in range(1, 101):
+            metrics.add_request_time("GET /api/v1/products/", i / 1000)
+
+        endpoint = metrics.get_summary()["endpoints"]["GET /api/v1/products/"]
+
+        for key in ("count", "mean", "p50", "p95", "p99", "min", "max"):
+            assert key in endpoint
+        assert endpoint["count"] == 100
+        assert endpoint["p95"] == pytest.approx(0.095, rel=0.02)
+        assert set(endpoint["windows"]) == {"1m", "5m", "1h"}
+        assert metrics.get_percentile("GET /api/v1/products/", 0.5, window="1h") == pytest.approx(0.05, rel=0.02)
+        assert metrics.get_percentile("GET /missing") is None
+
+    def test_worker_exports_merge(self):
+        """Exports from two workers merge into fleet-wide quantiles."""
+        worker_a, worker_b = PerformanceMetrics(), PerformanceMetrics()
+        for _ in range(90):
+            worker_a.add_request_time("GET /api/v1/products/", 0.01)
+        for _ in range(10):
+            worker_b.add_request_time("GET /api/v1/products/", 1.0)
+
+        merged = PerformanceMetrics.merge_request_sketches([
+            json.loads(json.dumps(worker_a.export_request_sketches())),
+            worker_b.export_request_sketches(),
+        ])
+
+        five_minutes = merged["GET /api/v1/products/"]["5m"]
+        assert five_minutes["count"] == 100
+        assert five_minutes["p50"] == pytest.approx(0.01, rel=0.02)
+        assert five_minutes["p95"] == pytest.approx(1.0, rel=0.02)
@@ -0,0 +1,138 @@
+"""
+aclue Event Loop Monitor Unit Test Suite
+
+Unit tests for the event loop lag probe and blocking-call watchdog in
+app.monitoring.loop_monitor.
+
+Test Coverage:
+- Lag histogram and blocked counters fed by the probe
+- Stack capture of the call that blocked the loop
+- Deduplication by call path, bounded reports and capture rate limiting
+- The /performance/event-loop route
+"""
+
+# ==============================================================================
+# IMPORTS AND DEPENDENCIES
+# ==============================================================================
+
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.middleware import performance_monitoring
+from app.middleware.performance_monitoring import create_performance_router
+from app.monitoring.loop_monitor import EventLoopMonitor
+from app.monitoring.metrics import registry
+
+# ==============================================================================
+# TEST HELPERS
+# ==============================================================================
+
+def blocking_supabase_call(seconds: float) -> None:
+    """Stands in for a synchronous .execute() inside a handler."""
+    time.sleep(seconds)
+
+
+def blocking_dataframe_work(seconds: float) -> None:
+    """Stands in for pandas work inside a handler."""
+    time.sleep(seconds)
+
+
+def blocking_model_scoring(seconds: float) -> None:
+    """Stands in for NumPy scoring inside a handler."""
+    time.sleep(seconds)
+
+
+async def monitored(monitor: EventLoopMonitor, *blocks) -> dict:
+    """Run blocking calls on the loop under the monitor and return its report."""
+    monitor.start()
+    await asyncio.sleep(0.03)
+    try:
+        for block in blocks:
+            block(0.15)
+            await asyncio.sleep(0.05)  # Let the probe and watchdog see the recovery
+    finally:
+        await monitor.stop()
+    return monitor.get_report()
+
+
+def make_monitor(**kwargs) -> EventLoopMonitor:
+    """Monitor with short intervals suitable for tests."""
+    kwargs.setdefault("interval", 0.01)
+    kwargs.setdefault("block_threshold", 0.05)
+    return EventLoopMonitor(**kwargs)
+
+# ==============================================================================
+# MONITOR TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestEventLoopMonitor:
+    """Test suite for EventLoopMonitor."""
+
+    async def test_blocking_call_is_captured(self):
+        """The stack of the call blocking the loop is recorded with its duration."""
+        blocked_before = registry.get_sample_value("event_loop_blocked_total") or 0.0
+        lag_before = registry.get_sample_value("event_loop_lag_seconds_count") or 0.0
+
+        report = await monitored(make_monitor(), blocking_supabase_call)
+
+        entry = report["reports"][0]
+        assert "blocking_supabase_call" in entry["location"]
+        assert "time.sleep(seconds)" in entry["stack"][-1]
+        assert entry["count"] == 1
+        assert 0.08 <= entry["total_blocked"] <= 0.5
+        assert report["blocked"]["count"] >= 1
+        assert report["lag"]["max"] >= 0.1
+        assert not report["running"]
+        assert registry.get_sample_value("event_loop_blocked_total") >= blocked_before + 1
+        assert registry.get_sample_value("event_loop_lag_seconds_count") > lag_before
+
+    async def test_repeated_blocks_are_deduplicated(self):
+        """The same call path blocking several times is one report."""
+        report = await monitored(make_monitor(), *[blocking_dataframe_work] * 3)
+
+        assert report["distinct_stacks"] == 1
+        assert report["reports"][0]["count"] == 3
+
+    async def test_reports_are_bounded(self):
+        """Only max_reports distinct call paths are kept; the oldest is dropped."""
+        report = await monitored(
+            make_monitor(max_reports=2),
+            blocking_supabase_call, blocking_dataframe_work, blocking_model_scoring
+        )
+
+        locations = " ".join(entry["location"] for entry in report["reports"])
+        assert report["distinct_stacks"] == 2
+        assert "blocking_supabase_call" not in locations
+
+    async def test_captures_are_rate_limited(self):
+        """Stalls beyond the capture budget are counted but not walked."""
+        report = await monitored(
+            make_monitor(max_captures_per_minute=1),
+            blocking_supabase_call, blocking_dataframe_work
+        )
+
+        assert report["captures"] == 1
+        assert report["suppressed"] == 1
+        assert report["blocked"]["count"] >= 2
+
+    async def test_event_loop_route(self, monkeypatch):
+        """The report is served next to the other performance routes."""
+        monitor = make_monitor()
+        monkeypatch.setattr(performance_monitoring, "event_loop_monitor", monitor)
+        await monitored(monitor, blocking_model_scoring)
+
+        app = FastAPI()
+        app.include_router(create_performance_router(app))
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/performance/event-loop", params={"limit": 5})
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["block_threshold"] == 0.05
+        assert "blocking_model_scoring" in body["reports"][0]["location"]
@@ -0,0 +1,181 @@
+"""
+aclue Middleware Stack Unit Test Suite
+
+Unit tests for the pure-ASGI middlewares in app.core.middleware,
+app.middleware.performance_monitoring, app.monitoring.metrics and the
+response cache in app.core.caching.
+
+Test Coverage:
+- Security headers added and server-identifying headers removed
+- Request ID propagated to request state and response headers
+- Streaming responses forwarded chunk by chunk through the stack
+- Performance and Prometheus metrics recorded from send messages
+- Unmatched paths sharing one latency bucket
+- Oversized response cache bodies streamed through without storage
+"""
+
+# ==============================================================================
+# IMPORTS AND DEPENDENCIES
+# ==============================================================================
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.core.caching import CacheConfig, CacheManager, HTTPCacheMiddleware
+from app.core.middleware import RequestLoggingMiddleware, SecurityHeadersMiddleware
+from app.middleware import performance_monitoring
+from app.middleware.performance_monitoring import PerformanceMetrics, PerformanceMonitoringMiddleware
+from app.monitoring.metrics import PrometheusMiddleware, http_requests_total
+
+# ==============================================================================
+# TEST HELPERS
+# ==============================================================================
+
+def make_app(*middlewares) -> FastAPI:
+    """App with JSON and streaming endpoints behind the given middlewares."""
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str, request: Request):
+        return {"id": item_id, "request_id": getattr(request.state, "request_id", None)}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i}".encode()
+        return StreamingResponse(chunks(), headers={"Server": "uvicorn"})
+
+    for middleware in middlewares:
+        app.add_middleware(middleware)
+    return app
+
+
+async def call_asgi(app, path: str):
+    """Drive one GET through the ASGI interface and return the sent messages."""
+    messages = []
+    requested = asyncio.Event()
+
+    async def receive():
+        # The body once, then block like a connected client
+        if requested.is_set():
+            await asyncio.Event().wait()
+        requested.set()
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app({
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"test")],
+        "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }, receive, send)
+    return messages
+
+
+async def idle_monitor(self):
+    """Stand-in for the resource monitor loop."""
+
+# ==============================================================================
+# APPLICATION MIDDLEWARE TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestApplicationMiddleware:
+    """Test suite for the security header and request logging middlewares."""
+
+    async def test_security_headers_and_request_id(self):
+        """Responses carry the security headers and the request's ID."""
+        app = make_app(SecurityHeadersMiddleware, RequestLoggingMiddleware)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/items/p1")
+            streamed = await client.get("/stream")
+
+        assert response.headers["x-frame-options"] == "DENY"
+        assert "default-src 'self'" in response.headers["content-security-policy"]
+        assert response.headers["x-request-id"] == response.json()["request_id"]
+        assert float(response.headers["x-process-time"]) >= 0
+        assert "server" not in streamed.headers
+        assert streamed.content == b"chunk0chunk1chunk2"
+
+    async def test_streaming_responses_are_not_buffered(self):
+        """Each streamed chunk reaches the server as its own body message."""
+        app = make_app(SecurityHeadersMiddleware, RequestLoggingMiddleware, PrometheusMiddleware)
+
+        messages = await call_asgi(app, "/stream")
+
+        bodies = [message for message in messages if message["type"] == "http.response.body"]
+        assert [message["body"] for message in bodies if message["body"]] == [b"chunk0", b"chunk1", b"chunk2"]
+        assert all(message.get("more_body") for message in bodies[:-1])
+
+    async def test_prometheus_counts_status(self):
+        """Request counts are labelled with the status from the start message."""
+        app = make_app(PrometheusMiddleware)
+        counter = http_requests_total.labels(method="GET", endpoint="/missing", status="404")
+        before = counter._value.get()
+
+        await call_asgi(app, "/missing")
+
+        assert counter._value.get() == before + 1
+
+# ==============================================================================
+# PERFORMANCE MONITORING MIDDLEWARE TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestPerformanceMonitoringMiddleware:
+    """Test suite for PerformanceMonitoringMiddleware."""
+
+    async def test_records_route_template_and_headers(self, monkeypatch):
+        """Latency is keyed by route template and timing headers are added."""
+        metrics = PerformanceMetrics()
+        monkeypatch.setattr(performance_monitoring, "performance_metrics", metrics)
+        monkeypatch.setattr(PerformanceMonitoringMiddleware, "_monitor_system_resources", idle_monitor)
+        app = make_app(PerformanceMonitoringMiddleware)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/items/p1")
+            response = await client.get("/items/p2")
+            for i in range(3):
+                await client.get(f"/wp-admin/{i}.php")
+
+        endpoints = metrics.get_summary()["endpoints"]
+        assert response.headers["x-response-time"].endswith("ms")
+        assert endpoints["GET /items/{item_id}"]["count"] == 2
+        assert endpoints["GET <unmatched>"]["count"] == 3  # One bucket, not one per path
+        assert len(endpoints) == 2
+
+# ==============================================================================
+# RESPONSE CACHE STREAMING TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestResponseCacheStreaming:
+    """Test suite for HTTPCacheMiddleware pass-through of large bodies."""
+
+    async def test_oversized_stream_passes_through(self):
+        """A body over max_body_bytes is streamed on and never stored."""
+        manager = CacheManager(CacheConfig())
+        response_cache = HTTPCacheMiddleware(
+            route_ttls={"/stream": 60}, max_body_bytes=8, manager=manager
+        )
+        app = make_app(response_cache)
+
+        first = await call_asgi(app, "/stream")
+        second = await call_asgi(app, "/stream")
+
+        start = next(message for message in second if message["type"] == "http.response.start")
+        assert b"".join(message.get("body", b"") for message in first[1:]) == b"chunk0chunk1chunk2"
+        assert b"etag" not in dict(start["headers"])
+        assert response_cache.get_stats()["stored"] == 0
+        assert response_cache.get_stats()["bypassed"] == 2
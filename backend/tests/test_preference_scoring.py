@@ -0,0 +1,117 @@
+"""
+aclue Preference Scoring Unit Test Suite
+
+Unit tests for the vectorised candidate scorer used by
+DatabaseService.get_products_for_recommendations.
+
+Test Coverage:
+- Scores and ordering identical to _score_products_by_preferences
+- Top-k selection with ties on the selection boundary
+- Products with missing brand, category, price or quality fields
+"""
+
+# ==============================================================================
+# IMPORTS AND DEPENDENCIES
+# ==============================================================================
+
+import copy
+import random
+import uuid
+
+import pytest
+
+from app.services.database_service import DatabaseService
+from app.services.preference_scoring import CandidateSet, rank_products
+
+# ==============================================================================
+# TEST HELPERS
+# ==============================================================================
+
+CATEGORIES = ["Electronics", "Fashion", "Home", "Sports", "Books"]
+BRANDS = ["Apple", "Nike", "Sony", "IKEA", "Penguin", "Generic"]
+
+
+def make_products(count: int, seed: int):
+    """Build a deterministic pool of candidate products with repeated values."""
+    rng = random.Random(seed)
+    products = []
+    for _ in range(count):
+        price_min = rng.choice([0, 15, 50, 120, 250, 499.99])
+        products.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "price_min": price_min,
+            "price_max": price_min + rng.choice([0, 10, 100, 300]),
+            "brand": rng.choice(BRANDS + [None, ""]),
+            "rating": rng.choice([None, 3.5, 4.0, 4.8, 5]),
+            "review_count": rng.choice([None, 0, 20, 100, 2500]),
+            "categories": {"name": rng.choice(CATEGORIES)},
+        })
+    return products
+
+
+PREFERENCES = {
+    "category_preferences": {"Electronics": 0.9, "Fashion": 0.35, "Books": 0.6},
+    "brand_scores": {"Apple": 0.9, "Sony": 0.55},
+    "liked_brands": ["Apple", "Nike"],
+    "price_range": {"min": 40, "max": 300},
+}
+
+# ==============================================================================
+# SCORING TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+class TestPreferenceScoring:
+    """Test suite for the vectorised preference scorer."""
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_matches_reference_scorer(self, seed):
+        """Vectorised ranking equals the loop-based scorer, score for score."""
+        products = make_products(400, seed)
+
+        expected = DatabaseService()._score_products_by_preferences(
+            copy.deepcopy(products), PREFERENCES
+        )
+        actual = rank_products(copy.deepcopy(products), PREFERENCES)
+
+        assert [p["id"] for p in actual] == [p["id"] for p in expected]
+        assert [p["_relevance_score"] for p in actual] == [p["_relevance_score"] for p in expected]
+
+    @pytest.mark.parametrize("k", [1, 7, 20, 399])
+    def test_top_k_matches_reference_prefix(self, k):
+        """Top-k selection returns exactly the first k of the full ranking."""
+        products = make_products(400, 4)
+
+        expected = DatabaseService()._score_products_by_preferences(
+            copy.deepcopy(products), PREFERENCES
+        )[:k]
+        actual = rank_products(copy.deepcopy(products), PREFERENCES, top_k=k)
+
+        assert [p["id"] for p in actual] == [p["id"] for p in expected]
+
+    def test_ties_keep_original_order(self):
+        """Equal scores keep candidate order, like a stable sort."""
+        products = [
+            {"id": str(i), "brand": "Apple", "price_min": 100, "price_max": 200,
+             "rating": 4.0, "review_count": 100, "categories": {"name": "Electronics"}}
+            for i in range(10)
+        ]
+
+        ranked = rank_products(products, PREFERENCES, top_k=4)
+
+        assert [p["id"] for p in ranked] == ["0", "1", "2", "3"]
+
+    def test_handles_sparse_products_and_preferences(self):
+        """Missing fields and empty preferences score as quality only."""
+        products = [
+            {"id": "a", "categories": {}, "rating": 5, "review_count": 100},
+            {"id": "b", "brand": None, "price_min": None, "price_max": None},
+        ]
+
+        ranked = rank_products(products, {})
+
+        assert [p["id"] for p in ranked] == ["a", "b"]
+        assert ranked[0]["_relevance_score"] == pytest.approx(0.1)
+        assert ranked[1]["_relevance_score"] == 0.0
+        assert rank_products([], PREFERENCES) == []
+        assert len(CandidateSet(products)) == 2
@@ -0,0 +1,221 @@
+"""
+aclue Sampling Profiler Unit Test Suite
+
+Unit tests for the on-demand sampling profiler in app.monitoring.profiler
+and its routes in create_performance_router.
+
+Test Coverage:
+- Whole-process sessions capturing busy threads
+- Collapsed-stack and speedscope export formats
+- Bounded stack aggregation
+- Route-filtered sessions sampling only matching requests
+- Profiler control routes and their conflict handling
+- Token protection on every profiler route
+"""
+
+# ==============================================================================
+# IMPORTS AND DEPENDENCIES
+# ==============================================================================
+
+import sys
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.middleware import performance_monitoring
+from app.middleware.performance_monitoring import (
+    PerformanceMonitoringMiddleware,
+    create_performance_router,
+)
+from app.monitoring.profiler import ProfileSession, SamplingProfiler
+
+# ==============================================================================
+# TEST HELPERS
+# ==============================================================================
+
+def spin(seconds: float) -> int:
+    """Burn CPU for a while."""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+def recommendation_hotspot(seconds: float) -> int:
+    """Named hot function for the filtered request."""
+    return spin(seconds)
+
+
+def analytics_hotspot(seconds: float) -> int:
+    """Named hot function for the unfiltered request."""
+    return spin(seconds)
+
+
+async def idle_monitor(self):
+    """Stand-in for the resource monitor loop."""
+
+
+def wait_for(profiler: SamplingProfiler, timeout: float = 2.0) -> None:
+    """Block until the profiler's session ends."""
+    deadline = time.monotonic() + timeout
+    while profiler.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+# ==============================================================================
+# SAMPLING AND EXPORT TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+class TestSamplingProfiler:
+    """Test suite for SamplingProfiler."""
+
+    def test_unfiltered_session_samples_threads(self):
+        """A time-window session samples every thread and stops by itself."""
+        profiler = SamplingProfiler()
+        worker = threading.Thread(target=analytics_hotspot, args=(0.3,), name="busy-worker")
+
+        profiler.start(duration=0.2, interval=0.002)
+        worker.start()
+        wait_for(profiler)
+        worker.join()
+
+        collapsed = profiler.collapsed()
+        assert not profiler.running
+        assert profiler.samples > 0
+        assert any(
+            line.startswith("busy-worker;") and "analytics_hotspot" in line
+            for line in collapsed.splitlines()
+        )
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+
+    def test_speedscope_document_references_shared_frames(self):
+        """Speedscope samples index into shared frames and carry weights in seconds."""
+        profiler = SamplingProfiler()
+        profiler.session = ProfileSession(duration=0, interval=0.005)
+        profiler._record("MainThread", sys._getframe())
+        profiler._record("MainThread", sys._getframe())
+
+        document = profiler.speedscope("test")
+        profile = document["profiles"][0]
+        frames = document["shared"]["frames"]
+
+        assert profile["type"] == "sampled"
+        assert profile["weights"] == [pytest.approx(0.01)]
+        assert all(0 <= index < len(frames) for sample in profile["samples"] for index in sample)
+        assert frames[profile["samples"][0][-1]]["name"].endswith(
+            "test_speedscope_document_references_shared_frames"
+        )
+        assert frames[0] == {"name": "MainThread"}
+
+    def test_distinct_stacks_are_bounded(self):
+        """Stacks beyond max_stacks are counted as dropped, not stored."""
+        profiler = SamplingProfiler(max_stacks=2)
+        for root in ("a", "b", "c", "a"):
+            profiler._record(root, sys._getframe())
+
+        assert len(profiler.stacks) == 2
+        assert profiler.dropped == 1
+        assert profiler.samples == 4
+
+# ==============================================================================
+# FILTERED SESSION AND ROUTE TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestProfilerRoutes:
+    """Test suite for route-filtered profiling through the middleware."""
+
+    async def test_route_filter_samples_only_matching_requests(self, monkeypatch):
+        """Only requests under the profiled prefix contribute stacks."""
+        profiler = SamplingProfiler()
+        monkeypatch.setattr(performance_monitoring, "sampling_profiler", profiler)
+        monkeypatch.setattr(PerformanceMonitoringMiddleware, "_monitor_system_resources", idle_monitor)
+
+        app = FastAPI()
+
+        @app.get("/api/v1/recommendations/")
+        async def recommendations():
+            return {"total": recommendation_hotspot(0.15)}
+
+        @app.get("/api/v1/analytics/")
+        async def analytics():
+            return {"total": analytics_hotspot(0.15)}
+
+        app.include_router(create_performance_router(app, enable_profiling=True, profiler_token="secret"))
+        app.add_middleware(PerformanceMonitoringMiddleware, enable_profiling=True)
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test", headers={"X-Profiler-Token": "secret"}
+        ) as client:
+            started = await client.post(
+                "/performance/profiler/start",
+                params={"duration": 5, "interval": 0.002, "route": "/api/v1/recommendations"}
+            )
+            conflict = await client.post("/performance/profiler/start")
+            await client.get("/api/v1/recommendations/")
+            await client.get("/api/v1/analytics/")
+            stats = (await client.post("/performance/profiler/stop")).json()
+            collapsed = (await client.get("/performance/profiler/collapsed")).text
+            speedscope = await client.get("/performance/profiler/speedscope")
+
+        assert started.json()["session"]["routes"] == ["/api/v1/recommendations"]
+        assert conflict.status_code == 409
+        assert stats["samples"] > 0 and not stats["running"]
+        assert "recommendation_hotspot" in collapsed
+        assert "analytics_hotspot" not in collapsed
+        assert all(line.startswith("GET /api/v1/recommendations/;") for line in collapsed.splitlines())
+        assert speedscope.json()["profiles"][0]["samples"]
+        assert profiler.tasks == {}
+
+    async def test_profiler_routes_require_opt_in(self):
+        """Without enable_profiling the control routes are not mounted."""
+        app = FastAPI()
+        app.include_router(create_performance_router(app))
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/performance/profiler/start")
+
+        assert response.status_code == 404
+
+    async def test_profiler_routes_require_token(self, monkeypatch):
+        """Every profiler route rejects requests without the configured token."""
+        monkeypatch.setattr(performance_monitoring, "sampling_profiler", SamplingProfiler())
+        app = FastAPI()
+        app.include_router(create_performance_router(app, enable_profiling=True, profiler_token="secret"))
+        routes = [
+            ("POST", "/performance/profiler/start"),
+            ("POST", "/performance/profiler/stop"),
+            ("GET", "/performance/profiler"),
+            ("GET", "/performance/profiler/collapsed"),
+            ("GET", "/performance/profiler/speedscope"),
+        ]
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            missing = [(await client.request(method, path)).status_code for method, path in routes]
+            wrong = [
+                (await client.request(method, path, headers={"X-Profiler-Token": "guess"})).status_code
+                for method, path in routes
+            ]
+            allowed = await client.get("/performance/profiler", headers={"X-Profiler-Token": "secret"})
+
+        assert missing == [401] * len(routes)
+        assert wrong == [401] * len(routes)
+        assert allowed.status_code == 200
+
+    async def test_profiler_routes_denied_without_configured_token(self, monkeypatch):
+        """With profiling enabled but no PROFILER_TOKEN, the routes deny all access."""
+        monkeypatch.setattr(performance_monitoring.settings, "PROFILER_TOKEN", None)
+        app = FastAPI()
+        app.include_router(create_performance_router(app, enable_profiling=True))
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(
+                "/performance/profiler/start", headers={"X-Profiler-Token": ""}
+            )
+
+        assert response.status_code == 403
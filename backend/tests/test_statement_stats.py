@@ -0,0 +1,181 @@
+"""
+aclue Statement Statistics Unit Test Suite
+
+Unit tests for query fingerprinting and the bounded statement statistics in
+app.monitoring.statements, and their use by PerformanceMetrics.
+
+Test Coverage:
+- SQL fingerprinting of literals, bind parameters, IN lists and VALUES
+- Type casts kept intact while named parameters are stripped
+- PostgREST fingerprinting of filters, paging and structural parameters
+- Per-fingerprint calls, times and rows with top-K deallocation
+- New fingerprints protected for one deallocation cycle
+- Bounded slow query samples and the /performance/slow-queries ranking
+"""
+
+# ==============================================================================
+# IMPORTS AND DEPENDENCIES
+# ==============================================================================
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.middleware import performance_monitoring
+from app.middleware.performance_monitoring import PerformanceMetrics, create_performance_router
+from app.monitoring.statements import StatementStats, fingerprint_postgrest, fingerprint_sql
+
+# ==============================================================================
+# FINGERPRINTING TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+class TestFingerprinting:
+    """Test suite for fingerprint_sql and fingerprint_postgrest."""
+
+    def test_sql_literals_are_stripped(self):
+        """Queries differing only in literals share a fingerprint."""
+        first = fingerprint_sql("SELECT * FROM products WHERE id = 'p1' AND price > 10.5 -- hot path")
+        second = fingerprint_sql("select * from products  where id = 'p''2'\n AND price > 99")
+
+        assert first == "SELECT * FROM products WHERE id = ? AND price > ?"
+        assert first.lower() == second.lower()
+
+    def test_sql_lists_params_and_values_collapse(self):
+        """IN lists, bind parameters and multi-row VALUES collapse to one shape."""
+        assert fingerprint_sql("SELECT 1 FROM t1 WHERE id IN (1, 2, 3)") == \
+            fingerprint_sql("SELECT 2 FROM t1 WHERE id IN (%s)")
+        assert fingerprint_sql("INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y')") == \
+            "INSERT INTO t (a, b) VALUES (...)"
+        assert fingerprint_sql("UPDATE t SET a = $1 WHERE id = :id") == "UPDATE t SET a = ? WHERE id = ?"
+
+    def test_sql_casts_are_not_parameters(self):
+        """A "::type" cast is kept; only a lone ":name" is a bind parameter."""
+        assert fingerprint_sql("SELECT created_at::date FROM swipe_interactions WHERE user_id = :user_id") == \
+            "SELECT created_at::date FROM swipe_interactions WHERE user_id = ?"
+        assert fingerprint_sql("SELECT '2024-01-01'::timestamptz") == "SELECT ?::timestamptz"
+
+    def test_postgrest_filters_keep_column_and_operator(self):
+        """Filter values are stripped; select, order and paging shape is kept."""
+        first = fingerprint_postgrest(
+            "select", "products",
+            httpx.QueryParams("select=id,title&id=eq.abc&category=in.(a,b)&order=created_at.desc&limit=10")
+        )
+        second = fingerprint_postgrest(
+            "select", "products",
+            "limit=50&order=created_at.desc&category=in.(c)&id=eq.xyz&select=id,title"
+        )
+
+        assert first == second
+        assert first == (
+            "supabase select products "
+            "category=in.?&id=eq.?&limit=?&order=created_at.desc&select=id,title"
+        )
+        assert fingerprint_postgrest("select", "users", "or=(email.eq.a@b.c,name.not.ilike.*x*)") == \
+            "supabase select users or=(email.eq.?,name.not.ilike.?)"
+        assert fingerprint_postgrest("insert", "product_views", "id=eq.1") == "supabase insert product_views"
+
+# ==============================================================================
+# STATEMENT STATISTICS TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+class TestStatementStats:
+    """Test suite for StatementStats."""
+
+    def test_aggregates_per_fingerprint(self):
+        """Calls, time and rows accumulate on one entry."""
+        stats = StatementStats(slow_threshold=0.1)
+        stats.record("q", 0.05, rows=2, sample="SELECT 1")
+        stats.record("q", 0.25, rows=3, sample="SELECT 2")
+
+        entry = stats.top(1)[0]
+        assert entry["calls"] == 2
+        assert entry["total_time"] == pytest.approx(0.30)
+        assert entry["mean_time"] == pytest.approx(0.15)
+        assert entry["min_time"] == 0.05
+        assert entry["max_time"] == 0.25
+        assert entry["rows"] == 5
+        assert entry["slow_calls"] == 1
+        assert entry["sample"] == "SELECT 1"
+
+    def test_cheapest_fingerprints_are_deallocated(self):
+        """The store stays bounded and keeps the most expensive statements."""
+        stats = StatementStats(max_entries=20)
+        stats.record("expensive", 10.0)
+        for i in range(200):
+            stats.record(f"cheap{i}", 0.001 * (i % 7))
+
+        assert len(stats) <= 20
+        assert "expensive" in stats
+        assert stats.evicted > 0
+        assert stats.totals()["deallocations"] > 0
+
+    def test_new_fingerprints_survive_one_deallocation(self):
+        """A just-created entry is not the next victim for having little time yet."""
+        stats = StatementStats(max_entries=20)
+        for i in range(20):
+            stats.record(f"established{i}", 1.0)
+
+        stats.record("new", 0.001)
+        stats.record("another", 1.0)  # Deallocates while "new" is the cheapest entry
+
+        assert "new" in stats
+        assert stats.totals()["deallocations"] == 2
+
+        stats.record("third", 1.0)  # "new" has had its cycle
+        assert "new" not in stats
+
+    def test_top_rejects_unknown_sort(self):
+        """Sorting is limited to the aggregated columns."""
+        with pytest.raises(ValueError):
+            StatementStats().top(sort="sample")
+
+# ==============================================================================
+# PERFORMANCE METRICS INTEGRATION TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestSlowQueryReporting:
+    """Test suite for fingerprinted query reporting in PerformanceMetrics."""
+
+    async def test_slow_samples_are_bounded(self):
+        """Slow query and endpoint samples are ring buffers with running totals."""
+        metrics = PerformanceMetrics(slow_sample_size=5)
+        for i in range(50):
+            metrics.add_query_time(f"SELECT * FROM products WHERE id = {i}", 0.5, rows=1)
+            metrics.add_request_time("GET /api/v1/products/{product_id}", 2.0)
+
+        summary = metrics.get_summary()["database"]
+        assert len(metrics.slow_queries) == 5
+        assert len(metrics.slow_endpoints) == 5
+        assert metrics.slow_query_count == 50
+        assert summary["fingerprints"] == 1
+        assert summary["total_queries"] == 50
+
+    async def test_slow_queries_route_ranks_by_total_time(self, monkeypatch):
+        """The route ranks fingerprints by total time and validates sort."""
+        metrics = PerformanceMetrics()
+        monkeypatch.setattr(performance_monitoring, "performance_metrics", metrics)
+        for i in range(20):
+            metrics.add_query_time(f"SELECT * FROM swipes WHERE user_id = '{i}'", 0.02)
+        metrics.add_query_time("SELECT * FROM products ORDER BY rating", 0.15)
+
+        app = FastAPI()
+        app.include_router(create_performance_router(app))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/performance/slow-queries", params={"limit": 2})
+            by_max = await client.get("/performance/slow-queries", params={"sort": "max_time"})
+            invalid = await client.get("/performance/slow-queries", params={"sort": "sample"})
+
+        body = response.json()
+        assert [entry["fingerprint"] for entry in body["statements"]] == [
+            "SELECT * FROM swipes WHERE user_id = ?",
+            "SELECT * FROM products ORDER BY rating",
+        ]
+        assert body["statements"][0]["calls"] == 20
+        assert body["total_count"] == 1
+        assert by_max.json()["statements"][0]["fingerprint"] == "SELECT * FROM products ORDER BY rating"
+        assert invalid.status_code == 400
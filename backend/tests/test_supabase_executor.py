@@ -0,0 +1,259 @@
+"""
+aclue Supabase Executor Unit Test Suite
+
+Unit tests for the non-blocking Supabase execution layer used by
+DatabaseService and the SupabaseClient wrapper.
+
+Test Coverage:
+- Blocking queries run off the event loop thread
+- Per-table in-flight limits are enforced
+- Tables without overrides fall back to the default limit
+- Executor statistics and shutdown
+- Query observers and Supabase performance instrumentation
+"""
+
+# ==============================================================================
+# IMPORTS AND DEPENDENCIES
+# ==============================================================================
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from app.core.supabase_executor import SupabaseExecutor
+from app.middleware.performance_monitoring import SupabasePerformanceMonitor, performance_metrics
+from app.monitoring.metrics import db_query_rows
+
+# ==============================================================================
+# TEST HELPERS
+# ==============================================================================
+
+class BlockingQuery:
+    """Fake PostgREST builder whose execute() blocks like a network call."""
+
+    def __init__(self, latency: float, tracker: dict):
+        self.latency = latency
+        self.tracker = tracker
+        self.lock = threading.Lock()
+
+    def execute(self):
+        with self.lock:
+            self.tracker["current"] += 1
+            self.tracker["peak"] = max(self.tracker["peak"], self.tracker["current"])
+        time.sleep(self.latency)
+        with self.lock:
+            self.tracker["current"] -= 1
+        response = Mock()
+        response.data = [{"thread": threading.current_thread().name}]
+        return response
+
+class FakeRequestBuilder:
+    """Fake PostgREST request builder exposing the attributes supabase-py sets."""
+
+    def __init__(self, path, http_method, json=None, headers=None, data=None, error=None):
+        self.path = path
+        self.http_method = http_method
+        self.json = json
+        self.headers = headers or {}
+        self.params = "id=eq.1"
+        self.data = data
+        self.error = error
+
+    def execute(self):
+        if self.error:
+            raise self.error
+        response = Mock()
+        response.data = self.data
+        return response
+
+# ==============================================================================
+# EXECUTOR TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestSupabaseExecutor:
+    """
+    Test bounded, per-table limited execution of blocking queries.
+
+    Validates that queries leave the event loop, that concurrency is
+    bounded per table, and that statistics reflect completed work.
+    """
+
+    async def test_execute_runs_off_event_loop(self):
+        """
+        Test that execute() runs the blocking call on a worker thread.
+        """
+        executor = SupabaseExecutor(max_workers=2)
+        tracker = {"current": 0, "peak": 0}
+
+        response = await executor.execute(BlockingQuery(0.01, tracker), "products")
+
+        assert response.data[0]["thread"].startswith("supabase")
+        assert response.data[0]["thread"] != threading.current_thread().name
+        executor.shutdown()
+
+    async def test_event_loop_stays_responsive(self):
+        """
+        Test that other coroutines progress while a query is blocked.
+        """
+        executor = SupabaseExecutor(max_workers=2)
+        tracker = {"current": 0, "peak": 0}
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(
+            executor.execute(BlockingQuery(0.1, tracker), "products"),
+            ticker()
+        )
+
+        # All ticks happened while the 100ms query was still running
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.1
+        executor.shutdown()
+
+    async def test_per_table_limit_enforced(self):
+        """
+        Test that a table override caps in-flight queries for that table.
+        """
+        executor = SupabaseExecutor(
+            max_workers=16,
+            default_table_limit=8,
+            table_limits={"swipe_interactions": 2}
+        )
+        tracker = {"current": 0, "peak": 0}
+        query = BlockingQuery(0.02, tracker)
+
+        await asyncio.gather(*[
+            executor.execute(query, "swipe_interactions") for _ in range(10)
+        ])
+
+        assert tracker["peak"] <= 2
+        assert executor.get_stats()["completed"]["swipe_interactions"] == 10
+        executor.shutdown()
+
+    async def test_default_limit_for_unconfigured_table(self):
+        """
+        Test that tables without an override use the default limit.
+        """
+        executor = SupabaseExecutor(max_workers=16, default_table_limit=3)
+        tracker = {"current": 0, "peak": 0}
+        query = BlockingQuery(0.02, tracker)
+
+        await asyncio.gather(*[executor.execute(query, "products") for _ in range(9)])
+
+        assert tracker["peak"] <= 3
+        executor.shutdown()
+
+    async def test_run_passes_arguments_and_propagates_errors(self):
+        """
+        Test run() with arbitrary callables and exception propagation.
+        """
+        executor = SupabaseExecutor(max_workers=1)
+
+        assert await executor.run(lambda a, b=0: a + b, 2, b=3, table="auth.users") == 5
+
+        def failing():
+            raise RuntimeError("PostgREST unavailable")
+
+        with pytest.raises(RuntimeError, match="PostgREST unavailable"):
+            await executor.run(failing, table="products")
+
+        stats = executor.get_stats()
+        assert stats["in_flight"]["products"] == 0
+        executor.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestSupabaseInstrumentation:
+    """
+    Test query observers and the Supabase performance monitor.
+    """
+
+    async def test_observers_receive_every_call(self):
+        """
+        Test observers see successful and failed calls with their latency.
+        """
+        executor = SupabaseExecutor(max_workers=2)
+        calls = []
+        observer = lambda query, table, response, duration, error: calls.append(
+            (table, response is not None, duration, error)
+        )
+        executor.add_observer(observer)
+
+        await executor.execute(FakeRequestBuilder("/products", "GET", data=[{}]), "products")
+        with pytest.raises(RuntimeError):
+            await executor.execute(
+                FakeRequestBuilder("/products", "GET", error=RuntimeError("boom")), "products"
+            )
+
+        assert [(c[0], c[1]) for c in calls] == [("products", True), ("products", False)]
+        assert all(c[2] >= 0 for c in calls)
+        assert isinstance(calls[1][3], RuntimeError)
+
+        executor.remove_observer(observer)
+        await executor.execute(FakeRequestBuilder("/products", "GET", data=[]), "products")
+        assert len(calls) == 2
+        executor.shutdown()
+
+    async def test_failing_observer_does_not_break_queries(self):
+        """
+        Test an observer error is logged rather than failing the query.
+        """
+        executor = SupabaseExecutor(max_workers=1)
+
+        def broken_observer(*args):
+            raise ValueError("observer bug")
+
+        executor.add_observer(broken_observer)
+        response = await executor.execute(FakeRequestBuilder("/products", "GET", data=[{"id": 1}]), "products")
+
+        assert response.data == [{"id": 1}]
+        executor.shutdown()
+
+    async def test_monitor_describes_postgrest_requests(self):
+        """
+        Test operation and target detection from request builders.
+        """
+        describe = SupabasePerformanceMonitor.describe
+
+        assert describe(FakeRequestBuilder("/products", "GET"), "products") == ("select", "products")
+        assert describe(FakeRequestBuilder("/product_views", "POST"), "product_views") == ("insert", "product_views")
+        assert describe(
+            FakeRequestBuilder("/swipe_interactions", "POST", headers={"Prefer": "resolution=ignore-duplicates"}),
+            "swipe_interactions"
+        ) == ("upsert", "swipe_interactions")
+        assert describe(FakeRequestBuilder("/rpc/apply_counter_deltas", "POST"), "rpc") == ("rpc", "apply_counter_deltas")
+        assert describe(Mock(spec=[]), "products") == ("unknown", "products")
+
+    async def test_monitor_records_rows_bytes_and_query_times(self):
+        """
+        Test the monitor feeds Prometheus and the performance aggregator.
+        """
+        executor = SupabaseExecutor(max_workers=1)
+        SupabasePerformanceMonitor.setup(executor, slow_query_threshold_ms=100)
+        try:
+            rows_before = db_query_rows.labels(query_type="insert", table="product_views")._sum.get()
+
+            await executor.execute(
+                FakeRequestBuilder(
+                    "/product_views", "POST",
+                    json=[{"id": 1}, {"id": 2}], data=[{"id": 1}, {"id": 2}]
+                ),
+                "product_views"
+            )
+
+            rows_after = db_query_rows.labels(query_type="insert", table="product_views")._sum.get()
+            assert rows_after - rows_before == 2
+            assert "supabase insert product_views" in performance_metrics.query_times
+        finally:
+            SupabasePerformanceMonitor.teardown(executor)
+            executor.shutdown()
@@ -0,0 +1,245 @@
+"""
+aclue Swipe Ingestion Unit Test Suite
+
+Unit tests for the write-behind swipe buffer used by
+DatabaseService.enqueue_swipe_interaction.
+
+Test Coverage:
+- Flushing on batch size and on flush interval
+- Backpressure when the buffer is full
+- Spill-to-disk on flush failure and replay on recovery
+- Quarantine of corrupt spill files
+- Spill file I/O runs off the event loop thread
+- Graceful shutdown drains buffered records
+"""
+
+# ==============================================================================
+# IMPORTS AND DEPENDENCIES
+# ==============================================================================
+
+import asyncio
+import os
+import threading
+import uuid
+
+import pytest
+
+from app.services.swipe_ingestion import SwipeWriteBehindBuffer, SwipeBufferFullError
+
+# ==============================================================================
+# TEST HELPERS
+# ==============================================================================
+
+class RecordingWriter:
+    """Fake batch writer that records batches and can be made to fail."""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+        self.release = None
+
+    async def __call__(self, batch):
+        if self.release is not None:
+            await self.release.wait()
+        if self.fail:
+            raise ConnectionError("PostgREST unavailable")
+        self.batches.append(list(batch))
+
+    @property
+    def records(self):
+        return [record for batch in self.batches for record in batch]
+
+
+def make_record(session_id="session-1"):
+    return {"id": str(uuid.uuid4()), "session_id": session_id, "swipe_direction": "right"}
+
+# ==============================================================================
+# WRITE-BEHIND BUFFER TESTS
+# ==============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestSwipeWriteBehindBuffer:
+    """
+    Test batching, backpressure and durability of the swipe buffer.
+    """
+
+    async def test_flushes_when_batch_size_reached(self):
+        """
+        Test that a full batch is flushed without waiting for the interval.
+        """
+        writer = RecordingWriter()
+        buffer = SwipeWriteBehindBuffer(writer, flush_size=5, flush_interval=10)
+        await buffer.start()
+
+        for _ in range(5):
+            await buffer.enqueue(make_record())
+        await asyncio.sleep(0.05)
+
+        assert len(writer.batches) == 1
+        assert len(writer.batches[0]) == 5
+
+        await buffer.stop()
+
+    async def test_flushes_partial_batch_after_interval(self):
+        """
+        Test that a partial batch is flushed once the interval elapses.
+        """
+        writer = RecordingWriter()
+        buffer = SwipeWriteBehindBuffer(writer, flush_size=100, flush_interval=0.05)
+        await buffer.start()
+
+        await buffer.enqueue(make_record())
+        await buffer.enqueue(make_record())
+        await asyncio.sleep(0.2)
+
+        assert len(writer.records) == 2
+        assert buffer.get_stats()["flushes"] == 1
+        await buffer.stop()
+
+    async def test_backpressure_rejects_when_full(self):
+        """
+        Test that enqueue raises once max_pending records are waiting.
+        """
+        writer = RecordingWriter()
+        writer.release = asyncio.Event()
+        buffer = SwipeWriteBehindBuffer(
+            writer, flush_size=1, flush_interval=0.01, max_pending=2, enqueue_timeout=0.02
+        )
+        await buffer.start()
+
+        # First record is taken by the (blocked) flush, two more fill the queue
+        for _ in range(3):
+            await buffer.enqueue(make_record())
+        await asyncio.sleep(0.02)
+
+        with pytest.raises(SwipeBufferFullError):
+            await buffer.enqueue(make_record())
+        assert buffer.get_stats()["rejected"] == 1
+
+        writer.release.set()
+        await buffer.stop()
+        assert len(writer.records) == 3
+
+    async def test_failed_flush_spills_and_replays(self, tmp_path):
+        """
+        Test that failed batches are spilled to disk and replayed later.
+        """
+        writer = RecordingWriter()
+        writer.fail = True
+        buffer = SwipeWriteBehindBuffer(
+            writer, flush_size=3, flush_interval=0.01, spill_dir=str(tmp_path)
+        )
+        await buffer.start()
+
+        spilled = [make_record() for _ in range(3)]
+        for record in spilled:
+            await buffer.enqueue(record)
+        await asyncio.sleep(0.05)
+
+        assert buffer.get_stats()["spilled"] == 3
+        assert len(os.listdir(tmp_path)) == 1
+
+        # Database recovers: next successful flush replays the spill file
+        writer.fail = False
+        await buffer.enqueue(make_record())
+        await asyncio.sleep(0.05)
+        await buffer.stop()
+
+        replayed_ids = {record["id"] for record in writer.records}
+        assert {record["id"] for record in spilled} <= replayed_ids
+        assert os.listdir(tmp_path) == []
+        assert buffer.get_stats()["replayed"] == 3
+
+    async def test_start_replays_spill_from_previous_process(self, tmp_path):
+        """
+        Test that spill files left by an earlier process are replayed on start.
+        """
+        writer = RecordingWriter()
+        writer.fail = True
+        first = SwipeWriteBehindBuffer(
+            writer, flush_size=10, flush_interval=0.01, spill_dir=str(tmp_path)
+        )
+        await first.start()
+        await first.enqueue(make_record())
+        await first.stop()
+        assert len(os.listdir(tmp_path)) == 1
+
+        writer.fail = False
+        second = SwipeWriteBehindBuffer(
+            writer, flush_size=10, flush_interval=0.01, spill_dir=str(tmp_path)
+        )
+        await second.start()
+
+        assert len(writer.records) == 1
+        assert os.listdir(tmp_path) == []
+        await second.stop()
+
+    async def test_corrupt_spill_file_is_quarantined(self, tmp_path):
+        """
+        Test that an unparseable spill file is set aside and later files still replay.
+        """
+        (tmp_path / "swipes-1-corrupt.jsonl").write_text('{"id": "truncated\n')
+        (tmp_path / "swipes-2-valid.jsonl").write_text('{"id": "r1", "session_id": "s1"}\n')
+        writer = RecordingWriter()
+        buffer = SwipeWriteBehindBuffer(
+            writer, flush_size=10, flush_interval=0.01, spill_dir=str(tmp_path)
+        )
+
+        await buffer.start()
+        await buffer._replay_spilled()
+
+        assert [record["id"] for record in writer.records] == ["r1"]
+        assert os.listdir(tmp_path) == ["swipes-1-corrupt.jsonl.bad"]
+        stats = buffer.get_stats()
+        assert stats["spill_files_quarantined"] == 1
+        assert stats["spill_files"] == 0
+        await buffer.stop()
+
+    async def test_spill_io_runs_off_event_loop(self, tmp_path, monkeypatch):
+        """
+        Test that spill writes and replay reads happen in worker threads.
+        """
+        threads = []
+        write_spill_file = SwipeWriteBehindBuffer._write_spill_file
+        read_spill_file = SwipeWriteBehindBuffer._read_spill_file
+
+        def record_write(path, batch):
+            threads.append(("write", threading.current_thread()))
+            return write_spill_file(path, batch)
+
+        def record_read(path):
+            threads.append(("read", threading.current_thread()))
+            return read_spill_file(path)
+
+        monkeypatch.setattr(SwipeWriteBehindBuffer, "_write_spill_file", staticmethod(record_write))
+        monkeypatch.setattr(SwipeWriteBehindBuffer, "_read_spill_file", staticmethod(record_read))
+        writer = RecordingWriter()
+        writer.fail = True
+        buffer = SwipeWriteBehindBuffer(writer, spill_dir=str(tmp_path))
+
+        await buffer._flush([make_record()])
+        writer.fail = False
+        await buffer._replay_spilled()
+
+        assert [kind for kind, _ in threads] == ["write", "read"]
+        assert all(thread is not threading.main_thread() for _, thread in threads)
+        assert len(writer.records) == 1
+        assert os.listdir(tmp_path) == []
+
+    async def test_stop_drains_buffered_records(self):
+        """
+        Test that stop() flushes everything still buffered.
+        """
+        writer = RecordingWriter()
+        buffer = SwipeWriteBehindBuffer(writer, flush_size=4, flush_interval=0.05)
+        await buffer.start()
+
+        for _ in range(10):
+            await buffer.enqueue(make_record())
+        await buffer.stop()
+
+        assert len(writer.records) == 10
+        assert all(len(batch) <= 4 for batch in writer.batches)
+        with pytest.raises(SwipeBufferFullError):
+            await buffer.enqueue(make_record())
@@ -0,0 +1,78 @@
+-- =====================================================================
+-- aclue Database Migration: Swipe Ingestion Functions
+-- Date: 2026-10-17
+-- Version: 4.0
+-- =====================================================================
+--
+-- DEPLOYMENT OVERVIEW:
+-- Adds the session counter functions used by swipe recording in
+-- backend/app/services/database_service.py.
+--
+-- FUNCTIONS DEPLOYED:
+-- 1. increment_session_swipes(session_id_param)
+--    - Per-swipe atomic increment (synchronous recording path)
+-- 2. increment_session_swipes_by(session_id_param, increment_param)
+--    - Batched increment used by write-behind ingestion: one call per
+--      session per flushed batch instead of one call per swipe
+--
+-- PRODUCTION REQUIREMENTS:
+-- ✅ Idempotent deployment using CREATE OR REPLACE
+-- ✅ Atomic UPDATE avoids read-modify-write races
+-- ✅ SECURITY DEFINER with immutable search path
+--
+-- =====================================================================
+
+-- =====================================================================
+-- 1. PER-SWIPE SESSION COUNTER
+-- =====================================================================
+
+CREATE OR REPLACE FUNCTION increment_session_swipes(session_id_param UUID)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+    UPDATE swipe_sessions
+    SET total_swipes = COALESCE(total_swipes, 0) + 1
+    WHERE id = session_id_param;
+END;
+$$;
+
+COMMENT ON FUNCTION increment_session_swipes(UUID) IS 'Atomically increment swipe_sessions.total_swipes by one';
+
+-- =====================================================================
+-- 2. BATCHED SESSION COUNTER
+-- =====================================================================
+-- Purpose: Apply an aggregated swipe count for one session in one statement
+-- Performance: A batch of N swipes across S sessions costs S calls, not N
+
+CREATE OR REPLACE FUNCTION increment_session_swipes_by(
+    session_id_param UUID,
+    increment_param INTEGER
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+    IF increment_param IS NULL OR increment_param <= 0 THEN
+        RETURN;
+    END IF;
+
+    UPDATE swipe_sessions
+    SET total_swipes = COALESCE(total_swipes, 0) + increment_param
+    WHERE id = session_id_param;
+END;
+$$;
+
+COMMENT ON FUNCTION increment_session_swipes_by(UUID, INTEGER) IS 'Atomically add a batched swipe count to swipe_sessions.total_swipes';
+
+-- Write-behind ingestion runs with the service role only
+REVOKE ALL ON FUNCTION increment_session_swipes_by(UUID, INTEGER) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION increment_session_swipes_by(UUID, INTEGER) TO service_role;
+
+-- =====================================================================
+-- DEPLOYMENT COMPLETE
+-- =====================================================================
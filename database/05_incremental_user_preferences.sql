@@ -0,0 +1,265 @@
+-- =====================================================================
+-- aclue Database Migration: Incremental User Preference Aggregation
+-- Date: 2026-10-17
+-- Version: 5.0
+-- =====================================================================
+--
+-- DEPLOYMENT OVERVIEW:
+-- User preferences were rebuilt by DatabaseService.calculate_user_preferences
+-- from the last 1000 swipes (three-way products/categories join) every time
+-- they were calculated. This migration keeps them current incrementally:
+-- every inserted swipe updates running counters in O(1) and re-derives only
+-- the affected category score, brand score and price range.
+--
+-- OBJECTS DEPLOYED:
+-- 1. user_preferences.preference_counters - raw running counters
+-- 2. apply_swipe_to_preferences(user, product, direction) - O(1) update
+-- 3. AFTER INSERT trigger on swipe_interactions
+--
+-- COUNTER LAYOUT (shared with calculate_user_preferences):
+-- {
+--   "categories": {"Electronics": {"likes": 2, "total": 3}},
+--   "brands":     {"Apple": {"likes": 3, "total": 3}},
+--   "price":      {"min": 99.0, "max": 999.0, "sum": 1500.0, "count": 3},
+--   "total": 10, "right": 6, "left": 3, "up": 1
+-- }
+--
+-- DRIFT RECONCILIATION:
+-- calculate_user_preferences remains the full reconcile. It rewrites both
+-- derived columns and counters, and runs in the background once
+-- last_calculated is older than PREFERENCE_RECONCILE_INTERVAL_HOURS.
+-- Rows that predate this migration (empty counters, existing swipes) are
+-- left untouched by the trigger until their first reconcile.
+--
+-- =====================================================================
+
+-- =====================================================================
+-- 1. COUNTER STORAGE
+-- =====================================================================
+
+ALTER TABLE user_preferences
+    ADD COLUMN IF NOT EXISTS preference_counters JSONB DEFAULT '{}';
+
+COMMENT ON COLUMN user_preferences.preference_counters IS 'Running like/total counters maintained per swipe by apply_swipe_to_preferences';
+
+-- The original constraints contradict how preferences are calculated:
+-- super likes count towards total_swipes and engagement_rate is rounded
+-- (and includes super likes). They would reject every incremental update.
+ALTER TABLE user_preferences DROP CONSTRAINT IF EXISTS valid_swipe_data;
+ALTER TABLE user_preferences DROP CONSTRAINT IF EXISTS valid_engagement_rate;
+ALTER TABLE user_preferences ADD CONSTRAINT valid_swipe_data CHECK (
+    total_swipes >= (right_swipes + left_swipes + super_likes)
+);
+
+-- =====================================================================
+-- 2. INCREMENTAL UPDATE FUNCTION
+-- =====================================================================
+-- Performance: two primary-key lookups plus one row update per swipe,
+-- independent of the user's swipe history
+
+CREATE OR REPLACE FUNCTION apply_swipe_to_preferences(
+    user_id_param UUID,
+    product_id_param UUID,
+    direction_param TEXT
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+    v_positive BOOLEAN := direction_param IN ('right', 'up');
+    v_category TEXT;
+    v_brand TEXT;
+    v_price NUMERIC;
+    v_row user_preferences%ROWTYPE;
+    v_counters JSONB;
+    v_stats JSONB;
+    v_price_stats JSONB;
+    v_category_likes INTEGER;
+    v_category_total INTEGER;
+    v_brand_scores JSONB;
+    v_liked TEXT[];
+    v_disliked TEXT[];
+    v_brand_score NUMERIC;
+    v_price_range JSONB;
+    v_category_preferences JSONB;
+    v_total INTEGER;
+    v_engaged INTEGER;
+BEGIN
+    IF user_id_param IS NULL OR product_id_param IS NULL THEN
+        RETURN;
+    END IF;
+
+    -- Product metadata; mirrors the products!inner(categories!inner) join
+    -- used by the full calculation, so unknown products are ignored
+    SELECT c.name, p.brand, p.price_min
+    INTO v_category, v_brand, v_price
+    FROM products p
+    JOIN categories c ON c.id = p.category_id
+    WHERE p.id = product_id_param;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    -- First swipe for this user: create the row without a calculation
+    -- timestamp so the application schedules a full reconcile
+    INSERT INTO user_preferences (user_id, preference_counters, last_calculated)
+    VALUES (user_id_param, '{}'::jsonb, NULL)
+    ON CONFLICT (user_id) DO NOTHING;
+
+    SELECT * INTO v_row
+    FROM user_preferences
+    WHERE user_id = user_id_param
+    FOR UPDATE;
+
+    v_counters := COALESCE(v_row.preference_counters, '{}'::jsonb);
+
+    -- Legacy row with history but no counters: wait for the reconcile
+    IF v_counters = '{}'::jsonb AND COALESCE(v_row.total_swipes, 0) > 0 THEN
+        RETURN;
+    END IF;
+
+    -- Category counters
+    v_stats := COALESCE(v_counters #> ARRAY['categories', v_category], '{"likes": 0, "total": 0}'::jsonb);
+    v_category_likes := (v_stats->>'likes')::INTEGER + CASE WHEN v_positive THEN 1 ELSE 0 END;
+    v_category_total := (v_stats->>'total')::INTEGER + 1;
+    v_counters := jsonb_set(
+        v_counters, '{categories}',
+        COALESCE(v_counters->'categories', '{}'::jsonb)
+            || jsonb_build_object(v_category, jsonb_build_object('likes', v_category_likes, 'total', v_category_total))
+    );
+
+    -- Brand counters (scored once a brand has 3+ interactions)
+    v_brand_scores := COALESCE(v_row.brand_scores, '{}'::jsonb);
+    v_liked := COALESCE(v_row.liked_brands, '{}'::TEXT[]);
+    v_disliked := COALESCE(v_row.disliked_brands, '{}'::TEXT[]);
+
+    IF v_brand IS NOT NULL AND v_brand <> '' THEN
+        v_stats := COALESCE(v_counters #> ARRAY['brands', v_brand], '{"likes": 0, "total": 0}'::jsonb);
+        v_stats := jsonb_build_object(
+            'likes', (v_stats->>'likes')::INTEGER + CASE WHEN v_positive THEN 1 ELSE 0 END,
+            'total', (v_stats->>'total')::INTEGER + 1
+        );
+        v_counters := jsonb_set(
+            v_counters, '{brands}',
+            COALESCE(v_counters->'brands', '{}'::jsonb) || jsonb_build_object(v_brand, v_stats)
+        );
+
+        IF (v_stats->>'total')::INTEGER >= 3 THEN
+            v_brand_score := ROUND((v_stats->>'likes')::NUMERIC / (v_stats->>'total')::NUMERIC, 3);
+            v_brand_scores := v_brand_scores || jsonb_build_object(v_brand, v_brand_score);
+
+            v_liked := array_remove(v_liked, v_brand);
+            v_disliked := array_remove(v_disliked, v_brand);
+            IF v_brand_score >= 0.7 AND COALESCE(cardinality(v_liked), 0) < 10 THEN
+                v_liked := array_append(v_liked, v_brand);
+            ELSIF v_brand_score <= 0.3 AND COALESCE(cardinality(v_disliked), 0) < 5 THEN
+                v_disliked := array_append(v_disliked, v_brand);
+            END IF;
+        END IF;
+    END IF;
+
+    -- Liked-price statistics (LEAST/GREATEST ignore NULL)
+    v_price_stats := COALESCE(v_counters->'price', '{"sum": 0, "count": 0}'::jsonb);
+    IF v_positive AND v_price IS NOT NULL AND v_price > 0 THEN
+        v_price_stats := jsonb_build_object(
+            'min', LEAST((v_price_stats->>'min')::NUMERIC, v_price),
+            'max', GREATEST((v_price_stats->>'max')::NUMERIC, v_price),
+            'sum', COALESCE((v_price_stats->>'sum')::NUMERIC, 0) + v_price,
+            'count', COALESCE((v_price_stats->>'count')::INTEGER, 0) + 1
+        );
+        v_counters := jsonb_set(v_counters, '{price}', v_price_stats);
+    END IF;
+
+    IF COALESCE((v_price_stats->>'count')::INTEGER, 0) > 0 THEN
+        v_price_range := jsonb_build_object(
+            'min', GREATEST(0, FLOOR((v_price_stats->>'min')::NUMERIC * 0.8)),
+            'max', FLOOR((v_price_stats->>'max')::NUMERIC * 1.2),
+            'avg', FLOOR((v_price_stats->>'sum')::NUMERIC / (v_price_stats->>'count')::NUMERIC),
+            'currency', 'GBP'
+        );
+    ELSE
+        v_price_range := '{"min": 0, "max": 1000, "currency": "GBP"}'::jsonb;
+    END IF;
+
+    -- Swipe direction totals
+    v_counters := v_counters || jsonb_build_object(
+        'total', COALESCE((v_counters->>'total')::INTEGER, 0) + 1,
+        'right', COALESCE((v_counters->>'right')::INTEGER, 0) + CASE WHEN direction_param = 'right' THEN 1 ELSE 0 END,
+        'left', COALESCE((v_counters->>'left')::INTEGER, 0) + CASE WHEN direction_param = 'left' THEN 1 ELSE 0 END,
+        'up', COALESCE((v_counters->>'up')::INTEGER, 0) + CASE WHEN direction_param = 'up' THEN 1 ELSE 0 END
+    );
+    v_total := (v_counters->>'total')::INTEGER;
+    v_engaged := (v_counters->>'right')::INTEGER + (v_counters->>'up')::INTEGER;
+
+    v_category_preferences := COALESCE(v_row.category_preferences, '{}'::jsonb)
+        || jsonb_build_object(v_category, ROUND(v_category_likes::NUMERIC / v_category_total, 3));
+
+    UPDATE user_preferences SET
+        preference_counters = v_counters,
+        category_preferences = v_category_preferences,
+        category_confidence = COALESCE(category_confidence, '{}'::jsonb)
+            || jsonb_build_object(v_category, ROUND(LEAST(1.0, v_category_total / 10.0), 3)),
+        brand_scores = v_brand_scores,
+        liked_brands = v_liked,
+        disliked_brands = v_disliked,
+        price_range = v_price_range,
+        total_swipes = v_total,
+        right_swipes = (v_counters->>'right')::INTEGER,
+        left_swipes = (v_counters->>'left')::INTEGER,
+        super_likes = (v_counters->>'up')::INTEGER,
+        engagement_rate = ROUND(v_engaged::NUMERIC / v_total, 3),
+        data_quality_score = ROUND(LEAST(1.0, v_total / 50.0), 2),
+        ml_features = COALESCE(ml_features, '{}'::jsonb) || jsonb_build_object(
+            'diversity_score', (SELECT COUNT(*) FROM jsonb_object_keys(v_category_preferences)),
+            'price_flexibility', CASE
+                WHEN COALESCE((v_price_stats->>'count')::INTEGER, 0) > 0
+                     AND (v_price_range->>'avg')::NUMERIC > 0
+                THEN ((v_price_range->>'max')::NUMERIC - (v_price_range->>'min')::NUMERIC)
+                     / (v_price_range->>'avg')::NUMERIC
+                ELSE 1.0
+            END,
+            'brand_loyalty', COALESCE(cardinality(v_liked), 0)::NUMERIC
+                / GREATEST(1, (SELECT COUNT(*) FROM jsonb_object_keys(v_brand_scores)))
+        )
+    WHERE user_id = user_id_param;
+END;
+$$;
+
+COMMENT ON FUNCTION apply_swipe_to_preferences(UUID, UUID, TEXT) IS 'O(1) incremental update of user_preferences counters and derived scores for one swipe';
+
+-- =====================================================================
+-- 3. SWIPE TRIGGER
+-- =====================================================================
+-- Covers every ingestion path (synchronous inserts, write-behind batch
+-- upserts, direct API inserts). Duplicate-ignoring upserts do not fire
+-- INSERT triggers for skipped rows, so replays are not double counted.
+-- Failures are downgraded to warnings: preferences must never block
+-- swipe recording, and the next reconcile repairs any missed update.
+
+CREATE OR REPLACE FUNCTION trg_apply_swipe_to_preferences()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+    BEGIN
+        PERFORM apply_swipe_to_preferences(NEW.user_id, NEW.product_id, NEW.swipe_direction);
+    EXCEPTION WHEN OTHERS THEN
+        RAISE WARNING 'apply_swipe_to_preferences failed for user %: %', NEW.user_id, SQLERRM;
+    END;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS apply_swipe_to_preferences_after_insert ON swipe_interactions;
+CREATE TRIGGER apply_swipe_to_preferences_after_insert
+    AFTER INSERT ON swipe_interactions
+    FOR EACH ROW EXECUTE FUNCTION trg_apply_swipe_to_preferences();
+
+-- =====================================================================
+-- DEPLOYMENT COMPLETE
+-- =====================================================================
@@ -0,0 +1,104 @@
+-- =====================================================================
+-- aclue Database Migration: Server-Side Business Metrics Aggregation
+-- Date: 2026-10-17
+-- Version: 6.0
+-- =====================================================================
+--
+-- DEPLOYMENT OVERVIEW:
+-- DatabaseService._get_business_metrics used to select the whole users
+-- table plus every swipe and affiliate click from the last 7 days into
+-- Python just to count them. get_business_metrics() computes the same
+-- KPIs inside PostgreSQL and returns a single small JSONB document.
+--
+-- OBJECTS DEPLOYED:
+-- 1. get_business_metrics(window_days) - aggregate KPI RPC
+-- 2. Supporting indexes so every count is an index range scan over the
+--    reporting window rather than a sequential scan of the table
+--
+-- OUTPUT SHAPE (unchanged from the previous Python implementation):
+-- {
+--   "users":        {"total", "active_7d", "engagement_rate"},
+--   "interactions": {"swipes_7d", "active_swipe_users", "avg_swipes_per_user"},
+--   "revenue":      {"affiliate_clicks_7d", "conversions_7d", "conversion_rate"}
+-- }
+--
+-- =====================================================================
+
+-- =====================================================================
+-- 1. SUPPORTING INDEXES
+-- =====================================================================
+
+CREATE INDEX IF NOT EXISTS idx_users_last_login_at
+    ON users(last_login_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_swipe_interactions_timestamp_user
+    ON swipe_interactions(swipe_timestamp DESC, user_id);
+
+CREATE INDEX IF NOT EXISTS idx_affiliate_clicks_timestamp_converted
+    ON affiliate_clicks(click_timestamp DESC, is_converted);
+
+-- =====================================================================
+-- 2. AGGREGATE KPI FUNCTION
+-- =====================================================================
+
+CREATE OR REPLACE FUNCTION get_business_metrics(window_days INTEGER DEFAULT 7)
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+    v_since TIMESTAMP WITH TIME ZONE := NOW() - make_interval(days => window_days);
+    v_total_users BIGINT;
+    v_active_users BIGINT;
+    v_swipes BIGINT;
+    v_swipe_users BIGINT;
+    v_clicks BIGINT;
+    v_conversions BIGINT;
+BEGIN
+    SELECT
+        COUNT(*),
+        COUNT(*) FILTER (WHERE last_login_at > v_since)
+    INTO v_total_users, v_active_users
+    FROM users;
+
+    SELECT COUNT(*), COUNT(DISTINCT user_id)
+    INTO v_swipes, v_swipe_users
+    FROM swipe_interactions
+    WHERE swipe_timestamp >= v_since;
+
+    SELECT COUNT(*), COUNT(*) FILTER (WHERE is_converted)
+    INTO v_clicks, v_conversions
+    FROM affiliate_clicks
+    WHERE click_timestamp >= v_since;
+
+    RETURN jsonb_build_object(
+        'users', jsonb_build_object(
+            'total', v_total_users,
+            'active_7d', v_active_users,
+            'engagement_rate', ROUND(v_active_users::NUMERIC / GREATEST(1, v_total_users) * 100, 2)
+        ),
+        'interactions', jsonb_build_object(
+            'swipes_7d', v_swipes,
+            'active_swipe_users', v_swipe_users,
+            'avg_swipes_per_user', ROUND(v_swipes::NUMERIC / GREATEST(1, v_swipe_users), 1)
+        ),
+        'revenue', jsonb_build_object(
+            'affiliate_clicks_7d', v_clicks,
+            'conversions_7d', v_conversions,
+            'conversion_rate', ROUND(v_conversions::NUMERIC / GREATEST(1, v_clicks) * 100, 2)
+        )
+    );
+END;
+$$;
+
+COMMENT ON FUNCTION get_business_metrics(INTEGER) IS 'Business KPIs for the performance dashboard, aggregated in the database';
+
+-- Dashboard metrics are read with the service role only
+REVOKE ALL ON FUNCTION get_business_metrics(INTEGER) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION get_business_metrics(INTEGER) TO service_role;
+
+-- =====================================================================
+-- DEPLOYMENT COMPLETE
+-- =====================================================================
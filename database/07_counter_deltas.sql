@@ -0,0 +1,124 @@
+-- =====================================================================
+-- aclue Database Migration: Batched Counter Deltas
+-- Date: 2026-10-17
+-- Version: 7.0
+-- =====================================================================
+--
+-- DEPLOYMENT OVERVIEW:
+-- Hot engagement counters were incremented one request at a time. The
+-- backend CounterAggregator (app/services/counter_service.py) now
+-- coalesces increments in memory and applies them periodically with one
+-- call to apply_counter_deltas(), inside a single transaction.
+--
+-- OBJECTS DEPLOYED:
+-- 1. Counter columns missing from the Supabase schema
+-- 2. apply_counter_deltas(deltas JSONB) - whitelisted atomic batch update
+--
+-- INPUT FORMAT:
+-- [
+--   {"table": "products", "key": "<uuid>", "column": "view_count", "delta": 17},
+--   {"table": "session_analytics", "key": "<session id>", "column": "affiliate_clicks", "delta": 2}
+-- ]
+--
+-- RETURNS:
+-- {"applied": <deltas that matched a row>, "unmatched": <increments not applied>}
+--
+-- SECURITY:
+-- Only the table/column pairs listed in the function can be updated;
+-- identifiers are quoted with format(%I) and values are bound parameters.
+--
+-- =====================================================================
+
+-- =====================================================================
+-- 1. COUNTER COLUMNS
+-- =====================================================================
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS view_count INTEGER DEFAULT 0;
+ALTER TABLE products ADD COLUMN IF NOT EXISTS click_count INTEGER DEFAULT 0;
+ALTER TABLE gift_links ADD COLUMN IF NOT EXISTS click_count INTEGER DEFAULT 0;
+
+-- =====================================================================
+-- 2. BATCHED DELTA FUNCTION
+-- =====================================================================
+
+CREATE OR REPLACE FUNCTION apply_counter_deltas(deltas JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+    v_item JSONB;
+    v_table TEXT;
+    v_column TEXT;
+    v_key TEXT;
+    v_delta INTEGER;
+    v_key_column TEXT;
+    v_key_type TEXT;
+    v_touch TEXT;
+    v_rows INTEGER;
+    v_applied INTEGER := 0;
+    v_unmatched INTEGER := 0;
+BEGIN
+    FOR v_item IN SELECT * FROM jsonb_array_elements(COALESCE(deltas, '[]'::jsonb))
+    LOOP
+        v_table := v_item->>'table';
+        v_column := v_item->>'column';
+        v_key := v_item->>'key';
+        v_delta := COALESCE((v_item->>'delta')::INTEGER, 0);
+        v_touch := NULL;
+
+        -- Whitelist: (table, column) -> key column, key type, activity column
+        CASE
+            WHEN v_table = 'swipe_sessions' AND v_column = 'total_swipes' THEN
+                v_key_column := 'id'; v_key_type := 'uuid';
+            WHEN v_table = 'session_analytics' AND v_column = 'affiliate_clicks' THEN
+                v_key_column := 'session_id'; v_key_type := 'text'; v_touch := 'last_activity_at';
+            WHEN v_table = 'products' AND v_column IN ('view_count', 'click_count') THEN
+                v_key_column := 'id'; v_key_type := 'uuid';
+            WHEN v_table = 'gift_links' AND v_column IN ('view_count', 'click_count') THEN
+                v_key_column := 'id'; v_key_type := 'uuid';
+            ELSE
+                RAISE EXCEPTION 'apply_counter_deltas: unsupported counter %.%', v_table, v_column;
+        END CASE;
+
+        -- Malformed keys are reported, not fatal, so one bad key cannot
+        -- poison an otherwise valid batch
+        IF v_delta = 0 OR v_key IS NULL
+           OR (v_key_type = 'uuid' AND v_key !~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$') THEN
+            v_unmatched := v_unmatched + GREATEST(v_delta, 0);
+            CONTINUE;
+        END IF;
+
+        IF v_touch IS NULL THEN
+            EXECUTE format(
+                'UPDATE %I SET %I = COALESCE(%I, 0) + $1 WHERE %I = $2::%s',
+                v_table, v_column, v_column, v_key_column, v_key_type
+            ) USING v_delta, v_key;
+        ELSE
+            EXECUTE format(
+                'UPDATE %I SET %I = COALESCE(%I, 0) + $1, %I = NOW() WHERE %I = $2::%s',
+                v_table, v_column, v_column, v_touch, v_key_column, v_key_type
+            ) USING v_delta, v_key;
+        END IF;
+
+        GET DIAGNOSTICS v_rows = ROW_COUNT;
+        IF v_rows > 0 THEN
+            v_applied := v_applied + 1;
+        ELSE
+            v_unmatched := v_unmatched + GREATEST(v_delta, 0);
+        END IF;
+    END LOOP;
+
+    RETURN jsonb_build_object('applied', v_applied, 'unmatched', v_unmatched);
+END;
+$$;
+
+COMMENT ON FUNCTION apply_counter_deltas(JSONB) IS 'Atomically apply a batch of coalesced counter increments (whitelisted counters only)';
+
+REVOKE ALL ON FUNCTION apply_counter_deltas(JSONB) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION apply_counter_deltas(JSONB) TO service_role;
+
+-- =====================================================================
+-- DEPLOYMENT COMPLETE
+-- =====================================================================
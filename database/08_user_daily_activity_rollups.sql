@@ -0,0 +1,411 @@
+-- =====================================================================
+-- aclue Database Migration: Per-User Daily Activity Rollups
+-- Date: 2026-10-17
+-- Version: 8.0
+-- =====================================================================
+--
+-- DEPLOYMENT OVERVIEW:
+-- DatabaseService.get_user_analytics_summary pulled every raw swipe,
+-- affiliate click and product view in the reporting window into Python,
+-- so a 90-day summary cost O(events). This migration maintains one row
+-- per user per UTC day holding the same aggregates, so a summary reads
+-- at most one row per day in the window.
+--
+-- OBJECTS DEPLOYED:
+-- 1. user_daily_activity - rollup table keyed by (user_id, activity_date)
+-- 2. rollup_add / rollup_bump - JSONB counter helpers
+-- 3. AFTER INSERT triggers on swipe_interactions and product_views, and
+--    AFTER INSERT OR UPDATE on affiliate_clicks (conversions and actual
+--    commission arrive after the click)
+-- 4. rebuild_user_daily_activity(since) - backfill / drift repair
+--
+-- JSONB LAYOUT:
+-- category_stats:    {"Electronics": {"total": 3, "likes": 2}}
+-- network_stats:     {"amazon": {"clicks": 4, "conversions": 1}}
+-- view_sources:      {"recommendations": 12}
+-- interaction_types: {"impression": 10, "click": 2}
+--
+-- PARITY WITH THE RAW SUMMARY:
+-- The raw read path selects swipes with products!inner(categories!inner),
+-- so swipes on products without a category are not rolled up either.
+-- Windows are whole UTC days: both read paths start at midnight.
+--
+-- ROLLOUT:
+-- The backend reads rollups only when USER_ANALYTICS_ROLLUPS_ENABLED is
+-- set. Deploy this migration (which backfills the last 90 days) first,
+-- then enable the flag.
+--
+-- =====================================================================
+
+-- =====================================================================
+-- 1. ROLLUP TABLE
+-- =====================================================================
+
+CREATE TABLE IF NOT EXISTS user_daily_activity (
+    user_id UUID NOT NULL,
+    activity_date DATE NOT NULL,
+
+    -- Swipes
+    swipes INTEGER NOT NULL DEFAULT 0,
+    right_swipes INTEGER NOT NULL DEFAULT 0,
+    super_likes INTEGER NOT NULL DEFAULT 0,
+    preference_strength_sum NUMERIC(12,2) NOT NULL DEFAULT 0,
+    category_stats JSONB NOT NULL DEFAULT '{}',
+
+    -- Affiliate clicks
+    clicks INTEGER NOT NULL DEFAULT 0,
+    conversions INTEGER NOT NULL DEFAULT 0,
+    revenue NUMERIC(12,2) NOT NULL DEFAULT 0,
+    network_stats JSONB NOT NULL DEFAULT '{}',
+
+    -- Product views
+    views INTEGER NOT NULL DEFAULT 0,
+    view_duration_sum BIGINT NOT NULL DEFAULT 0,
+    view_duration_count INTEGER NOT NULL DEFAULT 0,
+    view_sources JSONB NOT NULL DEFAULT '{}',
+    interaction_types JSONB NOT NULL DEFAULT '{}',
+
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    PRIMARY KEY (user_id, activity_date)
+);
+
+ALTER TABLE user_daily_activity ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own daily activity" ON user_daily_activity;
+CREATE POLICY "Users can view own daily activity" ON user_daily_activity
+    FOR SELECT USING (auth.uid() = user_id);
+
+COMMENT ON TABLE user_daily_activity IS 'Per-user per-day engagement aggregates maintained by triggers';
+
+-- =====================================================================
+-- 2. JSONB COUNTER HELPERS
+-- =====================================================================
+
+-- {"a": 1} + ("a", 2) -> {"a": 3}
+CREATE OR REPLACE FUNCTION rollup_add(doc JSONB, bucket TEXT, amount NUMERIC)
+RETURNS JSONB
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT COALESCE(doc, '{}'::jsonb) || jsonb_build_object(
+        bucket, COALESCE((doc->>bucket)::NUMERIC, 0) + amount
+    )
+$$;
+
+-- {"a": {"x": 1}} + ("a", {"x": 1, "y": 1}) -> {"a": {"x": 2, "y": 1}}
+CREATE OR REPLACE FUNCTION rollup_bump(doc JSONB, bucket TEXT, deltas JSONB)
+RETURNS JSONB
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT COALESCE(doc, '{}'::jsonb) || jsonb_build_object(
+        bucket,
+        COALESCE(doc->bucket, '{}'::jsonb) || COALESCE((
+            SELECT jsonb_object_agg(d.key, COALESCE((doc->bucket->>d.key)::NUMERIC, 0) + d.value::NUMERIC)
+            FROM jsonb_each_text(deltas) d
+        ), '{}'::jsonb)
+    )
+$$;
+
+-- =====================================================================
+-- 3. MAINTENANCE TRIGGERS
+-- =====================================================================
+-- Each event is one INSERT ... ON CONFLICT DO UPDATE, which locks the
+-- day row, so concurrent events for the same user cannot lose counts.
+-- Failures are downgraded to warnings: a rollup problem must never
+-- reject the underlying event (rebuild_user_daily_activity repairs drift).
+
+CREATE OR REPLACE FUNCTION trg_rollup_swipe_activity()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+    v_category TEXT;
+    v_like INTEGER := CASE WHEN NEW.swipe_direction IN ('right', 'up') THEN 1 ELSE 0 END;
+BEGIN
+    IF NEW.user_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    BEGIN
+        SELECT c.name INTO v_category
+        FROM products p
+        JOIN categories c ON c.id = p.category_id
+        WHERE p.id = NEW.product_id;
+
+        -- Same population as the raw summary's inner joins
+        IF v_category IS NULL THEN
+            RETURN NULL;
+        END IF;
+
+        INSERT INTO user_daily_activity AS uda (
+            user_id, activity_date, swipes, right_swipes, super_likes,
+            preference_strength_sum, category_stats
+        ) VALUES (
+            NEW.user_id,
+            (COALESCE(NEW.swipe_timestamp, NOW()) AT TIME ZONE 'UTC')::DATE,
+            1,
+            CASE WHEN NEW.swipe_direction = 'right' THEN 1 ELSE 0 END,
+            CASE WHEN NEW.swipe_direction = 'up' THEN 1 ELSE 0 END,
+            COALESCE(NEW.preference_strength, 0.5),
+            jsonb_build_object(v_category, jsonb_build_object('total', 1, 'likes', v_like))
+        )
+        ON CONFLICT (user_id, activity_date) DO UPDATE SET
+            swipes = uda.swipes + EXCLUDED.swipes,
+            right_swipes = uda.right_swipes + EXCLUDED.right_swipes,
+            super_likes = uda.super_likes + EXCLUDED.super_likes,
+            preference_strength_sum = uda.preference_strength_sum + EXCLUDED.preference_strength_sum,
+            category_stats = rollup_bump(
+                uda.category_stats, v_category, jsonb_build_object('total', 1, 'likes', v_like)
+            ),
+            updated_at = NOW();
+    EXCEPTION WHEN OTHERS THEN
+        RAISE WARNING 'swipe activity rollup failed for user %: %', NEW.user_id, SQLERRM;
+    END;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS rollup_swipe_activity_after_insert ON swipe_interactions;
+CREATE TRIGGER rollup_swipe_activity_after_insert
+    AFTER INSERT ON swipe_interactions
+    FOR EACH ROW EXECUTE FUNCTION trg_rollup_swipe_activity();
+
+CREATE OR REPLACE FUNCTION trg_rollup_click_activity()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+    v_network TEXT := COALESCE(NEW.affiliate_network, 'unknown');
+    v_clicks INTEGER := 1;
+    v_conversions INTEGER := CASE WHEN NEW.is_converted THEN 1 ELSE 0 END;
+    v_revenue NUMERIC := COALESCE(NEW.actual_commission, 0);
+BEGIN
+    IF NEW.user_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Updates contribute only the change in conversion state and revenue
+    IF TG_OP = 'UPDATE' THEN
+        v_clicks := 0;
+        v_conversions := v_conversions - CASE WHEN OLD.is_converted THEN 1 ELSE 0 END;
+        v_revenue := v_revenue - COALESCE(OLD.actual_commission, 0);
+        IF v_conversions = 0 AND v_revenue = 0 THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    BEGIN
+        INSERT INTO user_daily_activity AS uda (
+            user_id, activity_date, clicks, conversions, revenue, network_stats
+        ) VALUES (
+            NEW.user_id,
+            (COALESCE(NEW.click_timestamp, NOW()) AT TIME ZONE 'UTC')::DATE,
+            v_clicks,
+            v_conversions,
+            v_revenue,
+            jsonb_build_object(v_network, jsonb_build_object('clicks', v_clicks, 'conversions', v_conversions))
+        )
+        ON CONFLICT (user_id, activity_date) DO UPDATE SET
+            clicks = uda.clicks + EXCLUDED.clicks,
+            conversions = uda.conversions + EXCLUDED.conversions,
+            revenue = uda.revenue + EXCLUDED.revenue,
+            network_stats = rollup_bump(
+                uda.network_stats, v_network,
+                jsonb_build_object('clicks', v_clicks, 'conversions', v_conversions)
+            ),
+            updated_at = NOW();
+    EXCEPTION WHEN OTHERS THEN
+        RAISE WARNING 'click activity rollup failed for user %: %', NEW.user_id, SQLERRM;
+    END;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS rollup_click_activity_after_write ON affiliate_clicks;
+CREATE TRIGGER rollup_click_activity_after_write
+    AFTER INSERT OR UPDATE OF is_converted, actual_commission ON affiliate_clicks
+    FOR EACH ROW EXECUTE FUNCTION trg_rollup_click_activity();
+
+CREATE OR REPLACE FUNCTION trg_rollup_view_activity()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+    v_source TEXT := COALESCE(NEW.view_source, 'unknown');
+    v_interaction TEXT := COALESCE(NEW.interaction_type, 'impression');
+    v_has_duration BOOLEAN := COALESCE(NEW.view_duration_seconds, 0) > 0;
+BEGIN
+    IF NEW.user_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    BEGIN
+        INSERT INTO user_daily_activity AS uda (
+            user_id, activity_date, views, view_duration_sum, view_duration_count,
+            view_sources, interaction_types
+        ) VALUES (
+            NEW.user_id,
+            (COALESCE(NEW.view_timestamp, NOW()) AT TIME ZONE 'UTC')::DATE,
+            1,
+            CASE WHEN v_has_duration THEN NEW.view_duration_seconds ELSE 0 END,
+            CASE WHEN v_has_duration THEN 1 ELSE 0 END,
+            jsonb_build_object(v_source, 1),
+            jsonb_build_object(v_interaction, 1)
+        )
+        ON CONFLICT (user_id, activity_date) DO UPDATE SET
+            views = uda.views + 1,
+            view_duration_sum = uda.view_duration_sum + EXCLUDED.view_duration_sum,
+            view_duration_count = uda.view_duration_count + EXCLUDED.view_duration_count,
+            view_sources = rollup_add(uda.view_sources, v_source, 1),
+            interaction_types = rollup_add(uda.interaction_types, v_interaction, 1),
+            updated_at = NOW();
+    EXCEPTION WHEN OTHERS THEN
+        RAISE WARNING 'view activity rollup failed for user %: %', NEW.user_id, SQLERRM;
+    END;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS rollup_view_activity_after_insert ON product_views;
+CREATE TRIGGER rollup_view_activity_after_insert
+    AFTER INSERT ON product_views
+    FOR EACH ROW EXECUTE FUNCTION trg_rollup_view_activity();
+
+-- =====================================================================
+-- 4. BACKFILL / REBUILD
+-- =====================================================================
+-- Recomputes rollups from raw events for days on or after since_date.
+-- Run during low traffic: events inserted while it runs may be counted
+-- by both the rebuild and the triggers.
+
+CREATE OR REPLACE FUNCTION rebuild_user_daily_activity(since_date DATE)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+    v_since TIMESTAMP WITH TIME ZONE := since_date::TIMESTAMP AT TIME ZONE 'UTC';
+    v_rows INTEGER;
+BEGIN
+    DELETE FROM user_daily_activity WHERE activity_date >= since_date;
+
+    -- Swipes on categorised products, with per-category totals and likes
+    INSERT INTO user_daily_activity (
+        user_id, activity_date, swipes, right_swipes, super_likes,
+        preference_strength_sum, category_stats
+    )
+    SELECT
+        s.user_id, s.day, SUM(s.n), SUM(s.rights), SUM(s.ups), SUM(s.strength),
+        jsonb_object_agg(s.category, jsonb_build_object('total', s.n, 'likes', s.likes))
+    FROM (
+        SELECT
+            si.user_id,
+            (si.swipe_timestamp AT TIME ZONE 'UTC')::DATE AS day,
+            c.name AS category,
+            COUNT(*) AS n,
+            COUNT(*) FILTER (WHERE si.swipe_direction = 'right') AS rights,
+            COUNT(*) FILTER (WHERE si.swipe_direction = 'up') AS ups,
+            COUNT(*) FILTER (WHERE si.swipe_direction IN ('right', 'up')) AS likes,
+            SUM(COALESCE(si.preference_strength, 0.5)) AS strength
+        FROM swipe_interactions si
+        JOIN products p ON p.id = si.product_id
+        JOIN categories c ON c.id = p.category_id
+        WHERE si.user_id IS NOT NULL AND si.swipe_timestamp >= v_since
+        GROUP BY 1, 2, 3
+    ) s
+    GROUP BY s.user_id, s.day;
+
+    -- Affiliate clicks, with per-network clicks and conversions
+    INSERT INTO user_daily_activity AS uda (
+        user_id, activity_date, clicks, conversions, revenue, network_stats
+    )
+    SELECT
+        a.user_id, a.day, SUM(a.n), SUM(a.conversions), SUM(a.revenue),
+        jsonb_object_agg(a.network, jsonb_build_object('clicks', a.n, 'conversions', a.conversions))
+    FROM (
+        SELECT
+            ac.user_id,
+            (ac.click_timestamp AT TIME ZONE 'UTC')::DATE AS day,
+            COALESCE(ac.affiliate_network, 'unknown') AS network,
+            COUNT(*) AS n,
+            COUNT(*) FILTER (WHERE ac.is_converted) AS conversions,
+            SUM(COALESCE(ac.actual_commission, 0)) AS revenue
+        FROM affiliate_clicks ac
+        WHERE ac.user_id IS NOT NULL AND ac.click_timestamp >= v_since
+        GROUP BY 1, 2, 3
+    ) a
+    GROUP BY a.user_id, a.day
+    ON CONFLICT (user_id, activity_date) DO UPDATE SET
+        clicks = EXCLUDED.clicks,
+        conversions = EXCLUDED.conversions,
+        revenue = EXCLUDED.revenue,
+        network_stats = EXCLUDED.network_stats;
+
+    -- Product views, with source and interaction type histograms
+    WITH v AS (
+        SELECT
+            pv.user_id,
+            (pv.view_timestamp AT TIME ZONE 'UTC')::DATE AS day,
+            COALESCE(pv.view_source, 'unknown') AS source,
+            COALESCE(pv.interaction_type, 'impression') AS interaction,
+            pv.view_duration_seconds AS duration
+        FROM product_views pv
+        WHERE pv.user_id IS NOT NULL AND pv.view_timestamp >= v_since
+    ),
+    totals AS (
+        SELECT
+            user_id, day, COUNT(*) AS n,
+            COALESCE(SUM(duration) FILTER (WHERE duration > 0), 0) AS duration_sum,
+            COUNT(*) FILTER (WHERE duration > 0) AS duration_count
+        FROM v GROUP BY 1, 2
+    ),
+    sources AS (
+        SELECT user_id, day, jsonb_object_agg(source, n) AS doc
+        FROM (SELECT user_id, day, source, COUNT(*) AS n FROM v GROUP BY 1, 2, 3) x
+        GROUP BY 1, 2
+    ),
+    interactions AS (
+        SELECT user_id, day, jsonb_object_agg(interaction, n) AS doc
+        FROM (SELECT user_id, day, interaction, COUNT(*) AS n FROM v GROUP BY 1, 2, 3) x
+        GROUP BY 1, 2
+    )
+    INSERT INTO user_daily_activity AS uda (
+        user_id, activity_date, views, view_duration_sum, view_duration_count,
+        view_sources, interaction_types
+    )
+    SELECT t.user_id, t.day, t.n, t.duration_sum, t.duration_count, s.doc, i.doc
+    FROM totals t
+    JOIN sources s USING (user_id, day)
+    JOIN interactions i USING (user_id, day)
+    ON CONFLICT (user_id, activity_date) DO UPDATE SET
+        views = EXCLUDED.views,
+        view_duration_sum = EXCLUDED.view_duration_sum,
+        view_duration_count = EXCLUDED.view_duration_count,
+        view_sources = EXCLUDED.view_sources,
+        interaction_types = EXCLUDED.interaction_types;
+
+    SELECT COUNT(*) INTO v_rows FROM user_daily_activity WHERE activity_date >= since_date;
+    RETURN v_rows;
+END;
+$$;
+
+COMMENT ON FUNCTION rebuild_user_daily_activity(DATE) IS 'Recompute user_daily_activity from raw events for days on or after since_date';
+
+REVOKE ALL ON FUNCTION rebuild_user_daily_activity(DATE) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION rebuild_user_daily_activity(DATE) TO service_role;
+
+-- Initial backfill (covers the longest supported summary window)
+SELECT rebuild_user_daily_activity((NOW() AT TIME ZONE 'UTC')::DATE - 90);
+
+-- =====================================================================
+-- DEPLOYMENT COMPLETE
+-- =====================================================================
@@ -0,0 +1,210 @@
+-- =====================================================================
+-- aclue Database Migration: Atomic User Preference Reconcile
+-- Date: 2026-10-17
+-- Version: 9.0
+-- =====================================================================
+--
+-- DEPLOYMENT OVERVIEW:
+-- DatabaseService.calculate_user_preferences rebuilt preferences in Python
+-- from the user's last 1000 swipes and upserted the result. The
+-- apply_swipe_to_preferences trigger (migration 5.0) keeps all-time
+-- counters, so every reconcile of a user with more than 1000 swipes reset
+-- them to a 1000-swipe window, and the upsert overwrote increments the
+-- trigger applied while the reconcile was reading.
+--
+-- OBJECTS DEPLOYED:
+-- 1. idx_swipe_interactions_user (if missing)
+-- 2. reconcile_user_preferences(user) - recalculates counters and derived
+--    columns from all of the user's swipes in one call
+--
+-- CONSISTENCY WITH THE TRIGGER:
+-- - Same population: swipes on products with a category (inner joins),
+--   all time, exactly the swipes the trigger counts
+-- - Same derivations: category/brand scores, liked/disliked brands,
+--   price range, engagement and data quality use the trigger's formulas
+-- - Same lock: the user_preferences row is locked FOR UPDATE before the
+--   swipes are read. A swipe inserted concurrently either committed before
+--   the lock was granted (and is aggregated, since each statement below
+--   takes a new READ COMMITTED snapshot) or its trigger waits for the lock
+--   and is applied on top of the reconciled row. No swipe is lost or
+--   counted twice.
+--
+-- =====================================================================
+
+-- =====================================================================
+-- 1. SUPPORTING INDEX
+-- =====================================================================
+
+CREATE INDEX IF NOT EXISTS idx_swipe_interactions_user ON swipe_interactions(user_id);
+
+-- =====================================================================
+-- 2. RECONCILE FUNCTION
+-- =====================================================================
+-- Performance: one pass over the user's swipes per aggregate (three
+-- index scans on swipe_interactions.user_id) and one row update
+
+CREATE OR REPLACE FUNCTION reconcile_user_preferences(user_id_param UUID)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+    v_total INTEGER;
+    v_right INTEGER;
+    v_left INTEGER;
+    v_up INTEGER;
+    v_price_stats JSONB;
+    v_categories JSONB;
+    v_category_preferences JSONB;
+    v_category_confidence JSONB;
+    v_brands JSONB;
+    v_brand_scores JSONB;
+    v_liked TEXT[];
+    v_disliked TEXT[];
+    v_price_range JSONB;
+    v_row user_preferences%ROWTYPE;
+BEGIN
+    IF user_id_param IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO user_preferences (user_id, preference_counters, last_calculated)
+    VALUES (user_id_param, '{}'::jsonb, NULL)
+    ON CONFLICT (user_id) DO NOTHING;
+
+    -- The lock apply_swipe_to_preferences takes; held until commit
+    PERFORM 1 FROM user_preferences WHERE user_id = user_id_param FOR UPDATE;
+
+    -- Direction totals and liked-price statistics
+    SELECT
+        COUNT(*),
+        COUNT(*) FILTER (WHERE s.swipe_direction = 'right'),
+        COUNT(*) FILTER (WHERE s.swipe_direction = 'left'),
+        COUNT(*) FILTER (WHERE s.swipe_direction = 'up'),
+        jsonb_build_object(
+            'min', MIN(p.price_min) FILTER (WHERE s.swipe_direction IN ('right', 'up') AND p.price_min > 0),
+            'max', MAX(p.price_min) FILTER (WHERE s.swipe_direction IN ('right', 'up') AND p.price_min > 0),
+            'sum', COALESCE(SUM(p.price_min) FILTER (WHERE s.swipe_direction IN ('right', 'up') AND p.price_min > 0), 0),
+            'count', COUNT(*) FILTER (WHERE s.swipe_direction IN ('right', 'up') AND p.price_min > 0)
+        )
+    INTO v_total, v_right, v_left, v_up, v_price_stats
+    FROM swipe_interactions s
+    JOIN products p ON p.id = s.product_id
+    JOIN categories c ON c.id = p.category_id
+    WHERE s.user_id = user_id_param;
+
+    -- Category counters and scores
+    SELECT
+        COALESCE(jsonb_object_agg(stats.category, jsonb_build_object('likes', stats.likes, 'total', stats.total)), '{}'::jsonb),
+        COALESCE(jsonb_object_agg(stats.category, ROUND(stats.likes::NUMERIC / stats.total, 3)), '{}'::jsonb),
+        COALESCE(jsonb_object_agg(stats.category, ROUND(LEAST(1.0, stats.total / 10.0), 3)), '{}'::jsonb)
+    INTO v_categories, v_category_preferences, v_category_confidence
+    FROM (
+        SELECT
+            c.name AS category,
+            COUNT(*) FILTER (WHERE s.swipe_direction IN ('right', 'up')) AS likes,
+            COUNT(*) AS total
+        FROM swipe_interactions s
+        JOIN products p ON p.id = s.product_id
+        JOIN categories c ON c.id = p.category_id
+        WHERE s.user_id = user_id_param
+        GROUP BY c.name
+    ) stats;
+
+    -- Brand counters, scored once a brand has 3+ interactions
+    SELECT
+        COALESCE(jsonb_object_agg(stats.brand, jsonb_build_object('likes', stats.likes, 'total', stats.total)), '{}'::jsonb),
+        COALESCE(
+            jsonb_object_agg(stats.brand, ROUND(stats.likes::NUMERIC / stats.total, 3)) FILTER (WHERE stats.total >= 3),
+            '{}'::jsonb
+        )
+    INTO v_brands, v_brand_scores
+    FROM (
+        SELECT
+            p.brand,
+            COUNT(*) FILTER (WHERE s.swipe_direction IN ('right', 'up')) AS likes,
+            COUNT(*) AS total
+        FROM swipe_interactions s
+        JOIN products p ON p.id = s.product_id
+        JOIN categories c ON c.id = p.category_id
+        WHERE s.user_id = user_id_param
+          AND p.brand IS NOT NULL AND p.brand <> ''
+        GROUP BY p.brand
+    ) stats;
+
+    SELECT
+        COALESCE(ARRAY(
+            SELECT key FROM jsonb_each_text(v_brand_scores)
+            WHERE value::NUMERIC >= 0.7
+            ORDER BY value::NUMERIC DESC, key
+            LIMIT 10
+        ), '{}'::TEXT[]),
+        COALESCE(ARRAY(
+            SELECT key FROM jsonb_each_text(v_brand_scores)
+            WHERE value::NUMERIC <= 0.3
+            ORDER BY value::NUMERIC, key
+            LIMIT 5
+        ), '{}'::TEXT[])
+    INTO v_liked, v_disliked;
+
+    IF (v_price_stats->>'count')::INTEGER > 0 THEN
+        v_price_range := jsonb_build_object(
+            'min', GREATEST(0, FLOOR((v_price_stats->>'min')::NUMERIC * 0.8)),
+            'max', FLOOR((v_price_stats->>'max')::NUMERIC * 1.2),
+            'avg', FLOOR((v_price_stats->>'sum')::NUMERIC / (v_price_stats->>'count')::NUMERIC),
+            'currency', 'GBP'
+        );
+    ELSE
+        v_price_range := '{"min": 0, "max": 1000, "currency": "GBP"}'::jsonb;
+    END IF;
+
+    UPDATE user_preferences SET
+        preference_counters = jsonb_build_object(
+            'categories', v_categories,
+            'brands', v_brands,
+            'price', v_price_stats,
+            'total', v_total,
+            'right', v_right,
+            'left', v_left,
+            'up', v_up
+        ),
+        category_preferences = v_category_preferences,
+        category_confidence = v_category_confidence,
+        brand_scores = v_brand_scores,
+        liked_brands = v_liked,
+        disliked_brands = v_disliked,
+        price_range = v_price_range,
+        total_swipes = v_total,
+        right_swipes = v_right,
+        left_swipes = v_left,
+        super_likes = v_up,
+        engagement_rate = CASE WHEN v_total > 0 THEN ROUND((v_right + v_up)::NUMERIC / v_total, 3) ELSE 0 END,
+        data_quality_score = ROUND(LEAST(1.0, v_total / 50.0), 2),
+        ml_features = COALESCE(ml_features, '{}'::jsonb) || jsonb_build_object(
+            'diversity_score', (SELECT COUNT(*) FROM jsonb_object_keys(v_category_preferences)),
+            'price_flexibility', CASE
+                WHEN (v_price_stats->>'count')::INTEGER > 0 AND (v_price_range->>'avg')::NUMERIC > 0
+                THEN ((v_price_range->>'max')::NUMERIC - (v_price_range->>'min')::NUMERIC)
+                     / (v_price_range->>'avg')::NUMERIC
+                ELSE 1.0
+            END,
+            'brand_loyalty', COALESCE(cardinality(v_liked), 0)::NUMERIC
+                / GREATEST(1, (SELECT COUNT(*) FROM jsonb_object_keys(v_brand_scores)))
+        ),
+        last_calculated = NOW(),
+        calculation_version = 'v3.0'
+    WHERE user_id = user_id_param
+    RETURNING * INTO v_row;
+
+    RETURN to_jsonb(v_row);
+END;
+$$;
+
+COMMENT ON FUNCTION reconcile_user_preferences(UUID) IS 'Recalculate user_preferences counters and derived scores from all swipes, under the row lock the swipe trigger takes';
+
+GRANT EXECUTE ON FUNCTION reconcile_user_preferences(UUID) TO service_role;
+
+-- =====================================================================
+-- DEPLOYMENT COMPLETE
+-- =====================================================================